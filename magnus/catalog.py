@@ -1,12 +1,13 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
 import magnus.context as context
 from magnus import defaults
 from magnus.datastore import DataCatalog
+from magnus.retention import Throttle
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
 
@@ -95,6 +96,35 @@ class BaseCatalog(ABC, BaseModel):
         """
         raise NotImplementedError
 
+    def delete_run(
+        self, run_id: str, dry_run: bool = False, max_workers: int = 4, throttle: Optional[Throttle] = None, **kwargs
+    ) -> int:
+        """
+        Delete the catalog of the run.
+
+        Args:
+            run_id (str): The run id
+            dry_run (bool, optional): Only report the bytes to reclaim. Defaults to False.
+            max_workers (int, optional): The number of files deleted concurrently. Defaults to 4.
+            throttle (Throttle, optional): Limits the rate of deletes. Defaults to no limit.
+
+        Raises:
+            Exception: If the catalog handler does not support deleting runs
+
+        Returns:
+            int: The bytes reclaimed, or that would be reclaimed in a dry run
+        """
+        raise Exception(f"The catalog handler {self.service_name} does not support deleting runs")
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        The counters of the hash cache, if the catalog handler has one enabled.
+
+        Returns:
+            Dict[str, int]: The counters, empty if there is no cache.
+        """
+        return {}
+
 
 # --8<-- [end:docs]
 
@@ -139,3 +169,12 @@ class DoNothingCatalog(BaseCatalog):
         """
         logger.info("Using a do-nothing catalog, doing nothing while sync between runs")
         ...
+
+    def delete_run(
+        self, run_id: str, dry_run: bool = False, max_workers: int = 4, throttle: Optional[Throttle] = None, **kwargs
+    ) -> int:
+        """
+        Does nothing
+        """
+        logger.info("Using a do-nothing catalog, doing nothing while deleting a run")
+        return 0
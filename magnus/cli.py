@@ -1,4 +1,6 @@
+import json
 import logging
+from datetime import datetime
 
 import click
 from click_plugins import with_plugins
@@ -267,6 +269,295 @@ def fan(run_id, step_name, mode, map_variable, file, config_file, parameters_fil
     )
 
 
+@cli.command("compact", short_help="Collapse the run log of a completed run")
+@click.argument("run_id")
+@click.option(
+    "-c", "--config-file", default=None, help="config file, in yaml, to be used for the run", show_default=True
+)
+@click.option(
+    "--log-level",
+    default=defaults.LOG_LEVEL,
+    help="The log level",
+    show_default=True,
+    type=click.Choice(["INFO", "DEBUG", "WARNING", "ERROR", "FATAL"]),
+)
+def compact(run_id, config_file, log_level):  # pragma: no cover
+    """
+    Collapse the run log of a completed run, for run log stores that support it.
+
+    Usage: magnus compact [OPTIONS] RUN_ID
+    """
+    logger.setLevel(log_level)
+    entrypoints.compact(configuration_file=config_file, run_id=run_id)
+
+
+def _format_time(timestamp):
+    if timestamp is None:
+        return ""
+    return str(datetime.fromtimestamp(timestamp))
+
+
+@cli.command("gc", short_help="Delete the runs expired by a retention policy")
+@click.option(
+    "-c", "--config-file", default=None, help="config file, in yaml, to be used for the run", show_default=True
+)
+@click.option("--keep-last", type=int, default=None, help="Retain the latest these many finished runs of every tag")
+@click.option("--max-age-days", type=float, default=None, help="Retain the runs started in these many days")
+@click.option(
+    "--keep-referenced/--no-keep-referenced",
+    default=True,
+    help="Retain the runs re-run by a retained run",
+    show_default=True,
+)
+@click.option("--dry-run", is_flag=True, default=False, help="Only report the runs and the bytes to reclaim")
+@click.option("--max-workers", default=4, help="The number of files deleted concurrently", show_default=True)
+@click.option(
+    "--max-deletes-per-second", default=0.0, help="Limit the rate of deletes, 0 for no limit", show_default=True
+)
+@click.option(
+    "--log-level",
+    default=defaults.LOG_LEVEL,
+    help="The log level",
+    show_default=True,
+    type=click.Choice(["INFO", "DEBUG", "WARNING", "ERROR", "FATAL"]),
+)
+def gc(
+    config_file, keep_last, max_age_days, keep_referenced, dry_run, max_workers, max_deletes_per_second, log_level
+):  # pragma: no cover
+    """
+    Delete the run logs and the catalogs of the runs expired by the retention policy.
+
+    Usage: magnus gc [OPTIONS]
+    """
+    logger.setLevel(log_level)
+    collected = entrypoints.gc(
+        configuration_file=config_file,
+        keep_last=keep_last,
+        max_age_days=max_age_days,
+        keep_referenced=keep_referenced,
+        dry_run=dry_run,
+        max_workers=max_workers,
+        max_deletes_per_second=max_deletes_per_second,
+    )
+
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table("run_id", "tag", "status", "start_time", "run log bytes", "catalog bytes")
+    for run in collected:
+        table.add_row(
+            run["run_id"],
+            run["tag"],
+            run["status"],
+            _format_time(run["start_time"]),
+            str(run["run_log_bytes"]),
+            str(run["catalog_bytes"]),
+        )
+    Console().print(table)
+
+    reclaimed = sum(run["run_log_bytes"] + run["catalog_bytes"] for run in collected)
+    click.echo(f"{'Would reclaim' if dry_run else 'Reclaimed'} {reclaimed} bytes from {len(collected)} runs")
+
+
+@cli.command("runlog-server", short_help="Serve the run log store to remote run log stores")
+@click.option(
+    "-c", "--config-file", default=None, help="config file, in yaml, with the run log store to serve", show_default=True
+)
+@click.option("--host", default="127.0.0.1", help="The host to listen on", show_default=True)
+@click.option("--port", default=8765, help="The port to listen on", show_default=True)
+@click.option("--socket", "socket_path", default="", help="Listen on this Unix socket rather than the host and port")
+@click.option(
+    "--log-level",
+    default=defaults.LOG_LEVEL,
+    help="The log level",
+    show_default=True,
+    type=click.Choice(["INFO", "DEBUG", "WARNING", "ERROR", "FATAL"]),
+)
+def runlog_server(config_file, host, port, socket_path, log_level):  # pragma: no cover
+    """
+    Serve the run log store of the config file to the executions configured with the remote run log store.
+
+    Usage: magnus runlog-server [OPTIONS]
+    """
+    logger.setLevel(log_level)
+    entrypoints.runlog_server(configuration_file=config_file, host=host, port=port, socket_path=socket_path)
+
+
+@cli.group("runs", short_help="Query the runs of the run log store")
+def runs():
+    """
+    Query the runs of the run log store, listed from the index of the runs maintained by the run log store.
+    """
+    pass
+
+
+@runs.command("list", short_help="List the runs, the latest first")
+@click.option(
+    "-c", "--config-file", default=None, help="config file, in yaml, to be used for the run", show_default=True
+)
+@click.option("--tag", default="", help="Only the runs with the tag")
+@click.option("--status", default="", help="Only the runs with the status, e.g SUCCESS or FAIL")
+@click.option("--dag-hash", default="", help="Only the runs of the dag with the hash")
+@click.option("--original-run-id", default="", help="Only the re-runs of the run")
+@click.option("--limit", default=20, help="The number of runs to list", show_default=True)
+@click.option("--offset", default=0, help="The number of runs to skip", show_default=True)
+@click.option("--as-json", is_flag=True, default=False, help="Print the runs as json")
+@click.option(
+    "--log-level",
+    default=defaults.LOG_LEVEL,
+    help="The log level",
+    show_default=True,
+    type=click.Choice(["INFO", "DEBUG", "WARNING", "ERROR", "FATAL"]),
+)
+def list_runs(
+    config_file, tag, status, dag_hash, original_run_id, limit, offset, as_json, log_level
+):  # pragma: no cover
+    """
+    List the runs of the run log store, the latest first.
+
+    Usage: magnus runs list [OPTIONS]
+    """
+    logger.setLevel(log_level)
+    found = entrypoints.list_runs(
+        configuration_file=config_file,
+        tag=tag,
+        status=status,
+        dag_hash=dag_hash,
+        original_run_id=original_run_id,
+        limit=limit,
+        offset=offset,
+    )
+
+    if as_json:
+        click.echo(json.dumps(found, indent=4))
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table("run_id", "tag", "status", "dag_hash", "original_run_id", "start_time", "end_time")
+    for run in found:
+        table.add_row(
+            run["run_id"],
+            run["tag"],
+            run["status"],
+            run["dag_hash"],
+            run["original_run_id"],
+            _format_time(run["start_time"]),
+            _format_time(run["end_time"]),
+        )
+    Console().print(table)
+
+
+@runs.command("reindex", short_help="Rebuild the index of the runs from the run logs")
+@click.option(
+    "-c", "--config-file", default=None, help="config file, in yaml, to be used for the run", show_default=True
+)
+@click.option(
+    "--log-level",
+    default=defaults.LOG_LEVEL,
+    help="The log level",
+    show_default=True,
+    type=click.Choice(["INFO", "DEBUG", "WARNING", "ERROR", "FATAL"]),
+)
+def reindex(config_file, log_level):  # pragma: no cover
+    """
+    Rebuild the index of the runs by reading the run logs, needed for the runs created before the index.
+
+    Usage: magnus runs reindex [OPTIONS]
+    """
+    logger.setLevel(log_level)
+    entrypoints.reindex_runs(configuration_file=config_file)
+
+
+@runs.command("show", short_help="Summarize a run and page through its steps")
+@click.argument("run_id")
+@click.option(
+    "-c", "--config-file", default=None, help="config file, in yaml, to be used for the run", show_default=True
+)
+@click.option("--failed", is_flag=True, default=False, help="Only the failed steps")
+@click.option("--limit", default=50, help="The number of steps to show", show_default=True)
+@click.option("--offset", default=0, help="The number of steps to skip", show_default=True)
+@click.option("--as-json", is_flag=True, default=False, help="Print the summary and the steps as json")
+@click.option(
+    "--log-level",
+    default=defaults.LOG_LEVEL,
+    help="The log level",
+    show_default=True,
+    type=click.Choice(["INFO", "DEBUG", "WARNING", "ERROR", "FATAL"]),
+)
+def show_run(run_id, config_file, failed, limit, offset, as_json, log_level):  # pragma: no cover
+    """
+    Summarize the run, with the counts of the steps and branches by status and the failed steps,
+    and show a page of its steps.
+
+    Usage: magnus runs show [OPTIONS] RUN_ID
+    """
+    logger.setLevel(log_level)
+    summary, steps = entrypoints.show_run(
+        configuration_file=config_file, run_id=run_id, limit=limit, offset=offset, failed_only=failed
+    )
+
+    if as_json:
+        contents = summary.model_dump()
+        contents["page"] = [step_log.model_dump(exclude={"branches"}) for step_log in steps]
+        click.echo(json.dumps(contents, indent=4))
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    console.print(f"run_id: {summary.run_id}  tag: {summary.tag}  status: {summary.status}")
+
+    statuses = sorted(set(summary.steps) | set(summary.branches))
+    counts = Table("log", *statuses)
+    for name, by_status in {"steps": summary.steps, "branches": summary.branches}.items():
+        counts.add_row(name, *[str(by_status.get(status, 0)) for status in statuses])
+    console.print(counts)
+
+    if summary.failed_steps:
+        console.print("failed steps: " + ", ".join(summary.failed_steps))
+
+    table = Table("step", "type", "status", "attempts", "start_time", "end_time")
+    for step_log in steps:
+        attempt = step_log.attempts[-1] if step_log.attempts else None
+        table.add_row(
+            step_log.internal_name,
+            step_log.step_type,
+            step_log.status,
+            str(len(step_log.attempts)),
+            attempt.start_time if attempt else "",
+            attempt.end_time if attempt else "",
+        )
+    console.print(table)
+    console.print(f"steps {offset + 1} to {offset + len(steps)}, use --offset and --limit for more")
+
+
+@runs.command("export", short_help="Export the run log of a run as newline delimited json")
+@click.argument("run_id")
+@click.option(
+    "-c", "--config-file", default=None, help="config file, in yaml, to be used for the run", show_default=True
+)
+@click.option("-o", "--output", default="", help="The file to write to, the standard output by default")
+@click.option(
+    "--log-level",
+    default=defaults.LOG_LEVEL,
+    help="The log level",
+    show_default=True,
+    type=click.Choice(["INFO", "DEBUG", "WARNING", "ERROR", "FATAL"]),
+)
+def export_run(run_id, config_file, output, log_level):  # pragma: no cover
+    """
+    Export the run log as newline delimited json: the run log followed by every step and branch log,
+    a log per line, without loading the whole run log in memory.
+
+    Usage: magnus runs export [OPTIONS] RUN_ID
+    """
+    logger.setLevel(log_level)
+    entrypoints.export_run(configuration_file=config_file, run_id=run_id, output=output)
+
+
 # Needed for the binary creation
 if __name__ == "__main__":
     cli()
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, OrderedDict, Tuple, Union
+from collections.abc import Mapping
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, OrderedDict, Tuple, TypeVar, Union, cast
 
 from pydantic import BaseModel, Field
 
 import magnus.context as context
 from magnus import defaults, exceptions
+from magnus.retention import Throttle
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
 
@@ -54,6 +58,7 @@ class StepAttempt(BaseModel):
     status: str = "FAIL"
     message: str = ""
     parameters: Dict[str, Any] = Field(default_factory=dict)
+    parameters_hash: str = ""  # The hash of the parameters, if they are stored once as a snapshot of the run
 
 
 class CodeIdentity(BaseModel, extra="allow"):
@@ -132,6 +137,7 @@ class BranchLog(BaseModel):
 
     internal_name: str
     status: str = "FAIL"
+    parameters: Dict[str, Any] = Field(default_factory=dict)  # The parameters set by the steps of the branch
     steps: OrderedDict[str, StepLog] = Field(default_factory=OrderedDict)
 
     def get_data_catalogs_by_stage(self, stage="put") -> List[DataCatalog]:
@@ -282,6 +288,446 @@ class RunLog(BaseModel):
         raise exceptions.StepLogNotFoundError(self.run_id, i_name)
 
 
+class LogStatus(BaseModel):
+    """
+    The status of a step log or a branch log, as held by the status index of a run.
+    """
+
+    status: str
+    data_hashes: Dict[str, str] = Field(default_factory=dict)  # The hash of the data put in the catalog, by name
+    parameters: Dict[str, Any] = Field(default_factory=dict)  # The parameters set in the branch, by branch logs
+
+    @classmethod
+    def from_step_log(cls, step_log: StepLog) -> "LogStatus":
+        data_hashes = {
+            data_catalog.name: data_catalog.data_hash
+            for data_catalog in step_log.data_catalog
+            if data_catalog.stage == "put"
+        }
+        return cls(status=step_log.status, data_hashes=data_hashes)
+
+    @classmethod
+    def from_branch_log(cls, branch_log: BranchLog) -> "LogStatus":
+        return cls(status=branch_log.status, parameters=branch_log.parameters)
+
+
+LogT = TypeVar("LogT", RunLog, BranchLog, StepLog)
+
+
+def copy_log(log: LogT, **update: Any) -> LogT:
+    """
+    A deep copy of the log with the given fields replaced, e.g the branches of a step log.
+
+    The copy is validated from a dump of the log. Both run in pydantic-core, which is much cheaper than the deep
+    copy of the models in python by pickle or model_copy. The fields replaced are not dumped at all.
+
+    Args:
+        log (RunLog, BranchLog or StepLog): The log to copy
+        **update: The values of the fields to replace
+
+    Returns:
+        The copy of the log
+    """
+    contents = log.model_dump(exclude=set(update))
+    contents.update(update)
+    return type(log).model_validate(contents)
+
+
+def get_branch_scopes(internal_branch_name: str) -> List[str]:
+    """
+    The branches whose parameters are visible to the steps of a branch, from the outermost to the branch itself.
+
+    A branch is always a step and a branch name in the dot path convention, i.e map.1.parallel.a is a branch
+    of the step map.1.parallel which is part of the branch map.1.
+
+    Args:
+        internal_branch_name (str): The internal name of the branch, empty for the main dag
+
+    Returns:
+        List[str]: The internal names of the enclosing branches and the branch
+    """
+    if not internal_branch_name:
+        return []
+
+    dot_path = internal_branch_name.split(".")
+    return [".".join(dot_path[:i]) for i in range(2, len(dot_path) + 1, 2)]
+
+
+def get_parameters_hash(parameters: Dict[str, Any]) -> str:
+    """
+    The content address of the parameters, the sha1 of their canonical JSON.
+
+    Args:
+        parameters (dict): The parameters of an attempt
+
+    Returns:
+        str: The hash of the parameters
+    """
+    return hashlib.sha1(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _attempt_contents(contents: dict) -> Iterator[dict]:
+    """
+    The attempts in the dump of a run log, branch log or step log, in any depth.
+    """
+    yield from contents.get("attempts", [])
+    for branch in contents.get("branches", {}).values():
+        yield from _attempt_contents(branch)
+    for step in contents.get("steps", {}).values():
+        yield from _attempt_contents(step)
+
+
+def detach_parameters(contents: dict, snapshots: Dict[str, Dict[str, Any]]) -> dict:
+    """
+    Replace the parameters of the attempts in the dump of a log by the hash of the parameters, in place.
+
+    The attempts of a run mostly see the same parameters, the snapshots are collected by their hash so that the
+    store writes every distinct snapshot once.
+
+    Args:
+        contents (dict): The dump of a run log, branch log or step log
+        snapshots (dict): The snapshots by their hash, updated with the parameters of the attempts
+
+    Returns:
+        dict: The contents
+    """
+    for attempt in _attempt_contents(contents):
+        if not attempt.get("parameters"):
+            continue
+        parameters_hash = get_parameters_hash(attempt["parameters"])
+        snapshots.setdefault(parameters_hash, attempt["parameters"])
+        attempt["parameters"] = {}
+        attempt["parameters_hash"] = parameters_hash
+
+    return contents
+
+
+def attach_parameters(contents: dict, snapshots: Mapping) -> dict:
+    """
+    Resolve the parameters of the attempts in the dump of a log from the snapshots, in place.
+
+    Args:
+        contents (dict): The dump of a run log, branch log or step log, as written by detach_parameters
+        snapshots (Mapping): The snapshots by their hash
+
+    Returns:
+        dict: The contents
+    """
+    for attempt in _attempt_contents(contents):
+        parameters_hash = attempt.get("parameters_hash")
+        if not parameters_hash or attempt.get("parameters"):
+            continue
+        if parameters_hash not in snapshots:
+            logger.warning(f"The parameters snapshot {parameters_hash} is not found, the parameters are left empty")
+            continue
+        attempt["parameters"] = snapshots[parameters_hash]
+
+    return contents
+
+
+class RunLogSource(ABC):
+    """
+    The source a LazyRunLog loads its steps and branches from, one at a time.
+
+    Steps are loaded without their branches and branches without their steps.
+    """
+
+    @abstractmethod
+    def step_names(self, internal_branch_name: str) -> List[str]:
+        """
+        The internal names of the steps of the branch, in the order they were created.
+
+        Args:
+            internal_branch_name (str): The internal name of the branch, empty for the dag
+
+        Returns:
+            List[str]: The internal names of the steps
+        """
+        ...
+
+    @abstractmethod
+    def branch_names(self, internal_step_name: str) -> List[str]:
+        """
+        The internal names of the branches of the step, in the order they were created.
+
+        Args:
+            internal_step_name (str): The internal name of the step
+
+        Returns:
+            List[str]: The internal names of the branches
+        """
+        ...
+
+    @abstractmethod
+    def load_step(self, internal_name: str) -> StepLog: ...
+
+    @abstractmethod
+    def load_branch(self, internal_name: str) -> BranchLog: ...
+
+
+class RunLogTreeSource(RunLogSource):
+    """
+    A source over a run log already in memory, for stores which do not support loading parts of a run log.
+    """
+
+    def __init__(self, run_log: RunLog):
+        self.steps: Dict[str, StepLog] = {}
+        self.branches: Dict[str, BranchLog] = {}
+        self.children: Dict[str, List[str]] = {}
+
+        def _index(parent: str, steps: Dict[str, StepLog]):
+            self.children[parent] = list(steps)
+            for internal_name, step_log in steps.items():
+                self.steps[internal_name] = step_log
+                self.children[internal_name] = list(step_log.branches)
+                for branch_name, branch_log in step_log.branches.items():
+                    self.branches[branch_name] = branch_log
+                    _index(branch_name, branch_log.steps)
+
+        _index("", run_log.steps)
+
+    def step_names(self, internal_branch_name: str) -> List[str]:
+        return self.children.get(internal_branch_name, [])
+
+    def branch_names(self, internal_step_name: str) -> List[str]:
+        return self.children.get(internal_step_name, [])
+
+    def load_step(self, internal_name: str) -> StepLog:
+        return copy_log(self.steps[internal_name], branches={})
+
+    def load_branch(self, internal_name: str) -> BranchLog:
+        return copy_log(self.branches[internal_name], steps=OrderedDict())
+
+
+class LazyMapping(Mapping):
+    """
+    A read only mapping of the steps or branches, loading each only when it is first accessed.
+    """
+
+    def __init__(self, names: Callable[[], List[str]], load: Callable[[str], Any]):
+        self._names = names
+        self._load = load
+        self._keys: Optional[Dict[str, None]] = None
+        self._loaded: Dict[str, Any] = {}
+
+    def _index(self) -> Dict[str, None]:
+        if self._keys is None:
+            self._keys = dict.fromkeys(self._names())
+        return self._keys
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._loaded:
+            if key not in self._index():
+                raise KeyError(key)
+            self._loaded[key] = self._load(key)
+        return self._loaded[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index())
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def __repr__(self) -> str:
+        return f"LazyMapping({list(self._index())})"
+
+
+class LazyRunLog:
+    """
+    A view of the run log which loads the steps and branches only when they are accessed.
+
+    The attributes of the run log, like status or parameters, are loaded upfront. The steps of the run log,
+    the branches of a step and the steps of a branch are lazy mappings of StepLog and BranchLog.
+
+    Use iter_steps to walk all the steps without holding them in memory and to_run_log to get the
+    complete, eager RunLog. The step and branch logs returned are not meant to be serialized by themselves.
+    """
+
+    def __init__(self, run_log: RunLog, source: RunLogSource):
+        self._run_log = run_log
+        self._source = source
+        self.steps = LazyMapping(names=lambda: source.step_names(""), load=self._load_step)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for the attributes not found on the view, i.e the attributes of the run log.
+        return getattr(self._run_log, name)
+
+    def _load_step(self, internal_name: str) -> StepLog:
+        step_log = self._source.load_step(internal_name)
+        step_log.branches = LazyMapping(  # type: ignore
+            names=lambda: self._source.branch_names(internal_name), load=self._load_branch
+        )
+        return step_log
+
+    def _load_branch(self, internal_name: str) -> BranchLog:
+        branch_log = self._source.load_branch(internal_name)
+        branch_log.steps = LazyMapping(  # type: ignore
+            names=lambda: self._source.step_names(internal_name), load=self._load_step
+        )
+        return branch_log
+
+    def iter_steps(self, internal_branch_name: str = "") -> Iterator[StepLog]:
+        """
+        Walk the steps of the branch, depth first and in the order of creation, loading one step at a time.
+
+        The steps are not retained by the view and are returned without their branches.
+
+        Args:
+            internal_branch_name (str, optional): The branch to walk. Defaults to the whole dag.
+
+        Yields:
+            StepLog: The step logs
+        """
+        for step_name in self._source.step_names(internal_branch_name):
+            yield self._source.load_step(step_name)
+            for branch_name in self._source.branch_names(step_name):
+                yield from self.iter_steps(branch_name)
+
+    def iter_logs(self, internal_branch_name: str = "") -> Iterator[Union[StepLog, BranchLog]]:
+        """
+        Walk the steps and the branches of the branch, depth first and in the order of creation.
+
+        Every step is followed by its branches and every branch by its steps. The steps are returned without
+        their branches and the branches without their steps, one at a time.
+
+        Args:
+            internal_branch_name (str, optional): The branch to walk. Defaults to the whole dag.
+
+        Yields:
+            StepLog or BranchLog: The step logs and branch logs
+        """
+        for step_name in self._source.step_names(internal_branch_name):
+            yield self._source.load_step(step_name)
+            for branch_name in self._source.branch_names(step_name):
+                yield self._source.load_branch(branch_name)
+                yield from self.iter_logs(branch_name)
+
+    def count_steps(self, internal_branch_name: str = "") -> int:
+        """
+        The number of steps of the branch, including the steps of its branches, without loading any.
+
+        Args:
+            internal_branch_name (str, optional): The branch to count. Defaults to the whole dag.
+
+        Returns:
+            int: The number of step logs
+        """
+        count = 0
+        for step_name in self._source.step_names(internal_branch_name):
+            count += 1
+            for branch_name in self._source.branch_names(step_name):
+                count += self.count_steps(branch_name)
+        return count
+
+    def get_data_catalogs_by_stage(self, stage: str = "put") -> List[DataCatalog]:
+        """
+        Return all the cataloged data by the stage at which they were cataloged.
+
+        Args:
+            stage (str, optional): One of get or put. Defaults to 'put'.
+        """
+        if stage not in ["get", "put"]:
+            raise Exception("Only get or put are allowed in stage")
+
+        data_catalogs = [dc for step_log in self.iter_steps() for dc in step_log.data_catalog if dc.stage == stage]
+
+        return list(set(data_catalogs))
+
+    def to_run_log(self) -> RunLog:
+        """
+        The complete run log, loading every step and branch.
+
+        Returns:
+            RunLog: The eager run log
+        """
+
+        def _steps(internal_branch_name: str) -> OrderedDict[str, StepLog]:
+            steps: OrderedDict[str, StepLog] = OrderedDict()
+            for step_name in self._source.step_names(internal_branch_name):
+                step_log = self._source.load_step(step_name)
+                for branch_name in self._source.branch_names(step_name):
+                    branch_log = self._source.load_branch(branch_name)
+                    branch_log.steps = _steps(branch_name)
+                    step_log.branches[branch_name] = branch_log
+                steps[step_name] = step_log
+            return steps
+
+        run_log = copy_log(self._run_log, steps=OrderedDict())
+        run_log.steps = _steps("")
+        return run_log
+
+    # The search only ever indexes into steps and branches, so only the steps on the path are loaded.
+    search_branch_by_internal_name = RunLog.search_branch_by_internal_name
+    search_step_by_internal_name = RunLog.search_step_by_internal_name
+
+
+class RunLogSummary(BaseModel):
+    """
+    A bounded summary of a run log, shown in place of the run log for runs too big to show in full.
+    """
+
+    run_id: str
+    tag: str = ""
+    status: str
+    steps: Dict[str, int] = Field(default_factory=dict)  # The number of step logs by status
+    branches: Dict[str, int] = Field(default_factory=dict)  # The number of branch logs by status
+    failed_steps: List[str] = Field(default_factory=list)  # The first of the failed steps, by internal name
+
+    @classmethod
+    def from_run_log(cls, run_log: LazyRunLog, max_failed_steps: int = 20) -> "RunLogSummary":
+        """
+        Summarize the run log, walking the steps and branches one at a time.
+
+        Args:
+            run_log (LazyRunLog): The view of the run log
+            max_failed_steps (int, optional): The number of failed steps to list. Defaults to 20.
+
+        Returns:
+            RunLogSummary: The summary
+        """
+        summary = cls(run_id=run_log.run_id, tag=run_log.tag, status=run_log.status)
+
+        for log in run_log.iter_logs():
+            if isinstance(log, BranchLog):
+                summary.branches[log.status] = summary.branches.get(log.status, 0) + 1
+                continue
+
+            summary.steps[log.status] = summary.steps.get(log.status, 0) + 1
+            if log.status == defaults.FAIL and len(summary.failed_steps) < max_failed_steps:
+                summary.failed_steps.append(log.internal_name)
+
+        return summary
+
+
+def export_run_log(run_log: LazyRunLog, stream: IO[str]) -> int:
+    """
+    Write the run log as newline delimited json, a line for every log, without holding the run log in memory.
+
+    The first line is the run log without its steps, followed by every step log without its branches and
+    every branch log without its steps, in the order of iter_logs. Every line has the type of the log as log_type.
+
+    Args:
+        run_log (LazyRunLog): The view of the run log
+        stream (IO[str]): The stream to write to
+
+    Returns:
+        int: The number of lines written
+    """
+    header = run_log._run_log.model_dump(exclude={"steps"})
+    stream.write(json.dumps({"log_type": "RunLog", **header}) + "\n")
+
+    lines = 1
+    for log in run_log.iter_logs():
+        contents = log.model_dump(exclude={"steps"} if isinstance(log, BranchLog) else {"branches"})
+        stream.write(json.dumps({"log_type": type(log).__name__, **contents}) + "\n")
+        lines += 1
+
+    return lines
+
+
 # All outside modules should interact with dataclasses using the RunLogStore to promote extensibility
 # If you want to customize dataclass, extend BaseRunLogStore and implement the methods as per the specification
 
@@ -344,6 +790,25 @@ class BaseRunLogStore(ABC, BaseModel):
 
         raise NotImplementedError
 
+    def get_lazy_run_log(self, run_id: str, **kwargs) -> LazyRunLog:
+        """
+        Retrieves a view of the run log which loads the steps and branches only when they are accessed.
+
+        Stores which can retrieve parts of the run log should override this, the default loads the full run log.
+
+        Args:
+            run_id (str): The run_id of the run
+
+        Raises:
+            RunLogNotFoundError: If the run log for run_id is not found in the datastore
+
+        Returns:
+            LazyRunLog: The view of the run log
+        """
+        run_log = self.get_run_log_by_id(run_id=run_id, full=True)
+        header = run_log.model_copy(update={"steps": OrderedDict()})
+        return LazyRunLog(run_log=header, source=RunLogTreeSource(run_log))
+
     @abstractmethod
     def put_run_log(self, run_log: RunLog, **kwargs):
         """
@@ -373,16 +838,20 @@ class BaseRunLogStore(ABC, BaseModel):
         run_log.status = status
         self.put_run_log(run_log)
 
-    def get_parameters(self, run_id: str, **kwargs) -> dict:
+    def get_parameters(self, run_id: str, internal_branch_name: str = "", **kwargs) -> dict:
         """
         Get the parameters from the Run log defined by the run_id
 
+        The parameters set in a branch are kept in the branch log. For a branch, the parameters of the run log are
+        updated with the parameters of the enclosing branches and the branch.
+
         Args:
             run_id (str): The run_id of the run
+            internal_branch_name (str, optional): The branch of the parameters. Defaults to the run log.
 
         The method should:
             * Call get_run_log_by_id(run_id) to retrieve the run_log
-            * Return the parameters as identified in the run_log
+            * Return the parameters as identified in the run_log and the branches in scope
 
         Returns:
             dict: A dictionary of the run_log parameters
@@ -390,27 +859,39 @@ class BaseRunLogStore(ABC, BaseModel):
             RunLogNotFoundError: If the run log for run_id is not found in the datastore
         """
         run_log = self.get_run_log_by_id(run_id=run_id)
-        return run_log.parameters
 
-    def set_parameters(self, run_id: str, parameters: dict, **kwargs):
+        parameters = dict(run_log.parameters)
+        for scope in get_branch_scopes(internal_branch_name):
+            branch, _ = run_log.search_branch_by_internal_name(scope)
+            parameters.update(branch.parameters)
+
+        return parameters
+
+    def set_parameters(self, run_id: str, parameters: dict, internal_branch_name: str = "", **kwargs):
         """
         Update the parameters of the Run log with the new parameters
 
-        This method would over-write the parameters, if the parameter exists in the run log already
+        This method would over-write the parameters, if the parameter exists in the run log already.
+        The parameters set in a branch are kept in the branch log, to be merged by the composite node during fan in.
 
         The method should:
             * Call get_run_log_by_id(run_id) to retrieve the run_log
-            * Update the parameters of the run_log
+            * Update the parameters of the run_log or the branch
             * Call put_run_log(run_log) to put the run_log in the datastore
 
         Args:
             run_id (str): The run_id of the run
             parameters (dict): The parameters to update in the run log
+            internal_branch_name (str, optional): The branch of the parameters. Defaults to the run log.
         Raises:
             RunLogNotFoundError: If the run log for run_id is not found in the datastore
         """
         run_log = self.get_run_log_by_id(run_id=run_id)
-        run_log.parameters.update(parameters)
+        if internal_branch_name:
+            branch, _ = run_log.search_branch_by_internal_name(internal_branch_name)
+            branch.parameters.update(parameters)
+        else:
+            run_log.parameters.update(parameters)
         self.put_run_log(run_log=run_log)
 
     def get_run_config(self, run_id: str, **kwargs) -> dict:
@@ -579,6 +1060,186 @@ class BaseRunLogStore(ABC, BaseModel):
         step.branches[internal_branch_name] = branch_log  # type: ignore
         self.put_run_log(run_log)
 
+    def add_branch_logs(self, branch_logs: List[BranchLog], run_id: str, **kwargs):
+        """
+        Add many branch logs to the run log in one go, used by composite nodes during fan out.
+
+        The method should:
+        # Get the run log once
+        # Add every branch to the step containing it
+        # Write the run_log once
+
+        Args:
+            branch_logs (List[BranchLog]): The branch logs to add to the database
+            run_id (str): The run id to which the branch logs are added
+        """
+        if not branch_logs:
+            return
+
+        run_log = self.get_run_log_by_id(run_id=run_id)
+
+        for branch_log in branch_logs:
+            internal_branch_name = branch_log.internal_name
+            step_name = ".".join(internal_branch_name.split(".")[:-1])
+            step, _ = run_log.search_step_by_internal_name(step_name)
+            step.branches[internal_branch_name] = branch_log
+
+        self.put_run_log(run_log)
+
+    def get_branch_statuses(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, str]:
+        """
+        Returns the status of many branches in one go, used by composite nodes during fan in.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, str]: The status of the branch by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        run_log = self.get_run_log_by_id(run_id=run_id)
+
+        statuses: Dict[str, str] = {}
+        for internal_branch_name in internal_branch_names:
+            branch, _ = run_log.search_branch_by_internal_name(internal_branch_name)
+            statuses[internal_branch_name] = branch.status
+
+        return statuses
+
+    def get_branch_logs(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, BranchLog]:
+        """
+        Returns many branch logs in one go, used by composite nodes during fan in for the status and the
+        parameters of their branches.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, BranchLog]: The branch log by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        run_log = self.get_run_log_by_id(run_id=run_id)
+
+        branch_logs: Dict[str, BranchLog] = {}
+        for internal_branch_name in internal_branch_names:
+            branch, _ = run_log.search_branch_by_internal_name(internal_branch_name)
+            branch_logs[internal_branch_name] = cast(BranchLog, branch)
+
+        return branch_logs
+
+    def get_status_index(self, run_id: str, **kwargs) -> Dict[str, LogStatus]:
+        """
+        The status of every step log and branch log of the run by their internal names, retrieved in one go.
+
+        Used to decide the steps and branches to execute again while re-running a run, without retrieving
+        the step logs of the original run one at a time.
+
+        Args:
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, LogStatus]: The status of the step logs and branch logs by their internal names
+
+        Raises:
+            RunLogNotFoundError: If the run log for run_id is not found in the datastore
+        """
+        run_log = self.get_run_log_by_id(run_id=run_id, full=True)
+
+        index: Dict[str, LogStatus] = {}
+
+        def _index(steps: Dict[str, StepLog]):
+            for internal_name, step_log in steps.items():
+                index[internal_name] = LogStatus.from_step_log(step_log)
+                for internal_branch_name, branch_log in step_log.branches.items():
+                    index[internal_branch_name] = LogStatus.from_branch_log(branch_log)
+                    _index(branch_log.steps)
+
+        _index(run_log.steps)
+        return index
+
+    def flush(self, **kwargs):
+        """
+        Write any updates the run log store holds in memory.
+
+        Executors call this at the points where the run log has to be durable, e.g completion of a node.
+        Run log stores which write every update straight away need not implement this.
+        """
+        ...
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        The hit and miss counters of the read cache, if the run log store has one enabled.
+
+        Returns:
+            Dict[str, int]: The counters, empty if there is no cache.
+        """
+        return {}
+
+    def list_runs(
+        self,
+        tag: str = "",
+        status: str = "",
+        dag_hash: str = "",
+        original_run_id: str = "",
+        limit: int = 20,
+        offset: int = 0,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        """
+        List the runs matching all the filters given, the latest first.
+
+        Args:
+            tag (str, optional): The tag of the run
+            status (str, optional): The status of the run
+            dag_hash (str, optional): The hash of the dag of the run
+            original_run_id (str, optional): The run that was re-run
+            limit (int, optional): The number of runs to return, negative for all. Defaults to 20.
+            offset (int, optional): The number of runs to skip. Defaults to 0.
+
+        Raises:
+            Exception: If the run log store does not maintain an index of the runs
+
+        Returns:
+            List[dict]: The runs with run_id, tag, status, dag_hash, original_run_id, start_time and end_time
+        """
+        raise Exception(f"The run log store {self.service_name} does not support listing runs")
+
+    def reindex(self, **kwargs):
+        """
+        Rebuild the index of the runs from the run logs in the store.
+
+        Raises:
+            Exception: If the run log store does not maintain an index of the runs
+        """
+        raise Exception(f"The run log store {self.service_name} does not support listing runs")
+
+    def delete_run(
+        self, run_id: str, dry_run: bool = False, max_workers: int = 4, throttle: Optional[Throttle] = None, **kwargs
+    ) -> int:
+        """
+        Delete the run log of the run and remove it from the index of the runs.
+
+        Args:
+            run_id (str): The run id
+            dry_run (bool, optional): Only report the bytes to reclaim. Defaults to False.
+            max_workers (int, optional): The number of files deleted concurrently. Defaults to 4.
+            throttle (Throttle, optional): Limits the rate of deletes. Defaults to no limit.
+
+        Raises:
+            Exception: If the run log store does not support deleting runs
+            RunLogNotFoundError: If the run is not in the run log store
+
+        Returns:
+            int: The bytes reclaimed, or that would be reclaimed in a dry run
+        """
+        raise Exception(f"The run log store {self.service_name} does not support deleting runs")
+
     def create_attempt_log(self, **kwargs) -> StepAttempt:
         """
         Returns an uncommitted step attempt log.
@@ -89,6 +89,10 @@ MAP_PLACEHOLDER = "map_variable_placeholder"
 # Dag node
 DAG_BRANCH_NAME = "dag"
 
+# Merge of the parameters set in the branches of parallel and map nodes
+LAST_WRITER_REDUCER = "last-writer"
+COLLECT_REDUCER = "collect"
+
 # RUN settings
 RANDOM_RUN_ID_LEN = 6
 MAX_TIME = 86400  # 1 day in seconds
@@ -98,6 +102,7 @@ USER_CONFIG_FILE = "magnus-config.yaml"
 
 # Executor settings
 ENABLE_PARALLEL = False
+MAX_PRINTED_STEPS = 1000  # Runs with more steps print a summary of the run log at the end
 
 # RUN log store settings
 LOG_LOCATION_FOLDER = ".run_log_store"
@@ -107,6 +112,9 @@ DAG_BRANCH_NAME = "dag"
 
 # Data catalog settings
 CATALOG_LOCATION_FOLDER = ".catalog"
+CATALOG_MAX_WORKERS = 4  # The files hashed and copied concurrently by the file system catalogs
+CATALOG_LINK_MODE = "copy"  # How the catalog materializes files, see magnus.extensions.catalog.LINK_MODES
+CATALOG_COPY_BUFFER_SIZE = 1024 * 1024  # The bytes read, hashed and written at a time by a copy of the catalog
 COMPUTE_DATA_FOLDER = "."
 
 # Secrets settings
@@ -1,11 +1,14 @@
 import json
 import logging
-from typing import Optional, cast
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
 
 from rich import print
 
 import magnus.context as context
-from magnus import defaults, graph, utils
+from magnus import defaults, exceptions, graph, retention, utils
+from magnus.datastore import RunLogSummary, StepLog, export_run_log
 from magnus.defaults import MagnusConfig, ServiceConfig
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
@@ -479,6 +482,203 @@ def fan(
         raise ValueError(f"Invalid mode {mode}")
 
 
+def compact(configuration_file: str, run_id: str):
+    """
+    The entry point to collapse the run log of a completed run.
+
+    Only run log stores that accumulate writes, like segment-fs, support compaction.
+
+    Args:
+        configuration_file (str): The configuration file.
+        run_id (str): The run id of the run.
+    """
+    run_context = prepare_configurations(configuration_file=configuration_file, run_id=run_id)
+
+    run_log_store = run_context.run_log_store
+    if not hasattr(run_log_store, "compact"):
+        raise Exception(f"The run log store {run_log_store.service_name} does not support compaction")
+
+    run_log_store.compact(run_id=run_id)
+
+
+def list_runs(
+    configuration_file: str,
+    tag: str = "",
+    status: str = "",
+    dag_hash: str = "",
+    original_run_id: str = "",
+    limit: int = 20,
+    offset: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    The entry point to list the runs of the run log store, the latest first.
+
+    Only run log stores that maintain an index of the runs, like file-system and chunked-fs, support listing.
+
+    Args:
+        configuration_file (str): The configuration file.
+        tag (str): The tag of the runs
+        status (str): The status of the runs
+        dag_hash (str): The hash of the dag of the runs
+        original_run_id (str): The run that was re-run
+        limit (int): The number of runs to list
+        offset (int): The number of runs to skip
+
+    Returns:
+        List[dict]: The runs
+    """
+    run_context = prepare_configurations(configuration_file=configuration_file, run_id="")
+
+    return run_context.run_log_store.list_runs(
+        tag=tag,
+        status=status,
+        dag_hash=dag_hash,
+        original_run_id=original_run_id,
+        limit=limit,
+        offset=offset,
+    )
+
+
+def reindex_runs(configuration_file: str):
+    """
+    The entry point to rebuild the index of the runs from the run logs in the run log store.
+
+    Args:
+        configuration_file (str): The configuration file.
+    """
+    run_context = prepare_configurations(configuration_file=configuration_file, run_id="")
+
+    run_context.run_log_store.reindex()
+
+
+def show_run(
+    configuration_file: str,
+    run_id: str,
+    limit: int = 50,
+    offset: int = 0,
+    failed_only: bool = False,
+) -> Tuple[RunLogSummary, List[StepLog]]:
+    """
+    The entry point to summarize a run and page through its steps, loading a step at a time from the run log store.
+
+    Args:
+        configuration_file (str): The configuration file.
+        run_id (str): The run to show
+        limit (int): The number of steps to show
+        offset (int): The number of steps to skip
+        failed_only (bool): Only the failed steps
+
+    Returns:
+        Tuple[RunLogSummary, List[StepLog]]: The summary of the run and the page of steps, without their branches
+    """
+    run_context = prepare_configurations(configuration_file=configuration_file, run_id="")
+
+    run_log = run_context.run_log_store.get_lazy_run_log(run_id=run_id)
+    summary = RunLogSummary.from_run_log(run_log)
+
+    steps: Iterable[StepLog] = run_log.iter_steps()
+    if failed_only:
+        steps = (step_log for step_log in steps if step_log.status == defaults.FAIL)
+
+    return summary, list(islice(steps, offset, offset + limit))
+
+
+def export_run(configuration_file: str, run_id: str, output: str = "") -> int:
+    """
+    The entry point to export the run log of a run as newline delimited json, a log at a time.
+
+    Args:
+        configuration_file (str): The configuration file.
+        run_id (str): The run to export
+        output (str): The file to write to, the standard output if not provided
+
+    Returns:
+        int: The number of lines written
+    """
+    run_context = prepare_configurations(configuration_file=configuration_file, run_id="")
+
+    run_log = run_context.run_log_store.get_lazy_run_log(run_id=run_id)
+    if not output:
+        return export_run_log(run_log, sys.stdout)
+
+    with open(output, "w", encoding="utf-8") as stream:
+        return export_run_log(run_log, stream)
+
+
+def gc(
+    configuration_file: str,
+    keep_last: Optional[int] = None,
+    max_age_days: Optional[float] = None,
+    keep_referenced: bool = True,
+    dry_run: bool = False,
+    max_workers: int = 4,
+    max_deletes_per_second: float = 0,
+) -> List[Dict[str, Any]]:
+    """
+    The entry point to delete the runs expired by the retention policy, from the run log store and the catalog.
+
+    The catalog of a run is deleted before its run log, an interrupted collection leaves the run listed to be
+    collected again. A listed run that is not in the run log store, e.g a run log removed by hand, is left
+    in the index: run magnus runs reindex to drop it.
+
+    Args:
+        configuration_file (str): The configuration file.
+        keep_last (int): Retain the latest these many finished runs of every tag
+        max_age_days (float): Retain the runs started in these many days
+        keep_referenced (bool): Retain the runs re-run by a retained run
+        dry_run (bool): Only report the runs and the bytes that would be reclaimed
+        max_workers (int): The number of files deleted concurrently
+        max_deletes_per_second (float): Limits the rate of deletes, 0 for no limit
+
+    Returns:
+        List[dict]: The expired runs with the bytes reclaimed from the run log store and the catalog
+    """
+    policy = retention.RetentionPolicy(keep_last=keep_last, max_age_days=max_age_days, keep_referenced=keep_referenced)
+    run_context = prepare_configurations(configuration_file=configuration_file, run_id="")
+
+    runs = run_context.run_log_store.list_runs(limit=-1)
+    throttle = retention.Throttle(rate=max_deletes_per_second)
+
+    collected = []
+    for run in retention.expired_runs(runs, policy):
+        run_id = run["run_id"]
+        catalog_bytes = run_context.catalog_handler.delete_run(
+            run_id=run_id, dry_run=dry_run, max_workers=max_workers, throttle=throttle
+        )
+        try:
+            run_log_bytes = run_context.run_log_store.delete_run(
+                run_id=run_id, dry_run=dry_run, max_workers=max_workers, throttle=throttle
+            )
+        except exceptions.RunLogNotFoundError:
+            logger.warning(f"{run_id} is listed in the index but not in the run log store, not deleted")
+            continue
+        logger.info(f"{'Would delete' if dry_run else 'Deleted'} {run_id}: {run_log_bytes + catalog_bytes} bytes")
+        collected.append(dict(run, run_log_bytes=run_log_bytes, catalog_bytes=catalog_bytes))
+
+    return collected
+
+
+def runlog_server(configuration_file: str, host: str = "127.0.0.1", port: int = 8765, socket_path: str = ""):
+    """
+    The entry point to serve the run log store of the configuration to the remote run log stores.
+
+    Args:
+        configuration_file (str): The configuration file.
+        host (str): The host to listen on
+        port (int): The port to listen on
+        socket_path (str): Listen on this Unix socket rather than the host and port
+    """
+    from magnus.extensions.run_log_store.remote.server import RunLogServer
+
+    run_context = prepare_configurations(configuration_file=configuration_file, run_id="")
+
+    server = RunLogServer(run_context.run_log_store, host=host, port=port, socket_path=socket_path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping the run log server")
+
+
 if __name__ == "__main__":
     # This is only for perf testing purposes.
     prepare_configurations(run_id="abc", pipeline_file="example/mocking.yaml")
@@ -36,9 +36,11 @@ class BaseExecutor(ABC, BaseModel):
 
     enable_parallel: bool = defaults.ENABLE_PARALLEL
     overrides: dict = {}
+    max_printed_steps: int = defaults.MAX_PRINTED_STEPS
 
     _previous_run_log: Optional[RunLog] = None
     _single_step: str = ""
+    _local: bool = False  # True if the executor traverses the whole graph in one process, e.g local
 
     _context_step_log = None  # type : StepLog
     _context_node = None  # type: BaseNode
@@ -325,6 +327,37 @@ class BaseExecutor(ABC, BaseModel):
         """
         ...
 
+    def _is_branch_eligible_for_rerun(self, internal_branch_name: str) -> bool:
+        """
+        In case of a re-run, this method checks the status of the branch in the previous run to determine if
+        the branch of a composite node needs to be executed.
+            * True: If its not a re-run or the branch did not succeed in the last run.
+            * False: If its a re-run and the branch succeeded in the last run.
+
+        By default, every branch is executed and the steps of the branch decide.
+
+        Args:
+            internal_branch_name (str): The internal name of the branch, as of the branch log
+
+        Returns:
+            bool: Eligibility for re-run. True means execute the branch, False means the branch is skipped.
+        """
+        return True
+
+    def _get_original_branch_parameters(self, internal_branch_name: str) -> Dict[str, Any]:
+        """
+        In case of a re-run, the parameters set in the branch of the original run.
+
+        A branch skipped by the re-run carries them over, they are merged by the composite node during fan in.
+
+        Args:
+            internal_branch_name (str): The internal name of the branch, as of the branch log
+
+        Returns:
+            Dict[str, Any]: The parameters set in the branch of the original run
+        """
+        return {}
+
     @abstractmethod
     def send_return_code(self, stage="traversal"):
         """
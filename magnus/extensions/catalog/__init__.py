@@ -1,7 +1,26 @@
-from typing import List, Optional
+import hashlib
+import logging
+import os
+import shutil
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Set, Tuple, TypeVar, cast
 
+from magnus import defaults, utils
 from magnus.datastore import DataCatalog
 
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+LINK_MODES = ("copy", "reflink", "hardlink", "symlink")
+FICLONE = (
+    0x40049409  # The linux ioctl sharing the contents of a file, on btrfs, xfs and other copy on write file systems
+)
+
 
 def is_catalog_out_of_sync(catalog, synced_catalogs=Optional[List[DataCatalog]]) -> bool:
     """
@@ -19,3 +38,217 @@ def is_catalog_out_of_sync(catalog, synced_catalogs=Optional[List[DataCatalog]])
             return True
 
     return True  # The object does not exist, sync it
+
+
+def is_cataloged(catalog, synced_catalogs: Optional[List[DataCatalog]] = None) -> bool:
+    """
+    Check if the catalog item is one of the already cataloged objects, irrespective of its contents.
+    If it is not, the item is synced whatever its data hash and the hash can be computed while copying it.
+    """
+    if not synced_catalogs:
+        return False
+
+    return any(
+        synced_catalog.catalog_relative_path == catalog.catalog_relative_path for synced_catalog in synced_catalogs
+    )
+
+
+class ParentFolders:
+    """
+    Creates the parent folders of the files being written, once for every distinct folder.
+
+    Safe to be shared by the threads transferring the files.
+    """
+
+    def __init__(self):
+        self._made: Set[Path] = set()
+        self._lock = threading.Lock()
+
+    def make(self, path: Path):
+        """
+        Create the parent folder of the path, if not already created.
+
+        Args:
+            path (Path): The file to be written
+        """
+        folder = path.parent
+        with self._lock:
+            if folder in self._made:
+                return
+
+        folder.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._made.add(folder)
+
+
+def transfer_files(transfer: Callable[[T], R], files: Sequence[T], max_workers: int = 1) -> List[R]:
+    """
+    Apply the transfer, e.g hash and copy, to every file with up to max_workers files in flight.
+
+    The results are in the order of the files, irrespective of the order of completion.
+    Every file is attempted, the failures are raised together once all the files are done.
+
+    Args:
+        transfer (Callable): The transfer of a single file
+        files (Sequence): The files to transfer
+        max_workers (int, optional): The number of files transferred concurrently. Defaults to 1.
+
+    Raises:
+        Exception: If the transfer of any of the files failed
+
+    Returns:
+        List: The results of the transfer of the files
+    """
+    outcomes: List[Tuple[Optional[R], Optional[BaseException]]] = []
+    if max_workers <= 1 or len(files) <= 1:
+        for file in files:
+            try:
+                outcomes.append((transfer(file), None))
+            except Exception as e:
+                outcomes.append((None, e))
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(transfer, file) for file in files]
+        outcomes = [(None, future.exception()) if future.exception() else (future.result(), None) for future in futures]
+
+    failures = [f"{file}: {error}" for file, (_, error) in zip(files, outcomes) if error is not None]
+    if failures:
+        raise Exception(f"Could not transfer {len(failures)} of {len(files)} files:\n" + "\n".join(failures))
+
+    return [cast(R, result) for result, _ in outcomes]
+
+
+def validate_link_mode(link_mode: str) -> str:
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unsupported link mode {link_mode}, should be one of {LINK_MODES}")
+    return link_mode
+
+
+def protect(path: Path):
+    """
+    Remove the write permissions of the file, the links to a file of the catalog can not modify it.
+
+    Args:
+        path (Path): The file to protect
+    """
+    mode = path.stat().st_mode
+    path.chmod(mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _reflink(source: Path, destination: Path):
+    import fcntl  # Not available on windows
+
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+    shutil.copymode(source, destination)
+
+
+def _make_writable(path: Path):
+    # A copy is independent of the source, even if the source is protected
+    path.chmod(path.stat().st_mode | stat.S_IWUSR)
+
+
+def copy_and_hash(source: Path, destination: Path, buffer_size: int = defaults.CATALOG_COPY_BUFFER_SIZE) -> str:
+    """
+    Copy the source to the destination and compute the data hash of the contents, reading the source once.
+
+    Args:
+        source (Path): The file to copy
+        destination (Path): The file to copy to
+        buffer_size (int, optional): The bytes copied at a time. Defaults to defaults.CATALOG_COPY_BUFFER_SIZE.
+
+    Returns:
+        str: The SHA ID of the file contents, as utils.get_data_hash
+    """
+    hasher = hashlib.sha256()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+
+    with open(source, "rb", buffering=0) as source_file, open(destination, "wb") as destination_file:
+        while True:
+            read = source_file.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+            destination_file.write(view[:read])
+
+    shutil.copymode(source, destination)
+    return hasher.hexdigest()
+
+
+def _link(source: Path, destination: Path, link_mode: str) -> bool:
+    # Replaces the destination by a link to the source, False if a copy should be made instead
+    if destination.exists() or destination.is_symlink():
+        destination.unlink()
+
+    try:
+        if link_mode == "reflink":
+            _reflink(source, destination)
+            _make_writable(destination)
+            return True
+
+        if link_mode == "hardlink":
+            os.link(source, destination)
+            protect(destination)
+            return True
+
+        if link_mode == "symlink":
+            protect(source)
+            os.symlink(os.path.abspath(source), destination)
+            return True
+    except (OSError, ImportError) as e:
+        logger.debug(f"Could not {link_mode} {source} to {destination}, copying instead: {e}")
+        destination.unlink(missing_ok=True)
+
+    return False
+
+
+def link_file(source: Path, destination: Path, link_mode: str = "copy") -> str:
+    """
+    Make the contents of the source available at the destination, as per the link mode.
+
+    copy: The contents are copied.
+    reflink: The destination shares the contents of the source until either is written, as a copy.
+    hardlink: The destination is the same file as the source, made read only.
+    symlink: The destination is a symbolic link to the source, made read only.
+
+    A reflink or hardlink which is not possible, e.g across devices or file systems, falls back to a copy.
+    An existing destination is replaced.
+
+    Args:
+        source (Path): The file to make available
+        destination (Path): The path to make it available at
+        link_mode (str, optional): One of LINK_MODES. Defaults to "copy".
+
+    Returns:
+        str: The link mode used, copy if fallen back
+    """
+    if _link(source, destination, link_mode):
+        return link_mode
+
+    shutil.copy(source, destination)
+    _make_writable(destination)
+    return "copy"
+
+
+def link_and_hash(source: Path, destination: Path, link_mode: str = "copy") -> Tuple[str, str]:
+    """
+    Make the contents of the source available at the destination, as link_file, and compute their data hash.
+
+    A copy computes the data hash while streaming the contents, the source is read once.
+    A link does not read the contents, the source is then hashed.
+
+    Args:
+        source (Path): The file to make available
+        destination (Path): The path to make it available at
+        link_mode (str, optional): One of LINK_MODES. Defaults to "copy".
+
+    Returns:
+        Tuple[str, str]: The link mode used, copy if fallen back, and the SHA ID of the file contents
+    """
+    if _link(source, destination, link_mode):
+        return link_mode, utils.get_data_hash(str(source))
+
+    data_hash = copy_and_hash(source, destination)
+    _make_writable(destination)
+    return "copy", data_hash
@@ -0,0 +1,377 @@
+import collections
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Counter, Iterable, List, Optional, Tuple
+
+from pydantic import PrivateAttr
+
+from magnus import defaults, retention, utils
+from magnus.datastore import DataCatalog
+from magnus.extensions.catalog import ParentFolders, is_catalog_out_of_sync, is_cataloged, link_file, transfer_files
+from magnus.extensions.catalog.file_system.implementation import FileSystemCatalog
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+# The folder of the catalog location holding the contents of the files, hidden to not be taken for a run.
+BLOBS_FOLDER = ".blobs"
+# Blobs stored or reused this recently are not deleted with a run, a put of a running pipeline may be using them.
+BLOB_GRACE_SECONDS = 300
+
+
+class ContentAddressedCatalog(FileSystemCatalog):
+    """
+    A Catalog handler that uses the local file system and stores the contents of every file once.
+
+    The contents of the files are stored as blobs, named by their data hash, in the .blobs folder of the
+    catalog location. The catalog of a run is a manifest of the files put by the run: for every file, a small
+    file at the same relative path holding the data hash of its contents.
+    The files of the manifest are written independently, the branches of a parallel run can put at the same time.
+
+    Files with the same contents, across the steps, runs and re-runs, are stored once and
+    syncing the catalog of a previous run for a re-run copies only its manifest.
+
+    Note: Do not share the catalog location with a file-system catalog.
+
+    Example config:
+
+    catalog:
+      type: content-addressed
+      config:
+        catalog_location: The location to store the catalog.
+
+    """
+
+    service_name: str = "content-addressed"
+
+    _references: Optional[Counter[str]] = PrivateAttr(default=None)
+    _references_at: float = PrivateAttr(default=0)
+
+    def get_blob_location(self) -> Path:
+        return Path(self.get_catalog_location()) / BLOBS_FOLDER
+
+    def get_blob_path(self, data_hash: str) -> Path:
+        return self.get_blob_location() / data_hash[:2] / data_hash
+
+    def _store_blob(self, file: Path, data_hash: str) -> bool:
+        """
+        Store the contents of the file as the blob of the data hash, if not stored already.
+
+        The blob is written to a temporary name and renamed, a reader never sees a partial blob.
+        The blob is a copy or a reflink of the file, never a link: the blob is shared by every run with the
+        same contents and a later write to the file must not change it.
+
+        Args:
+            file (Path): The file to store
+            data_hash (str): The data hash of the contents of the file
+
+        Returns:
+            bool: True if the contents were copied, False if the blob was already stored
+        """
+        blob = self.get_blob_path(data_hash)
+        if blob.exists():
+            os.utime(blob)  # Marks the blob as in use, see BLOB_GRACE_SECONDS
+            return False
+
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        temporary = blob.with_name(f".{data_hash}.{os.getpid()}.{threading.get_ident()}")
+        link_file(file, temporary, link_mode=self.get_put_link_mode())
+        os.replace(temporary, blob)
+        return True
+
+    def _store_new_blob(self, file: Path) -> Tuple[str, bool]:
+        """
+        Store the contents of a file not hashed before, hashing them while they are copied.
+
+        The file is copied to a temporary name in the blob location and renamed to its blob once hashed,
+        the copy is discarded if the blob was already stored. The file is read only once.
+
+        Args:
+            file (Path): The file to store
+
+        Returns:
+            Tuple[str, bool]: The data hash of the contents of the file and True if they were not stored before
+        """
+        blob_location = self.get_blob_location()
+        blob_location.mkdir(parents=True, exist_ok=True)
+        temporary = blob_location / f".put.{os.getpid()}.{threading.get_ident()}"
+        _, data_hash = self.link_and_hash(file, temporary, link_mode=self.get_put_link_mode())
+
+        blob = self.get_blob_path(data_hash)
+        if blob.exists():
+            os.remove(temporary)
+            os.utime(blob)  # Marks the blob as in use, see BLOB_GRACE_SECONDS
+            return data_hash, False
+
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temporary, blob)
+        return data_hash, True
+
+    def _write_manifest_entry(self, entry: Path, data_hash: str):
+        temporary = entry.with_name(f".{entry.name}.{os.getpid()}.{threading.get_ident()}")
+        temporary.write_text(data_hash)
+        os.replace(temporary, entry)
+
+    def get(self, name: str, run_id: str, compute_data_folder: str = "", **kwargs) -> List[DataCatalog]:
+        """
+        Get the files matching the glob pattern from the manifest of the run, copying their contents from the blobs.
+
+        Args:
+            name ([str]): A glob matching the file name
+            run_id ([str]): The run id
+
+        Raises:
+            Exception: If the catalog location does not exist or the blob of a file is not found
+
+        Returns:
+            List(object) : A list of catalog objects
+        """
+        logger.info(f"Using the {self.service_name} catalog and trying to get {name} for run_id: {run_id}")
+
+        copy_to = Path(compute_data_folder or self.compute_data_folder)
+
+        catalog_location = self.get_catalog_location()
+        run_catalog = Path(catalog_location) / run_id / copy_to
+
+        logger.debug(f"Copying objects to {copy_to} from the manifest of the run at {run_catalog}")
+
+        if not utils.does_dir_exist(run_catalog):
+            msg = (
+                f"Expected Catalog to be present at: {run_catalog} but not found.\n"
+                "Note: Please make sure that some data was put in the catalog before trying to get from it.\n"
+            )
+            raise Exception(msg)
+
+        entries = [
+            entry
+            for entry in run_catalog.glob(name)
+            if entry.is_file() and not entry.name.startswith(".") and not str(entry).endswith(".execution.log")
+        ]
+
+        run_log_store = self._context.run_log_store
+        parent_folders = ParentFolders()
+
+        def _get(entry: Path) -> DataCatalog:
+            relative_file_path = entry.relative_to(run_catalog)
+            data_hash = entry.read_text()
+
+            blob = self.get_blob_path(data_hash)
+            if not blob.exists():
+                raise Exception(f"The contents of {relative_file_path}, with data hash {data_hash}, are not in {blob}")
+
+            data_catalog = run_log_store.create_data_catalog(str(relative_file_path))
+            data_catalog.catalog_handler_location = catalog_location
+            data_catalog.catalog_relative_path = str(relative_file_path)
+            data_catalog.data_hash = data_hash
+            data_catalog.stage = "get"
+
+            if self.is_up_to_date(copy_to / relative_file_path, blob, data_hash):
+                logger.info(f"{copy_to / relative_file_path} has the contents of {blob}, not copied")
+                return data_catalog
+
+            parent_folders.make(copy_to / relative_file_path)
+            mode = link_file(blob, copy_to / relative_file_path, link_mode=self.link_mode)
+            logger.info(f"Copied {relative_file_path} from {blob} to {copy_to} by {mode}")
+            return data_catalog
+
+        data_catalogs = transfer_files(_get, entries, max_workers=self.max_workers)
+
+        if not data_catalogs:
+            raise Exception(f"Did not find any files matching {name} in {run_catalog}")
+
+        return data_catalogs
+
+    def put(
+        self,
+        name: str,
+        run_id: str,
+        compute_data_folder: str = "",
+        synced_catalogs: Optional[List[DataCatalog]] = None,
+        **kwargs,
+    ) -> List[DataCatalog]:
+        """
+        Put the files matching the glob pattern into the catalog.
+
+        The contents of a file are stored only if no file with the same data hash was put before, by any run.
+        A file whose data hash is not in the hash cache is hashed while it is copied, and is read only once.
+        If previously synced catalogs are provided, and no changes were observed, the manifest is not updated.
+
+        Args:
+            name (str): The glob pattern of the files to catalog
+            run_id (str): The run id of the run
+            compute_data_folder (str, optional): The compute data folder to sync from. Defaults to settings default.
+            synced_catalogs (dict, optional): dictionary of previously synced catalogs. Defaults to None.
+
+        Raises:
+            Exception: If the compute data folder does not exist.
+
+        Returns:
+            List(object) : A list of catalog objects
+        """
+        logger.info(f"Using the {self.service_name} catalog and trying to put {name} for run_id: {run_id}")
+
+        copy_from = Path(compute_data_folder or self.compute_data_folder)
+
+        catalog_location = self.get_catalog_location()
+        run_catalog = Path(catalog_location) / run_id
+        utils.safe_make_dir(run_catalog)
+
+        if not utils.does_dir_exist(copy_from):
+            msg = (
+                f"Expected compute data folder to be present at: {compute_data_folder} but not found. \n"
+                "Note: Magnus does not create the compute data folder for you. Please ensure that the folder exists.\n"
+            )
+            raise Exception(msg)
+
+        glob_files = [file for file in copy_from.glob(name) if file.is_file()]
+
+        run_log_store = self._context.run_log_store
+        parent_folders = ParentFolders()
+
+        def _put(file: Path) -> DataCatalog:
+            relative_file_path = file.relative_to(".")
+
+            data_catalog = run_log_store.create_data_catalog(str(relative_file_path))
+            data_catalog.catalog_handler_location = catalog_location
+            data_catalog.catalog_relative_path = run_id + os.sep + str(relative_file_path)
+            data_catalog.stage = "put"
+
+            data_hash = self.get_cached_data_hash(str(file))
+            if data_hash is None and not is_cataloged(data_catalog, synced_catalogs):
+                # Stored whatever its contents, the file is hashed while being copied
+                data_catalog.data_hash, stored = self._store_new_blob(file)
+                if stored:
+                    logger.info(f"{data_catalog.name} was stored as {data_catalog.data_hash}")
+                else:
+                    logger.info(f"{data_catalog.name} was found in the catalog as {data_catalog.data_hash}")
+
+                parent_folders.make(run_catalog / relative_file_path)
+                self._write_manifest_entry(run_catalog / relative_file_path, data_catalog.data_hash)
+                return data_catalog
+
+            data_catalog.data_hash = data_hash or self.get_data_hash(str(file))
+
+            if not is_catalog_out_of_sync(data_catalog, synced_catalogs):
+                logger.info(f"{data_catalog.name} was found to be unchanged, ignoring syncing")
+                return data_catalog
+
+            if self._store_blob(file, data_catalog.data_hash):
+                logger.info(f"{data_catalog.name} was stored as {data_catalog.data_hash}")
+            else:
+                logger.info(f"{data_catalog.name} was found in the catalog as {data_catalog.data_hash}, not copied")
+
+            parent_folders.make(run_catalog / relative_file_path)
+            self._write_manifest_entry(run_catalog / relative_file_path, data_catalog.data_hash)
+            return data_catalog
+
+        data_catalogs = transfer_files(_put, glob_files, max_workers=self.max_workers)
+
+        if not data_catalogs:
+            raise Exception(f"Did not find any files matching {name} in {copy_from}")
+
+        return data_catalogs
+
+    def _count_references(self, run_catalogs: Iterable[Path]) -> Counter[str]:
+        references: Counter[str] = collections.Counter()
+        for run_catalog in run_catalogs:
+            for root, _, file_names in os.walk(run_catalog):
+                for file_name in file_names:
+                    if file_name.startswith("."):
+                        continue
+                    references[Path(root, file_name).read_text()] += 1
+        return references
+
+    def _all_references(self) -> Counter[str]:
+        """
+        The number of manifest entries referring to every blob, across the runs of the catalog location.
+
+        Counted once for the deletes of a gc pass, rather than walking every manifest for every run deleted.
+        The count is redone once older than half of BLOB_GRACE_SECONDS: a put or a sync between runs touches
+        the blobs it refers to, which are kept by their grace period until the references are counted again.
+
+        Returns:
+            Counter[str]: The number of references by data hash
+        """
+        now = time.monotonic()
+        if self._references is None or now - self._references_at > BLOB_GRACE_SECONDS / 2:
+            catalog_location = Path(self.get_catalog_location())
+            run_catalogs = [
+                path for path in catalog_location.iterdir() if path.is_dir() and not path.name.startswith(".")
+            ]
+            self._references = self._count_references(run_catalogs)
+            self._references_at = now
+        return self._references
+
+    def sync_between_runs(self, previous_run_id: str, run_id: str):
+        """
+        Sync the manifest of the previous run to the run, the contents of the files are not copied.
+
+        The blobs of the previous run are touched before its manifest is copied, a gc that counted the
+        references before the copy does not delete them, see BLOB_GRACE_SECONDS.
+
+        Args:
+            previous_run_id (str): The previous run id to sync the catalogs from
+            run_id (str): The run_id to which the data catalogs should be synced to.
+
+        Raises:
+            Exception: If the previous run log does not exist in the catalog
+        """
+        previous_catalog = Path(self.get_catalog_location()) / previous_run_id
+        for data_hash in self._count_references([previous_catalog]):
+            try:
+                os.utime(self.get_blob_path(data_hash))
+            except FileNotFoundError:
+                pass
+
+        super().sync_between_runs(previous_run_id=previous_run_id, run_id=run_id)
+
+    def delete_run(
+        self,
+        run_id: str,
+        dry_run: bool = False,
+        max_workers: int = 4,
+        throttle: Optional[retention.Throttle] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Delete the manifest of the run and the blobs that no other run refers to.
+
+        The references of the runs to the blobs are counted once for all the runs deleted by a gc, see _all_references.
+
+        Args:
+            run_id (str): The run id
+            dry_run (bool, optional): Only report the bytes to reclaim. Defaults to False.
+            max_workers (int, optional): The number of files deleted concurrently. Defaults to 4.
+            throttle (Throttle, optional): Limits the rate of deletes. Defaults to no limit.
+
+        Returns:
+            int: The bytes reclaimed, or that would be reclaimed in a dry run
+        """
+        run_catalog = Path(self.get_catalog_location()) / run_id
+        run_references = self._count_references([run_catalog])
+        # Counted before the run is set aside, the references of the run are then taken off the count
+        references = self._all_references() if run_references else collections.Counter()
+
+        if not dry_run:
+            run_catalog = retention.set_aside(run_catalog)
+        reclaimed = retention.remove_tree(run_catalog, dry_run=dry_run, max_workers=max_workers, throttle=throttle)
+
+        now = time.time()
+        for data_hash, count in run_references.items():
+            remaining = references[data_hash] - count
+            if not dry_run:
+                references[data_hash] = remaining
+            if remaining > 0:
+                continue
+
+            blob = self.get_blob_path(data_hash)
+            try:
+                if now - blob.stat().st_mtime < BLOB_GRACE_SECONDS:
+                    continue
+            except FileNotFoundError:
+                continue
+            reclaimed += retention.remove_tree(blob, dry_run=dry_run, throttle=throttle)
+
+        return reclaimed
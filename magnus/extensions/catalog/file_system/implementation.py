@@ -1,13 +1,25 @@
 import logging
 import os
-import shutil
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from magnus import defaults, utils
+from pydantic import PrivateAttr, field_validator
+
+from magnus import defaults, retention, utils
 from magnus.catalog import BaseCatalog
 from magnus.datastore import DataCatalog
-from magnus.extensions.catalog import is_catalog_out_of_sync
+from magnus.extensions.catalog import (
+    ParentFolders,
+    is_catalog_out_of_sync,
+    is_cataloged,
+    link_and_hash,
+    link_file,
+    transfer_files,
+    validate_link_mode,
+)
+from magnus.extensions.catalog.hash_cache import HASH_CACHE_FILE, HashCache
+from magnus.extensions.run_log_store.cache import file_token
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
 
@@ -25,15 +37,133 @@ class FileSystemCatalog(BaseCatalog):
       config:
         catalog_location: The location to store the catalog.
         compute_data_folder: The folder to source the data from.
+        hash_cache: Keep the data hashes of the files in the catalog location, defaults to true.
+        max_workers: The number of files hashed and copied concurrently, defaults to 4.
+        link_mode: One of copy, reflink, hardlink or symlink, defaults to copy.
 
     """
 
     service_name: str = "file-system"
     catalog_location: str = defaults.CATALOG_LOCATION_FOLDER
+    hash_cache: bool = True
+    max_workers: int = defaults.CATALOG_MAX_WORKERS
+    link_mode: str = defaults.CATALOG_LINK_MODE
+
+    _hash_cache: Optional[HashCache] = PrivateAttr(default=None)
+    _hash_cache_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @field_validator("link_mode")
+    @classmethod
+    def check_link_mode(cls, link_mode: str) -> str:
+        return validate_link_mode(link_mode)
 
     def get_catalog_location(self):
         return self.catalog_location
 
+    def get_put_link_mode(self) -> str:
+        """
+        The link mode of the files written to the catalog, by put or a sync between runs.
+
+        The catalog should not share its files with the compute data folder or with the previous runs: a write
+        in place to a linked file, e.g by root which ignores the read only protection, would change the catalog.
+        Hard and symbolic links are only used to get files from the catalog, a reflink is used otherwise.
+        """
+        if self.link_mode in ["hardlink", "symlink"]:
+            return "reflink"
+        return self.link_mode
+
+    def get_hash_cache(self) -> Optional[HashCache]:
+        """
+        The hash cache of the catalog location, None if disabled.
+        """
+        if not self.hash_cache:
+            return None
+
+        # The catalog location can change after the creation, e.g within a container
+        location = str(Path(self.get_catalog_location()) / HASH_CACHE_FILE)
+        with self._hash_cache_lock:
+            if self._hash_cache is None or self._hash_cache.path != location:
+                self._hash_cache = HashCache(location)
+            return self._hash_cache
+
+    def get_data_hash(self, file_name: str) -> str:
+        """
+        The data hash of the file, served from the hash cache of the catalog location if enabled.
+
+        Args:
+            file_name (str): The file to hash
+
+        Returns:
+            str: The SHA ID of the file contents
+        """
+        hash_cache = self.get_hash_cache()
+        if hash_cache is None:
+            return utils.get_data_hash(file_name)
+
+        return hash_cache.get_data_hash(file_name)
+
+    def get_cached_data_hash(self, file_name: str) -> Optional[str]:
+        """
+        The data hash of the file if it can be served from the hash cache, without reading the file.
+
+        Args:
+            file_name (str): The file to look up
+
+        Returns:
+            Optional[str]: The SHA ID of the file contents, None if the file has to be hashed
+        """
+        hash_cache = self.get_hash_cache()
+        if hash_cache is None:
+            return None
+
+        return hash_cache.lookup(file_name)
+
+    def link_and_hash(self, source: Path, destination: Path, link_mode: str) -> Tuple[str, str]:
+        """
+        Make the source available at the destination and hash it, a copy reads the source only once.
+
+        Args:
+            source (Path): The file to make available
+            destination (Path): The path to make it available at
+            link_mode (str): One of LINK_MODES
+
+        Returns:
+            Tuple[str, str]: The link mode used and the SHA ID of the file contents
+        """
+        token = file_token(str(source))
+        mode, data_hash = link_and_hash(source, destination, link_mode=link_mode)
+
+        hash_cache = self.get_hash_cache()
+        if hash_cache is not None:
+            hash_cache.record(str(source), data_hash, token)
+
+        return mode, data_hash
+
+    def is_up_to_date(self, destination: Path, source: Path, data_hash: str) -> bool:
+        """
+        Check if the destination already holds the contents of the source, the copy can then be skipped.
+
+        Args:
+            destination (Path): The file to copy to
+            source (Path): The file to copy from
+            data_hash (str): The data hash of the source
+
+        Returns:
+            bool: True if the destination has the same contents as the source
+        """
+        if not destination.is_file() or destination.stat().st_size != source.stat().st_size:
+            return False
+
+        if os.path.samefile(destination, source):
+            return True
+
+        return self.get_data_hash(str(destination)) == data_hash
+
+    def cache_stats(self) -> Dict[str, int]:
+        if self._hash_cache is None:
+            return {}
+        return self._hash_cache.stats()
+
     def get(self, name: str, run_id: str, compute_data_folder: str = "", **kwargs) -> List[DataCatalog]:
         """
         Get the file by matching glob pattern to the name
@@ -70,33 +200,43 @@ class FileSystemCatalog(BaseCatalog):
 
         # Iterate through the contents of the run_catalog and copy the files that fit the name pattern
         # We should also return a list of data hashes
-        glob_files = run_catalog.glob(name)
+        glob_files = [
+            file for file in run_catalog.glob(name) if file.is_file() and not str(file).endswith(".execution.log")
+        ]
         logger.debug(f"Glob identified {glob_files} as matches to from the catalog location: {run_catalog}")
 
-        data_catalogs = []
         run_log_store = self._context.run_log_store
-        for file in glob_files:
-            if file.is_dir():
-                # Need not add a data catalog for the folder
-                continue
-
-            if str(file).endswith(".execution.log"):
-                continue
+        parent_folders = ParentFolders()
 
+        def _get(file: Path) -> DataCatalog:
             relative_file_path = file.relative_to(run_catalog)
+            destination = copy_to / relative_file_path
 
             data_catalog = run_log_store.create_data_catalog(str(relative_file_path))
             data_catalog.catalog_handler_location = catalog_location
             data_catalog.catalog_relative_path = str(relative_file_path)
-            data_catalog.data_hash = utils.get_data_hash(str(file))
             data_catalog.stage = "get"
-            data_catalogs.append(data_catalog)
 
-            # Make the directory in the data folder if required
-            Path(copy_to / relative_file_path.parent).mkdir(parents=True, exist_ok=True)
-            shutil.copy(file, copy_to / relative_file_path)
+            data_hash = self.get_cached_data_hash(str(file))
+            if data_hash is None and not (destination.exists() or destination.is_symlink()):
+                # Nothing to compare against, the file is hashed while being copied
+                parent_folders.make(destination)
+                mode, data_catalog.data_hash = self.link_and_hash(file, destination, link_mode=self.link_mode)
+                logger.info(f"Copied {file} from {run_catalog} to {copy_to} by {mode}")
+                return data_catalog
+
+            data_catalog.data_hash = data_hash or self.get_data_hash(str(file))
+
+            if self.is_up_to_date(destination, file, data_catalog.data_hash):
+                logger.info(f"{destination} has the contents of {file}, not copied")
+                return data_catalog
 
-            logger.info(f"Copied {file} from {run_catalog} to {copy_to}")
+            parent_folders.make(destination)
+            mode = link_file(file, destination, link_mode=self.link_mode)
+            logger.info(f"Copied {file} from {run_catalog} to {copy_to} by {mode}")
+            return data_catalog
+
+        data_catalogs = transfer_files(_get, glob_files, max_workers=self.max_workers)
 
         if not data_catalogs:
             raise Exception(f"Did not find any files matching {name} in {run_catalog}")
@@ -151,33 +291,41 @@ class FileSystemCatalog(BaseCatalog):
         # Iterate through the contents of copy_from and if the name matches, we move them to the run_catalog
         # We should also return a list of datastore.DataCatalog items
 
-        glob_files = copy_from.glob(name)  # type: ignore
+        glob_files = [file for file in copy_from.glob(name) if file.is_file()]  # type: ignore
         logger.debug(f"Glob identified {glob_files} as matches to from the compute data folder: {copy_from}")
 
-        data_catalogs = []
         run_log_store = self._context.run_log_store
-        for file in glob_files:
-            if file.is_dir():
-                # Need not add a data catalog for the folder
-                continue
+        parent_folders = ParentFolders()
 
+        def _put(file: Path) -> DataCatalog:
             relative_file_path = file.relative_to(".")
 
             data_catalog = run_log_store.create_data_catalog(str(relative_file_path))
             data_catalog.catalog_handler_location = catalog_location
             data_catalog.catalog_relative_path = run_id + os.sep + str(relative_file_path)
-            data_catalog.data_hash = utils.get_data_hash(str(file))
             data_catalog.stage = "put"
-            data_catalogs.append(data_catalog)
+
+            data_hash = self.get_cached_data_hash(str(file))
+            if data_hash is None and not is_cataloged(data_catalog, synced_catalogs):
+                # Synced whatever its contents, the file is hashed while being copied
+                logger.info(f"{data_catalog.name} was not synced before, syncing")
+                parent_folders.make(run_catalog / relative_file_path)
+                _, data_catalog.data_hash = self.link_and_hash(
+                    file, run_catalog / relative_file_path, link_mode=self.get_put_link_mode()
+                )
+                return data_catalog
+
+            data_catalog.data_hash = data_hash or self.get_data_hash(str(file))
 
             if is_catalog_out_of_sync(data_catalog, synced_catalogs):
                 logger.info(f"{data_catalog.name} was found to be changed, syncing")
-
-                # Make the directory in the catalog if required
-                Path(run_catalog / relative_file_path.parent).mkdir(parents=True, exist_ok=True)
-                shutil.copy(file, run_catalog / relative_file_path)
+                parent_folders.make(run_catalog / relative_file_path)
+                link_file(file, run_catalog / relative_file_path, link_mode=self.get_put_link_mode())
             else:
                 logger.info(f"{data_catalog.name} was found to be unchanged, ignoring syncing")
+            return data_catalog
+
+        data_catalogs = transfer_files(_put, glob_files, max_workers=self.max_workers)
 
         if not data_catalogs:
             raise Exception(f"Did not find any files matching {name} in {copy_from}")
@@ -213,14 +361,51 @@ class FileSystemCatalog(BaseCatalog):
             )
             raise Exception(msg)
 
-        cataloged_files = list((catalog_location / previous_run_id).glob("*"))
-
-        for cataloged_file in cataloged_files:
-            if str(cataloged_file).endswith("execution.log"):
-                continue
-            print(cataloged_file.name)
-            if cataloged_file.is_file():
-                shutil.copy(cataloged_file, run_catalog / cataloged_file.name)
-            else:
-                shutil.copytree(cataloged_file, run_catalog / cataloged_file.name)
+        previous_catalog = catalog_location / previous_run_id
+        cataloged_files = [
+            cataloged_file
+            for cataloged_file in previous_catalog.rglob("*")
+            if cataloged_file.is_file()
+            and not (cataloged_file.parent == previous_catalog and cataloged_file.name.endswith("execution.log"))
+        ]
+
+        parent_folders = ParentFolders()
+
+        def _sync(cataloged_file: Path):
+            parent_folders.make(run_catalog / cataloged_file.relative_to(previous_catalog))
+            link_file(
+                cataloged_file,
+                run_catalog / cataloged_file.relative_to(previous_catalog),
+                link_mode=self.get_put_link_mode(),
+            )
             logger.info(f"Copied file from: {cataloged_file} to {run_catalog}")
+
+        transfer_files(_sync, cataloged_files, max_workers=self.max_workers)
+
+    def delete_run(
+        self,
+        run_id: str,
+        dry_run: bool = False,
+        max_workers: int = 4,
+        throttle: Optional[retention.Throttle] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Delete the catalog of the run, the files are deleted in parallel.
+
+        The folder of the run is first renamed to a hidden name, so that it is gone for the readers at once.
+
+        Args:
+            run_id (str): The run id
+            dry_run (bool, optional): Only report the bytes to reclaim. Defaults to False.
+            max_workers (int, optional): The number of files deleted concurrently. Defaults to 4.
+            throttle (Throttle, optional): Limits the rate of deletes. Defaults to no limit.
+
+        Returns:
+            int: The bytes reclaimed, or that would be reclaimed in a dry run
+        """
+        run_catalog = Path(self.get_catalog_location()) / run_id
+        if not dry_run:
+            run_catalog = retention.set_aside(run_catalog)
+
+        return retention.remove_tree(run_catalog, dry_run=dry_run, max_workers=max_workers, throttle=throttle)
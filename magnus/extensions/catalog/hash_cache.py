@@ -0,0 +1,148 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from magnus import defaults, utils
+from magnus.extensions.run_log_store.cache import file_token
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+# The file of the cache in the catalog location, hidden to not be taken for a run.
+HASH_CACHE_FILE = ".hashes.db"
+# Files modified this recently are not cached, a write within the resolution of the modification
+# time of the file system would not change the key of the file.
+RACY_SECONDS = 2
+
+
+class HashCache:
+    """
+    A persistent cache of the data hashes of files, shared by the processes, steps and runs of a catalog.
+
+    The data hash of a file is kept against its device, inode, size and modification time: any write to the
+    file changes its key and the stale hash is never served. The cache is a SQLite database, safe to be
+    used by the branches of a parallel run and the threads of a catalog at the same time.
+
+    If the database cannot be used, e.g a read only catalog location, the files are hashed without the cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_hashed = 0
+        self.bytes_cached = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        The connection to the database, opened on the first use in every process.
+        """
+        if self._connection is None or self._connection_pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS hashes (device INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, "
+                "data_hash TEXT, PRIMARY KEY (device, inode, size, mtime_ns))"
+            )
+            self._connection = connection
+            self._connection_pid = os.getpid()
+
+        return self._connection
+
+    def _execute(self, statement: str, arguments: tuple) -> Any:
+        try:
+            with self._lock:
+                return self.connection.execute(statement, arguments).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"The hash cache at {self.path} could not be used: {e}")
+            return None
+
+    def lookup(self, file_name: str) -> Optional[str]:
+        """
+        The data hash of the file from the cache, if the file has not changed since it was last hashed.
+
+        Args:
+            file_name (str): The file to look up
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+
+        Returns:
+            Optional[str]: The SHA ID of the file contents, None if not in the cache
+        """
+        token = file_token(file_name)
+        if token is None:
+            raise FileNotFoundError(file_name)
+
+        row = self._execute(
+            "SELECT data_hash FROM hashes WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ?", token
+        )
+        if not row:
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_cached += token[2]
+        return row[0]
+
+    def record(self, file_name: str, data_hash: str, token: Optional[Tuple[int, int, int, int]]):
+        """
+        Keep the data hash of the file, computed from its contents when the file had the token.
+
+        The hash is not kept if the file changed since, or was modified too recently, see RACY_SECONDS.
+
+        Args:
+            file_name (str): The file hashed
+            data_hash (str): The SHA ID of the file contents
+            token (tuple): The file_token of the file taken before reading its contents
+        """
+        if token is None:
+            return
+
+        with self._lock:
+            self.misses += 1
+            self.bytes_hashed += token[2]
+
+        if time.time_ns() - token[3] >= RACY_SECONDS * 1_000_000_000 and file_token(file_name) == token:
+            self._execute("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)", (*token, data_hash))
+
+    def get_data_hash(self, file_name: str) -> str:
+        """
+        The data hash of the file, from the cache if the file has not changed since it was last hashed.
+
+        Args:
+            file_name (str): The file to hash
+
+        Returns:
+            str: The SHA ID of the file contents, as utils.get_data_hash
+        """
+        data_hash = self.lookup(file_name)
+        if data_hash is not None:
+            return data_hash
+
+        token = file_token(file_name)
+        data_hash = utils.get_data_hash(file_name)
+        self.record(file_name, data_hash, token)
+
+        return data_hash
+
+    def stats(self) -> Dict[str, int]:
+        """
+        The counters of the cache, in this process.
+
+        Returns:
+            dict: hits, misses, the bytes hashed and the bytes served from the cache
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_hashed": self.bytes_hashed,
+            "bytes_cached": self.bytes_cached,
+        }
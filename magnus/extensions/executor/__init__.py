@@ -8,7 +8,7 @@ from typing import Any, Dict, List, Optional, cast
 from rich import print
 
 from magnus import context, defaults, exceptions, integration, parameters, utils
-from magnus.datastore import DataCatalog, RunLog, StepLog
+from magnus.datastore import BranchLog, DataCatalog, LogStatus, RunLogSummary, StepLog
 from magnus.defaults import TypeMapVariable
 from magnus.executor import BaseExecutor
 from magnus.experiment_tracker import get_tracked_data
@@ -18,6 +18,10 @@ from magnus.nodes import BaseNode
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
 
+# The status index of the original run of a re-run, by its run id. It is kept by the module, rather than the
+# executor, so that the branches executed in forked processes inherit it.
+_original_run_indexes: Dict[str, Dict[str, LogStatus]] = {}
+
 
 class GenericExecutor(BaseExecutor):
     """
@@ -74,9 +78,7 @@ class GenericExecutor(BaseExecutor):
 
     def _set_up_for_re_run(self, parameters: Dict[str, Any]) -> None:
         try:
-            attempt_run_log = self._context.run_log_store.get_run_log_by_id(
-                run_id=self._context.original_run_id, full=False
-            )
+            self._context.run_log_store.get_run_log_by_id(run_id=self._context.original_run_id, full=False)
         except exceptions.RunLogNotFoundError as e:
             msg = (
                 f"Expected a run log with id: {self._context.original_run_id} "
@@ -92,7 +94,8 @@ class GenericExecutor(BaseExecutor):
             previous_run_id=self._context.original_run_id, run_id=self._context.run_id
         )
 
-        parameters.update(cast(RunLog, attempt_run_log).parameters)
+        # The chunked run log stores do not keep the parameters in the run log
+        parameters.update(self._context.run_log_store.get_parameters(run_id=self._context.original_run_id))
 
     def _set_up_run_log(self, exists_ok=False):
         """
@@ -299,7 +302,11 @@ class GenericExecutor(BaseExecutor):
         By now, all the parameters are part of the run log as a dictionary.
         We set them as environment variables, serialized as json strings.
         """
-        params = self._context.run_log_store.get_parameters(run_id=self._context.run_id)
+        # The parameters set by the steps of a branch are kept in the branch, until the fan in of the composite node
+        internal_branch_name = node._get_branch_log_name(map_variable)
+        params = self._context.run_log_store.get_parameters(
+            run_id=self._context.run_id, internal_branch_name=internal_branch_name
+        )
         parameters.set_user_defined_params_as_environment_variables(params)
 
         attempt = self.step_attempt_number
@@ -340,7 +347,9 @@ class GenericExecutor(BaseExecutor):
                 self._sync_catalog(step_log, stage="put", synced_catalogs=data_catalogs_get)
                 step_log.user_defined_metrics = tracked_data
                 diff_parameters = utils.diff_dict(params, parameters_out)
-                self._context.run_log_store.set_parameters(self._context.run_id, diff_parameters)
+                self._context.run_log_store.set_parameters(
+                    self._context.run_id, diff_parameters, internal_branch_name=internal_branch_name
+                )
 
             # Remove the step context
             self._context_step_log = None
@@ -348,6 +357,7 @@ class GenericExecutor(BaseExecutor):
             self._context_metrics = {}  # type: ignore
 
             self._context.run_log_store.add_step_log(step_log, self._context.run_id)
+            self._context.run_log_store.flush()
 
     def add_code_identities(self, node: BaseNode, step_log: StepLog, **kwargs):
         """
@@ -413,6 +423,7 @@ class GenericExecutor(BaseExecutor):
         # We call an internal function to iterate the sub graphs and execute them
         if node.is_composite:
             self._context.run_log_store.add_step_log(step_log, self._context.run_id)
+            self._context.run_log_store.flush()
             node.execute_as_graph(map_variable=map_variable, **kwargs)
             return
 
@@ -518,6 +529,7 @@ class GenericExecutor(BaseExecutor):
 
             current_node = next_node_name
 
+        self._context.run_log_store.flush()
         run_log = self._context.run_log_store.get_branch_log(
             working_on._get_branch_log_name(map_variable), self._context.run_id
         )
@@ -528,11 +540,40 @@ class GenericExecutor(BaseExecutor):
 
         logger.info(f"Finished execution of the {branch} with status {run_log.status}")
 
-        # get the final run log
+        cache_stats = self._context.run_log_store.cache_stats()
+        if cache_stats:
+            logger.info(f"Run log store cache of the {branch}: {cache_stats}")
+
+        hash_cache_stats = self._context.catalog_handler.cache_stats()
+        if hash_cache_stats:
+            logger.info(f"Catalog hash cache of the {branch}: {hash_cache_stats}")
+
         if branch == "graph":
-            run_log = self._context.run_log_store.get_run_log_by_id(run_id=self._context.run_id, full=True)
+            self._print_run_log()
+            return
+
         print(json.dumps(run_log.model_dump(), indent=4))
 
+    def _print_run_log(self):
+        """
+        Print the final run log, or a summary of it if the run has more than max_printed_steps steps.
+
+        The steps of the run are counted without loading them, the summary loads one step at a time.
+        """
+        run_id = self._context.run_id
+        run_log = self._context.run_log_store.get_lazy_run_log(run_id=run_id)
+
+        if run_log.count_steps() <= self.max_printed_steps:
+            print(json.dumps(run_log.to_run_log().model_dump(), indent=4))
+            return
+
+        summary = RunLogSummary.from_run_log(run_log)
+        print(json.dumps(summary.model_dump(), indent=4))
+        print(
+            f"The run has more than {self.max_printed_steps} steps, "
+            f"use magnus runs show {run_id} or magnus runs export {run_id} to see its steps"
+        )
+
     def _is_step_eligible_for_rerun(self, node: BaseNode, map_variable: TypeMapVariable = None):
         """
         In case of a re-run, this method checks to see if the previous run step status to determine if a re-run is
@@ -555,11 +596,8 @@ class GenericExecutor(BaseExecutor):
             node_step_log_name = node._get_step_log_name(map_variable=map_variable)
             logger.info(f"Scanning previous run logs for node logs of: {node_step_log_name}")
 
-            try:
-                previous_node_log = self._context.run_log_store.get_step_log(
-                    internal_name=node_step_log_name, run_id=self._context.original_run_id
-                )
-            except exceptions.StepLogNotFoundError:
+            previous_node_log = self._get_original_status(node_step_log_name)
+            if previous_node_log is None:
                 logger.warning(f"Did not find the node {node.name} in previous run log")
                 return True  # We should re-run the node.
 
@@ -573,6 +611,93 @@ class GenericExecutor(BaseExecutor):
 
         return True
 
+    def _is_branch_eligible_for_rerun(self, internal_branch_name: str) -> bool:
+        """
+        In case of a re-run, this method checks the status of the branch in the previous run to determine if
+        the branch of a composite node needs to be executed.
+            * True: If its not a re-run.
+            * True: If its a re-run and the branch did not succeed in the last run or its log does not exist.
+            * False: If its a re-run and the branch succeeded in the last run.
+
+        Composite nodes use this to skip the branches that succeeded, e.g the iterations of a map, in bulk
+        rather than traversing every step of them.
+
+        Args:
+            internal_branch_name (str): The internal name of the branch, as of the branch log
+
+        Returns:
+            bool: Eligibility for re-run. True means execute the branch, False means the branch is skipped.
+        """
+        if not self._context.use_cached:
+            return True
+
+        previous_branch_log = self._get_original_status(internal_branch_name, is_branch=True)
+        return previous_branch_log is None or previous_branch_log.status != defaults.SUCCESS
+
+    def _get_original_branch_parameters(self, internal_branch_name: str) -> Dict[str, Any]:
+        """
+        In case of a re-run, the parameters set in the branch of the original run, as held by its status index.
+
+        Args:
+            internal_branch_name (str): The internal name of the branch, as of the branch log
+
+        Returns:
+            Dict[str, Any]: The parameters set in the branch of the original run
+        """
+        if not self._context.use_cached:
+            return {}
+
+        previous_branch_log = self._get_original_status(internal_branch_name, is_branch=True)
+        return previous_branch_log.parameters if previous_branch_log else {}
+
+    def _get_original_status(self, internal_name: str, is_branch: bool = False) -> Optional[LogStatus]:
+        """
+        In case of a re-run, the status of a step log or branch log of the original run.
+
+        Executors that traverse the whole graph in one process use the status index of the original run.
+        The others, e.g executing a node per container, retrieve only the log of interest rather than
+        building the index in every container.
+
+        Args:
+            internal_name (str): The internal name of the step log or branch log
+            is_branch (bool, optional): True if it is a branch log. Defaults to False.
+
+        Returns:
+            Optional[LogStatus]: The status of the log, None if the log does not exist in the original run
+        """
+        if self._local:
+            return self._get_original_run_index().get(internal_name)
+
+        run_log_store = self._context.run_log_store
+        original_run_id = self._context.original_run_id
+        try:
+            if is_branch:
+                branch_log = run_log_store.get_branch_log(internal_branch_name=internal_name, run_id=original_run_id)
+                return LogStatus.from_branch_log(cast(BranchLog, branch_log))
+            step_log = run_log_store.get_step_log(internal_name=internal_name, run_id=original_run_id)
+            return LogStatus.from_step_log(step_log)
+        except (exceptions.StepLogNotFoundError, exceptions.BranchLogNotFoundError):
+            return None
+
+    def _get_original_run_index(self) -> Dict[str, LogStatus]:
+        """
+        The status index of the original run of a re-run, retrieved once and kept in memory.
+
+        The original run does not change during the re-run, all the decisions of eligibility are made from
+        the index rather than retrieving the step logs of the original run one at a time.
+
+        Returns:
+            Dict[str, LogStatus]: The status of the step logs and branch logs of the original run by internal name
+        """
+        original_run_id = self._context.original_run_id
+        if original_run_id not in _original_run_indexes:
+            logger.info(f"Retrieving the status index of the original run: {original_run_id}")
+            index = self._context.run_log_store.get_status_index(run_id=original_run_id)
+            _original_run_indexes.clear()
+            _original_run_indexes[original_run_id] = index
+
+        return _original_run_indexes[original_run_id]
+
     def send_return_code(self, stage="traversal"):
         """
         Convenience function used by pipeline to send return code to the caller of the cli
@@ -684,6 +809,7 @@ class GenericExecutor(BaseExecutor):
         self._context.run_log_store.add_step_log(step_log, self._context.run_id)
 
         node.fan_out(executor=self, map_variable=map_variable)
+        self._context.run_log_store.flush()
 
     def fan_in(self, node: BaseNode, map_variable: TypeMapVariable = None):
         """
@@ -705,6 +831,7 @@ class GenericExecutor(BaseExecutor):
 
         """
         node.fan_in(executor=self, map_variable=map_variable)
+        self._context.run_log_store.flush()
 
         step_log = self._context.run_log_store.get_step_log(
             node._get_step_log_name(map_variable=map_variable), self._context.run_id
@@ -820,7 +820,9 @@ class ArgoExecutor(GenericExecutor):
         # If its a map node, write the list values to "/tmp/output.txt"
         if node.node_type == "map":
             node = cast(MapNode, node)
-            iterate_on = self._context.run_log_store.get_parameters(self._context.run_id)[node.iterate_on]
+            iterate_on = self._context.run_log_store.get_parameters(
+                self._context.run_id, internal_branch_name=node._get_branch_log_name(map_variable)
+            )[node.iterate_on]
 
             with open("/tmp/output.txt", mode="w", encoding="utf-8") as myfile:
                 json.dump(iterate_on, myfile, indent=4)
@@ -26,6 +26,8 @@ class LocalExecutor(GenericExecutor):
 
     service_name: str = "local"
 
+    _local: bool = True
+
     def trigger_job(self, node: BaseNode, map_variable: TypeMapVariable = None, **kwargs):
         """
         In this mode of execution, we prepare for the node execution and execute the node
@@ -58,6 +58,7 @@ class LocalContainerExecutor(GenericExecutor):
     _container_log_location = "/tmp/run_logs/"
     _container_catalog_location = "/tmp/catalog/"
     _container_secrets_location = "/tmp/dotenv"
+    _local: bool = True
     _volumes: Dict[str, Dict[str, str]] = {}
 
     def add_code_identities(self, node: BaseNode, step_log: StepLog, **kwargs):
@@ -155,6 +156,8 @@ class LocalContainerExecutor(GenericExecutor):
 
         command = utils.get_node_execution_command(node, map_variable=map_variable)
 
+        # The container writes to the same run log, nothing should be pending in this process.
+        self._context.run_log_store.flush()
         self._spin_container(
             node=node,
             command=command,
@@ -257,11 +260,15 @@ class LocalContainerComputeFileSystemRunLogstore(BaseIntegration):
     service_provider = "file-system"  # The actual implementation of the service
 
     def validate(self, **kwargs):
-        if self.executor._is_parallel_execution():  # pragma: no branch
+        from magnus.extensions.run_log_store.file_system.implementation import FileSystemRunLogstore
+
+        self.service = cast(FileSystemRunLogstore, self.service)
+
+        if self.executor._is_parallel_execution() and not self.service.locking:  # pragma: no branch
             msg = (
-                "Run log generated by file-system run log store are not thread safe. "
+                "Run log generated by file-system run log store are not thread safe without locking. "
                 "Inconsistent results are possible because of race conditions to write to the same file.\n"
-                "Consider using partitioned run log store like database for consistent results."
+                "Consider enabling locking or using partitioned run log store like database for consistent results."
             )
             logger.warning(msg)
 
@@ -316,6 +323,36 @@ class LocalContainerComputeFileSystemCatalog(BaseIntegration):
         self.service.catalog_location = self.executor._container_catalog_location
 
 
+class LocalContainerComputeContentAddressedCatalog(BaseIntegration):
+    """
+    Integration pattern between Local container and content addressed catalog
+    """
+
+    executor_type = "local-container"
+    service_type = "catalog"  # One of secret, catalog, datastore
+    service_provider = "content-addressed"  # The actual implementation of the service
+
+    def configure_for_traversal(self, **kwargs):
+        from magnus.extensions.catalog.content_addressed.implementation import ContentAddressedCatalog
+
+        self.executor = cast(LocalContainerExecutor, self.executor)
+        self.service = cast(ContentAddressedCatalog, self.service)
+
+        catalog_location = self.service.catalog_location
+        self.executor._volumes[str(Path(catalog_location).resolve())] = {
+            "bind": f"{self.executor._container_catalog_location}",
+            "mode": "rw",
+        }
+
+    def configure_for_execution(self, **kwargs):
+        from magnus.extensions.catalog.content_addressed.implementation import ContentAddressedCatalog
+
+        self.executor = cast(LocalContainerExecutor, self.executor)
+        self.service = cast(ContentAddressedCatalog, self.service)
+
+        self.service.catalog_location = self.executor._container_catalog_location
+
+
 class LocalContainerComputeDotEnvSecrets(BaseIntegration):
     """
     Integration between local container and dot env secrets
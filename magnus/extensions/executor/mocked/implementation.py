@@ -79,6 +79,7 @@ class MockedExecutor(GenericExecutor):
         # We call an internal function to iterate the sub graphs and execute them
         if node.is_composite:
             self._context.run_log_store.add_step_log(step_log, self._context.run_id)
+            self._context.run_log_store.flush()
             node.execute_as_graph(map_variable=map_variable, **kwargs)
             return
 
@@ -139,6 +140,9 @@ class MockedExecutor(GenericExecutor):
         """
         return True
 
+    def _is_branch_eligible_for_rerun(self, internal_branch_name: str) -> bool:
+        return True
+
     def _resolve_executor_config(self, node: BaseNode):
         """
         The overrides section can contain specific over-rides to an global executor config.
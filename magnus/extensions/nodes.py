@@ -10,7 +10,7 @@ from pydantic import ConfigDict, Field, ValidationInfo, field_serializer, field_
 from typing_extensions import Annotated
 
 from magnus import defaults, utils
-from magnus.datastore import StepAttempt
+from magnus.datastore import BranchLog, StepAttempt
 from magnus.defaults import TypeMapVariable
 from magnus.graph import Graph, create_graph
 from magnus.nodes import CompositeNode, ExecutableNode, TerminalNode
@@ -183,6 +183,7 @@ class ParallelNode(CompositeNode):
 
     node_type: str = Field(default="parallel", serialization_alias="type")
     branches: Dict[str, Graph]
+    reducer: str = Field(default=defaults.LAST_WRITER_REDUCER)
     is_composite: bool = Field(default=True, exclude=True)
 
     @field_serializer("branches")
@@ -229,12 +230,19 @@ class ParallelNode(CompositeNode):
             map_variable (dict, optional): If the node is part of a map node. Defaults to None.
         """
         # Prepare the branch logs
+        branch_logs = []
         for internal_branch_name, _ in self.branches.items():
             effective_branch_name = self._resolve_map_placeholders(internal_branch_name, map_variable=map_variable)
 
             branch_log = self._context.run_log_store.create_branch_log(effective_branch_name)
             branch_log.status = defaults.PROCESSING
-            self._context.run_log_store.add_branch_log(branch_log, self._context.run_id)
+            if not self._context.executor._is_branch_eligible_for_rerun(effective_branch_name):
+                # The branch succeeded in the original run and is not executed again
+                branch_log.status = defaults.SUCCESS
+                branch_log.parameters = self._context.executor._get_original_branch_parameters(effective_branch_name)
+            branch_logs.append(branch_log)
+
+        self._context.run_log_store.add_branch_logs(branch_logs, self._context.run_id)
 
     def execute_as_graph(self, map_variable: TypeMapVariable = None, **kwargs):
         """
@@ -260,15 +268,22 @@ class ParallelNode(CompositeNode):
         from magnus import entrypoints
 
         self.fan_out(map_variable=map_variable, **kwargs)
+        # The branch logs should be stored before the branches, in other processes, update them.
+        self._context.run_log_store.flush()
 
         jobs = []
         # Given that we can have nesting and complex graphs, controlling the number of processes is hard.
         # A better way is to actually submit the job to some process scheduler which does resource management
         for internal_branch_name, branch in self.branches.items():
+            effective_branch_name = self._resolve_map_placeholders(internal_branch_name, map_variable=map_variable)
+            if not self._context.executor._is_branch_eligible_for_rerun(effective_branch_name):
+                logger.info(f"Skipping the branch {effective_branch_name}, it succeeded in the original run")
+                continue
+
             if self._context.executor._is_parallel_execution():
                 # Trigger parallel jobs
                 action = entrypoints.execute_single_brach
-                kwargs = {
+                process_kwargs = {
                     "configuration_file": self._context.configuration_file,
                     "pipeline_file": self._context.pipeline_file,
                     "branch_name": internal_branch_name.replace(" ", defaults.COMMAND_FRIENDLY_CHARACTER),
@@ -276,7 +291,7 @@ class ParallelNode(CompositeNode):
                     "map_variable": json.dumps(map_variable),
                     "tag": self._context.tag,
                 }
-                process = multiprocessing.Process(target=action, kwargs=kwargs)
+                process = multiprocessing.Process(target=action, kwargs=process_kwargs)
                 jobs.append(process)
                 process.start()
 
@@ -299,12 +314,14 @@ class ParallelNode(CompositeNode):
             executor (BaseExecutor): The executor class as defined by the config
             map_variable (dict, optional): If the node is part of a map. Defaults to None.
         """
-        step_success_bool = True
-        for internal_branch_name, _ in self.branches.items():
-            effective_branch_name = self._resolve_map_placeholders(internal_branch_name, map_variable=map_variable)
-            branch_log = self._context.run_log_store.get_branch_log(effective_branch_name, self._context.run_id)
-            if branch_log.status != defaults.SUCCESS:
-                step_success_bool = False
+        effective_branch_names = [
+            self._resolve_map_placeholders(internal_branch_name, map_variable=map_variable)
+            for internal_branch_name in self.branches
+        ]
+        branch_logs = self._context.run_log_store.get_branch_logs(effective_branch_names, self._context.run_id)
+        step_success_bool = all(branch_log.status == defaults.SUCCESS for branch_log in branch_logs.values())
+
+        self._merge_branch_parameters(list(branch_logs.values()), reducer=self.reducer, map_variable=map_variable)
 
         # Collate all the results and update the status of the step
         effective_internal_name = self._resolve_map_placeholders(self.internal_name, map_variable=map_variable)
@@ -337,6 +354,7 @@ class MapNode(CompositeNode):
     iterate_on: str
     iterate_as: str
     branch: Graph
+    reducer: str = Field(default=defaults.LAST_WRITER_REDUCER)
     is_composite: bool = True
 
     @classmethod
@@ -370,6 +388,18 @@ class MapNode(CompositeNode):
         """
         return self.branch
 
+    def _get_iterate_on(self, map_variable: TypeMapVariable = None) -> Any:
+        """
+        The value of the parameter to iterate on, as seen by the branch containing the node.
+
+        Raises:
+            KeyError: If the parameter is not set
+        """
+        parameters = self._context.run_log_store.get_parameters(
+            self._context.run_id, internal_branch_name=self._get_branch_log_name(map_variable)
+        )
+        return parameters[self.iterate_on]
+
     def fan_out(self, map_variable: TypeMapVariable = None, **kwargs):
         """
         The general method to fan out for a node of type map.
@@ -381,16 +411,23 @@ class MapNode(CompositeNode):
             executor (BaseExecutor): The executor class as defined by the config
             map_variable (dict, optional): If the node is part of map. Defaults to None.
         """
-        iterate_on = self._context.run_log_store.get_parameters(self._context.run_id)[self.iterate_on]
+        iterate_on = self._get_iterate_on(map_variable=map_variable)
 
         # Prepare the branch logs
+        branch_logs = []
         for iter_variable in iterate_on:
             effective_branch_name = self._resolve_map_placeholders(
                 self.internal_name + "." + str(iter_variable), map_variable=map_variable
             )
             branch_log = self._context.run_log_store.create_branch_log(effective_branch_name)
             branch_log.status = defaults.PROCESSING
-            self._context.run_log_store.add_branch_log(branch_log, self._context.run_id)
+            if not self._context.executor._is_branch_eligible_for_rerun(effective_branch_name):
+                # The iteration succeeded in the original run and is not executed again
+                branch_log.status = defaults.SUCCESS
+                branch_log.parameters = self._context.executor._get_original_branch_parameters(effective_branch_name)
+            branch_logs.append(branch_log)
+
+        self._context.run_log_store.add_branch_logs(branch_logs, self._context.run_id)
 
     def execute_as_graph(self, map_variable: TypeMapVariable = None, **kwargs):
         """
@@ -422,7 +459,7 @@ class MapNode(CompositeNode):
 
         iterate_on = None
         try:
-            iterate_on = self._context.run_log_store.get_parameters(self._context.run_id)[self.iterate_on]
+            iterate_on = self._get_iterate_on(map_variable=map_variable)
         except KeyError:
             raise Exception(
                 f"Expected parameter {self.iterate_on} not present in Run Log parameters, was it ever set before?"
@@ -432,18 +469,28 @@ class MapNode(CompositeNode):
             raise Exception("Only list is allowed as a valid iterator type")
 
         self.fan_out(map_variable=map_variable, **kwargs)
+        # The branch logs should be stored before the branches, in other processes, update them.
+        self._context.run_log_store.flush()
 
         jobs = []
+        skipped = 0
         # Given that we can have nesting and complex graphs, controlling the number of processess is hard.
         # A better way is to actually submit the job to some process scheduler which does resource management
         for iter_variable in iterate_on:
+            effective_branch_name = self._resolve_map_placeholders(
+                self.internal_name + "." + str(iter_variable), map_variable=map_variable
+            )
+            if not self._context.executor._is_branch_eligible_for_rerun(effective_branch_name):
+                skipped += 1
+                continue
+
             effective_map_variable = map_variable or OrderedDict()
             effective_map_variable[self.iterate_as] = iter_variable
 
             if self._context.executor._is_parallel_execution():
                 # Trigger parallel jobs
                 action = entrypoints.execute_single_brach
-                kwargs = {
+                process_kwargs = {
                     "configuration_file": self._context.configuration_file,
                     "pipeline_file": self._context.pipeline_file,
                     "branch_name": self.branch.internal_branch_name.replace(" ", defaults.COMMAND_FRIENDLY_CHARACTER),
@@ -451,7 +498,7 @@ class MapNode(CompositeNode):
                     "map_variable": json.dumps(effective_map_variable),
                     "tag": self._context.tag,
                 }
-                process = multiprocessing.Process(target=action, kwargs=kwargs)
+                process = multiprocessing.Process(target=action, kwargs=process_kwargs)
                 jobs.append(process)
                 process.start()
 
@@ -459,6 +506,9 @@ class MapNode(CompositeNode):
                 # If parallel is not enabled, execute them sequentially
                 self._context.executor.execute_graph(self.branch, map_variable=effective_map_variable, **kwargs)
 
+        if skipped:
+            logger.info(f"Skipped {skipped} iterations of {self.internal_name}, they succeeded in the original run")
+
         for job in jobs:
             job.join()
 
@@ -474,17 +524,16 @@ class MapNode(CompositeNode):
             executor (BaseExecutor): The executor class as defined by the config
             map_variable (dict, optional): If the node is part of map node. Defaults to None.
         """
-        iterate_on = self._context.run_log_store.get_parameters(self._context.run_id)[self.iterate_on]
+        iterate_on = self._get_iterate_on(map_variable=map_variable)
         # # Find status of the branches
-        step_success_bool = True
+        effective_branch_names = [
+            self._resolve_map_placeholders(self.internal_name + "." + str(iter_variable), map_variable=map_variable)
+            for iter_variable in iterate_on
+        ]
+        branch_logs = self._context.run_log_store.get_branch_logs(effective_branch_names, self._context.run_id)
+        step_success_bool = all(branch_log.status == defaults.SUCCESS for branch_log in branch_logs.values())
 
-        for iter_variable in iterate_on:
-            effective_branch_name = self._resolve_map_placeholders(
-                self.internal_name + "." + str(iter_variable), map_variable=map_variable
-            )
-            branch_log = self._context.run_log_store.get_branch_log(effective_branch_name, self._context.run_id)
-            if branch_log.status != defaults.SUCCESS:
-                step_success_bool = False
+        self._merge_branch_parameters(list(branch_logs.values()), reducer=self.reducer, map_variable=map_variable)
 
         # Collate all the results and update the status of the step
         effective_internal_name = self._resolve_map_placeholders(self.internal_name, map_variable=map_variable)
@@ -623,6 +672,8 @@ class DagNode(CompositeNode):
         if branch_log.status != defaults.SUCCESS:
             step_success_bool = False
 
+        self._merge_branch_parameters([cast(BranchLog, branch_log)], map_variable=map_variable)
+
         step_log = self._context.run_log_store.get_step_log(effective_internal_name, self._context.run_id)
         step_log.status = defaults.PROCESSING
 
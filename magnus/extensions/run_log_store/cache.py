@@ -0,0 +1,138 @@
+import os
+import pickle
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple, Type
+
+
+def file_token(path: Any) -> Optional[Tuple[int, int, int, int]]:
+    """
+    The token which changes whenever the file is written, by this or any other process.
+
+    Args:
+        path (str): The path to the file
+
+    Returns:
+        Optional[tuple]: The device, inode, size and modification time in ns or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def fd_token(fd: int) -> Tuple[int, int, int, int]:
+    """
+    The token of the file open as fd, used to remember the contents just written by this process.
+
+    Args:
+        fd (int): The file descriptor
+
+    Returns:
+        tuple: The device, inode, size and modification time in ns
+    """
+    stat = os.fstat(fd)
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class CacheEntry:
+    """
+    The decoded contents of a single entity of the run log store and the token it is valid for.
+
+    The contents are kept pickled, unpickling gives every caller its own copy to modify and is
+    much cheaper than a deep copy of the model or reading and parsing the JSON again.
+    """
+
+    def __init__(self, token: Hashable, contents: dict):
+        self.token = token
+        self.payload = pickle.dumps(contents, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def model(self, model_type: Type = dict) -> Any:
+        """
+        A copy of the contents decoded as the model type, callers are free to modify it.
+
+        Args:
+            model_type (Type): A pydantic model or dict
+
+        Returns:
+            Any: The decoded contents
+        """
+        contents = pickle.loads(self.payload)
+        if model_type is dict:
+            return contents
+
+        return model_type.model_validate(contents)
+
+
+class RunLogCache:
+    """
+    A process local cache of the decoded entities of a run log store.
+
+    Every entry is valid for a token, e.g the modification time of the file it was read from.
+    The store asks for an entry with the current token of the entity and a stale entry is discarded,
+    so the writes of other processes, like the sibling branches of a parallel node, are always seen.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, token: Hashable) -> Optional[CacheEntry]:
+        """
+        Return the entry of the key if it is valid for the token.
+
+        Args:
+            key (Hashable): The key of the entity
+            token (Hashable): The current token of the entity
+
+        Returns:
+            Optional[CacheEntry]: The entry if present and valid
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.token == token:
+                self.hits += 1
+                return entry
+
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, token: Hashable, contents: dict) -> CacheEntry:
+        """
+        Remember the contents of the key, valid for the token.
+
+        Args:
+            key (Hashable): The key of the entity
+            token (Hashable): The token of the entity the contents correspond to
+            contents (dict): The contents as stored
+
+        Returns:
+            CacheEntry: The new entry
+        """
+        entry = CacheEntry(token=token, contents=contents)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        The hit and miss counters of the cache.
+
+        Returns:
+            dict: hits, misses and the number of entries
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -1,39 +1,465 @@
+import hashlib
 import json
 import logging
+import os
+import time
 from pathlib import Path
 from string import Template
-from typing import Optional, Sequence, Union
+from typing import Any, ContextManager, Dict, Hashable, List, Optional, Sequence, Set, Tuple, Union
 
-from magnus import defaults, utils
+from pydantic import PrivateAttr, field_validator
+
+from magnus import defaults, exceptions, retention, utils
+from magnus.datastore import RunLog
+from magnus.extensions.run_log_store import serializers
+from magnus.extensions.run_log_store.cache import file_token
 from magnus.extensions.run_log_store.generic_chunked import ChunkedRunLogStore
+from magnus.extensions.run_log_store.locking import RunLocks, atomic_write, ends_run
+from magnus.extensions.run_log_store.run_index import TERMINAL_STATUSES, RunIndex
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
 
 T = Union[str, Path]
 
+MANIFEST_FILE_NAME = "manifest.index"
+SNAPSHOT_FILE_NAME = "snapshot.index"
+LAYOUT_FILE_NAME = "layout.index"
+
+LAYOUTS = ["flat", "sharded"]
+
+
+class RunManifest:
+    """
+    An in-memory view of the append-only manifest of a single run folder.
+
+    The manifest holds one line per write of a chunk file, relative to the run folder, in the order they were
+    written. It is both the index of the chunks and the journal of the changes to the run.
+    Writers only ever append complete lines to it, which keeps it consistent under concurrent writers from
+    parallel branches. Readers keep the offset they have read till and only read the newly appended lines.
+
+    The chunk files are indexed by their logical name, i.e the name of the file without the creation time.
+    In the sharded layout, the lines carry the sub-directories of the chunk files.
+    """
+
+    def __init__(self, run_folder: Path):
+        self.run_folder = run_folder
+        self.manifest_path = run_folder / MANIFEST_FILE_NAME
+        self.offset = 0
+        self.entries: Dict[str, List[str]] = {}
+
+    @staticmethod
+    def logical_name(file_name: str) -> str:
+        """
+        The logical name of a chunk file, the pattern it is searched by.
+
+        StepLog-<name>-<creation_time>.json and BranchLog-<name>-<creation_time>.json drop the creation time.
+        All the other chunks are known by their name without the suffix.
+
+        Args:
+            file_name (str): The name of the chunk file, with or without the sub-directories
+
+        Returns:
+            str: The logical name of the chunk
+        """
+        file_name = file_name.rpartition("/")[2]
+        stem = file_name[: -len(".json")] if file_name.endswith(".json") else file_name
+
+        timestamped = [ChunkedRunLogStore.LogTypes.STEP_LOG.value, ChunkedRunLogStore.LogTypes.BRANCH_LOG.value]
+        if any(stem.startswith(prefix + "-") for prefix in timestamped):
+            return stem[: stem.rindex("-") + 1]
+
+        return stem
+
+    def add(self, file_name: str):
+        """
+        Index the chunk file against its logical name, ignoring duplicates.
+
+        Args:
+            file_name (str): The name of the chunk file relative to the run folder
+        """
+        files = self.entries.setdefault(self.logical_name(file_name), [])
+        if file_name not in files:
+            files.append(file_name)
+
+    def append(self, file_names: List[str]):
+        """
+        Append the chunk files to the manifest on disk.
+
+        The lines are written in a single write call to a file opened in append mode, so concurrent writers
+        do not interleave their entries.
+
+        Args:
+            file_names (List[str]): The names of the chunk files relative to the run folder
+        """
+        if not file_names:
+            return
+
+        content = "".join(f"{file_name}\n" for file_name in file_names).encode()
+        fd = os.open(self.manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, content)
+        finally:
+            os.close(fd)
+
+    def rebuild(self):
+        """
+        Rebuild the manifest by scanning the run folder.
+
+        Used for runs that were created before the manifest was introduced or if the manifest was removed.
+        The chunks are ordered by their creation time, the run log and parameters first.
+        The sub-directories of the sharded layout are scanned too.
+        """
+
+        def _created(file_name: str) -> int:
+            logical_name = self.logical_name(file_name)
+            if not logical_name.endswith("-"):
+                return 0
+            return int(file_name.rpartition("/")[2][len(logical_name) : -len(".json")])
+
+        chunks = sorted(
+            (path.relative_to(self.run_folder).as_posix() for path in self.run_folder.rglob("*.json")),
+            key=lambda name: (_created(name), name),
+        )
+        if not chunks:
+            return
+
+        logger.info(f"Rebuilding the manifest of {self.run_folder} from {len(chunks)} chunks")
+        self.append(chunks)
+
+    def refresh(self):
+        """
+        Read the lines appended to the manifest since the last refresh.
+
+        Only complete lines are consumed, a line being written by another process is picked up by the next refresh.
+        """
+        try:
+            size = os.stat(self.manifest_path).st_size
+        except FileNotFoundError:
+            if self.offset:
+                # The manifest was removed underneath us, start afresh.
+                self.offset = 0
+                self.entries = {}
+            if not self.run_folder.is_dir():
+                return
+            self.rebuild()
+            try:
+                size = os.stat(self.manifest_path).st_size
+            except FileNotFoundError:
+                return
+
+        lines, self.offset = self.read(self.offset, size)
+        for line in lines:
+            self.add(line)
+
+    def read(self, offset: int, size: int) -> Tuple[List[str], int]:
+        """
+        Read the complete lines between the offset and the size of the manifest.
+
+        Args:
+            offset (int): The offset to read from
+            size (int): The size of the manifest
+
+        Returns:
+            tuple: The lines and the offset till which the lines are read
+        """
+        if size <= offset:
+            return [], offset
+
+        with open(self.manifest_path, "rb") as fr:
+            fr.seek(offset)
+            content = fr.read(size - offset)
+
+        complete = content.rfind(b"\n") + 1
+        return [line for line in content[:complete].decode().splitlines() if line], offset + complete
+
+    def lookup(self, name: str, prefix: bool = False) -> List[Path]:
+        """
+        Find the chunk files by their logical name.
+
+        Args:
+            name (str): The logical name of the chunk or a prefix of it
+            prefix (bool, optional): Match every logical name starting with name. Defaults to False.
+
+        Returns:
+            List[Path]: The paths of the matching chunk files
+        """
+        self.refresh()
+
+        if not prefix:
+            return [self.run_folder / file_name for file_name in self.entries.get(name, [])]
+
+        return [
+            self.run_folder / file_name
+            for logical_name, files in self.entries.items()
+            if logical_name.startswith(name)
+            for file_name in files
+        ]
+
 
 class ChunkedFileSystemRunLogStore(ChunkedRunLogStore):
     """
     File system run log store but chunks the run log into thread safe chunks.
     This enables executions to be parallel.
+
+    Every run folder maintains a manifest of the chunks in it, lookups are served from the manifest rather than
+    scanning the run folder. The manifest also records every write to a chunk, which keeps the full run log
+    up to date by reading only the chunks written since it was last prepared.
+
+    In the sharded layout, the step and branch logs of a run are spread over nested sub-directories by the hash of
+    their name, which keeps every directory small for runs with very many steps. The layout is recorded in the run
+    folder when the run is created, so runs of either layout can be read and written by any store.
+
+    Chunks are written to a temporary file and renamed into place, readers never see a partially written chunk.
+    The updates to a run are serialized by an advisory lock per run, in the .locks folder of the log folder,
+    which makes the store safe for the parallel branches of map and parallel nodes.
+
+    Example config:
+
+    run_log_store:
+      type: chunked-fs
+      config:
+        log_folder: The folder to out the logs. Defaults to .run_log_store
+        cache: Keep the decoded chunks in memory, validated by the modification time of the file. Defaults to false
+        write_behind: Buffer the step logs in memory till the executor flushes them. Defaults to false
+        serializer: One of json, compact-json or msgpack. Defaults to json
+        compression: One of gzip or zstd. Defaults to no compression
+        snapshot_interval: Save the full run log every these many changes, 0 to disable. Defaults to 1000
+        run_index: Maintain an index of the runs in the log folder to list them. Defaults to true
+        run_index_wal: Use the WAL journal of SQLite for the index, not supported by network file systems.
+            Defaults to true, false for the k8s persistent volumes
+        layout: flat or sharded, the layout of the runs created by the store. Defaults to flat
+        shard_levels: The depth of the sub-directories of the sharded layout, 256 per level. Defaults to 2
+        locking: Lock the run while updating it, disable for file systems without flock support. Defaults to true
     """
 
     service_name: str = "chunked-fs"
     log_folder: str = defaults.LOG_LOCATION_FOLDER
+    serializer: str = "json"
+    compression: str = ""
+    run_index: bool = True
+    run_index_wal: bool = True
+    layout: str = "flat"
+    shard_levels: int = 2
+    locking: bool = True
+
+    _manifests: Dict[str, RunManifest] = PrivateAttr(default_factory=dict)
+    _run_index: Optional[RunIndex] = PrivateAttr(default=None)
+    _run_shard_levels: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _made_folders: Set[Path] = PrivateAttr(default_factory=set)
+    _locks: Optional[RunLocks] = PrivateAttr(default=None)
+
+    @field_validator("serializer")
+    @classmethod
+    def check_serializer(cls, serializer: str) -> str:
+        return serializers.validate_serializer(serializer)
+
+    @field_validator("compression")
+    @classmethod
+    def check_compression(cls, compression: str) -> str:
+        return serializers.validate_compression(compression)
+
+    @field_validator("layout")
+    @classmethod
+    def check_layout(cls, layout: str) -> str:
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unsupported layout {layout}, should be one of {LAYOUTS}")
+        return layout
+
+    @field_validator("shard_levels")
+    @classmethod
+    def check_shard_levels(cls, shard_levels: int) -> int:
+        if shard_levels < 1:
+            raise ValueError("shard_levels should be at least 1")
+        return shard_levels
+
+    @property
+    def log_folder_name(self) -> str:
+        return self.log_folder
+
+    @property
+    def index(self) -> RunIndex:
+        if not self.run_index:
+            raise Exception(f"The run index is disabled for the run log store {self.service_name}")
+
+        if self._run_index is None:
+            self._run_index = RunIndex(self.log_folder_name, layout="chunked-fs", wal=self.run_index_wal)
+        return self._run_index
+
+    def _lock(self, run_id: str) -> ContextManager:
+        if not self.locking:
+            return super()._lock(run_id)
+
+        if self._locks is None:
+            self._locks = RunLocks(self.log_folder_name)
+        return self._locks(run_id)
+
+    def create_run_log(
+        self,
+        run_id: str,
+        dag_hash: str = "",
+        use_cached: bool = False,
+        tag: str = "",
+        original_run_id: str = "",
+        status: str = defaults.CREATED,
+        **kwargs,
+    ) -> RunLog:
+        run_log = super().create_run_log(
+            run_id=run_id,
+            dag_hash=dag_hash,
+            use_cached=use_cached,
+            tag=tag,
+            original_run_id=original_run_id,
+            status=status,
+            **kwargs,
+        )
+        if self.run_index:
+            self.index.record(run_log)
+        return run_log
+
+    def put_run_log(self, run_log: RunLog, **kwargs):
+        super().put_run_log(run_log=run_log, **kwargs)
+        if self.run_index:
+            self.index.record(run_log)
+
+    def update_run_log_status(self, run_id: str, status: str):
+        super().update_run_log_status(run_id=run_id, status=status)
+
+        if status in TERMINAL_STATUSES:
+            self._remove_lock(run_id)
+
+    def _remove_lock(self, run_id: str):
+        # The run is over, nothing updates its chunks any more and the lock file would only pile up.
+        if self._locks is not None:
+            self._locks.remove(run_id)
+
+    def _ends_run(self, log_type: ChunkedRunLogStore.LogTypes, name: str, contents: dict) -> bool:
+        if log_type != self.LogTypes.STEP_LOG:
+            return False
+        return ends_run(name, contents.get("step_type", ""), contents.get("status", ""))
+
+    def list_runs(
+        self,
+        tag: str = "",
+        status: str = "",
+        dag_hash: str = "",
+        original_run_id: str = "",
+        limit: int = 20,
+        offset: int = 0,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        return self.index.query(
+            tag=tag, status=status, dag_hash=dag_hash, original_run_id=original_run_id, limit=limit, offset=offset
+        )
+
+    def reindex(self, **kwargs):
+        """
+        Rebuild the index of the runs from the run folders in the log folder.
+
+        Only the RunLog chunk of every run is read, the start time is the creation time of the earliest step
+        as recorded in the name of its chunk and the end time is when the RunLog chunk was last written.
+        """
+        run_logs = []
+        for run_folder in Path(self.log_folder_name).iterdir():
+            if not run_folder.is_dir() or run_folder.name.startswith("."):
+                continue
+
+            try:
+                run_log = self.get_run_log_by_id(run_id=run_folder.name, full=False)
+            except exceptions.RunLogNotFoundError:
+                continue
+
+            modified_at = os.stat(self.get_matches(run_id=run_log.run_id, name="RunLog")).st_mtime  # type: ignore
+            created = self._internal_names(run_id=run_log.run_id, log_type=self.LogTypes.STEP_LOG).values()
+            start_time = min((int(Path(name).stem.rpartition("-")[2]) / 1e9 for name in created), default=modified_at)
+            end_time = modified_at if run_log.status in TERMINAL_STATUSES else None
+            run_logs.append((run_log, start_time, end_time))
+
+        self.index.rebuild(run_logs)
+
+    def delete_run(
+        self,
+        run_id: str,
+        dry_run: bool = False,
+        max_workers: int = 4,
+        throttle: Optional[retention.Throttle] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Delete the folder of the run, of either layout, and remove it from the index of the runs.
+
+        The folder is renamed to a hidden name under the lock of the run, so that the run is gone for the readers
+        at once, and its chunks are then deleted in parallel.
+
+        Args:
+            run_id (str): The run id
+            dry_run (bool, optional): Only report the bytes to reclaim. Defaults to False.
+            max_workers (int, optional): The number of files deleted concurrently. Defaults to 4.
+            throttle (Throttle, optional): Limits the rate of deletes. Defaults to no limit.
+
+        Raises:
+            RunLogNotFoundError: If there is no folder of the run in the log folder
+
+        Returns:
+            int: The bytes reclaimed, or that would be reclaimed in a dry run
+        """
+        run_folder = self.log_folder_with_run_id(run_id=run_id)
+        if not run_folder.is_dir():
+            raise exceptions.RunLogNotFoundError(run_id)
+
+        if dry_run:
+            return retention.remove_tree(run_folder, dry_run=True)
+
+        with self._lock(run_id):
+            deleted_folder = retention.set_aside(run_folder)
+
+        # The folders of a run created again with the same run id have to be made again.
+        self._made_folders = {
+            folder for folder in self._made_folders if folder != run_folder and run_folder not in folder.parents
+        }
+        self._manifests.pop(run_id, None)
+        self._run_shard_levels.pop(run_id, None)
+        with self._views_lock:
+            self._views.pop(run_id, None)
+        with self._pending_lock:
+            self._pending.pop(run_id, None)
+
+        reclaimed = retention.remove_tree(deleted_folder, max_workers=max_workers, throttle=throttle)
+
+        if self.run_index:
+            self.index.remove(run_id)
+        if self._locks is not None:
+            self._locks.remove(run_id)
+
+        return reclaimed
+
+    def get_manifest(self, run_id: str) -> RunManifest:
+        """
+        Return the manifest of the run, creating the in-memory view if this is the first access.
+
+        Args:
+            run_id (str): The run id
+
+        Returns:
+            RunManifest: The manifest of the run
+        """
+        if run_id not in self._manifests:
+            self._manifests[run_id] = RunManifest(self.log_folder_with_run_id(run_id=run_id))
+
+        return self._manifests[run_id]
 
     def get_matches(self, run_id: str, name: str, multiple_allowed: bool = False) -> Optional[Union[Sequence[T], T]]:
         """
         Get contents of files matching the pattern name*
 
+        If multiple matches are not allowed, the name is matched exactly against the logical name of the chunk.
+
         Args:
             run_id (str): The run id
             name (str): The suffix of the file name to check in the run log store.
         """
-        log_folder = self.log_folder_with_run_id(run_id=run_id)
-
         sub_name = Template(name).safe_substitute({"creation_time": ""})
 
-        matches = list(log_folder.glob(f"{sub_name}*"))
+        matches = self.get_manifest(run_id=run_id).lookup(sub_name, prefix=multiple_allowed)
         if matches:
             if not multiple_allowed:
                 if len(matches) > 1:
@@ -54,7 +480,88 @@ class ChunkedFileSystemRunLogStore(ChunkedRunLogStore):
         Returns:
             Path: The path to the log folder with the run id
         """
-        return Path(self.log_folder) / run_id
+        return Path(self.log_folder_name) / run_id
+
+    def shard_levels_of(self, run_id: str) -> int:
+        """
+        The depth of the sub-directories of the run, 0 for the flat layout.
+
+        The layout of a run is fixed when its folder is created. A sharded run records it in the run folder and
+        an existing run folder without the record is flat, which includes the runs created before sharding.
+        A new run folder is created as per the configured layout, the record is written before the folder is
+        visible to other processes.
+
+        Args:
+            run_id (str): The run id
+
+        Returns:
+            int: The number of levels of sub-directories
+        """
+        if run_id in self._run_shard_levels:
+            return self._run_shard_levels[run_id]
+
+        run_folder = self.log_folder_with_run_id(run_id=run_id)
+        if not run_folder.is_dir():
+            self._make_run_folder(run_folder)
+
+        try:
+            with open(run_folder / LAYOUT_FILE_NAME, "r") as fr:
+                shard_levels = int(json.load(fr)["shard_levels"])
+        except FileNotFoundError:
+            shard_levels = 0
+
+        self._run_shard_levels[run_id] = shard_levels
+        return shard_levels
+
+    def _make_run_folder(self, run_folder: Path):
+        """
+        Create the folder of a new run as per the configured layout.
+
+        A sharded run folder is prepared under a temporary name and renamed into place with the layout in it.
+        If another process created the run folder meanwhile, its layout wins.
+
+        Args:
+            run_folder (Path): The folder of the run
+        """
+        if self.layout == "flat":
+            utils.safe_make_dir(run_folder)
+            return
+
+        temporary_folder = run_folder.with_name(f".{run_folder.name}.{os.getpid()}")
+        utils.safe_make_dir(temporary_folder)
+        with open(temporary_folder / LAYOUT_FILE_NAME, "w") as fw:
+            json.dump({"layout": self.layout, "shard_levels": self.shard_levels}, fw)
+
+        try:
+            os.rename(temporary_folder, run_folder)
+        except OSError:
+            # The run folder was created by another process
+            os.remove(temporary_folder / LAYOUT_FILE_NAME)
+            os.rmdir(temporary_folder)
+
+    def chunk_path(self, run_id: str, name: str) -> Path:
+        """
+        The path to write a new chunk of the run to.
+
+        In the sharded layout, the step and branch logs are placed in sub-directories named by the leading bytes
+        of the hash of their logical name. The run log and the parameters are always in the run folder.
+
+        Args:
+            run_id (str): The run id
+            name (str): The name of the chunk file
+
+        Returns:
+            Path: The path to the chunk file
+        """
+        run_folder = self.log_folder_with_run_id(run_id=run_id)
+        shard_levels = self.shard_levels_of(run_id=run_id)
+
+        logical_name = RunManifest.logical_name(name)
+        if not shard_levels or not logical_name.endswith("-"):
+            return run_folder / name
+
+        digest = hashlib.sha1(logical_name.encode()).hexdigest()
+        return run_folder.joinpath(*(digest[2 * level : 2 * level + 2] for level in range(shard_levels)), name)
 
     def safe_suffix_json(self, name: Union[Path, str]) -> str:
         """
@@ -71,22 +578,145 @@ class ChunkedFileSystemRunLogStore(ChunkedRunLogStore):
 
         return str(name) + ".json"
 
+    def _write(self, run_id: str, contents: dict, name: Union[Path, str]) -> str:
+        """
+        Write the contents to the chunk file, without adding it to the manifest.
+
+        Args:
+            run_id (str): The run id
+            contents (dict): The dict to store
+            name (str): The path of the chunk file
+
+        Returns:
+            str: The name of the chunk file relative to the run folder
+        """
+        folder = Path(self.safe_suffix_json(name)).parent
+        if folder not in self._made_folders:
+            utils.safe_make_dir(folder)
+            self._made_folders.add(folder)
+
+        token = atomic_write(
+            self.safe_suffix_json(name),
+            serializers.dumps(contents, serializer=self.serializer, compression=self.compression),
+        )
+
+        self._remember(self.safe_suffix_json(name), contents, token)
+
+        return Path(self.safe_suffix_json(name)).relative_to(self.log_folder_with_run_id(run_id=run_id)).as_posix()
+
     def _store(self, run_id: str, contents: dict, name: Union[Path, str], insert=False):
         """
         Store the contents against the name in the folder.
 
+        Every write of a chunk is recorded in the manifest of the run.
+
         Args:
             run_id (str): The run id
             contents (dict): The dict to store
             name (str): The name to store as
         """
         if insert:
-            name = self.log_folder_with_run_id(run_id=run_id) / name
+            name = self.chunk_path(run_id=run_id, name=str(name))
+
+        self.get_manifest(run_id=run_id).append([self._write(run_id=run_id, contents=contents, name=name)])
+
+    def store_many(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, items: Dict[str, dict]):
+        """
+        Store many logs of the same log type, the writes are recorded in the manifest in a single append.
+
+        Args:
+            run_id (str): The run id to store against
+            log_type (LogTypes): The type of log to store
+            items (dict): The contents to store by the name
+        """
+        written: List[str] = []
+
+        with self._lock(run_id):
+            for name, contents in items.items():
+                naming_pattern = self.naming_pattern(log_type=log_type, name=name)
+                match = self.get_matches(run_id=run_id, name=naming_pattern, multiple_allowed=False)
+
+                if match:
+                    contents = dict(self._load(name=match), **contents)  # type: ignore
+                    written.append(self._write(run_id=run_id, contents=contents, name=match))  # type: ignore
+                    continue
+
+                name_to_give = Template(naming_pattern).safe_substitute({"creation_time": str(int(time.time_ns()))})
+                chunk_path = self.chunk_path(run_id=run_id, name=name_to_give)
+                written.append(self._write(run_id=run_id, contents=contents, name=chunk_path))
+
+            self.get_manifest(run_id=run_id).append(written)
+
+        if any(self._ends_run(log_type, name, contents) for name, contents in items.items()):
+            self._remove_lock(run_id)
+
+    def store(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, contents: dict, name: str = ""):
+        super().store(run_id=run_id, log_type=log_type, contents=contents, name=name)
+
+        if self._ends_run(log_type, name, contents):
+            self._remove_lock(run_id)
+
+    def _changes(self, run_id: str, cursor: Any) -> Optional[Tuple[List[T], Any, bool]]:
+        """
+        The chunks written since the cursor, read from the manifest.
 
-        utils.safe_make_dir(self.log_folder_with_run_id(run_id=run_id))
+        The cursor is the inode of the manifest and the offset read till, a manifest that was recreated
+        or truncated invalidates the cursor.
 
-        with open(self.safe_suffix_json(name), "w") as fw:
-            json.dump(contents, fw, ensure_ascii=True, indent=4)
+        Args:
+            run_id (str): The run id
+            cursor (Any): The cursor as returned by an earlier call, None to list all the chunks
+
+        Returns:
+            tuple: The paths of the chunk files, the new cursor and if the cursor was invalid
+        """
+        manifest = self.get_manifest(run_id=run_id)
+        manifest.refresh()  # Builds the manifest of the runs created before it was introduced.
+
+        token = file_token(manifest.manifest_path)
+        if token is None:
+            return [], cursor, False
+
+        _, inode, size, _ = token
+        reset = cursor is None or cursor["inode"] != inode or cursor["offset"] > size
+        lines, offset = manifest.read(0 if reset else cursor["offset"], size)
+
+        chunks: List[T] = [manifest.run_folder / line for line in lines]
+        return chunks, {"inode": inode, "offset": offset}, reset
+
+    def _load_snapshot(self, run_id: str) -> Optional[dict]:
+        try:
+            with open(self.log_folder_with_run_id(run_id=run_id) / SNAPSHOT_FILE_NAME, "rb") as fr:
+                return serializers.loads(fr.read())
+        except FileNotFoundError:
+            return None
+
+    def _store_snapshot(self, run_id: str, snapshot: dict):
+        """
+        Save the snapshot next to the manifest, replacing the earlier one atomically.
+
+        Args:
+            run_id (str): The run id
+            snapshot (dict): The snapshot
+        """
+        snapshot_path = self.log_folder_with_run_id(run_id=run_id) / SNAPSHOT_FILE_NAME
+
+        logger.info(f"{self.service_name} Saving the snapshot of {run_id} as of {snapshot['cursor']}")
+        atomic_write(
+            snapshot_path, serializers.dumps(snapshot, serializer=self.serializer, compression=self.compression)
+        )
+
+    def _token(self, name: Union[str, Path]) -> Optional[Hashable]:
+        """
+        The chunk file changes its inode, size or modification time whenever it is written.
+
+        Args:
+            name (str): The name of the chunk file
+
+        Returns:
+            Optional[Hashable]: The token of the file
+        """
+        return file_token(self.safe_suffix_json(name))
 
     def _retrieve(self, name: Union[str, Path]) -> dict:
         """
@@ -98,9 +728,5 @@ class ChunkedFileSystemRunLogStore(ChunkedRunLogStore):
         Returns:
             dict: The contents
         """
-        contents: dict = {}
-
-        with open(self.safe_suffix_json(name), "r") as fr:
-            contents = json.load(fr)
-
-        return contents
+        with open(self.safe_suffix_json(name), "rb") as fr:
+            return serializers.loads(fr.read())
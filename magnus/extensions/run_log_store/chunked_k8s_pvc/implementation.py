@@ -10,11 +10,14 @@ logger = logging.getLogger(defaults.NAME)
 class ChunkedK8PersistentVolumeRunLogstore(ChunkedFileSystemRunLogStore):
     """
     Uses the K8s Persistent Volumes to store run logs.
+
+    The volumes are usually network file systems, the index of the runs uses the rollback journal of SQLite.
     """
 
     service_name: str = "chunked-k8s-pvc"
     persistent_volume_name: str
     mount_path: str
+    run_index_wal: bool = False
 
     @property
     def log_folder_name(self) -> str:
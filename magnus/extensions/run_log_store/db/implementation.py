@@ -0,0 +1,535 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, cast
+
+from pydantic import PrivateAttr
+
+from magnus import defaults, exceptions
+from magnus.datastore import BranchLog, StepLog
+from magnus.extensions.run_log_store.generic_chunked import ChunkedRunLogStore, EntityNotFoundError
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+T = Union[str, Path]
+
+# Keeps the number of bound parameters of a single statement well within the limits of every database.
+BATCH_SIZE = 500
+
+
+class DBRunLogStore(ChunkedRunLogStore):
+    """
+    Run log store which stores the chunks of the run log as rows of a database table.
+
+    Every chunk, i.e the run log, a parameter, a step log or a branch log, is a row identified by
+    (run_id, attribute_type, attribute_key). Lookups are served by a unique index on these columns and
+    updates are merged into the existing row in a single transaction.
+
+    Any database supported by SQLAlchemy can be used, SQLite in WAL mode is the default which
+    needs no infrastructure.
+
+    Example config:
+
+    run_log_store:
+      type: db
+      config:
+        connection_string: The SQLAlchemy connection string. Defaults to sqlite:///.run_log_store.db
+          Secrets can be referred to as ${secret_name}.
+        db_name: The name of the table. Defaults to run_logs
+        pool_size: The number of connections kept open. Defaults to 5
+        max_overflow: The connections allowed over the pool size. Defaults to 10
+        busy_timeout: Seconds a SQLite writer waits for the lock. Defaults to 60
+
+    """
+
+    service_name: str = "db"
+    connection_string: str = "sqlite:///.run_log_store.db"
+    db_name: str = "run_logs"
+    pool_size: int = 5
+    max_overflow: int = 10
+    busy_timeout: int = 60
+
+    _DB_LOG: Any = PrivateAttr(default=None)
+    _engine: Any = PrivateAttr(default=None)
+    _engine_pid: int = PrivateAttr(default=0)
+    _base: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, _: Any) -> None:
+        try:
+            from sqlalchemy import BigInteger, Column, Index, Integer, Text
+            from sqlalchemy.orm import declarative_base
+        except ImportError as _e:
+            logger.exception("Unable to import SQLalchemy, is it installed?")
+            msg = "SQLAlchemy is required for this extension. Please install it"
+            raise Exception(msg) from _e
+
+        Base = declarative_base()
+
+        class DBLog(Base):  # type: ignore
+            """
+            Base table for storing run logs in database.
+
+            In this model, we fragment the run log into logical units that are concurrent safe.
+            """
+
+            __tablename__ = self.db_name
+            __table_args__ = (
+                Index(f"ix_{self.db_name}_attribute", "run_id", "attribute_type", "attribute_key", unique=True),
+            )
+
+            pk = Column(Integer, primary_key=True, autoincrement=True)
+            run_id = Column(Text, nullable=False)
+            attribute_type = Column(Text, nullable=False)  # RunLog, StepLog, BranchLog, Parameter
+            attribute_key = Column(Text, nullable=False)  # step internal name, parameter key etc, empty for run log
+            attribute_value = Column(Text, nullable=False)  # The JSON string
+            created_at = Column(BigInteger, nullable=False)  # time in ns, orders the step and branch logs
+            updated_at = Column(BigInteger, nullable=False)
+
+        self._DB_LOG = DBLog
+        self._base = Base
+
+    @property
+    def engine(self) -> Any:
+        """
+        The engine to the database, created on the first use in every process.
+
+        Connections of the pool are not shared with a forked process, the child gets its own pool.
+        """
+        if self._engine is not None and self._engine_pid != os.getpid():
+            self._engine.dispose(close=False)
+            self._engine = None
+
+        if self._engine is None:
+            self._engine = self._create_engine()
+            self._engine_pid = os.getpid()
+            self.create_tables()
+
+        return self._engine
+
+    def _resolve_connection_string(self) -> str:
+        """
+        Substitute the secrets referred to in the connection string.
+        """
+        identifiers = set()
+        for match in Template.pattern.finditer(self.connection_string):
+            identifier = match.group("named") or match.group("braced")
+            if identifier:
+                identifiers.add(identifier)
+
+        run_context = self._context
+        if not identifiers or run_context is None:
+            return self.connection_string
+
+        secrets = {identifier: run_context.secrets_handler.get(name=identifier) for identifier in identifiers}
+        return Template(self.connection_string).safe_substitute(**secrets)
+
+    def _create_engine(self) -> Any:
+        import sqlalchemy
+        from sqlalchemy import event
+        from sqlalchemy.engine import make_url
+
+        connection_string = self._resolve_connection_string()
+        url = make_url(connection_string)
+
+        engine_kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+        is_sqlite = url.get_backend_name() == "sqlite"
+        in_memory = is_sqlite and url.database in (None, "", ":memory:")
+
+        if not in_memory:
+            engine_kwargs.update(pool_size=self.pool_size, max_overflow=self.max_overflow)
+
+        if is_sqlite and not in_memory:
+            Path(url.database).parent.mkdir(parents=True, exist_ok=True)  # type: ignore
+
+        engine = sqlalchemy.create_engine(url, **engine_kwargs)
+
+        if is_sqlite:
+            busy_timeout = self.busy_timeout * 1000
+
+            @event.listens_for(engine, "connect")
+            def _on_connect(dbapi_connection, _):
+                # Transactions are begun by us in _on_begin, not by the driver.
+                dbapi_connection.isolation_level = None
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+                if not in_memory:
+                    cursor.execute("PRAGMA journal_mode = WAL")
+                    cursor.execute("PRAGMA synchronous = NORMAL")
+                cursor.close()
+
+            @event.listens_for(engine, "begin")
+            def _on_begin(connection):
+                # Writers take the write lock upfront so that the read of the merge is consistent with the write.
+                if connection.get_execution_options().get("immediate", False):
+                    connection.exec_driver_sql("BEGIN IMMEDIATE")
+                else:
+                    connection.exec_driver_sql("BEGIN")
+
+        return engine
+
+    def create_tables(self):
+        """
+        Create the table and its indexes if they do not exist.
+        """
+        self._base.metadata.create_all(self.engine, checkfirst=True)
+
+    def _attribute(self, naming_pattern: str) -> Tuple[str, str]:
+        """
+        Split a naming pattern into the attribute type and the attribute key.
+
+        Args:
+            naming_pattern (str): The naming pattern as given by naming_pattern or a prefix of it.
+
+        Returns:
+            Tuple[str, str]: The attribute type and attribute key
+        """
+        sub_name = Template(naming_pattern).safe_substitute({"creation_time": ""})
+        attribute_type, _, attribute_key = sub_name.partition("-")
+
+        if attribute_type in [self.LogTypes.STEP_LOG.value, self.LogTypes.BRANCH_LOG.value] and attribute_key:
+            attribute_key = attribute_key[:-1]  # The separator before the creation time
+
+        return attribute_type, attribute_key
+
+    def get_matches(self, run_id: str, name: str, multiple_allowed: bool = False) -> Optional[Union[Sequence[T], T]]:
+        """
+        Get the primary keys of the rows matching the naming pattern.
+
+        If multiple matches are allowed, the key of the naming pattern is matched as a prefix.
+
+        Args:
+            run_id (str): The run id
+            name (str): The naming pattern of the log to check in the run log store.
+        """
+        from sqlalchemy import select
+
+        DBLog = self._DB_LOG
+        attribute_type, attribute_key = self._attribute(name)
+
+        query = select(DBLog.pk).where(DBLog.run_id == run_id, DBLog.attribute_type == attribute_type)
+        if multiple_allowed:
+            if attribute_key:
+                query = query.where(DBLog.attribute_key.startswith(attribute_key, autoescape=True))
+        else:
+            query = query.where(DBLog.attribute_key == attribute_key)
+
+        with self.engine.connect() as connection:
+            matches = [str(pk) for pk in connection.execute(query.order_by(DBLog.created_at, DBLog.pk)).scalars()]
+
+        if not matches:
+            return None
+
+        if not multiple_allowed:
+            return matches[0]
+        return matches
+
+    def _store(self, run_id: str, contents: dict, name: T, insert: bool = False):
+        """
+        Store the contents against the naming pattern, merging with the existing contents.
+
+        Args:
+            run_id (str): The run id
+            contents (dict): The dict to store
+            name (str): The naming pattern of the log
+        """
+        attribute_type, attribute_key = self._attribute(str(name))
+        self._upsert(run_id=run_id, attribute_type=attribute_type, items={attribute_key: contents})
+
+    def _retrieve(self, name: T) -> dict:
+        """
+        Retrieve the contents of the row by its primary key.
+
+        Args:
+            name (str): The primary key as returned by get_matches
+
+        Returns:
+            dict: The contents
+        """
+        from sqlalchemy import select
+
+        DBLog = self._DB_LOG
+        with self.engine.connect() as connection:
+            value = connection.execute(select(DBLog.attribute_value).where(DBLog.pk == int(str(name)))).scalar_one()
+
+        return json.loads(value)
+
+    def _upsert(self, run_id: str, attribute_type: str, items: Dict[str, dict]):
+        """
+        Insert or merge the contents of many keys of the same attribute type in a single transaction.
+
+        The existing rows are read and updated under the write lock, a row inserted concurrently by another
+        writer fails the unique index and the transaction is retried as an update.
+
+        Args:
+            run_id (str): The run id
+            attribute_type (str): The attribute type of all the items
+            items (dict): The contents to store by the attribute key
+        """
+        from sqlalchemy import bindparam, insert, select, update
+        from sqlalchemy.exc import IntegrityError
+
+        DBLog = self._DB_LOG
+        keys = list(items)
+
+        for attempt in range(2):
+            try:
+                with self.engine.connect() as connection:
+                    connection = connection.execution_options(immediate=True)
+                    with connection.begin():
+                        existing: Dict[str, str] = {}
+                        for start in range(0, len(keys), BATCH_SIZE):
+                            query = (
+                                select(DBLog.attribute_key, DBLog.attribute_value)
+                                .where(
+                                    DBLog.run_id == run_id,
+                                    DBLog.attribute_type == attribute_type,
+                                    DBLog.attribute_key.in_(keys[start : start + BATCH_SIZE]),
+                                )
+                                .with_for_update()
+                            )
+                            existing.update({key: value for key, value in connection.execute(query)})
+
+                        now = time.time_ns()
+                        inserts: List[Dict[str, Any]] = []
+                        updates: List[Dict[str, Any]] = []
+                        for position, (key, contents) in enumerate(items.items()):
+                            if key in existing:
+                                merged = dict(json.loads(existing[key]), **contents)
+                                updates.append({"key": key, "value": json.dumps(merged), "updated_at": now})
+                                continue
+
+                            inserts.append(
+                                {
+                                    "run_id": run_id,
+                                    "attribute_type": attribute_type,
+                                    "attribute_key": key,
+                                    "attribute_value": json.dumps(contents),
+                                    # Keeps the order of a batch, the creation time orders the step and branch logs.
+                                    "created_at": now + position,
+                                    "updated_at": now,
+                                }
+                            )
+
+                        if inserts:
+                            connection.execute(insert(DBLog), inserts)
+
+                        if updates:
+                            statement = (
+                                update(DBLog)
+                                .where(
+                                    DBLog.run_id == run_id,
+                                    DBLog.attribute_type == attribute_type,
+                                    DBLog.attribute_key == bindparam("key"),
+                                )
+                                .values(attribute_value=bindparam("value"), updated_at=bindparam("updated_at"))
+                            )
+                            connection.execute(statement, updates)
+                return
+            except IntegrityError:
+                if attempt:
+                    raise
+                logger.info(f"Concurrent insert of {attribute_type} in {run_id}, retrying as an update")
+
+    def store(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, contents: dict, name: str = ""):
+        """
+        Store a SINGLE log type in the database, merging with the existing contents.
+
+        Args:
+            run_id (str): The run id to store against
+            log_type (LogTypes): The type of log to store
+            contents (dict): The dict of contents to store
+            name (str, optional): The name against the contents have to be stored. Defaults to ''.
+        """
+        self.store_many(run_id=run_id, log_type=log_type, items={name: contents})
+
+    def store_many(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, items: Dict[str, dict]):
+        """
+        Store many logs of the same log type in a single transaction.
+
+        Args:
+            run_id (str): The run id to store against
+            log_type (LogTypes): The type of log to store
+            items (dict): The contents to store by the name
+        """
+        if not items:
+            return
+
+        for name in items:
+            self.naming_pattern(log_type=log_type, name=name)  # Validates the name for the log type
+
+        self._upsert(run_id=run_id, attribute_type=log_type.value, items=items)
+
+    def retrieve(
+        self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, name: str = "", multiple_allowed=False
+    ) -> Any:
+        """
+        Retrieve the model given a log_type and a name in a single query.
+
+        Args:
+            run_id (str): The run id
+            log_type (LogTypes): One of RunLog, Parameter, StepLog, BranchLog
+            name (str, optional): The name to match. Defaults to ''.
+            multiple_allowed (bool, optional): Are multiple allowed. Defaults to False.
+
+        Raises:
+            EntityNotFoundError: If there is no match found
+
+        Returns:
+            Any: One of StepLog, BranchLog, Parameter or RunLog
+        """
+        from sqlalchemy import select
+
+        if not name and log_type not in [
+            self.LogTypes.RUN_LOG,
+            self.LogTypes.PARAMETER,
+        ]:
+            raise Exception(f"Name is required during retrieval for {log_type}")
+
+        DBLog = self._DB_LOG
+        query = select(DBLog.attribute_value).where(DBLog.run_id == run_id, DBLog.attribute_type == log_type.value)
+        if multiple_allowed:
+            if name:
+                query = query.where(DBLog.attribute_key.startswith(name, autoescape=True))
+        else:
+            query = query.where(DBLog.attribute_key == name)
+
+        with self.engine.connect() as connection:
+            values = list(connection.execute(query.order_by(DBLog.created_at, DBLog.pk)).scalars())
+
+        if not values:
+            raise EntityNotFoundError()
+
+        model = self.ModelTypes[log_type.name].value
+        if not multiple_allowed:
+            return model(**json.loads(values[0]))
+
+        return [model(**json.loads(value)) for value in values]
+
+    def orderly_retrieve(
+        self, run_id: str, log_type: ChunkedRunLogStore.LogTypes
+    ) -> Dict[str, Union[StepLog, BranchLog]]:
+        """Should only be used by prepare full run log.
+
+        Retrieves the StepLog or BranchLog sorted according to creation time in a single query.
+
+        Args:
+            run_id (str): The run id
+            log_type (LogTypes): One of StepLog or BranchLog
+        """
+        from sqlalchemy import select
+
+        DBLog = self._DB_LOG
+        query = (
+            select(DBLog.attribute_value)
+            .where(DBLog.run_id == run_id, DBLog.attribute_type == log_type.value)
+            .order_by(DBLog.created_at, DBLog.pk)
+        )
+
+        with self.engine.connect() as connection:
+            values = list(connection.execute(query).scalars())
+
+        logs: Dict[str, Union[StepLog, BranchLog]] = {}
+        model = cast(Type[Union[StepLog, BranchLog]], self.ModelTypes[log_type.name].value)
+        for value in values:
+            log_model = model(**json.loads(value))
+            logs[log_model.internal_name] = log_model
+
+        return logs
+
+    def _internal_names(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes) -> Dict[str, T]:
+        """
+        The primary keys of the step or branch logs by their internal names, without retrieving the contents.
+
+        Args:
+            run_id (str): The run id
+            log_type (LogTypes): One of StepLog or BranchLog
+
+        Returns:
+            dict: The primary keys by the internal names, in the order of creation
+        """
+        from sqlalchemy import select
+
+        DBLog = self._DB_LOG
+        query = (
+            select(DBLog.attribute_key, DBLog.pk)
+            .where(DBLog.run_id == run_id, DBLog.attribute_type == log_type.value)
+            .order_by(DBLog.created_at, DBLog.pk)
+        )
+
+        with self.engine.connect() as connection:
+            return {attribute_key: str(pk) for attribute_key, pk in connection.execute(query)}
+
+    def get_branch_statuses(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, str]:
+        """
+        Returns the status of many branches with one query per batch of branches.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, str]: The status of the branch by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        from sqlalchemy import select
+
+        DBLog = self._DB_LOG
+        statuses: Dict[str, str] = {}
+
+        with self.engine.connect() as connection:
+            for start in range(0, len(internal_branch_names), BATCH_SIZE):
+                query = select(DBLog.attribute_key, DBLog.attribute_value).where(
+                    DBLog.run_id == run_id,
+                    DBLog.attribute_type == self.LogTypes.BRANCH_LOG.value,
+                    DBLog.attribute_key.in_(internal_branch_names[start : start + BATCH_SIZE]),
+                )
+                for key, value in connection.execute(query):
+                    statuses[key] = json.loads(value)["status"]
+
+        for internal_branch_name in internal_branch_names:
+            if internal_branch_name not in statuses:
+                raise exceptions.BranchLogNotFoundError(run_id=run_id, name=internal_branch_name)
+
+        return {internal_branch_name: statuses[internal_branch_name] for internal_branch_name in internal_branch_names}
+
+    def get_branch_logs(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, BranchLog]:
+        """
+        Returns many branch logs with one query per batch of branches.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, BranchLog]: The branch log by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        from sqlalchemy import select
+
+        DBLog = self._DB_LOG
+        branch_logs: Dict[str, BranchLog] = {}
+
+        with self.engine.connect() as connection:
+            for start in range(0, len(internal_branch_names), BATCH_SIZE):
+                query = select(DBLog.attribute_key, DBLog.attribute_value).where(
+                    DBLog.run_id == run_id,
+                    DBLog.attribute_type == self.LogTypes.BRANCH_LOG.value,
+                    DBLog.attribute_key.in_(internal_branch_names[start : start + BATCH_SIZE]),
+                )
+                for key, value in connection.execute(query):
+                    branch_logs[key] = BranchLog(**json.loads(value))
+
+        for internal_branch_name in internal_branch_names:
+            if internal_branch_name not in branch_logs:
+                raise exceptions.BranchLogNotFoundError(run_id=run_id, name=internal_branch_name)
+
+        return {
+            internal_branch_name: branch_logs[internal_branch_name] for internal_branch_name in internal_branch_names
+        }
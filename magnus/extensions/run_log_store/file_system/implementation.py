@@ -1,12 +1,23 @@
-import json
+import contextlib
 import logging
+import os
 from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional, Union
 
-from magnus import defaults, exceptions, utils
-from magnus.datastore import BaseRunLogStore, RunLog
+from pydantic import PrivateAttr, field_validator
+
+from magnus import defaults, exceptions, retention, utils
+from magnus.datastore import BaseRunLogStore, BranchLog, RunLog, StepLog, attach_parameters, detach_parameters
+from magnus.extensions.run_log_store import serializers
+from magnus.extensions.run_log_store.cache import RunLogCache, file_token
+from magnus.extensions.run_log_store.locking import RunLocks, atomic_write, ends_run
+from magnus.extensions.run_log_store.run_index import TERMINAL_STATUSES, RunIndex, started_at
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
 
+# The key of the run log file holding the parameters of the attempts by their hash
+PARAMETER_SNAPSHOTS = "parameter_snapshots"
+
 
 class FileSystemRunLogstore(BaseRunLogStore):
     """
@@ -18,8 +29,10 @@ class FileSystemRunLogstore(BaseRunLogStore):
         When locally testing a pipeline and have the need to compare across runs.
         Its fully featured and perfectly fine if your local environment is where you would do everything.
 
-    Do not use:
-        If you need parallelization on local, this run log would not support it.
+    The run log is written to a temporary file and renamed into place, readers never see a partially written one.
+    Every update reads, modifies and writes the whole run log under an advisory lock of the run, in the .locks
+    folder of the log folder. Parallel branches are safe but wait for each other, prefer chunked-fs for wide
+    map or parallel nodes.
 
     Example config:
 
@@ -27,16 +40,69 @@ class FileSystemRunLogstore(BaseRunLogStore):
       type: file-system
       config:
         log_folder: The folder to out the logs. Defaults to .run_log_store
+        cache: Keep the decoded run log in memory, validated by the modification time of the file. Defaults to false
+        serializer: One of json, compact-json or msgpack. Defaults to json
+        compression: One of gzip or zstd. Defaults to no compression
+        run_index: Maintain an index of the runs in the log folder to list them. Defaults to true
+        run_index_wal: Use the WAL journal of SQLite for the index, not supported by network file systems.
+            Defaults to true, false for the k8s persistent volumes
+        locking: Lock the run while updating it, disable for file systems without flock support. Defaults to true
 
     """
 
     service_name: str = "file-system"
     log_folder: str = defaults.LOG_LOCATION_FOLDER
+    cache: bool = False
+    serializer: str = "json"
+    compression: str = ""
+    run_index: bool = True
+    run_index_wal: bool = True
+    locking: bool = True
+
+    _cache: RunLogCache = PrivateAttr(default_factory=RunLogCache)
+    _run_index: Optional[RunIndex] = PrivateAttr(default=None)
+    _locks: Optional[RunLocks] = PrivateAttr(default=None)
+
+    @field_validator("serializer")
+    @classmethod
+    def check_serializer(cls, serializer: str) -> str:
+        return serializers.validate_serializer(serializer)
+
+    @field_validator("compression")
+    @classmethod
+    def check_compression(cls, compression: str) -> str:
+        return serializers.validate_compression(compression)
 
     @property
     def log_folder_name(self):
         return self.log_folder
 
+    @property
+    def index(self) -> RunIndex:
+        if not self.run_index:
+            raise Exception(f"The run index is disabled for the run log store {self.service_name}")
+
+        if self._run_index is None:
+            self._run_index = RunIndex(self.log_folder_name, layout="file-system", wal=self.run_index_wal)
+        return self._run_index
+
+    def lock(self, run_id: str) -> ContextManager:
+        """
+        The lock of the run, held while the run log is read, modified and written.
+
+        Args:
+            run_id (str): The run id
+
+        Returns:
+            ContextManager: The lock, a no-op if locking is disabled
+        """
+        if not self.locking:
+            return contextlib.nullcontext()
+
+        if self._locks is None:
+            self._locks = RunLocks(self.log_folder_name)
+        return self._locks(run_id)
+
     def write_to_folder(self, run_log: RunLog):
         """
         Write the run log to the folder
@@ -51,8 +117,20 @@ class FileSystemRunLogstore(BaseRunLogStore):
         run_id = run_log.run_id
         json_file_path = write_to_path / f"{run_id}.json"
 
-        with json_file_path.open("w") as fw:
-            json.dump(run_log.model_dump(), fw, ensure_ascii=True, indent=4)  # pylint: disable=no-member
+        contents = run_log.model_dump()  # pylint: disable=no-member
+        snapshots: Dict[str, dict] = {}
+        detach_parameters(contents, snapshots)
+        contents[PARAMETER_SNAPSHOTS] = snapshots
+        token = atomic_write(
+            json_file_path, serializers.dumps(contents, serializer=self.serializer, compression=self.compression)
+        )
+
+        if self.cache:
+            attach_parameters(contents, contents.pop(PARAMETER_SNAPSHOTS))
+            self._cache.put(str(json_file_path), token, contents)
+
+        if self.run_index:
+            self.index.record(run_log)
 
     def get_from_folder(self, run_id: str) -> RunLog:
         """
@@ -75,14 +153,58 @@ class FileSystemRunLogstore(BaseRunLogStore):
         read_from_path = Path(write_to)
         json_file_path = read_from_path / f"{run_id}.json"
 
-        if not json_file_path.exists():
+        token = file_token(json_file_path)
+        if token is None:
             raise FileNotFoundError(f"Expected {json_file_path} is not present")
 
-        with json_file_path.open("r") as fr:
-            json_str = json.load(fr)
+        if self.cache:
+            entry = self._cache.get(str(json_file_path), token)
+            if entry is not None:
+                return entry.model(RunLog)
+
+        with json_file_path.open("rb") as fr:
+            json_str = serializers.loads(fr.read())
+            attach_parameters(json_str, json_str.pop(PARAMETER_SNAPSHOTS, {}))
             run_log = RunLog(**json_str)  # pylint: disable=no-member
+
+        if self.cache:
+            self._cache.put(str(json_file_path), token, json_str)
         return run_log
 
+    def list_runs(
+        self,
+        tag: str = "",
+        status: str = "",
+        dag_hash: str = "",
+        original_run_id: str = "",
+        limit: int = 20,
+        offset: int = 0,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        return self.index.query(
+            tag=tag, status=status, dag_hash=dag_hash, original_run_id=original_run_id, limit=limit, offset=offset
+        )
+
+    def reindex(self, **kwargs):
+        """
+        Rebuild the index of the runs by reading every run log in the log folder.
+
+        The start time is the earliest attempt of any step, the end time is when the run log was last written.
+        """
+        run_logs = []
+        for json_file_path in Path(self.log_folder_name).glob("*.json"):
+            run_log = self.get_from_folder(json_file_path.stem)
+            modified_at = os.stat(json_file_path).st_mtime
+            end_time = modified_at if run_log.status in TERMINAL_STATUSES else None
+            run_logs.append((run_log, started_at(run_log) or modified_at, end_time))
+
+        self.index.rebuild(run_logs)
+
+    def cache_stats(self) -> Dict[str, int]:
+        if not self.cache:
+            return {}
+        return self._cache.stats()
+
     def create_run_log(
         self,
         run_id: str,
@@ -98,22 +220,23 @@ class FileSystemRunLogstore(BaseRunLogStore):
         # Adds it to the db
         """
 
-        try:
-            self.get_run_log_by_id(run_id=run_id, full=False)
-            raise exceptions.RunLogExistsError(run_id=run_id)
-        except exceptions.RunLogNotFoundError:
-            pass
-
-        logger.info(f"{self.service_name} Creating a Run Log for : {run_id}")
-        run_log = RunLog(
-            run_id=run_id,
-            dag_hash=dag_hash,
-            use_cached=use_cached,
-            tag=tag,
-            original_run_id=original_run_id,
-            status=status,
-        )
-        self.write_to_folder(run_log)
+        with self.lock(run_id):
+            try:
+                self.get_run_log_by_id(run_id=run_id, full=False)
+                raise exceptions.RunLogExistsError(run_id=run_id)
+            except exceptions.RunLogNotFoundError:
+                pass
+
+            logger.info(f"{self.service_name} Creating a Run Log for : {run_id}")
+            run_log = RunLog(
+                run_id=run_id,
+                dag_hash=dag_hash,
+                use_cached=use_cached,
+                tag=tag,
+                original_run_id=original_run_id,
+                status=status,
+            )
+            self.write_to_folder(run_log)
         return run_log
 
     def get_run_log_by_id(self, run_id: str, full: bool = False, **kwargs) -> RunLog:
@@ -134,3 +257,85 @@ class FileSystemRunLogstore(BaseRunLogStore):
         """
         logger.info(f"{self.service_name} Putting the run log in the DB: {run_log.run_id}")
         self.write_to_folder(run_log)
+
+    # The updates below read, modify and write the run log, they hold the lock of the run to not lose
+    # the updates of the parallel branches.
+
+    def update_run_log_status(self, run_id: str, status: str):
+        with self.lock(run_id):
+            super().update_run_log_status(run_id=run_id, status=status)
+
+        if status in TERMINAL_STATUSES:
+            self._remove_lock(run_id)
+
+    def set_parameters(self, run_id: str, parameters: dict, internal_branch_name: str = "", **kwargs):
+        with self.lock(run_id):
+            super().set_parameters(
+                run_id=run_id, parameters=parameters, internal_branch_name=internal_branch_name, **kwargs
+            )
+
+    def set_run_config(self, run_id: str, run_config: dict, **kwargs):
+        with self.lock(run_id):
+            super().set_run_config(run_id=run_id, run_config=run_config, **kwargs)
+
+    def add_step_log(self, step_log: StepLog, run_id: str, **kwargs):
+        with self.lock(run_id):
+            super().add_step_log(step_log=step_log, run_id=run_id, **kwargs)
+
+        if ends_run(step_log.internal_name, step_log.step_type, step_log.status):
+            self._remove_lock(run_id)
+
+    def _remove_lock(self, run_id: str):
+        # The run is over, nothing updates its run log any more and the lock file would only pile up.
+        if self._locks is not None:
+            self._locks.remove(run_id)
+
+    def add_branch_log(self, branch_log: Union[BranchLog, RunLog], run_id: str, **kwargs):
+        with self.lock(run_id):
+            super().add_branch_log(branch_log=branch_log, run_id=run_id, **kwargs)
+
+    def add_branch_logs(self, branch_logs: List[BranchLog], run_id: str, **kwargs):
+        with self.lock(run_id):
+            super().add_branch_logs(branch_logs=branch_logs, run_id=run_id, **kwargs)
+
+    def delete_run(
+        self,
+        run_id: str,
+        dry_run: bool = False,
+        max_workers: int = 4,
+        throttle: Optional[retention.Throttle] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Delete the run log of the run and remove it from the index of the runs.
+
+        Args:
+            run_id (str): The run id
+            dry_run (bool, optional): Only report the bytes to reclaim. Defaults to False.
+            max_workers (int, optional): Unused, the run log is a single file.
+            throttle (Throttle, optional): Limits the rate of deletes. Defaults to no limit.
+
+        Raises:
+            RunLogNotFoundError: If there is no run log of the run in the log folder
+
+        Returns:
+            int: The bytes reclaimed, or that would be reclaimed in a dry run
+        """
+        json_file_path = Path(self.log_folder_name) / f"{run_id}.json"
+        if not json_file_path.is_file():
+            raise exceptions.RunLogNotFoundError(run_id)
+
+        with self.lock(run_id):
+            reclaimed = retention.remove_tree(json_file_path, dry_run=dry_run, throttle=throttle)
+
+        if dry_run:
+            return reclaimed
+
+        if self.cache:
+            self._cache.invalidate(str(json_file_path))
+        if self.run_index:
+            self.index.remove(run_id)
+        if self._locks is not None:
+            self._locks.remove(run_id)
+
+        return reclaimed
@@ -1,13 +1,32 @@
+import atexit
+import contextlib
 import logging
+import os
+import signal
+import threading
 import time
 from abc import abstractmethod
 from enum import Enum
 from pathlib import Path
 from string import Template
-from typing import Any, Dict, Optional, Sequence, Union
+from typing import Any, ContextManager, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union, cast
+
+from pydantic import PrivateAttr
 
 from magnus import defaults, exceptions
-from magnus.datastore import BaseRunLogStore, BranchLog, RunLog, StepLog
+from magnus.datastore import (
+    BaseRunLogStore,
+    BranchLog,
+    LazyRunLog,
+    LogStatus,
+    RunLog,
+    RunLogSource,
+    StepLog,
+    copy_log,
+    detach_parameters,
+    get_branch_scopes,
+)
+from magnus.extensions.run_log_store.cache import CacheEntry, RunLogCache
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
 
@@ -19,35 +38,165 @@ class EntityNotFoundError(Exception):
     pass
 
 
+class MaterializedRunLog:
+    """
+    The full run log of a run, maintained incrementally from the chunks written since the cursor.
+
+    The step and branch logs are indexed by their internal name and are the same objects as in the tree
+    of the run log, so a change to a chunk replaces a single node of the tree.
+    Branch logs without any steps are not part of the tree, as in the run log prepared from all the chunks.
+    """
+
+    def __init__(self, run_id: str, cursor: Any = None):
+        self.cursor = cursor
+        self.run_log = RunLog(run_id=run_id)
+        self.found = False  # The RunLog chunk has been applied
+        self.steps: Dict[str, StepLog] = {}
+        self.branches: Dict[str, BranchLog] = {}
+        self.changes = 0  # The chunks applied since the last snapshot
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "MaterializedRunLog":
+        """
+        Rebuild the view from a snapshot, the indexes are rebuilt by walking the tree.
+
+        Args:
+            snapshot (dict): The snapshot as given by snapshot()
+
+        Returns:
+            MaterializedRunLog: The view as of the cursor of the snapshot
+        """
+        run_log = RunLog.model_validate(snapshot["run_log"])
+        view = cls(run_id=run_log.run_id, cursor=snapshot["cursor"])
+        view.run_log = run_log
+        view.found = True
+
+        def _index(steps: Dict[str, StepLog]):
+            for internal_name, step_log in steps.items():
+                view.steps[internal_name] = step_log
+                for branch_name, branch_log in step_log.branches.items():
+                    view.branches[branch_name] = branch_log
+                    _index(branch_log.steps)
+
+        _index(run_log.steps)
+        for branch_name, branch_log in snapshot["branches"].items():
+            view.branches[branch_name] = BranchLog.model_validate(branch_log)
+
+        return view
+
+    def snapshot(self) -> dict:
+        """
+        The view as a dict, the branches not part of the tree are kept separately.
+
+        Returns:
+            dict: The cursor, the run log and the detached branches
+        """
+        attached = {branch_name for step_log in self.steps.values() for branch_name in step_log.branches}
+        return {
+            "cursor": self.cursor,
+            "run_log": self.run_log.model_dump(),
+            "branches": {
+                branch_name: branch_log.model_dump()
+                for branch_name, branch_log in self.branches.items()
+                if branch_name not in attached
+            },
+        }
+
+
+class ChunkedRunLogSource(RunLogSource):
+    """
+    Loads the steps and branches of a run from their chunks, as a LazyRunLog accesses them.
+
+    The index of the internal names of the steps and branches is built from the names of the chunks,
+    without retrieving them.
+    """
+
+    def __init__(self, run_log_store: "ChunkedRunLogStore", run_id: str):
+        self.run_log_store = run_log_store
+        self.run_id = run_id
+
+        self.steps = run_log_store._internal_names(run_id=run_id, log_type=run_log_store.LogTypes.STEP_LOG)
+        for internal_name in run_log_store._pending.get(run_id, {}):
+            self.steps.setdefault(internal_name, "")
+        self.branches = run_log_store._internal_names(run_id=run_id, log_type=run_log_store.LogTypes.BRANCH_LOG)
+
+        self.children: Dict[str, List[str]] = {}
+        for internal_name in self.steps:
+            self.children.setdefault(run_log_store._get_parent_branch(internal_name) or "", []).append(internal_name)
+        for internal_name in self.branches:
+            self.children.setdefault(".".join(internal_name.split(".")[:-1]), []).append(internal_name)
+
+    def step_names(self, internal_branch_name: str) -> List[str]:
+        return self.children.get(internal_branch_name, [])
+
+    def branch_names(self, internal_step_name: str) -> List[str]:
+        return self.children.get(internal_step_name, [])
+
+    def load_step(self, internal_name: str) -> StepLog:
+        return self.run_log_store.get_step_log(internal_name=internal_name, run_id=self.run_id)
+
+    def load_branch(self, internal_name: str) -> BranchLog:
+        return self.run_log_store._load(name=self.branches[internal_name], model_type=BranchLog)
+
+
 class ChunkedRunLogStore(BaseRunLogStore):
     """
     A generic implementation of a RunLogStore that stores RunLogs in chunks.
+
+    If cache is enabled, the decoded chunks are kept in memory for as long as their token, as given by _token,
+    does not change.
+
+    If write_behind is enabled, the updates to step logs are kept in memory and coalesced till the next flush.
+    The executor flushes on completion of a node, before executing a composite node or triggering a job
+    in another process and on completion of a branch. Pending updates are also flushed on exit of the process.
+
+    Stores which can list the chunks written since a cursor, as given by _changes, maintain the full run log
+    incrementally. Every snapshot_interval changes, the full run log is saved as a snapshot for other processes.
+
+    The read, merge and write of a chunk happens under the lock of the run, as given by _lock, so that
+    concurrent updates to the same chunk from other processes are not lost.
+
+    The parameters of the attempts are stored once per distinct snapshot, as a chunk named by their hash, and the
+    attempts of the step logs refer to them by the hash. They are resolved when the step logs are read back.
     """
 
     service_name: str = ""
+    cache: bool = False
+    write_behind: bool = False
+    snapshot_interval: int = 1000
+
+    _cache: RunLogCache = PrivateAttr(default_factory=RunLogCache)
+    _pending: Dict[str, Dict[str, CacheEntry]] = PrivateAttr(default_factory=dict)  # run_id: {internal_name: entry}
+    _pending_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _exit_flush_pid: int = PrivateAttr(default=0)
+    _views: Dict[str, MaterializedRunLog] = PrivateAttr(default_factory=dict)
+    _views_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _parameter_snapshots: Dict[Tuple[str, str], dict] = PrivateAttr(default_factory=dict)  # (run_id, hash): snapshot
 
     class LogTypes(Enum):
         RUN_LOG = "RunLog"
         PARAMETER = "Parameter"
         STEP_LOG = "StepLog"
         BRANCH_LOG = "BranchLog"
+        PARAMETER_SNAPSHOT = "ParameterSnapshot"
 
     class ModelTypes(Enum):
         RUN_LOG = RunLog
         PARAMETER = dict
         STEP_LOG = StepLog
         BRANCH_LOG = BranchLog
+        PARAMETER_SNAPSHOT = dict
 
     def naming_pattern(self, log_type: LogTypes, name: str = "") -> str:
         """
-        Naming pattern to store RunLog, Parameter, StepLog or BranchLog.
+        Naming pattern to store RunLog, Parameter, StepLog, BranchLog or ParameterSnapshot.
 
         The reasoning for name to be defaulted to empty string:
             Its actually conditionally empty. For RunLog and Parameter it is empty.
-            For StepLog and BranchLog it should be provided.
+            For StepLog, BranchLog and ParameterSnapshot it should be provided.
 
         Args:
-            log_type (LogTypes): One of RunLog, Parameter, StepLog or BranchLog
+            log_type (LogTypes): One of RunLog, Parameter, StepLog, BranchLog or ParameterSnapshot
             name (str, optional): The name to be included or left. Defaults to ''.
 
         Raises:
@@ -71,6 +220,9 @@ class ChunkedRunLogStore(BaseRunLogStore):
         if log_type == self.LogTypes.BRANCH_LOG:
             return "-".join([self.LogTypes.BRANCH_LOG.value, name, "${creation_time}"])
 
+        if log_type == self.LogTypes.PARAMETER_SNAPSHOT:
+            return "-".join([self.LogTypes.PARAMETER_SNAPSHOT.value, name])
+
         raise Exception("Unexpected log type")
 
     @abstractmethod
@@ -109,6 +261,231 @@ class ChunkedRunLogStore(BaseRunLogStore):
         """
         ...
 
+    def _token(self, name: T) -> Optional[Hashable]:
+        """
+        The token of the chunk which changes whenever the chunk is written, e.g the modification time of a file.
+
+        Stores which can provide a token cheaper than retrieving the chunk should override this to
+        support the cache. A chunk without a token is never cached.
+
+        Args:
+            name (str): The name of the chunk as returned by get_matches
+
+        Returns:
+            Optional[Hashable]: The token or None
+        """
+        return None
+
+    def _changes(self, run_id: str, cursor: Any) -> Optional[Tuple[List[T], Any, bool]]:
+        """
+        The chunks written since the cursor, in the order they were written.
+
+        Stores which can list the changes cheaper than retrieving all the chunks should override this to
+        maintain the full run log incrementally.
+
+        Args:
+            run_id (str): The run id
+            cursor (Any): The cursor as returned by an earlier call, None to list all the chunks
+
+        Returns:
+            Optional[tuple]: The names of the chunks as returned by get_matches, the new cursor and
+                if the cursor was no longer valid, i.e the names are all the chunks. None if not supported.
+        """
+        return None
+
+    def _load_snapshot(self, run_id: str) -> Optional[dict]:
+        """
+        The latest snapshot of the full run log, as saved by _store_snapshot.
+
+        Args:
+            run_id (str): The run id
+
+        Returns:
+            Optional[dict]: The snapshot, None if there is none.
+        """
+        return None
+
+    def _store_snapshot(self, run_id: str, snapshot: dict):
+        """
+        Save the snapshot of the full run log, for other processes to start from.
+
+        Args:
+            run_id (str): The run id
+            snapshot (dict): The snapshot
+        """
+        ...
+
+    def _lock(self, run_id: str) -> ContextManager:
+        """
+        The lock of the run, held while a chunk is read, merged and written.
+
+        Stores whose persistence layer does not serialize the updates to a chunk, like a file system, should override.
+
+        Args:
+            run_id (str): The run id
+
+        Returns:
+            ContextManager: The lock
+        """
+        return contextlib.nullcontext()
+
+    def _load(self, name: T, model_type: Any = dict) -> Any:
+        """
+        Retrieve the chunk decoded as the model type, from the cache if enabled and valid.
+
+        Args:
+            name (str): The name of the chunk as returned by get_matches
+            model_type (Any, optional): The model to decode the contents to. Defaults to dict.
+
+        Returns:
+            Any: The decoded contents, callers are free to modify it.
+        """
+        token = self._token(name) if self.cache else None
+        if token is None:
+            return model_type(**self._retrieve(name=name))
+
+        entry = self._cache.get(str(name), token)
+        if entry is None:
+            entry = self._cache.put(str(name), token, self._retrieve(name=name))
+
+        return entry.model(model_type)
+
+    def _remember(self, name: T, contents: dict, token: Optional[Hashable]):
+        """
+        Remember the contents just stored against the chunk, if cache is enabled.
+
+        Args:
+            name (str): The name of the chunk as returned by get_matches
+            contents (dict): The contents stored
+            token (Optional[Hashable]): The token of the chunk as stored
+        """
+        if not self.cache:
+            return
+
+        if token is None:
+            self._cache.invalidate(str(name))
+            return
+
+        self._cache.put(str(name), token, contents)
+
+    def cache_stats(self) -> Dict[str, int]:
+        if not self.cache:
+            return {}
+        return self._cache.stats()
+
+    def flush(self, **kwargs):
+        """
+        Write the pending updates of the step logs, one batch per run.
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+
+        for run_id, entries in pending.items():
+            logger.info(f"{self.service_name} Flushing {len(entries)} step logs of {run_id}")
+            items = {internal_name: entry.model() for internal_name, entry in entries.items()}
+            self._detach_parameters(run_id=run_id, items=items.values())
+            self.store_many(run_id=run_id, log_type=self.LogTypes.STEP_LOG, items=items)
+
+    def _detach_parameters(self, run_id: str, items: Iterable[dict]):
+        """
+        Replace the parameters of the attempts by their hash and store the snapshots not stored already.
+
+        The snapshots are stored before the step logs referring to them.
+
+        Args:
+            run_id (str): The run id
+            items (Iterable[dict]): The dumps of the step logs, modified in place
+        """
+        snapshots: Dict[str, dict] = {}
+        for contents in items:
+            detach_parameters(contents, snapshots)
+
+        new_snapshots = {
+            parameters_hash: snapshot
+            for parameters_hash, snapshot in snapshots.items()
+            if (run_id, parameters_hash) not in self._parameter_snapshots
+        }
+        if not new_snapshots:
+            return
+
+        self.store_many(run_id=run_id, log_type=self.LogTypes.PARAMETER_SNAPSHOT, items=new_snapshots)
+        for parameters_hash, snapshot in new_snapshots.items():
+            self._parameter_snapshots[(run_id, parameters_hash)] = snapshot
+
+    def _get_parameter_snapshot(self, run_id: str, parameters_hash: str) -> Optional[dict]:
+        """
+        The snapshot of the parameters by its hash, retrieved once per process as snapshots never change.
+
+        Args:
+            run_id (str): The run id
+            parameters_hash (str): The hash of the parameters
+
+        Returns:
+            Optional[dict]: The parameters, None if the snapshot is not found
+        """
+        snapshot = self._parameter_snapshots.get((run_id, parameters_hash))
+        if snapshot is not None:
+            return snapshot
+
+        try:
+            snapshot = self.retrieve(run_id=run_id, log_type=self.LogTypes.PARAMETER_SNAPSHOT, name=parameters_hash)
+        except EntityNotFoundError:
+            logger.warning(f"The parameters snapshot {parameters_hash} of {run_id} is not found")
+            return None
+
+        self._parameter_snapshots[(run_id, parameters_hash)] = snapshot
+        return snapshot
+
+    def _attach_parameters(self, run_id: str, step_logs: Iterable[StepLog]):
+        """
+        Resolve the parameters of the attempts of the step logs, and of the steps of their branches, from the snapshots.
+
+        Args:
+            run_id (str): The run id
+            step_logs (Iterable[StepLog]): The step logs, modified in place
+        """
+        for step_log in step_logs:
+            for attempt in step_log.attempts:
+                if not attempt.parameters_hash or attempt.parameters:
+                    continue
+                snapshot = self._get_parameter_snapshot(run_id=run_id, parameters_hash=attempt.parameters_hash)
+                attempt.parameters = dict(snapshot or {})
+
+            for branch_log in step_log.branches.values():
+                self._attach_parameters(run_id=run_id, step_logs=branch_log.steps.values())
+
+    def _flush_at_exit(self):
+        """
+        Flush the pending updates when the process exits or is terminated, registered once per process.
+        """
+        if self._exit_flush_pid == os.getpid():
+            return
+        self._exit_flush_pid = os.getpid()
+        pid = os.getpid()
+
+        def _flush():
+            # Forked processes inherit the registration but not the responsibility.
+            if os.getpid() == pid:
+                self.flush()
+
+        atexit.register(_flush)
+
+        try:
+            previous_handler = signal.getsignal(signal.SIGTERM)
+
+            def _flush_on_sigterm(signum, frame):
+                _flush()
+                if callable(previous_handler):
+                    previous_handler(signum, frame)
+                elif previous_handler != signal.SIG_IGN:
+                    signal.signal(signum, signal.SIG_DFL)
+                    os.kill(os.getpid(), signum)
+
+            signal.signal(signal.SIGTERM, _flush_on_sigterm)
+        except ValueError:
+            # Signal handlers can only be set from the main thread.
+            logger.warning("Unable to flush the pending step logs on SIGTERM, not in the main thread")
+
     def store(self, run_id: str, log_type: LogTypes, contents: dict, name: str = ""):
         """Store a SINGLE log type in the file system
 
@@ -119,20 +496,36 @@ class ChunkedRunLogStore(BaseRunLogStore):
             name (str, optional): The name against the contents have to be stored. Defaults to ''.
         """
         naming_pattern = self.naming_pattern(log_type=log_type, name=name)
-        match = self.get_matches(run_id=run_id, name=naming_pattern, multiple_allowed=False)
-        # The boolean multiple allowed confuses mypy a lot!
-        name_to_give: str = ""
-        insert = False
 
-        if match:
-            existing_contents = self._retrieve(name=match)  # type: ignore
-            contents = dict(existing_contents, **contents)
-            name_to_give = match  # type: ignore
-        else:
-            name_to_give = Template(naming_pattern).safe_substitute({"creation_time": str(int(time.time_ns()))})
-            insert = True
+        with self._lock(run_id):
+            match = self.get_matches(run_id=run_id, name=naming_pattern, multiple_allowed=False)
+            # The boolean multiple allowed confuses mypy a lot!
+            name_to_give: str = ""
+            insert = False
+
+            if match:
+                existing_contents = self._load(name=match)  # type: ignore
+                contents = dict(existing_contents, **contents)
+                name_to_give = match  # type: ignore
+            else:
+                name_to_give = Template(naming_pattern).safe_substitute({"creation_time": str(int(time.time_ns()))})
+                insert = True
 
-        self._store(run_id=run_id, contents=contents, name=name_to_give, insert=insert)
+            self._store(run_id=run_id, contents=contents, name=name_to_give, insert=insert)
+
+    def store_many(self, run_id: str, log_type: LogTypes, items: Dict[str, dict]):
+        """
+        Store many logs of the same log type.
+
+        Stores which can write many logs cheaper than one at a time should override this.
+
+        Args:
+            run_id (str): The run id to store against
+            log_type (LogTypes): The type of log to store
+            items (dict): The contents to store by the name
+        """
+        for name, contents in items.items():
+            self.store(run_id=run_id, log_type=log_type, contents=contents, name=name)
 
     def retrieve(self, run_id: str, log_type: LogTypes, name: str = "", multiple_allowed=False) -> Any:
         """
@@ -166,17 +559,11 @@ class ChunkedRunLogStore(BaseRunLogStore):
         naming_pattern = self.naming_pattern(log_type=log_type, name=name)
         matches = self.get_matches(run_id=run_id, name=naming_pattern, multiple_allowed=multiple_allowed)
         if matches:
+            model = self.ModelTypes[log_type.name].value
             if not multiple_allowed:
-                contents = self._retrieve(name=matches)  # type: ignore
-                model = self.ModelTypes[log_type.name].value
-                return model(**contents)
+                return self._load(name=matches, model_type=model)  # type: ignore
 
-            models = []
-            for match in matches:  # type: ignore
-                contents = self._retrieve(name=match)
-                model = self.ModelTypes[log_type.name].value
-                models.append(model(**contents))
-            return models
+            return [self._load(name=match, model_type=model) for match in matches]  # type: ignore
 
         raise EntityNotFoundError()
 
@@ -196,8 +583,8 @@ class ChunkedRunLogStore(BaseRunLogStore):
 
         matches = self.get_matches(run_id=run_id, name=prefix, multiple_allowed=True)
 
-        if log_type == self.LogTypes.BRANCH_LOG and not matches:
-            # No branch logs are found
+        if not matches:
+            # No branch logs are found or, with write behind, the step logs are yet to be flushed
             return {}
         # Forcing get_matches to always return a list is a better design
         epoch_created = [str(match).split("-")[-1] for match in matches]  # type: ignore
@@ -209,11 +596,37 @@ class ChunkedRunLogStore(BaseRunLogStore):
 
         for match in matches:
             model = self.ModelTypes[log_type.name].value
-            log_model = model(**self._retrieve(match))
-            logs[log_model.internal_name] = log_model  # type: ignore
+            log_model = self._load(name=match, model_type=model)
+            logs[log_model.internal_name] = log_model
 
         return logs
 
+    def _internal_names(self, run_id: str, log_type: LogTypes) -> Dict[str, T]:
+        """
+        The chunks of the step or branch logs by their internal names, in the order they were created.
+
+        The internal name and the creation time are parsed from the name of the chunk, as given by naming_pattern.
+        Stores whose get_matches does not return the names as per the naming pattern should override this.
+
+        Args:
+            run_id (str): The run id
+            log_type (LogTypes): One of StepLog or BranchLog
+
+        Returns:
+            dict: The names of the chunks by the internal names of the logs
+        """
+        prefix = f"{log_type.value}-"
+        matches = self.get_matches(run_id=run_id, name=log_type.value, multiple_allowed=True) or []
+
+        chunks = []
+        for match in matches:  # type: ignore
+            stem = Path(match).name
+            stem = stem[: -len(".json")] if stem.endswith(".json") else stem
+            internal_name, _, created = stem[len(prefix) :].rpartition("-")
+            chunks.append((int(created), internal_name, match))
+
+        return {internal_name: match for _, internal_name, match in sorted(chunks, key=lambda chunk: chunk[0])}
+
     def _get_parent_branch(self, name: str) -> Union[str, None]:
         """
         Returns the name of the parent branch.
@@ -250,6 +663,114 @@ class ChunkedRunLogStore(BaseRunLogStore):
         # Ignore the branch.step_name
         return ".".join(dot_path[:-2])
 
+    def _apply(self, view: MaterializedRunLog, name: T):
+        """
+        Apply the current contents of the chunk to the view.
+
+        Raises:
+            KeyError: If the branch or the step the chunk belongs to is not part of the view
+        """
+        chunk = Path(name).name
+        if chunk.startswith(self.LogTypes.RUN_LOG.value):
+            run_log = self._load(name=name, model_type=RunLog)
+            run_log.steps = view.run_log.steps
+            run_log.parameters = view.run_log.parameters
+            view.run_log = run_log
+            view.found = True
+            return
+
+        if chunk.startswith(self.LogTypes.PARAMETER_SNAPSHOT.value):
+            # Resolved when the run log is read, the names of the snapshots start with the same prefix as parameters
+            return
+
+        if chunk.startswith(self.LogTypes.PARAMETER.value):
+            view.run_log.parameters.update(self._load(name=name))
+            return
+
+        if chunk.startswith(self.LogTypes.BRANCH_LOG.value):
+            branch_log = self._load(name=name, model_type=BranchLog)
+            internal_name = branch_log.internal_name
+            existing = view.branches.get(internal_name)
+            view.branches[internal_name] = branch_log
+            if existing is None:
+                return
+
+            branch_log.steps = existing.steps
+            parent_step = view.steps.get(".".join(internal_name.split(".")[:-1]))
+            if parent_step is not None and parent_step.branches.get(internal_name) is existing:
+                parent_step.branches[internal_name] = branch_log
+            return
+
+        step_log = self._load(name=name, model_type=StepLog)
+        internal_name = step_log.internal_name
+        existing_step = view.steps.get(internal_name)
+        if existing_step is not None:
+            step_log.branches = existing_step.branches
+        view.steps[internal_name] = step_log
+
+        branch_name = self._get_parent_branch(internal_name)
+        if not branch_name:
+            view.run_log.steps[internal_name] = step_log
+            return
+
+        branch_log = view.branches[branch_name]
+        branch_log.steps[internal_name] = step_log
+        view.steps[self._get_parent_step(internal_name)].branches[branch_name] = branch_log  # type: ignore
+
+    def _materialize(self, run_id: str) -> Optional[RunLog]:
+        """
+        The full run log from the materialized view of the run, advanced by the chunks written since the last call.
+
+        A process without a view starts from the latest snapshot, if any.
+
+        Args:
+            run_id (str): The run id
+
+        Raises:
+            EntityNotFoundError: If the run log is not found
+
+        Returns:
+            Optional[RunLog]: A copy of the full run log, None if the store does not support incremental views.
+        """
+        if self._pending.get(run_id):
+            return None
+
+        with self._views_lock:
+            view = self._views.get(run_id)
+            if view is None:
+                snapshot = self._load_snapshot(run_id=run_id)
+                view = MaterializedRunLog.from_snapshot(snapshot) if snapshot else MaterializedRunLog(run_id=run_id)
+
+            changes = self._changes(run_id=run_id, cursor=view.cursor)
+            if changes is None:
+                return None
+
+            names, cursor, reset = changes
+            if reset:
+                view = MaterializedRunLog(run_id=run_id)
+
+            try:
+                # A chunk written many times since the cursor needs to be applied only once, at its first position.
+                for name in dict.fromkeys(names):
+                    self._apply(view, name)
+            except KeyError:
+                logger.warning(f"{self.service_name} Unable to apply the changes of {run_id}, preparing it in full")
+                self._views.pop(run_id, None)
+                return None
+
+            view.cursor = cursor
+            view.changes += len(names)
+            self._views[run_id] = view
+
+            if not view.found:
+                raise EntityNotFoundError()
+
+            if self.snapshot_interval and view.changes >= self.snapshot_interval:
+                self._store_snapshot(run_id=run_id, snapshot=view.snapshot())
+                view.changes = 0
+
+            return copy_log(view.run_log)
+
     def _prepare_full_run_log(self, run_log: RunLog):
         """
         Populates the run log with the branches and steps.
@@ -261,6 +782,8 @@ class ChunkedRunLogStore(BaseRunLogStore):
         run_log.parameters = self.get_parameters(run_id=run_id)
 
         ordered_steps = self.orderly_retrieve(run_id=run_id, log_type=self.LogTypes.STEP_LOG)
+        for internal_name, entry in self._pending.get(run_id, {}).copy().items():
+            ordered_steps[internal_name] = entry.model(StepLog)
         ordered_branches = self.orderly_retrieve(run_id=run_id, log_type=self.LogTypes.BRANCH_LOG)
 
         current_branch: Any = None  # It could be str, None, RunLog
@@ -277,6 +800,8 @@ class ChunkedRunLogStore(BaseRunLogStore):
 
             current_branch.steps[step_internal_name] = ordered_steps[step_internal_name]
 
+        self._attach_parameters(run_id=run_id, step_logs=run_log.steps.values())
+
     def create_run_log(
         self,
         run_id: str,
@@ -302,6 +827,10 @@ class ChunkedRunLogStore(BaseRunLogStore):
             pass
 
         logger.info(f"{self.service_name} Creating a Run Log for : {run_id}")
+        # Snapshots remembered of an earlier run with the same run id are not in the store anymore
+        for key in [key for key in self._parameter_snapshots if key[0] == run_id]:
+            del self._parameter_snapshots[key]
+
         run_log = RunLog(
             run_id=run_id,
             dag_hash=dag_hash,
@@ -331,6 +860,12 @@ class ChunkedRunLogStore(BaseRunLogStore):
         """
         try:
             logger.info(f"{self.service_name} Getting a Run Log for : {run_id}")
+            if full:
+                materialized = self._materialize(run_id=run_id)
+                if materialized is not None:
+                    self._attach_parameters(run_id=run_id, step_logs=materialized.steps.values())
+                    return materialized
+
             run_log = self.retrieve(run_id=run_id, log_type=self.LogTypes.RUN_LOG, multiple_allowed=False)
 
             if full:
@@ -340,6 +875,24 @@ class ChunkedRunLogStore(BaseRunLogStore):
         except EntityNotFoundError as e:
             raise exceptions.RunLogNotFoundError(run_id) from e
 
+    def get_lazy_run_log(self, run_id: str, **kwargs) -> LazyRunLog:
+        """
+        Retrieves a view of the run log which retrieves the chunks of the steps and branches only when accessed.
+
+        Args:
+            run_id (str): The run_id of the run
+
+        Raises:
+            RunLogNotFoundError: If the run log for run_id is not found in the datastore
+
+        Returns:
+            LazyRunLog: The view of the run log
+        """
+        run_log = self.get_run_log_by_id(run_id=run_id, full=False)
+        run_log.parameters = self.get_parameters(run_id=run_id)
+
+        return LazyRunLog(run_log=run_log, source=ChunkedRunLogSource(self, run_id=run_id))
+
     def put_run_log(self, run_log: RunLog, **kwargs):
         """
         Puts the Run Log in the database as defined by the config
@@ -356,12 +909,16 @@ class ChunkedRunLogStore(BaseRunLogStore):
         run_id = run_log.run_id
         self.store(run_id=run_id, contents=run_log.model_dump(), log_type=self.LogTypes.RUN_LOG)
 
-    def get_parameters(self, run_id: str, **kwargs) -> dict:
+    def get_parameters(self, run_id: str, internal_branch_name: str = "", **kwargs) -> dict:
         """
         Get the parameters from the Run log defined by the run_id
 
+        For a branch, the parameters of the run are updated with the parameters kept in the branch logs of the
+        enclosing branches and the branch.
+
         Args:
             run_id (str): The run_id of the run
+            internal_branch_name (str, optional): The branch of the parameters. Defaults to the run log.
 
         The method should:
             * Call get_run_log_by_id(run_id) to retrieve the run_log
@@ -380,32 +937,38 @@ class ChunkedRunLogStore(BaseRunLogStore):
             # No parameters are set
             pass
 
+        for scope in get_branch_scopes(internal_branch_name):
+            parameters.update(cast(BranchLog, self.get_branch_log(scope, run_id=run_id)).parameters)
+
         return parameters
 
-    def set_parameters(self, run_id: str, parameters: dict, **kwargs):
+    def set_parameters(self, run_id: str, parameters: dict, internal_branch_name: str = "", **kwargs):
         """
         Update the parameters of the Run log with the new parameters
 
-        This method would over-write the parameters, if the parameter exists in the run log already
+        This method would over-write the parameters, if the parameter exists in the run log already.
 
-        The method should:
-            * Call get_run_log_by_id(run_id) to retrieve the run_log
-            * Update the parameters of the run_log
-            * Call put_run_log(run_log) to put the run_log in the datastore
+        The parameters of the run are stored as a chunk per parameter. The parameters set in a branch are stored
+        in the branch log, only the steps of the branch write to it.
 
         Args:
             run_id (str): The run_id of the run
             parameters (dict): The parameters to update in the run log
+            internal_branch_name (str, optional): The branch of the parameters. Defaults to the run log.
         Raises:
             RunLogNotFoundError: If the run log for run_id is not found in the datastore
         """
-        for key, value in parameters.items():
-            self.store(
-                run_id=run_id,
-                log_type=self.LogTypes.PARAMETER,
-                contents={key: value},
-                name=key,
-            )
+        if internal_branch_name:
+            branch_log = cast(BranchLog, self.get_branch_log(internal_branch_name, run_id=run_id))
+            branch_log.parameters.update(parameters)
+            self.add_branch_log(branch_log, run_id=run_id)
+            return
+
+        self.store_many(
+            run_id=run_id,
+            log_type=self.LogTypes.PARAMETER,
+            items={key: {key: value} for key, value in parameters.items()},
+        )
 
     def get_run_config(self, run_id: str, **kwargs) -> dict:
         """
@@ -457,12 +1020,17 @@ class ChunkedRunLogStore(BaseRunLogStore):
         """
         logger.info(f"{self.service_name} Getting the step log: {internal_name} of {run_id}")
 
+        pending = self._pending.get(run_id, {}).get(internal_name)
+        if pending is not None:
+            return pending.model(StepLog)
+
         step_log = self.retrieve(
             run_id=run_id,
             log_type=self.LogTypes.STEP_LOG,
             name=internal_name,
             multiple_allowed=False,
         )
+        self._attach_parameters(run_id=run_id, step_logs=[step_log])
 
         return step_log
 
@@ -487,10 +1055,21 @@ class ChunkedRunLogStore(BaseRunLogStore):
         """
         logger.info(f"{self.service_name} Adding the step log to DB: {step_log.internal_name}")
 
+        if self.write_behind:
+            self._flush_at_exit()
+            with self._pending_lock:
+                # The step log is always complete, the pending update replaces any earlier one.
+                self._pending.setdefault(run_id, {})[step_log.internal_name] = CacheEntry(
+                    token=None, contents=step_log.model_dump()
+                )
+            return
+
+        contents = step_log.model_dump()
+        self._detach_parameters(run_id=run_id, items=[contents])
         self.store(
             run_id=run_id,
             log_type=self.LogTypes.STEP_LOG,
-            contents=step_log.model_dump(),
+            contents=contents,
             name=step_log.internal_name,
         )
 
@@ -539,3 +1118,100 @@ class ChunkedRunLogStore(BaseRunLogStore):
             contents=branch_log.model_dump(),
             name=internal_branch_name,
         )
+
+    def add_branch_logs(self, branch_logs: List[BranchLog], run_id: str, **kwargs):
+        """
+        Add many branch logs in one go, used by composite nodes during fan out.
+
+        Args:
+            branch_logs (List[BranchLog]): The branch logs to add to the database
+            run_id (str): The run id to which the branch logs are added
+        """
+        logger.info(f"{self.service_name} Adding {len(branch_logs)} branch logs to DB")
+        self.store_many(
+            run_id=run_id,
+            log_type=self.LogTypes.BRANCH_LOG,
+            items={branch_log.internal_name: branch_log.model_dump() for branch_log in branch_logs},
+        )
+
+    def get_status_index(self, run_id: str, **kwargs) -> Dict[str, LogStatus]:
+        """
+        The status of every step log and branch log of the run by their internal names, retrieved in one go.
+
+        The step logs and branch logs are retrieved as chunks, the branches without any steps are part of the index.
+
+        Args:
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, LogStatus]: The status of the step logs and branch logs by their internal names
+
+        Raises:
+            RunLogNotFoundError: If the run log for run_id is not found in the datastore
+        """
+        self.get_run_log_by_id(run_id=run_id, full=False)
+
+        step_logs = self.orderly_retrieve(run_id=run_id, log_type=self.LogTypes.STEP_LOG)
+        for internal_name, entry in self._pending.get(run_id, {}).copy().items():
+            step_logs[internal_name] = entry.model(StepLog)
+        branch_logs = self.orderly_retrieve(run_id=run_id, log_type=self.LogTypes.BRANCH_LOG)
+
+        index = {
+            internal_name: LogStatus.from_step_log(cast(StepLog, step_log))
+            for internal_name, step_log in step_logs.items()
+        }
+        index.update(
+            {
+                internal_name: LogStatus.from_branch_log(cast(BranchLog, branch_log))
+                for internal_name, branch_log in branch_logs.items()
+            }
+        )
+        return index
+
+    def get_branch_statuses(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, str]:
+        """
+        Returns the status of many branches in one go, used by composite nodes during fan in.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, str]: The status of the branch by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        statuses: Dict[str, str] = {}
+        for internal_branch_name in internal_branch_names:
+            naming_pattern = self.naming_pattern(log_type=self.LogTypes.BRANCH_LOG, name=internal_branch_name)
+            match = self.get_matches(run_id=run_id, name=naming_pattern, multiple_allowed=False)
+            if not match:
+                raise exceptions.BranchLogNotFoundError(run_id=run_id, name=internal_branch_name)
+            statuses[internal_branch_name] = self._load(name=match)["status"]  # type: ignore
+
+        return statuses
+
+    def get_branch_logs(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, BranchLog]:
+        """
+        Returns many branch logs in one go, used by composite nodes during fan in.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, BranchLog]: The branch log by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        branch_logs: Dict[str, BranchLog] = {}
+        for internal_branch_name in internal_branch_names:
+            naming_pattern = self.naming_pattern(log_type=self.LogTypes.BRANCH_LOG, name=internal_branch_name)
+            match = self.get_matches(run_id=run_id, name=naming_pattern, multiple_allowed=False)
+            if not match:
+                raise exceptions.BranchLogNotFoundError(run_id=run_id, name=internal_branch_name)
+            branch_logs[internal_branch_name] = self._load(name=cast(T, match), model_type=BranchLog)
+
+        return branch_logs
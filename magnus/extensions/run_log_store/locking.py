@@ -0,0 +1,172 @@
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+from magnus import defaults
+from magnus.extensions.run_log_store.cache import fd_token
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+LOCKS_FOLDER_NAME = ".locks"
+
+
+def ends_run(internal_name: str, step_type: str, status: str) -> bool:
+    """
+    Check if the step log is the last write of a run, the lock of the run is not needed after it.
+
+    The success or fail node of the pipeline, not of a branch, writes its step log once it has set the status
+    of the run and every branch is done.
+
+    Args:
+        internal_name (str): The internal name of the step log
+        step_type (str): The type of the node of the step log
+        status (str): The status of the step log
+
+    Returns:
+        bool: True if the step log completes the terminal node of the pipeline
+    """
+    return "." not in internal_name and step_type in ["success", "fail"] and status in [defaults.SUCCESS, defaults.FAIL]
+
+
+def atomic_write(path: Union[str, Path], payload: bytes) -> Tuple[int, int, int, int]:
+    """
+    Write the payload to a temporary file next to the path and rename it over the path.
+
+    Readers see either the earlier contents or the new contents, never a partially written file.
+
+    Args:
+        path (str): The path to write to
+        payload (bytes): The contents
+
+    Returns:
+        tuple: The token of the written file, as given by fd_token
+    """
+    path = Path(path)
+    temporary_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+
+    try:
+        with open(temporary_path, "wb") as fw:
+            fw.write(payload)
+            fw.flush()
+            token = fd_token(fw.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return token
+
+
+class FileLock:
+    """
+    An exclusive advisory lock held on a lock file, across processes and the threads of a process.
+
+    The lock is reentrant within a thread, the file lock is taken by the outermost acquire.
+    Uses flock, which locks the open file rather than the process, so every acquire has its own descriptor.
+    Without fcntl, e.g on Windows, only the threads of the process are excluded.
+
+    The lock file can be removed while others wait on it, by RunLocks.remove. A waiter that gets the lock of
+    a file that is no longer at the path, or was replaced by a new one, opens the path again and retries.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = -1
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                while True:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                    fcntl.flock(self._fd, fcntl.LOCK_EX)
+                    if self._holds_path():
+                        break
+                    os.close(self._fd)
+                    self._fd = -1
+            except BaseException:
+                if self._fd >= 0:
+                    os.close(self._fd)
+                    self._fd = -1
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def _holds_path(self) -> bool:
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        locked = os.fstat(self._fd)
+        return (current.st_dev, current.st_ino) == (locked.st_dev, locked.st_ino)
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = -1
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class RunLocks:
+    """
+    The locks of the runs in a log folder, kept in the .locks folder of the log folder.
+
+    The lock of a run is held for the read, merge and write of its run log or chunks,
+    serializing the updates to a run from the parallel branches.
+    """
+
+    def __init__(self, folder: Union[str, Path]):
+        self.folder = Path(folder) / LOCKS_FOLDER_NAME
+        self._locks: Dict[Tuple[int, str], FileLock] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, run_id: str) -> FileLock:
+        # Forked processes start with their own locks, the state of the parent's is not theirs.
+        key = (os.getpid(), run_id)
+        with self._lock:
+            if key not in self._locks:
+                self._locks[key] = FileLock(self.folder / f"{run_id}.lock")
+            return self._locks[key]
+
+    def remove(self, run_id: str):
+        """
+        Remove the lock file of a run that is over or deleted.
+
+        The file is removed while holding its lock, the processes waiting on it retry on a new lock file.
+        The file is kept if the lock is held by the caller, the holder would not be excluding the others.
+
+        Args:
+            run_id (str): The run id
+        """
+        lock = self(run_id)
+        with lock:
+            if lock._depth == 1:
+                try:
+                    os.remove(lock.path)
+                except FileNotFoundError:
+                    pass
+
+        with self._lock:
+            self._locks.pop((os.getpid(), run_id), None)
@@ -0,0 +1,309 @@
+import atexit
+import http.client
+import logging
+import os
+import queue
+import socket
+import threading
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+from pydantic import PrivateAttr, field_validator
+
+from magnus import defaults
+from magnus.datastore import BaseRunLogStore, BranchLog, LogStatus, RunLog, StepLog
+from magnus.extensions.run_log_store.remote import protocol
+from magnus.retention import Throttle
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    A HTTP connection over a Unix socket.
+    """
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ConnectionPool:
+    """
+    The connections to the run log server kept alive between requests, of a single process.
+
+    Idle connections are kept up to the size of the pool. A request on a connection closed by the server
+    while it was idle is retried once on a new connection, failures on new connections are raised.
+    """
+
+    def __init__(self, url: str, size: int = 8, timeout: float = 60):
+        self.url = url
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        parts = urlsplit(self.url)
+        if parts.scheme == "unix":
+            return UnixHTTPConnection(parts.netloc + parts.path, timeout=self.timeout)
+        return http.client.HTTPConnection(
+            parts.hostname or "127.0.0.1", parts.port or protocol.DEFAULT_PORT, timeout=self.timeout
+        )
+
+    def post(self, path: str, body: bytes) -> bytes:
+        """
+        POST the body to the path of the run log server.
+
+        Args:
+            path (str): The path of the endpoint
+            body (bytes): The body of the request
+
+        Raises:
+            Exception: If the server can not be reached or does not respond with 200
+
+        Returns:
+            bytes: The body of the response
+        """
+        try:
+            connection, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self._connect(), False
+
+        while True:
+            try:
+                connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+                response = connection.getresponse()
+                payload = response.read()
+                break
+            except (http.client.HTTPException, OSError) as _e:
+                connection.close()
+                if not reused:
+                    raise Exception(f"Unable to reach the run log server at {self.url}") from _e
+                connection, reused = self._connect(), False
+
+        if response.status != 200:
+            connection.close()
+            raise Exception(f"The run log server at {self.url} responded with {response.status}: {payload[:200]!r}")
+
+        if response.will_close:
+            connection.close()
+            return payload
+
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+        return payload
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RemoteRunLogStore(BaseRunLogStore):
+    """
+    A run log store served by the run log server, magnus runlog-server, to executions without shared storage.
+
+    The calls are sent over persistent connections, HTTP or a Unix socket, pooled per process.
+    If write_behind is enabled, the writes are queued and sent in a single request at the flush points of
+    the executor or before the next read, rather than a request per write.
+
+    Example config:
+
+    run_log_store:
+      type: remote
+      config:
+        url: http://host:port or unix:///path/to/socket. Defaults to http://127.0.0.1:8765
+        pool_size: The idle connections kept alive per process. Defaults to 8
+        timeout: Seconds to wait for the server. Defaults to 60
+        write_behind: Queue the writes till the next flush or read. Defaults to false
+    """
+
+    service_name: str = "remote"
+    url: str = f"http://127.0.0.1:{protocol.DEFAULT_PORT}"
+    pool_size: int = 8
+    timeout: float = 60
+    write_behind: bool = False
+
+    _pools: Dict[int, ConnectionPool] = PrivateAttr(default_factory=dict)
+    _pending: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    _pending_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _exit_flush_pid: int = PrivateAttr(default=0)
+
+    @field_validator("url")
+    @classmethod
+    def check_url(cls, url: str) -> str:
+        if urlsplit(url).scheme not in ["http", "unix"]:
+            raise ValueError(f"Unsupported url {url}, should be http://host:port or unix:///path/to/socket")
+        return url
+
+    @property
+    def pool(self) -> ConnectionPool:
+        # Forked processes, like the branches of a parallel node, can not share the connections of the parent.
+        pid = os.getpid()
+        if pid not in self._pools:
+            self._pools[pid] = ConnectionPool(self.url, size=self.pool_size, timeout=self.timeout)
+        return self._pools[pid]
+
+    def _send(self, calls: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Send the calls in a single request and return their results, raising the first error.
+
+        Args:
+            calls (list): The method and the arguments of every call
+
+        Returns:
+            list: The result of every call
+        """
+        response = protocol.loads(self.pool.post(protocol.CALL_PATH, protocol.calls_payload(calls)))
+
+        results = []
+        for result in response["results"]:
+            if "error" in result:
+                raise protocol.decode_error(result["error"])
+            results.append(protocol.decode(result["result"]))
+        return results
+
+    def _read(self, method: str, **kwargs) -> Any:
+        self.flush()
+        return self._send([{"method": method, "kwargs": kwargs}])[0]
+
+    def _write(self, method: str, **kwargs):
+        call = {"method": method, "kwargs": kwargs}
+        if not self.write_behind:
+            self._send([call])
+            return
+
+        with self._pending_lock:
+            self._pending.append(call)
+        self._flush_at_exit()
+
+    def flush(self, **kwargs):
+        """
+        Send the queued writes in a single request.
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+
+        if pending:
+            logger.info(f"{self.service_name} Sending {len(pending)} writes to {self.url}")
+            self._send(pending)
+
+    def _flush_at_exit(self):
+        if self._exit_flush_pid == os.getpid():
+            return
+        self._exit_flush_pid = pid = os.getpid()
+
+        def _flush():
+            # Forked processes inherit the registration but not the responsibility.
+            if os.getpid() == pid:
+                self.flush()
+
+        atexit.register(_flush)
+
+    def create_run_log(
+        self,
+        run_id: str,
+        dag_hash: str = "",
+        use_cached: bool = False,
+        tag: str = "",
+        original_run_id: str = "",
+        status: str = defaults.CREATED,
+        **kwargs,
+    ) -> RunLog:
+        return self._read(
+            "create_run_log",
+            run_id=run_id,
+            dag_hash=dag_hash,
+            use_cached=use_cached,
+            tag=tag,
+            original_run_id=original_run_id,
+            status=status,
+        )
+
+    def get_run_log_by_id(self, run_id: str, full: bool = False, **kwargs) -> RunLog:
+        return self._read("get_run_log_by_id", run_id=run_id, full=full)
+
+    def put_run_log(self, run_log: RunLog, **kwargs):
+        self._write("put_run_log", run_log=run_log)
+
+    def update_run_log_status(self, run_id: str, status: str):
+        self._write("update_run_log_status", run_id=run_id, status=status)
+
+    def get_parameters(self, run_id: str, internal_branch_name: str = "", **kwargs) -> dict:
+        return self._read("get_parameters", run_id=run_id, internal_branch_name=internal_branch_name)
+
+    def set_parameters(self, run_id: str, parameters: dict, internal_branch_name: str = "", **kwargs):
+        self._write("set_parameters", run_id=run_id, parameters=parameters, internal_branch_name=internal_branch_name)
+
+    def get_run_config(self, run_id: str, **kwargs) -> dict:
+        return self._read("get_run_config", run_id=run_id)
+
+    def set_run_config(self, run_id: str, run_config: dict, **kwargs):
+        self._write("set_run_config", run_id=run_id, run_config=run_config)
+
+    def get_step_log(self, internal_name: str, run_id: str, **kwargs) -> StepLog:
+        return self._read("get_step_log", internal_name=internal_name, run_id=run_id)
+
+    def add_step_log(self, step_log: StepLog, run_id: str, **kwargs):
+        self._write("add_step_log", step_log=step_log, run_id=run_id)
+
+    def get_branch_log(self, internal_branch_name: str, run_id: str, **kwargs) -> Union[BranchLog, RunLog]:
+        return self._read("get_branch_log", internal_branch_name=internal_branch_name, run_id=run_id)
+
+    def add_branch_log(self, branch_log: Union[BranchLog, RunLog], run_id: str, **kwargs):
+        self._write("add_branch_log", branch_log=branch_log, run_id=run_id)
+
+    def add_branch_logs(self, branch_logs: List[BranchLog], run_id: str, **kwargs):
+        self._write("add_branch_logs", branch_logs=branch_logs, run_id=run_id)
+
+    def get_branch_statuses(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, str]:
+        return self._read("get_branch_statuses", internal_branch_names=internal_branch_names, run_id=run_id)
+
+    def get_branch_logs(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, BranchLog]:
+        return self._read("get_branch_logs", internal_branch_names=internal_branch_names, run_id=run_id)
+
+    def get_status_index(self, run_id: str, **kwargs) -> Dict[str, LogStatus]:
+        return self._read("get_status_index", run_id=run_id)
+
+    def list_runs(
+        self,
+        tag: str = "",
+        status: str = "",
+        dag_hash: str = "",
+        original_run_id: str = "",
+        limit: int = 20,
+        offset: int = 0,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        return self._read(
+            "list_runs",
+            tag=tag,
+            status=status,
+            dag_hash=dag_hash,
+            original_run_id=original_run_id,
+            limit=limit,
+            offset=offset,
+        )
+
+    def reindex(self, **kwargs):
+        self._read("reindex")
+
+    def delete_run(
+        self, run_id: str, dry_run: bool = False, max_workers: int = 4, throttle: Optional[Throttle] = None, **kwargs
+    ) -> int:
+        max_deletes_per_second = 1 / throttle.interval if throttle and throttle.interval else 0
+        return self._read(
+            "delete_run",
+            run_id=run_id,
+            dry_run=dry_run,
+            max_workers=max_workers,
+            max_deletes_per_second=max_deletes_per_second,
+        )
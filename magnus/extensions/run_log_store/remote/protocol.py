@@ -0,0 +1,105 @@
+"""
+The protocol between the run log server and the remote run log store.
+
+A request is a batch of calls to the methods of the run log store, {"calls": [{"method": ..., "kwargs": ...}]},
+POSTed to /call. The response has a result or an error for every call, in order, {"results": [...]}.
+The run logs, step logs, branch logs and log statuses are sent as {"__model__": <name>, "value": <model_dump>}.
+"""
+
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel
+
+from magnus import exceptions
+from magnus.datastore import BranchLog, LogStatus, RunLog, StepLog
+from magnus.extensions.run_log_store import serializers
+
+CALL_PATH = "/call"
+HEALTH_PATH = "/health"
+
+DEFAULT_PORT = 8765
+
+# The methods of the run log store served, the writes can be batched by the client.
+READS = [
+    "create_run_log",
+    "get_run_log_by_id",
+    "get_parameters",
+    "get_run_config",
+    "get_step_log",
+    "get_branch_log",
+    "get_branch_statuses",
+    "get_branch_logs",
+    "get_status_index",
+    "list_runs",
+    "reindex",
+    "delete_run",
+]
+WRITES = [
+    "put_run_log",
+    "update_run_log_status",
+    "set_parameters",
+    "set_run_config",
+    "add_step_log",
+    "add_branch_log",
+    "add_branch_logs",
+]
+METHODS = READS + WRITES
+
+MODELS: Dict[str, Type[BaseModel]] = {model.__name__: model for model in (RunLog, StepLog, BranchLog, LogStatus)}
+
+
+def encode(value: Any) -> Any:
+    if isinstance(value, (RunLog, StepLog, BranchLog, LogStatus)):
+        return {"__model__": type(value).__name__, "value": value.model_dump()}
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    return value
+
+
+def decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "__model__" in value and value["__model__"] in MODELS:
+            return MODELS[value["__model__"]].model_validate(value["value"])
+        return {key: decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+
+def encode_error(error: Exception) -> Dict[str, str]:
+    return {"type": type(error).__name__, "message": getattr(error, "message", "") or str(error)}
+
+
+def decode_error(error: Dict[str, str]) -> Exception:
+    """
+    The exception raised on the server, the exceptions of magnus are raised as is for the callers to handle.
+
+    Args:
+        error (dict): The type and message of the exception
+
+    Returns:
+        Exception: The exception to raise
+    """
+    exception_type = getattr(exceptions, error["type"], None)
+    if not (isinstance(exception_type, type) and issubclass(exception_type, Exception)):
+        return Exception(f"The run log server failed with {error['type']}: {error['message']}")
+
+    # The exceptions of magnus take the entity rather than the message, the message is set as they would.
+    exception = exception_type.__new__(exception_type)
+    Exception.__init__(exception)
+    exception.message = error["message"]  # type: ignore
+    return exception
+
+
+def dumps(contents: dict) -> bytes:
+    return serializers.dumps(contents, serializer="compact-json")
+
+
+def loads(payload: bytes) -> dict:
+    return serializers.loads(payload)
+
+
+def calls_payload(calls: List[Dict[str, Any]]) -> bytes:
+    return dumps({"calls": [{"method": call["method"], "kwargs": encode(call["kwargs"])} for call in calls]})
@@ -0,0 +1,179 @@
+import logging
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Union
+
+from magnus import defaults
+from magnus.datastore import BaseRunLogStore, RunLog
+from magnus.extensions.run_log_store.remote import protocol
+from magnus.retention import Throttle
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+
+class RunLogRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the calls of the remote run log stores, a connection is kept alive for many requests.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: Union["_TCPServer", "_UnixServer"]
+
+    def do_GET(self):
+        if self.path != protocol.HEALTH_PATH:
+            self._respond(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        self._respond(200, {"status": "ok", "run_log_store": self.server.run_log_server.run_log_store.service_name})
+
+    def do_POST(self):
+        if self.path != protocol.CALL_PATH:
+            self._respond(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            calls = protocol.loads(self.rfile.read(length))["calls"]
+        except Exception as _e:  # pylint: disable=broad-except
+            self._respond(400, {"error": f"Unable to decode the request: {_e}"})
+            return
+
+        self._respond(200, {"results": self.server.run_log_server.dispatch(calls)})
+
+    def _respond(self, status: int, contents: dict):
+        payload = protocol.dumps(contents)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logger.debug(format % args)
+
+
+class _TCPRequestHandler(RunLogRequestHandler):
+    # The headers and the body of a response are separate writes, delayed by Nagle otherwise.
+    disable_nagle_algorithm = True
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    run_log_server: "RunLogServer"
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    run_log_server: "RunLogServer"
+
+
+class RunLogServer:
+    """
+    Serves a run log store to the remote run log stores of the executions, over HTTP or a Unix socket.
+
+    The server owns the run log store, e.g a SQLite database or segment logs on a local disk, so that
+    the containers or pods of an execution do not write to a shared file system.
+
+    Every connection is served by a thread. The calls to a run are serialized, the calls to different runs
+    are concurrent.
+    """
+
+    def __init__(self, run_log_store: BaseRunLogStore, host: str = "127.0.0.1", port: int = 0, socket_path: str = ""):
+        if run_log_store.service_name == "remote":
+            raise Exception("The run log server cannot serve a remote run log store")
+
+        self.run_log_store = run_log_store
+        self.socket_path = socket_path
+
+        self._server: Union[_TCPServer, _UnixServer]
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self._server = _UnixServer(socket_path, RunLogRequestHandler)
+        else:
+            self._server = _TCPServer((host, port), _TCPRequestHandler)
+        self._server.run_log_server = self
+
+        self._run_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """
+        The url for the remote run log stores to connect to.
+        """
+        if self.socket_path:
+            return f"unix://{self.socket_path}"
+
+        host, port = self._server.server_address[:2]  # type: ignore
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def _run_lock(self, run_id: str) -> threading.Lock:
+        with self._lock:
+            if run_id not in self._run_locks:
+                self._run_locks[run_id] = threading.Lock()
+            return self._run_locks[run_id]
+
+    def call(self, method: str, kwargs: Dict[str, Any]) -> Any:
+        """
+        Call the method of the run log store, under the lock of the run.
+
+        Args:
+            method (str): One of the methods in protocol.METHODS
+            kwargs (dict): The decoded arguments
+
+        Returns:
+            Any: The result of the method
+        """
+        if method not in protocol.METHODS:
+            raise Exception(f"The run log server does not support {method}")
+
+        if method == "delete_run":
+            kwargs["throttle"] = Throttle(rate=kwargs.pop("max_deletes_per_second", 0))
+
+        run_id = kwargs.get("run_id", "")
+        if isinstance(kwargs.get("run_log"), RunLog):
+            run_id = kwargs["run_log"].run_id
+
+        with self._run_lock(run_id):
+            return getattr(self.run_log_store, method)(**kwargs)
+
+    def dispatch(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Make the calls of a request in order, the failure of a call does not stop the rest.
+
+        Args:
+            calls (list): The method and the encoded arguments of every call
+
+        Returns:
+            list: The encoded result or error of every call
+        """
+        results = []
+        for call in calls:
+            try:
+                result = self.call(call["method"], protocol.decode(call.get("kwargs", {})))
+                results.append({"result": protocol.encode(result)})
+            except Exception as _e:  # pylint: disable=broad-except
+                logger.debug(f"The call to {call.get('method')} failed", exc_info=True)
+                results.append({"error": protocol.encode_error(_e)})
+
+        return results
+
+    def serve_forever(self):
+        logger.info(f"Serving the {self.run_log_store.service_name} run log store at {self.url}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self.run_log_store.flush()
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
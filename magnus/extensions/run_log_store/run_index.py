@@ -0,0 +1,209 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from magnus import defaults
+from magnus.datastore import RunLog
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+# The stores of different layouts can share a log folder, every layout keeps its own index of its runs.
+INDEX_FILE_NAME = "run_index.{layout}.db"
+
+TERMINAL_STATUSES = [defaults.SUCCESS, defaults.FAIL]
+
+COLUMNS = ["run_id", "tag", "status", "dag_hash", "original_run_id", "start_time", "end_time"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    tag TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    dag_hash TEXT NOT NULL DEFAULT '',
+    original_run_id TEXT NOT NULL DEFAULT '',
+    start_time REAL NOT NULL,
+    end_time REAL
+);
+CREATE INDEX IF NOT EXISTS ix_runs_start_time ON runs (start_time);
+CREATE INDEX IF NOT EXISTS ix_runs_tag ON runs (tag, start_time);
+CREATE INDEX IF NOT EXISTS ix_runs_status ON runs (status, start_time);
+CREATE INDEX IF NOT EXISTS ix_runs_dag_hash ON runs (dag_hash, start_time);
+"""
+
+
+def started_at(run_log: RunLog) -> Optional[float]:
+    """
+    The earliest start time of the attempts of the steps of the run, used while rebuilding the index.
+
+    Args:
+        run_log (RunLog): The full run log
+
+    Returns:
+        Optional[float]: The start time as a timestamp, None if no step was attempted
+    """
+    start_times = []
+
+    def _collect(steps):
+        for step_log in steps.values():
+            for attempt in step_log.attempts:
+                try:
+                    start_times.append(datetime.fromisoformat(str(attempt.start_time)).timestamp())
+                except ValueError:
+                    pass
+            for branch_log in step_log.branches.values():
+                _collect(branch_log.steps)
+
+    _collect(run_log.steps)
+    return min(start_times, default=None)
+
+
+class RunIndex:
+    """
+    A SQLite index of the runs in a run log store, to list and query runs without opening their run logs.
+
+    The run log stores record a run when it is created and whenever the attributes of the run log change.
+    The index is a sidecar, the run logs remain the source of truth and the index can be rebuilt from them.
+
+    SQLite in WAL mode allows concurrent writers from many processes, e.g the branches of a parallel node.
+    WAL needs memory shared between the processes and does not work on network file systems, e.g the NFS volumes
+    of kubernetes, where the rollback journal is used instead.
+
+    The index of a folder is specific to the layout of the run logs, e.g file-system or chunked-fs, as only
+    the runs of that layout can be read or deleted by the store that lists them.
+    """
+
+    def __init__(self, folder: str, layout: str, wal: bool = True):
+        self.path = Path(folder) / INDEX_FILE_NAME.format(layout=layout)
+        self.wal = wal
+        self._connections: Dict[Tuple[int, int], sqlite3.Connection] = {}
+        self._recorded: Dict[str, Tuple[Any, ...]] = {}  # run_id: the attributes as last recorded
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        A connection per process and thread, the schema is created on the first connection.
+        """
+        key = (os.getpid(), threading.get_ident())
+        if key not in self._connections:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+            if self.wal:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+            else:
+                connection.execute("PRAGMA journal_mode=DELETE")
+            connection.executescript(SCHEMA)
+            self._connections[key] = connection
+
+        return self._connections[key]
+
+    def record(self, run_log: RunLog):
+        """
+        Record the attributes of the run, the end time is set once the run reaches a terminal status.
+
+        Writes are skipped if the attributes did not change since they were last recorded by this process.
+
+        Args:
+            run_log (RunLog): The run log, the steps are not needed
+        """
+        attributes = (run_log.tag or "", run_log.status, run_log.dag_hash or "", run_log.original_run_id or "")
+        if self._recorded.get(run_log.run_id) == attributes:
+            return
+
+        now = time.time()
+        end_time = now if run_log.status in TERMINAL_STATUSES else None
+        with self._lock:
+            self.connection.execute(
+                """
+                INSERT INTO runs (run_id, tag, status, dag_hash, original_run_id, start_time, end_time)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run_id) DO UPDATE SET
+                    tag = excluded.tag,
+                    status = excluded.status,
+                    dag_hash = excluded.dag_hash,
+                    original_run_id = excluded.original_run_id,
+                    end_time = excluded.end_time
+                """,
+                (run_log.run_id, *attributes, now, end_time),
+            )
+        self._recorded[run_log.run_id] = attributes
+
+    def remove(self, run_id: str):
+        with self._lock:
+            self.connection.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        self._recorded.pop(run_id, None)
+
+    def query(
+        self,
+        tag: str = "",
+        status: str = "",
+        dag_hash: str = "",
+        original_run_id: str = "",
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        The runs matching all the filters given, the latest first.
+
+        Args:
+            tag (str, optional): The tag of the run
+            status (str, optional): The status of the run
+            dag_hash (str, optional): The hash of the dag of the run
+            original_run_id (str, optional): The run that was re-run
+            limit (int, optional): The number of runs to return. Defaults to 20.
+            offset (int, optional): The number of runs to skip. Defaults to 0.
+
+        Returns:
+            List[dict]: The runs with run_id, tag, status, dag_hash, original_run_id, start_time and end_time
+        """
+        filters = {"tag": tag, "status": status, "dag_hash": dag_hash, "original_run_id": original_run_id}
+        where = [f"{column} = ?" for column, value in filters.items() if value]
+        values: List[Any] = [value for value in filters.values() if value]
+
+        query = f"SELECT {', '.join(COLUMNS)} FROM runs"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY start_time DESC, run_id LIMIT ? OFFSET ?"
+
+        rows = self.connection.execute(query, (*values, limit, offset)).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def rebuild(self, run_logs: List[Tuple[RunLog, float, Optional[float]]]):
+        """
+        Replace the index with the runs given, used to index the runs created before the index.
+
+        Args:
+            run_logs (list): The run logs with their start and end times
+        """
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM runs")
+                connection.executemany(
+                    f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            run_log.run_id,
+                            run_log.tag or "",
+                            run_log.status,
+                            run_log.dag_hash or "",
+                            run_log.original_run_id or "",
+                            start_time,
+                            end_time,
+                        )
+                        for run_log, start_time, end_time in run_logs
+                    ],
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        self._recorded.clear()
+        logger.info(f"Indexed {len(run_logs)} runs in {self.path}")
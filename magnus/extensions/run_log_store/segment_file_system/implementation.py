@@ -0,0 +1,445 @@
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from pydantic import PrivateAttr
+
+from magnus import defaults, exceptions, utils
+from magnus.datastore import BranchLog
+from magnus.extensions.run_log_store.generic_chunked import ChunkedRunLogStore
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+T = Union[str, Path]
+
+Stamp = Tuple[int, str, int]  # (time in ns, writer, sequence of the writer)
+
+REGISTRY_FILE_NAME = "segments.index"
+SEGMENT_SUFFIX = ".segment"
+
+
+class SegmentFold:
+    """
+    The latest state of a run, folded from the records of all the segments of the run.
+
+    Every record carries the naming pattern of the log, the stamp of the write and the contents written.
+    The contents of a log are the shallow merge of all the records written against it, exactly like the
+    read-modify-write of the chunked store. The merge is done field by field using the stamp of the write,
+    so the order in which the segments are read does not change the folded state.
+    """
+
+    def __init__(self, run_folder: Path):
+        self.run_folder = run_folder
+        self.registry_offset = 0
+        self.registry_identity: Optional[Tuple[int, int]] = None  # device and inode of the registry read
+        self.segments: Dict[str, int] = {}  # segment name: offset read till
+        self.fields: Dict[str, Dict[str, Tuple[Stamp, Any]]] = {}  # logical name: {field: (stamp, value)}
+        self.created: Dict[str, Stamp] = {}  # logical name: stamp of the first write
+        self.patterns: Dict[str, str] = {}  # logical name: naming pattern
+        self.chunk_names: Dict[str, str] = {}  # chunk name: logical name
+
+    @staticmethod
+    def logical_name(naming_pattern: str) -> str:
+        return Template(naming_pattern).safe_substitute({"creation_time": ""})
+
+    def chunk_name(self, logical_name: str) -> str:
+        """
+        The name of the log as it would have been by the chunked store, i.e with the creation time.
+        """
+        creation_time = str(self.created[logical_name][0])
+        return Template(self.patterns[logical_name]).safe_substitute({"creation_time": creation_time})
+
+    def apply(self, record: Dict[str, Any]):
+        """
+        Fold a single record into the state.
+
+        Args:
+            record (dict): The record as written to the segment
+        """
+        naming_pattern = record["name"]
+        logical_name = self.logical_name(naming_pattern)
+        stamp: Stamp = (record["time"], record["writer"], record["seq"])
+        created: Stamp = tuple(record.get("created", stamp))
+
+        if logical_name not in self.created or created < self.created[logical_name]:
+            if logical_name in self.created:
+                del self.chunk_names[self.chunk_name(logical_name)]
+            self.created[logical_name] = created
+            self.patterns[logical_name] = naming_pattern
+            self.chunk_names[self.chunk_name(logical_name)] = logical_name
+
+        fields = self.fields.setdefault(logical_name, {})
+        for key, value in record["contents"].items():
+            if key not in fields or fields[key][0] < stamp:
+                fields[key] = (stamp, value)
+
+    def contents(self, logical_name: str) -> dict:
+        return {key: value for key, (_, value) in self.fields[logical_name].items()}
+
+    def reset(self):
+        self.__init__(self.run_folder)  # type: ignore
+
+    def _read_new_lines(self, path: Path, offset: int) -> Tuple[List[str], int]:
+        """
+        Read the complete lines appended to the file since the offset.
+
+        Returns:
+            Tuple[List[str], int]: The lines and the new offset
+        """
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            return [], offset
+
+        if size <= offset:
+            return [], offset
+
+        with open(path, "rb") as fr:
+            fr.seek(offset)
+            content = fr.read(size - offset)
+
+        complete = content.rfind(b"\n") + 1
+        lines = [line for line in content[:complete].decode().splitlines() if line]
+        return lines, offset + complete
+
+    def refresh(self):
+        """
+        Fold the records appended to any of the segments since the last refresh.
+
+        The segments of the run are known from the registry, the run folder is never listed.
+        compact replaces the registry by a new file, a registry with a different inode starts the fold afresh.
+        """
+        registry = self.run_folder / REGISTRY_FILE_NAME
+        try:
+            stat = os.stat(registry)
+        except FileNotFoundError:
+            if self.registry_offset:
+                self.reset()
+            return
+
+        identity = (stat.st_dev, stat.st_ino)
+        if self.registry_identity not in (None, identity) or stat.st_size < self.registry_offset:
+            # The run was compacted underneath us, start afresh.
+            self.reset()
+        self.registry_identity = identity
+
+        segment_names, self.registry_offset = self._read_new_lines(registry, self.registry_offset)
+        for segment_name in segment_names:
+            self.segments.setdefault(segment_name, 0)
+
+        for segment_name, offset in self.segments.items():
+            lines, self.segments[segment_name] = self._read_new_lines(self.run_folder / segment_name, offset)
+            for line in lines:
+                self.apply(json.loads(line))
+
+    def lookup(self, name: str, prefix: bool = False) -> List[str]:
+        """
+        Find the logs by their logical name.
+
+        Args:
+            name (str): The logical name of the log or a prefix of it
+            prefix (bool, optional): Match every logical name starting with name. Defaults to False.
+
+        Returns:
+            List[str]: The chunk names of the matching logs
+        """
+        self.refresh()
+
+        if not prefix:
+            return [self.chunk_name(name)] if name in self.created else []
+
+        return [self.chunk_name(logical_name) for logical_name in self.created if logical_name.startswith(name)]
+
+
+class SegmentFileSystemRunLogStore(ChunkedRunLogStore):
+    """
+    File system run log store where every writer process appends its writes to its own segment file.
+
+    A write never reads or rewrites existing logs. Readers fold the records of all the segments into the latest
+    state of the run and only read the records appended since their last read.
+    This makes concurrent branches writing to the same run cheap, even on shared volumes.
+
+    Once the run is complete, the segments can be collapsed into one by magnus compact.
+
+    Example config:
+
+    run_log_store:
+      type: segment-fs
+      config:
+        log_folder: The folder to out the logs. Defaults to .run_log_store
+
+    """
+
+    service_name: str = "segment-fs"
+    log_folder: str = defaults.LOG_LOCATION_FOLDER
+
+    _folds: Dict[str, SegmentFold] = PrivateAttr(default_factory=dict)
+    _writer: str = PrivateAttr(default="")
+    _writer_pid: int = PrivateAttr(default=0)
+    _seq: int = PrivateAttr(default=0)
+    _segment_fds: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    def log_folder_with_run_id(self, run_id: str) -> Path:
+        """
+        Utility function to get the log folder for a run id.
+
+        Args:
+            run_id (str): The run id
+
+        Returns:
+            Path: The path to the log folder with the run id
+        """
+        return Path(self.log_folder) / run_id
+
+    def get_fold(self, run_id: str) -> SegmentFold:
+        if run_id not in self._folds:
+            self._folds[run_id] = SegmentFold(self.log_folder_with_run_id(run_id=run_id))
+
+        return self._folds[run_id]
+
+    @property
+    def writer(self) -> str:
+        """
+        The identity of this writer process, unique across hosts and forks.
+        """
+        if self._writer_pid != os.getpid():
+            self._writer = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self._writer_pid = os.getpid()
+            self._seq = 0
+            self._segment_fds = {}
+
+        return self._writer
+
+    def _segment_fd(self, run_id: str) -> int:
+        """
+        Open the segment of this writer for the run, registering it if its the first write.
+        """
+        writer = self.writer
+        if run_id not in self._segment_fds:
+            run_folder = self.log_folder_with_run_id(run_id=run_id)
+            utils.safe_make_dir(run_folder)
+
+            segment_name = writer + SEGMENT_SUFFIX
+            fd = os.open(run_folder / segment_name, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+            registry_fd = os.open(run_folder / REGISTRY_FILE_NAME, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(registry_fd, f"{segment_name}\n".encode())
+            finally:
+                os.close(registry_fd)
+
+            self._segment_fds[run_id] = fd
+
+        return self._segment_fds[run_id]
+
+    def _append(self, run_id: str, records: List[Dict[str, Any]]):
+        """
+        Append the records to the segment of this writer in a single write.
+
+        The records are folded into the local state straight away, there is no need to read them back.
+        """
+        fd = self._segment_fd(run_id)
+        content = "".join(json.dumps(record, ensure_ascii=True) + "\n" for record in records).encode()
+        os.write(fd, content)
+
+        fold = self.get_fold(run_id)
+        segment_name = self.writer + SEGMENT_SUFFIX
+        if segment_name in fold.segments:
+            for record in records:
+                fold.apply(record)
+            fold.segments[segment_name] += len(content)
+
+    def _record(self, naming_pattern: str, contents: dict) -> Dict[str, Any]:
+        writer = self.writer
+        self._seq += 1
+        return {
+            "name": naming_pattern,
+            "time": time.time_ns(),
+            "writer": writer,
+            "seq": self._seq,
+            "contents": contents,
+        }
+
+    def store(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, contents: dict, name: str = ""):
+        """
+        Append a write of a SINGLE log type to the segment of this writer.
+
+        The merge with the existing contents happens when the segments are folded.
+
+        Args:
+            run_id (str): The run id to store against
+            log_type (LogTypes): The type of log to store
+            contents (dict): The dict of contents to store
+            name (str, optional): The name against the contents have to be stored. Defaults to ''.
+        """
+        naming_pattern = self.naming_pattern(log_type=log_type, name=name)
+        self._store(run_id=run_id, contents=contents, name=naming_pattern)
+
+    def store_many(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, items: Dict[str, dict]):
+        """
+        Append many writes of the same log type to the segment of this writer in a single write.
+
+        Args:
+            run_id (str): The run id to store against
+            log_type (LogTypes): The type of log to store
+            items (dict): The contents to store by the name
+        """
+        if not items:
+            return
+
+        records = [
+            self._record(self.naming_pattern(log_type=log_type, name=name), contents)
+            for name, contents in items.items()
+        ]
+        self._append(run_id=run_id, records=records)
+
+    def get_branch_statuses(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, str]:
+        """
+        Returns the status of many branches from the folded state of the run.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, str]: The status of the branch by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        fold = self.get_fold(run_id)
+        fold.refresh()
+
+        statuses: Dict[str, str] = {}
+        for internal_branch_name in internal_branch_names:
+            naming_pattern = self.naming_pattern(log_type=self.LogTypes.BRANCH_LOG, name=internal_branch_name)
+            logical_name = fold.logical_name(naming_pattern)
+            if logical_name not in fold.fields:
+                raise exceptions.BranchLogNotFoundError(run_id=run_id, name=internal_branch_name)
+            statuses[internal_branch_name] = fold.fields[logical_name]["status"][1]
+
+        return statuses
+
+    def get_branch_logs(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, BranchLog]:
+        """
+        Returns many branch logs from the folded state of the run.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, BranchLog]: The branch log by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        fold = self.get_fold(run_id)
+        fold.refresh()
+
+        branch_logs: Dict[str, BranchLog] = {}
+        for internal_branch_name in internal_branch_names:
+            naming_pattern = self.naming_pattern(log_type=self.LogTypes.BRANCH_LOG, name=internal_branch_name)
+            logical_name = fold.logical_name(naming_pattern)
+            if logical_name not in fold.fields:
+                raise exceptions.BranchLogNotFoundError(run_id=run_id, name=internal_branch_name)
+            branch_logs[internal_branch_name] = BranchLog(**fold.contents(logical_name))
+
+        return branch_logs
+
+    def get_matches(self, run_id: str, name: str, multiple_allowed: bool = False) -> Optional[Union[Sequence[T], T]]:
+        """
+        Get the logs of the run matching the naming pattern.
+
+        If multiple matches are not allowed, the name is matched exactly against the logical name of the log.
+
+        Args:
+            run_id (str): The run id
+            name (str): The naming pattern of the log to check in the run log store.
+        """
+        fold = self.get_fold(run_id)
+        matches = fold.lookup(fold.logical_name(name), prefix=multiple_allowed)
+        if not matches:
+            return None
+
+        paths = [fold.run_folder / match for match in matches]
+        if not multiple_allowed:
+            return paths[0]
+        return paths
+
+    def _store(self, run_id: str, contents: dict, name: T, insert: bool = False):
+        """
+        Append the contents against the naming pattern to the segment of this writer.
+
+        Args:
+            run_id (str): The run id
+            contents (dict): The dict to store
+            name (str): The naming pattern of the log
+        """
+        self._append(run_id=run_id, records=[self._record(str(name), contents)])
+
+    def _retrieve(self, name: T) -> dict:
+        """
+        Return the folded contents of the log.
+
+        Args:
+            name (Path): The run folder and the chunk name of the log as returned by get_matches
+
+        Returns:
+            dict: The contents
+        """
+        path = Path(name)
+        fold = self.get_fold(path.parent.name)
+        return fold.contents(fold.chunk_names[path.name])
+
+    def compact(self, run_id: str):
+        """
+        Collapse all the segments of the run into one segment holding the latest state.
+
+        Only compact a run that is complete, writers that are still active would keep writing to the segments
+        being removed.
+
+        Args:
+            run_id (str): The run id to compact
+        """
+        fold = SegmentFold(self.log_folder_with_run_id(run_id=run_id))
+        fold.refresh()
+        if not fold.segments:
+            raise Exception(f"No segments found for the run {run_id}")
+
+        writer = f"compacted-{time.time_ns()}"
+        records = []
+        for seq, (logical_name, created) in enumerate(sorted(fold.created.items(), key=lambda item: item[1])):
+            last_written = max(stamp for stamp, _ in fold.fields[logical_name].values())
+            records.append(
+                {
+                    "name": fold.patterns[logical_name],
+                    "time": last_written[0],
+                    "writer": writer,
+                    "seq": seq,
+                    "created": list(created),
+                    "contents": fold.contents(logical_name),
+                }
+            )
+
+        run_folder = fold.run_folder
+        segment_name = writer + SEGMENT_SUFFIX
+        with open(run_folder / segment_name, "w") as fw:
+            for record in records:
+                fw.write(json.dumps(record, ensure_ascii=True) + "\n")
+
+        temp_registry = run_folder / f"{REGISTRY_FILE_NAME}.{writer}"
+        temp_registry.write_text(f"{segment_name}\n")
+        os.replace(temp_registry, run_folder / REGISTRY_FILE_NAME)
+
+        for old_segment in fold.segments:
+            (run_folder / old_segment).unlink(missing_ok=True)
+
+        self._folds.pop(run_id, None)
+        logger.info(f"Compacted {len(fold.segments)} segments of {run_id} into {segment_name}")
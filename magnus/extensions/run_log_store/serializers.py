@@ -0,0 +1,152 @@
+import gzip
+import json
+import logging
+import math
+import re
+from typing import Any
+
+from magnus import defaults
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+SERIALIZERS = ["json", "compact-json", "msgpack"]
+COMPRESSIONS = ["", "gzip", "zstd"]
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# orjson reads integers beyond 64 bits as floats, any number with as many digits is left to json.
+LONG_NUMBER = re.compile(rb"\d{19,}")
+
+
+def _orjson() -> Any:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _msgpack() -> Any:
+    try:
+        import msgpack
+    except ImportError as _e:
+        msg = "msgpack is required for the msgpack serializer. Please install it"
+        raise Exception(msg) from _e
+    return msgpack
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as _e:
+        msg = "zstandard is required for the zstd compression. Please install it"
+        raise Exception(msg) from _e
+    return zstandard
+
+
+def _has_non_finite(contents: Any) -> bool:
+    if isinstance(contents, float):
+        return not math.isfinite(contents)
+    if isinstance(contents, dict):
+        return any(_has_non_finite(value) for value in contents.values())
+    if isinstance(contents, (list, tuple)):
+        return any(_has_non_finite(value) for value in contents)
+    return False
+
+
+def validate_serializer(serializer: str) -> str:
+    if serializer not in SERIALIZERS:
+        raise ValueError(f"Unsupported serializer {serializer}, should be one of {SERIALIZERS}")
+    return serializer
+
+
+def validate_compression(compression: str) -> str:
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression {compression}, should be one of {COMPRESSIONS}")
+    return compression
+
+
+def dumps(contents: dict, serializer: str = "json", compression: str = "") -> bytes:
+    """
+    Encode the contents of a run log, or a part of it, as bytes.
+
+    json is the indented, human readable format the stores always used. compact-json drops the
+    indentation and uses orjson if it is installed. msgpack is a binary format.
+
+    compact-json does not accept NaN or infinity, which are not valid JSON, as orjson would
+    silently store them as null.
+
+    Args:
+        contents (dict): The contents to encode
+        serializer (str): One of json, compact-json or msgpack. Defaults to json
+        compression (str): One of gzip or zstd, empty for no compression. Defaults to no compression
+
+    Returns:
+        bytes: The encoded contents
+    """
+    payload: bytes
+    if serializer == "json":
+        payload = json.dumps(contents, ensure_ascii=True, indent=4).encode()
+    elif serializer == "compact-json":
+        payload = b""
+        orjson = _orjson()
+        if orjson:
+            try:
+                payload = orjson.dumps(contents, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # orjson does not handle integers beyond 64 bits, json does.
+                logger.debug("orjson unable to encode the contents, falling back to json")
+            if b"null" in payload and _has_non_finite(contents):
+                raise ValueError("Out of range float values are not supported by compact-json")
+        if not payload:
+            payload = json.dumps(contents, ensure_ascii=True, separators=(",", ":"), allow_nan=False).encode()
+    elif serializer == "msgpack":
+        payload = _msgpack().packb(contents, use_bin_type=True)
+    else:
+        raise Exception(f"Unsupported serializer {serializer}")
+
+    if compression == "gzip":
+        # mtime is fixed so that the same contents give the same bytes.
+        return gzip.compress(payload, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        return _zstd().ZstdCompressor().compress(payload)
+    if compression:
+        raise Exception(f"Unsupported compression {compression}")
+
+    return payload
+
+
+def loads(payload: bytes) -> dict:
+    """
+    Decode the contents written by dumps, with any of the serializers or compressions.
+
+    The format is detected from the leading bytes, so the contents written with a different
+    configuration, or before the configuration was introduced, are always readable.
+
+    JSON is decoded with orjson if it is installed, unless the contents could be something only
+    json reads back faithfully: NaN, infinity or integers beyond 64 bits.
+
+    Args:
+        payload (bytes): The encoded contents
+
+    Returns:
+        dict: The decoded contents
+    """
+    if payload[:2] == GZIP_MAGIC:
+        payload = gzip.decompress(payload)
+    elif payload[:4] == ZSTD_MAGIC:
+        payload = _zstd().ZstdDecompressor().decompressobj().decompress(payload)
+
+    # JSON documents of the run log are always objects, i.e start with { after any whitespace.
+    # A msgpack map starts with 0x80 - 0x8f or 0xde, 0xdf neither of which is valid JSON.
+    if payload.lstrip()[:1] == b"{":
+        orjson = _orjson()
+        if orjson and not LONG_NUMBER.search(payload):
+            try:
+                return orjson.loads(payload)
+            except orjson.JSONDecodeError:
+                logger.debug("orjson unable to decode the contents, falling back to json")
+        return json.loads(payload)
+
+    return _msgpack().unpackb(payload, raw=False, strict_map_key=False)
@@ -0,0 +1,344 @@
+import logging
+import os
+import threading
+from multiprocessing.managers import BaseManager
+from string import Template
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, cast
+
+from pydantic import PrivateAttr
+
+from magnus import defaults, exceptions
+from magnus.datastore import BranchLog, StepLog
+from magnus.extensions.run_log_store.generic_chunked import ChunkedRunLogStore, EntityNotFoundError
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+# The address of the manager serving the run logs, inherited by the processes of the branches.
+ADDRESS_ENV = "MAGNUS_SHARED_RUN_LOG_ADDRESS"
+
+
+class RunLogChunks:
+    """
+    The chunks of the run logs, held in the process of the manager and shared by all the processes of a run.
+
+    The chunks of a run are kept by their attribute type, i.e RunLog, Parameter, StepLog or BranchLog, and their
+    attribute key, in the order they were created. Every method is a single call to the manager and is atomic.
+    """
+
+    def __init__(self):
+        self._runs: Dict[str, Dict[str, Dict[str, dict]]] = {}
+        self._lock = threading.Lock()
+
+    def keys(self, run_id: str, attribute_type: str, prefix: str = "") -> List[str]:
+        with self._lock:
+            chunks = self._runs.get(run_id, {}).get(attribute_type, {})
+            return [key for key in chunks if key.startswith(prefix)]
+
+    def get(self, run_id: str, attribute_type: str, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._runs.get(run_id, {}).get(attribute_type, {}).get(key)
+
+    def values(self, run_id: str, attribute_type: str, prefix: str = "") -> List[dict]:
+        with self._lock:
+            chunks = self._runs.get(run_id, {}).get(attribute_type, {})
+            return [contents for key, contents in chunks.items() if key.startswith(prefix)]
+
+    def statuses(self, run_id: str, attribute_type: str, keys: List[str]) -> Dict[str, str]:
+        with self._lock:
+            chunks = self._runs.get(run_id, {}).get(attribute_type, {})
+            return {key: chunks[key]["status"] for key in keys if key in chunks}
+
+    def many(self, run_id: str, attribute_type: str, keys: List[str]) -> Dict[str, dict]:
+        with self._lock:
+            chunks = self._runs.get(run_id, {}).get(attribute_type, {})
+            return {key: chunks[key] for key in keys if key in chunks}
+
+    def upsert(self, run_id: str, attribute_type: str, items: Dict[str, dict]):
+        with self._lock:
+            chunks = self._runs.setdefault(run_id, {}).setdefault(attribute_type, {})
+            for key, contents in items.items():
+                chunks[key] = dict(chunks.get(key, {}), **contents)
+
+
+_chunks = RunLogChunks()
+
+
+def _get_chunks() -> RunLogChunks:
+    return _chunks
+
+
+class SharedRunLogManager(BaseManager):
+    pass
+
+
+SharedRunLogManager.register("chunks", callable=_get_chunks)
+
+
+class SharedMemoryRunLogStore(ChunkedRunLogStore):
+    """
+    In-memory run log store shared by the processes of the run, e.g the branches of parallel or map nodes.
+
+    The run log is held in a manager process started by the first use of the store, the processes started
+    by multiprocessing, as the local executor does for parallel execution, connect to it.
+    The chunks of the run log are merged by the manager, concurrent updates from the branches are not lost.
+
+    Like the buffered run log store, the run log is not persisted and is gone when the run is complete.
+
+    Example config:
+
+    run_log_store:
+      type: shared-memory
+
+    """
+
+    service_name: str = "shared-memory"
+
+    _manager: Any = PrivateAttr(default=None)
+    _chunks: Any = PrivateAttr(default=None)
+    _chunks_pid: int = PrivateAttr(default=0)
+
+    @property
+    def chunks(self) -> Any:
+        """
+        The proxy to the chunks held by the manager, connected on the first use in every process.
+        """
+        if self._chunks is None or self._chunks_pid != os.getpid():
+            self._chunks = self._connect()
+            self._chunks_pid = os.getpid()
+
+        return self._chunks
+
+    def _connect(self) -> Any:
+        address = os.environ.get(ADDRESS_ENV, "")
+        if address:
+            manager = SharedRunLogManager(address=address)
+            try:
+                manager.connect()
+                return manager.chunks()  # type: ignore
+            except (FileNotFoundError, ConnectionRefusedError):
+                logger.info(f"{self.service_name} The run log manager at {address} is no longer running")
+
+        self._manager = SharedRunLogManager()
+        self._manager.start()
+        os.environ[ADDRESS_ENV] = self._manager.address
+        logger.info(f"{self.service_name} Started the run log manager at {self._manager.address}")
+
+        return self._manager.chunks()
+
+    def _attribute(self, naming_pattern: str) -> Tuple[str, str]:
+        """
+        Split a naming pattern into the attribute type and the attribute key.
+
+        Args:
+            naming_pattern (str): The naming pattern as given by naming_pattern or a prefix of it.
+
+        Returns:
+            Tuple[str, str]: The attribute type and attribute key
+        """
+        sub_name = Template(naming_pattern).safe_substitute({"creation_time": ""})
+        attribute_type, _, attribute_key = sub_name.partition("-")
+
+        if attribute_type in [self.LogTypes.STEP_LOG.value, self.LogTypes.BRANCH_LOG.value] and attribute_key:
+            attribute_key = attribute_key[:-1]  # The separator before the creation time
+
+        return attribute_type, attribute_key
+
+    def get_matches(
+        self, run_id: str, name: str, multiple_allowed: bool = False
+    ) -> Optional[Union[Sequence[str], str]]:
+        """
+        Get the chunks matching the naming pattern, as run_id/attribute_type/attribute_key.
+
+        If multiple matches are allowed, the key of the naming pattern is matched as a prefix.
+
+        Args:
+            run_id (str): The run id
+            name (str): The naming pattern of the log to check in the run log store.
+        """
+        attribute_type, attribute_key = self._attribute(name)
+
+        if multiple_allowed:
+            keys = self.chunks.keys(run_id, attribute_type, attribute_key)
+        else:
+            keys = [attribute_key] if self.chunks.get(run_id, attribute_type, attribute_key) is not None else []
+
+        matches = ["/".join([run_id, attribute_type, key]) for key in keys]
+        if not matches:
+            return None
+
+        if not multiple_allowed:
+            return matches[0]
+        return matches
+
+    def _store(self, run_id: str, contents: dict, name: Any, insert: bool = False):
+        """
+        Store the contents against the naming pattern, merging with the existing contents.
+
+        Args:
+            run_id (str): The run id
+            contents (dict): The dict to store
+            name (str): The naming pattern of the log
+        """
+        attribute_type, attribute_key = self._attribute(str(name))
+        self.chunks.upsert(run_id, attribute_type, {attribute_key: contents})
+
+    def _retrieve(self, name: Any) -> dict:
+        """
+        Retrieve the contents of the chunk.
+
+        Args:
+            name (str): The chunk as returned by get_matches
+
+        Returns:
+            dict: The contents
+        """
+        run_id, attribute_type, attribute_key = str(name).split("/", 2)
+        contents = self.chunks.get(run_id, attribute_type, attribute_key)
+        if contents is None:
+            raise EntityNotFoundError()
+
+        return contents
+
+    def store(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, contents: dict, name: str = ""):
+        """
+        Store a SINGLE log type, merged with the existing contents by the manager.
+
+        Args:
+            run_id (str): The run id to store against
+            log_type (LogTypes): The type of log to store
+            contents (dict): The dict of contents to store
+            name (str, optional): The name against the contents have to be stored. Defaults to ''.
+        """
+        self.store_many(run_id=run_id, log_type=log_type, items={name: contents})
+
+    def store_many(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, items: Dict[str, dict]):
+        """
+        Store many logs of the same log type in a single call to the manager.
+
+        Args:
+            run_id (str): The run id to store against
+            log_type (LogTypes): The type of log to store
+            items (dict): The contents to store by the name
+        """
+        if not items:
+            return
+
+        for name in items:
+            self.naming_pattern(log_type=log_type, name=name)  # Validates the name for the log type
+
+        self.chunks.upsert(run_id, log_type.value, items)
+
+    def retrieve(
+        self, run_id: str, log_type: ChunkedRunLogStore.LogTypes, name: str = "", multiple_allowed=False
+    ) -> Any:
+        """
+        Retrieve the model given a log_type and a name in a single call to the manager.
+
+        Args:
+            run_id (str): The run id
+            log_type (LogTypes): One of RunLog, Parameter, StepLog, BranchLog
+            name (str, optional): The name to match. Defaults to ''.
+            multiple_allowed (bool, optional): Are multiple allowed. Defaults to False.
+
+        Raises:
+            EntityNotFoundError: If there is no match found
+
+        Returns:
+            Any: One of StepLog, BranchLog, Parameter or RunLog
+        """
+        if not name and log_type not in [
+            self.LogTypes.RUN_LOG,
+            self.LogTypes.PARAMETER,
+        ]:
+            raise Exception(f"Name is required during retrieval for {log_type}")
+
+        model = self.ModelTypes[log_type.name].value
+        if multiple_allowed:
+            values = self.chunks.values(run_id, log_type.value, name)
+            if not values:
+                raise EntityNotFoundError()
+            return [model(**value) for value in values]
+
+        value = self.chunks.get(run_id, log_type.value, name)
+        if value is None:
+            raise EntityNotFoundError()
+        return model(**value)
+
+    def orderly_retrieve(
+        self, run_id: str, log_type: ChunkedRunLogStore.LogTypes
+    ) -> Dict[str, Union[StepLog, BranchLog]]:
+        """Should only be used by prepare full run log.
+
+        Retrieves the StepLog or BranchLog in the order of creation in a single call to the manager.
+
+        Args:
+            run_id (str): The run id
+            log_type (LogTypes): One of StepLog or BranchLog
+        """
+        logs: Dict[str, Union[StepLog, BranchLog]] = {}
+        model = cast(Type[Union[StepLog, BranchLog]], self.ModelTypes[log_type.name].value)
+        for value in self.chunks.values(run_id, log_type.value):
+            log_model = model(**value)
+            logs[log_model.internal_name] = log_model
+
+        return logs
+
+    def _internal_names(self, run_id: str, log_type: ChunkedRunLogStore.LogTypes) -> Dict[str, Any]:
+        """
+        The chunks of the step or branch logs by their internal names, without retrieving the contents.
+
+        Args:
+            run_id (str): The run id
+            log_type (LogTypes): One of StepLog or BranchLog
+
+        Returns:
+            dict: The chunks by the internal names, in the order of creation
+        """
+        return {key: "/".join([run_id, log_type.value, key]) for key in self.chunks.keys(run_id, log_type.value)}
+
+    def get_branch_statuses(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, str]:
+        """
+        Returns the status of many branches in a single call to the manager.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, str]: The status of the branch by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        statuses = self.chunks.statuses(run_id, self.LogTypes.BRANCH_LOG.value, internal_branch_names)
+
+        for internal_branch_name in internal_branch_names:
+            if internal_branch_name not in statuses:
+                raise exceptions.BranchLogNotFoundError(run_id=run_id, name=internal_branch_name)
+
+        return {internal_branch_name: statuses[internal_branch_name] for internal_branch_name in internal_branch_names}
+
+    def get_branch_logs(self, internal_branch_names: List[str], run_id: str, **kwargs) -> Dict[str, BranchLog]:
+        """
+        Returns many branch logs in a single call to the manager.
+
+        Args:
+            internal_branch_names (List[str]): The internal branch names of interest
+            run_id (str): The run id of interest
+
+        Returns:
+            Dict[str, BranchLog]: The branch log by its internal branch name
+
+        Raises:
+            BranchLogNotFoundError: If any of the branches are not found in the datastore for run_id
+        """
+        chunks = self.chunks.many(run_id, self.LogTypes.BRANCH_LOG.value, internal_branch_names)
+
+        for internal_branch_name in internal_branch_names:
+            if internal_branch_name not in chunks:
+                raise exceptions.BranchLogNotFoundError(run_id=run_id, name=internal_branch_name)
+
+        return {
+            internal_branch_name: BranchLog(**chunks[internal_branch_name])
+            for internal_branch_name in internal_branch_names
+        }
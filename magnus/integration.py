@@ -166,6 +166,25 @@ class BufferedRunLogStore(BaseIntegration):
         logger.warning(msg)
 
 
+class SharedMemoryRunLogStore(BaseIntegration):
+    """
+    Integration between any executor and shared memory run log store
+    """
+
+    service_type = "run_log_store"  # One of secret, catalog, datastore
+    service_provider = "shared-memory"  # The actual implementation of the service
+
+    def validate(self, **kwargs):
+        if not self.executor.service_name == "local":
+            raise Exception("Shared memory run log store is only supported for local executor")
+
+        msg = (
+            "Run log generated by shared memory run log store are not persisted. "
+            "Re-running this run, in case of a failure, is not possible"
+        )
+        logger.warning(msg)
+
+
 class DoNothingCatalog(BaseIntegration):
     """
     Integration between any executor and do nothing catalog
@@ -10,7 +10,7 @@ from pydantic import BaseModel
 
 import magnus.context as context
 from magnus import defaults, exceptions, parameters, pickler, utils
-from magnus.datastore import RunLog, StepLog
+from magnus.datastore import RunLog, StepLog, copy_log
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
 
@@ -97,13 +97,11 @@ def set_parameter(**kwargs) -> None:
 
 
 @overload
-def get_parameter(key: str, cast_as: Optional[CastT]) -> CastT:
-    ...
+def get_parameter(key: str, cast_as: Optional[CastT]) -> CastT: ...
 
 
 @overload
-def get_parameter(cast_as: Optional[CastT]) -> CastT:
-    ...
+def get_parameter(cast_as: Optional[CastT]) -> CastT: ...
 
 
 @check_context
@@ -289,12 +287,14 @@ def get_run_log() -> RunLog:
     """
     Returns the run_log of the current run.
 
-    The return is a deep copy of the run log to prevent any modification.
+    The return is a copy of the run log to prevent any modification.
+    For large runs, prefer the run log store's get_lazy_run_log which loads a step at a time.
     """
-    return context.run_context.run_log_store.get_run_log_by_id(
+    run_log = context.run_context.run_log_store.get_run_log_by_id(
         context.run_context.run_id,
         full=True,
-    ).copy(deep=True)
+    )
+    return copy_log(run_log)
 
 
 @check_context
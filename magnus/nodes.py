@@ -1,12 +1,15 @@
+import importlib
 import logging
+import os
+import sys
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 import magnus.context as context
-from magnus import defaults, exceptions
-from magnus.datastore import StepAttempt
+from magnus import defaults, exceptions, utils
+from magnus.datastore import BranchLog, StepAttempt
 from magnus.defaults import TypeMapVariable
 
 logger = logging.getLogger(defaults.LOGGER_NAME)
@@ -452,6 +455,61 @@ class CompositeNode(TraversalNode):
     def execute(self, mock=False, map_variable: TypeMapVariable = None, **kwargs) -> StepAttempt:
         raise Exception("This is a composite node and does not have an execute function")
 
+    def _merge_branch_parameters(
+        self,
+        branch_logs: List[BranchLog],
+        reducer: str = defaults.LAST_WRITER_REDUCER,
+        map_variable: TypeMapVariable = None,
+    ):
+        """
+        Merge the parameters set in the branches into the branch containing the node, or the run.
+
+        The steps of a branch set the parameters in the branch log and do not contend with the other branches.
+        The values of a parameter, in the order of the branches that set it, are merged by the reducer:
+            * last-writer: The value of the last branch.
+            * collect: The list of the values.
+            * A function, as module.function, called with the list of the values and returning the merged value.
+
+        Args:
+            branch_logs (List[BranchLog]): The branch logs of the node, in order, as read for the fan in
+            reducer (str, optional): The reducer of the values. Defaults to last-writer.
+            map_variable (dict, optional): If the node is part of a map. Defaults to None.
+        """
+        run_log_store = self._context.run_log_store
+
+        values: Dict[str, List[Any]] = {}
+        for branch_log in branch_logs:
+            for key, value in branch_log.parameters.items():
+                values.setdefault(key, []).append(value)
+
+        if not values:
+            return
+
+        reduce = self._get_reducer(reducer)
+        try:
+            merged = {key: reduce(key_values) for key, key_values in values.items()}
+        except Exception as e:
+            msg = f"The reducer {reducer} of {self.internal_name} could not merge the parameters of the branches"
+            logger.exception(msg)
+            raise Exception(msg) from e
+
+        # The branch containing the node, empty for the main dag
+        effective_internal_name = self._resolve_map_placeholders(self.internal_name, map_variable=map_variable)
+        internal_branch_name = ".".join(effective_internal_name.split(".")[:-1])
+        run_log_store.set_parameters(self._context.run_id, merged, internal_branch_name=internal_branch_name)
+
+    @staticmethod
+    def _get_reducer(reducer: str) -> Callable[[List[Any]], Any]:
+        if reducer == defaults.LAST_WRITER_REDUCER:
+            return lambda values: values[-1]
+
+        if reducer == defaults.COLLECT_REDUCER:
+            return list
+
+        module, func = utils.get_module_and_attr_names(reducer)
+        sys.path.insert(0, os.getcwd())  # Need to add the current directory to path
+        return getattr(importlib.import_module(module), func)
+
 
 class TerminalNode(BaseNode):
     def _get_on_failure_node(self) -> str:
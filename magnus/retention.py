@@ -0,0 +1,189 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+from pydantic import BaseModel, ConfigDict, model_validator
+
+from magnus import defaults
+
+logger = logging.getLogger(defaults.LOGGER_NAME)
+
+TERMINAL_STATUSES = [defaults.SUCCESS, defaults.FAIL]
+
+
+class RetentionPolicy(BaseModel):
+    """
+    The runs to retain, the runs of the run log store not retained by the policy are expired.
+
+    A run is expired if it is not one of the latest keep_last runs of its tag, or if it started more than
+    max_age_days ago. Runs which have not finished are never expired, and with keep_referenced the runs re-run
+    by a retained run, as recorded in its original_run_id, are always retained.
+    """
+
+    keep_last: Optional[int] = None
+    max_age_days: Optional[float] = None
+    keep_referenced: bool = True
+
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def check_policy(self) -> "RetentionPolicy":
+        if self.keep_last is None and self.max_age_days is None:
+            raise ValueError("Provide at least one of keep_last or max_age_days for the retention policy")
+        if self.keep_last is not None and self.keep_last < 0:
+            raise ValueError("keep_last should not be negative")
+        return self
+
+
+def expired_runs(runs: List[Dict[str, Any]], policy: RetentionPolicy, now: Optional[float] = None) -> List[dict]:
+    """
+    The runs expired by the policy.
+
+    Args:
+        runs (List[dict]): The runs as listed by the run log store
+        policy (RetentionPolicy): The retention policy
+        now (float, optional): The current time as a timestamp. Defaults to the time of the call.
+
+    Returns:
+        List[dict]: The expired runs, in the order they were given
+    """
+    now = time.time() if now is None else now
+    expired: Set[str] = set()
+    finished = [run for run in runs if run["status"] in TERMINAL_STATUSES]
+
+    if policy.max_age_days is not None:
+        oldest = now - policy.max_age_days * 24 * 60 * 60
+        expired.update(run["run_id"] for run in finished if run["start_time"] < oldest)
+
+    if policy.keep_last is not None:
+        by_tag: Dict[str, List[dict]] = {}
+        for run in finished:
+            by_tag.setdefault(run["tag"], []).append(run)
+
+        for tagged in by_tag.values():
+            tagged.sort(key=lambda run: run["start_time"], reverse=True)
+            expired.update(run["run_id"] for run in tagged[policy.keep_last :])
+
+    if policy.keep_referenced:
+        # A retained run can be a re-run of an expired run which in turn can be a re-run of another.
+        original_run_ids = {run["run_id"]: run["original_run_id"] for run in runs}
+        pending = [run_id for run_id in original_run_ids if run_id not in expired]
+        while pending:
+            original_run_id = original_run_ids.get(pending.pop(), "")
+            if original_run_id in expired:
+                expired.remove(original_run_id)
+                pending.append(original_run_id)
+
+    return [run for run in runs if run["run_id"] in expired]
+
+
+class Throttle:
+    """
+    Limits the rate of the operations, e.g deletes of files, across the threads sharing it.
+
+    A rate of 0 does not limit.
+    """
+
+    def __init__(self, rate: float = 0):
+        self.interval = 1 / rate if rate else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def remove_tree(
+    path: Union[str, Path], dry_run: bool = False, max_workers: int = 4, throttle: Optional[Throttle] = None
+) -> int:
+    """
+    Remove the file or the folder with all its contents, the files are removed in parallel.
+
+    Removing the files one by one, rather than shutil.rmtree, allows many removals in flight on network file
+    systems and throttling them to leave the I/O to the running pipelines.
+
+    Args:
+        path (str): The file or folder to remove
+        dry_run (bool, optional): Only report the bytes to reclaim. Defaults to False.
+        max_workers (int, optional): The number of files removed concurrently. Defaults to 4.
+        throttle (Throttle, optional): Limits the rate of removals. Defaults to no limit.
+
+    Returns:
+        int: The bytes reclaimed, or that would be reclaimed in a dry run
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+
+    if not path.is_dir():
+        size = path.stat().st_size
+        if not dry_run:
+            if throttle:
+                throttle.wait()
+            path.unlink()
+        return size
+
+    files: List[str] = []
+    folders: List[str] = []
+    size = 0
+    for root, _, file_names in os.walk(path):
+        folders.append(root)
+        for file_name in file_names:
+            file_path = os.path.join(root, file_name)
+            size += os.lstat(file_path).st_size
+            files.append(file_path)
+
+    if dry_run:
+        return size
+
+    def _remove(file_path: str):
+        if throttle:
+            throttle.wait()
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(_remove, files))
+
+    # os.walk lists a folder before its sub-folders
+    for folder in reversed(folders):
+        os.rmdir(folder)
+
+    return size
+
+
+def set_aside(path: Union[str, Path]) -> Path:
+    """
+    Rename the file or folder to a hidden name in the same folder, before removing it.
+
+    The rename is a single operation even on network file systems, the readers see the run as removed
+    immediately and a removal interrupted midway does not leave a partial run behind.
+
+    Args:
+        path (str): The file or folder to set aside
+
+    Returns:
+        Path: The new path, the path itself if it does not exist
+    """
+    path = Path(path)
+    aside = path.with_name(f".deleting.{path.name}.{os.getpid()}")
+    try:
+        os.rename(path, aside)
+    except FileNotFoundError:
+        return path
+    return aside
@@ -228,9 +228,12 @@ class Parallel(BaseTraversal):
         terminate_with_failure (bool): Whether to terminate the pipeline with a failure after this node.
         terminate_with_success (bool): Whether to terminate the pipeline with a success after this node.
         on_failure (str): The name of the node to execute if any of the branches fail.
+        reducer (str): The merge of the parameters set by the branches: last-writer, collect or module.function.
+            Defaults to last-writer.
     """
 
     branches: Dict[str, "Pipeline"]
+    reducer: str = Field(default=defaults.LAST_WRITER_REDUCER)
 
     @computed_field  # type: ignore
     @property
@@ -242,7 +245,13 @@ class Parallel(BaseTraversal):
             if not (self.terminate_with_failure or self.terminate_with_success):
                 raise AssertionError("A node not being terminated must have a user defined next node")
 
-        node = ParallelNode(name=self.name, branches=self.graph_branches, internal_name="", next_node=self.next_node)
+        node = ParallelNode(
+            name=self.name,
+            branches=self.graph_branches,
+            internal_name="",
+            next_node=self.next_node,
+            reducer=self.reducer,
+        )
         return node
 
 
@@ -259,6 +268,8 @@ class Map(BaseTraversal):
 
         iterate_as: The name of the iterable to be passed to functions.
 
+        reducer (str): The merge of the parameters set by the iterations: last-writer, collect or module.function.
+            Defaults to last-writer.
 
         overrides (Dict[str, Any]): Any overrides to the command.
 
@@ -267,6 +278,7 @@ class Map(BaseTraversal):
     branch: "Pipeline"
     iterate_on: str
     iterate_as: str
+    reducer: str = Field(default=defaults.LAST_WRITER_REDUCER)
     overrides: Dict[str, Any] = Field(default_factory=dict)
 
     @computed_field  # type: ignore
@@ -286,6 +298,7 @@ class Map(BaseTraversal):
             next_node=self.next_node,
             iterate_on=self.iterate_on,
             iterate_as=self.iterate_as,
+            reducer=self.reducer,
             overrides=self.overrides,
         )
 
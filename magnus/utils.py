@@ -350,8 +350,7 @@ def diff_dict(d1: Dict[str, Any], d2: Dict[str, Any]) -> Dict[str, Any]:
     diff = {}
 
     for k2, v2 in d2.items():
-        if k2 in d1 and d1[k2] != v2:
-            diff[k2] = v2
+        if k2 in d1 and d1[k2] == v2:
             continue
         diff[k2] = v2
 
@@ -0,0 +1,77 @@
+"""
+Compare the size and write time of the run log of a map, with the parameters of the attempts stored once as
+snapshots or copied into every attempt as before.
+
+Every iteration of the map adds a step log with an attempt carrying the same, config like, parameters.
+The file-system store rewrites the whole run log on every step, keep the iterations low for it.
+
+    python scripts/benchmarks/parameter_snapshots.py [--iterations 1000] [--keys 200] [--store chunked-fs]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from magnus.extensions.run_log_store import generic_chunked
+from magnus.extensions.run_log_store.chunked_file_system.implementation import ChunkedFileSystemRunLogStore
+from magnus.extensions.run_log_store.file_system import implementation as file_system
+from magnus.extensions.run_log_store.file_system.implementation import FileSystemRunLogstore
+
+STORES = {"chunked-fs": ChunkedFileSystemRunLogStore, "file-system": FileSystemRunLogstore}
+
+
+def synthetic_parameters(keys: int) -> Dict[str, Any]:
+    return {f"key_{i}": {"value": i, "description": f"The configuration value number {i}"} for i in range(keys)}
+
+
+def folder_size(folder: str) -> int:
+    return sum(path.stat().st_size for path in Path(folder).rglob("*") if path.is_file())
+
+
+def run(store: str, iterations: int, parameters: Dict[str, Any]):
+    log_folder = tempfile.mkdtemp()
+    run_log_store = STORES[store](log_folder=log_folder, run_index=False)
+    run_log_store.create_run_log(run_id="benchmark")
+    run_log_store.add_step_log(run_log_store.create_step_log("map", "map"), run_id="benchmark")
+    branch_logs = [run_log_store.create_branch_log(f"map.{i}") for i in range(iterations)]
+    run_log_store.add_branch_logs(branch_logs, run_id="benchmark")
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        step_log = run_log_store.create_step_log("step", f"map.{i}.step")
+        attempt_log = run_log_store.create_attempt_log()
+        attempt_log.parameters = parameters.copy()
+        step_log.attempts.append(attempt_log)
+        run_log_store.add_step_log(step_log, run_id="benchmark")
+    elapsed = time.perf_counter() - start
+
+    return elapsed, folder_size(log_folder)
+
+
+def main(store: str, iterations: int, keys: int):
+    parameters = synthetic_parameters(keys)
+
+    snapshots = run(store, iterations, parameters)
+
+    def _keep(contents: dict, snapshots: dict) -> dict:
+        return contents
+
+    # The parameters copied into every attempt, as before the snapshots
+    generic_chunked.detach_parameters = _keep  # type: ignore
+    file_system.detach_parameters = _keep  # type: ignore
+    copies = run(store, iterations, parameters)
+
+    print(f"{'case':<20}{'seconds':>10}{'MB':>10}")
+    for name, (elapsed, size) in {"copies": copies, "snapshots": snapshots}.items():
+        print(f"{name:<20}{elapsed:>10.3f}{size / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--keys", type=int, default=200)
+    parser.add_argument("--store", choices=list(STORES), default="chunked-fs")
+    arguments = parser.parse_args()
+    main(arguments.store, arguments.iterations, arguments.keys)
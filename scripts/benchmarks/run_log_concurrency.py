@@ -0,0 +1,84 @@
+"""
+Stress the file based run log stores with many processes updating a single run, as the branches of a map do.
+
+Every process adds its own step logs and updates a few step logs shared by all the processes.
+Reports the throughput, the step logs lost to concurrent updates and the errors of the workers,
+with and without the locking of the run.
+
+    python scripts/benchmarks/run_log_concurrency.py [--processes 16] [--steps 50] [--shared 4]
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from typing import Any, Dict
+
+from magnus.extensions.run_log_store.chunked_file_system.implementation import ChunkedFileSystemRunLogStore
+from magnus.extensions.run_log_store.file_system.implementation import FileSystemRunLogstore
+
+RUN_ID = "benchmark"
+
+STORES: Dict[str, Any] = {
+    "file-system": FileSystemRunLogstore,
+    "chunked-fs": ChunkedFileSystemRunLogStore,
+}
+
+
+def hammer(service_name: str, config: dict, worker: int, steps: int, shared: int, errors: Any):
+    run_log_store = STORES[service_name](**config)
+
+    for i in range(steps):
+        names = [f"worker_{worker}_{i}", f"shared_{i % shared}"]
+        for name in names:
+            try:
+                run_log_store.add_step_log(run_log_store.create_step_log(name, name), run_id=RUN_ID)
+            except Exception:  # pylint: disable=broad-except
+                with errors.get_lock():
+                    errors.value += 1
+
+
+def main(processes: int, steps: int, shared: int):
+    columns = ["seconds", "writes/s", "lost", "errors", "readable"]
+    print(f"{'store':<28}" + "".join(f"{column:>10}" for column in columns))
+
+    for service_name in STORES:
+        for locking in [True, False]:
+            with tempfile.TemporaryDirectory() as log_folder:
+                config = {"log_folder": log_folder, "locking": locking, "run_index": False}
+                STORES[service_name](**config).create_run_log(run_id=RUN_ID)
+
+                errors = multiprocessing.Value("i", 0)
+                workers = [
+                    multiprocessing.Process(target=hammer, args=(service_name, config, i, steps, shared, errors))
+                    for i in range(processes)
+                ]
+
+                start = time.perf_counter()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                elapsed = time.perf_counter() - start
+
+                expected = processes * steps + min(shared, steps)
+                try:
+                    found = len(STORES[service_name](**config).get_run_log_by_id(run_id=RUN_ID, full=True).steps)
+                    readable = "yes"
+                except Exception:  # pylint: disable=broad-except
+                    found, readable = 0, "no"
+
+                print(
+                    f"{service_name + (' locked' if locking else ' unlocked'):<28}"
+                    f"{elapsed:>10.2f}{2 * processes * steps / elapsed:>10.0f}"
+                    f"{expected - found:>10}{errors.value:>10}{readable:>10}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--shared", type=int, default=4)
+    arguments = parser.parse_args()
+    main(arguments.processes, arguments.steps, arguments.shared)
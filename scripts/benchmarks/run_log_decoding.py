@@ -0,0 +1,122 @@
+"""
+Compare the ways to decode and copy the logs of a run log store, on a synthetic map of 10k steps.
+
+Decoding validates the stored contents into the models, as the stores do, or builds them without
+validation by model_construct, as a trusted read of the contents written by magnus would.
+Copying gives every caller its own run log or step log, by pickle, by model_copy or by copy_log.
+
+    python scripts/benchmarks/run_log_decoding.py [--branches 1000] [--steps 10]
+"""
+
+import argparse
+import json
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from magnus import datastore
+
+
+def synthetic_run_log(branches: int, steps: int) -> datastore.RunLog:
+    run_log = datastore.RunLog(run_id="benchmark", status="SUCCESS")
+    map_step = datastore.StepLog(name="map", internal_name="map", status="SUCCESS", step_type="map")
+
+    for b in range(branches):
+        branch_log = datastore.BranchLog(internal_name=f"map.{b}", status="SUCCESS")
+        for i in range(steps):
+            internal_name = f"map.{b}.step_{i}"
+            step_log = datastore.StepLog(name=f"step_{i}", internal_name=internal_name, status="SUCCESS")
+            step_log.code_identities.append(
+                datastore.CodeIdentity(code_identifier="0" * 40, code_identifier_type="git", code_identifier_url="url")
+            )
+            step_log.attempts.append(
+                datastore.StepAttempt(
+                    attempt_number=1,
+                    start_time="2024-01-01 00:00:00.000000",
+                    end_time="2024-01-01 00:00:01.000000",
+                    duration="0:00:01",
+                    status="SUCCESS",
+                    parameters={"x": i, "y": f"value {i}"},
+                )
+            )
+            step_log.data_catalog.append(
+                datastore.DataCatalog(name=f"data/{i}.csv", data_hash="f" * 64, catalog_relative_path=f"data/{i}.csv")
+            )
+            branch_log.steps[internal_name] = step_log
+        map_step.branches[branch_log.internal_name] = branch_log
+
+    run_log.steps["map"] = map_step
+    return run_log
+
+
+def construct_step_log(contents: dict) -> datastore.StepLog:
+    values = dict(contents)
+    values["code_identities"] = [datastore.CodeIdentity.model_construct(**c) for c in values["code_identities"]]
+    values["attempts"] = [datastore.StepAttempt.model_construct(**a) for a in values["attempts"]]
+    values["data_catalog"] = [datastore.DataCatalog.model_construct(**d) for d in values["data_catalog"]]
+    values["branches"] = {name: construct_branch_log(branch) for name, branch in values["branches"].items()}
+    return datastore.StepLog.model_construct(**values)
+
+
+def construct_branch_log(contents: dict) -> datastore.BranchLog:
+    steps = OrderedDict((name, construct_step_log(step_log)) for name, step_log in contents["steps"].items())
+    return datastore.BranchLog.model_construct(**dict(contents, steps=steps))
+
+
+def construct_run_log(contents: dict) -> datastore.RunLog:
+    steps = OrderedDict((name, construct_step_log(step_log)) for name, step_log in contents["steps"].items())
+    return datastore.RunLog.model_construct(**dict(contents, steps=steps))
+
+
+def timed(func: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(branches: int, steps: int):
+    run_log = synthetic_run_log(branches, steps)
+    contents = json.loads(json.dumps(run_log.model_dump()))
+    payload = json.dumps(contents).encode()
+    chunks = [
+        json.loads(json.dumps(step_log.model_dump()))
+        for branch_log in run_log.steps["map"].branches.values()
+        for step_log in branch_log.steps.values()
+    ]
+
+    step_logs = [step_log for branch in run_log.steps["map"].branches.values() for step_log in branch.steps.values()]
+
+    assert construct_run_log(contents) == datastore.RunLog.model_validate(contents)
+    assert datastore.copy_log(run_log) == run_log
+
+    cases = {
+        "decode chunks, model_validate": lambda: [datastore.StepLog.model_validate(chunk) for chunk in chunks],
+        "decode chunks, model_construct": lambda: [construct_step_log(chunk) for chunk in chunks],
+        "decode run log, model_validate": lambda: datastore.RunLog.model_validate(contents),
+        "decode run log, model_construct": lambda: construct_run_log(contents),
+        "decode run log, model_validate_json": lambda: datastore.RunLog.model_validate_json(payload),
+        "copy run log, pickle": lambda: pickle.loads(pickle.dumps(run_log, protocol=pickle.HIGHEST_PROTOCOL)),
+        "copy run log, model_copy": lambda: run_log.model_copy(deep=True),
+        "copy run log, copy_log": lambda: datastore.copy_log(run_log),
+        # A lazy run log copies every step log it loads
+        "copy step logs, model_copy": lambda: [step_log.model_copy(deep=True) for step_log in step_logs],
+        "copy step logs, copy_log": lambda: [datastore.copy_log(step_log) for step_log in step_logs],
+    }
+
+    total = branches * steps
+    print(f"{'case':<40}{'seconds':>10}{'steps/s':>12}")
+    for name, case in cases.items():
+        elapsed = timed(case)
+        print(f"{name:<40}{elapsed:>10.3f}{total / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--branches", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=10)
+    arguments = parser.parse_args()
+    main(arguments.branches, arguments.steps)
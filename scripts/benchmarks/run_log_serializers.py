@@ -0,0 +1,110 @@
+"""
+Compare the serializers of the file based run log stores on a synthetic run of 10k steps.
+
+Reports the size, the time to encode and the time to decode and validate, for both the single
+document of the file-system store and the per step chunks of the chunked-fs store.
+
+    python scripts/benchmarks/run_log_serializers.py [--steps 10000]
+
+The msgpack serializer and the zstd compression are skipped if msgpack or zstandard are not installed.
+"""
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+from magnus import datastore
+from magnus.extensions.run_log_store import serializers
+
+
+def synthetic_run_log(steps: int) -> datastore.RunLog:
+    run_log = datastore.RunLog(run_id="benchmark", status="SUCCESS")
+    run_log.parameters = {f"param_{i}": i for i in range(50)}
+
+    for i in range(steps):
+        step_log = datastore.StepLog(name=f"step_{i}", internal_name=f"step_{i}", status="SUCCESS")
+        step_log.code_identities.append(
+            datastore.CodeIdentity(code_identifier="0" * 40, code_identifier_type="git", code_identifier_url="url")
+        )
+        step_log.attempts.append(
+            datastore.StepAttempt(
+                attempt_number=1,
+                start_time="2024-01-01 00:00:00.000000",
+                end_time="2024-01-01 00:00:01.000000",
+                duration="0:00:01",
+                status="SUCCESS",
+                message="",
+                parameters={"x": i, "y": f"value {i}"},
+            )
+        )
+        step_log.data_catalog.append(
+            datastore.DataCatalog(name=f"data/{i}.csv", data_hash="f" * 64, catalog_relative_path=f"data/{i}.csv")
+        )
+        run_log.steps[step_log.internal_name] = step_log
+
+    return run_log
+
+
+def timed(func: Callable[[], object], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def formats() -> List[Tuple[str, str]]:
+    available = []
+    for serializer in serializers.SERIALIZERS:
+        for compression in serializers.COMPRESSIONS:
+            try:
+                serializers.loads(serializers.dumps({"probe": 1}, serializer=serializer, compression=compression))
+            except Exception:  # pylint: disable=broad-except
+                print(f"Skipping {serializer} {compression or 'uncompressed'}, not installed")
+                continue
+            available.append((serializer, compression))
+    return available
+
+
+def main(steps: int):
+    run_log = synthetic_run_log(steps)
+    document = run_log.model_dump()
+    chunks = [step_log.model_dump() for step_log in run_log.steps.values()]
+
+    available = formats()
+
+    print(f"orjson {'is' if serializers._orjson() else 'is not'} installed")
+    columns = ["document MB", "encode s", "decode s", "chunks MB", "encode s", "decode s"]
+    print(f"{'format':<26}" + "".join(f"{column:>12}" for column in columns))
+
+    for serializer, compression in available:
+
+        def dump_document():
+            return serializers.dumps(document, serializer=serializer, compression=compression)
+
+        def dump_chunks():
+            return [serializers.dumps(chunk, serializer=serializer, compression=compression) for chunk in chunks]
+
+        payload = dump_document()
+        payloads = dump_chunks()
+        chunks_size = sum(len(chunk) for chunk in payloads)
+
+        def load_document():
+            datastore.RunLog.model_validate(serializers.loads(payload))
+
+        def load_chunks():
+            for chunk in payloads:
+                datastore.StepLog.model_validate(serializers.loads(chunk))
+
+        print(
+            f"{serializer + ' ' + (compression or 'uncompressed'):<26}"
+            f"{len(payload) / 1e6:>12.2f}{timed(dump_document):>12.3f}{timed(load_document):>12.3f}"
+            f"{chunks_size / 1e6:>12.2f}{timed(dump_chunks):>12.3f}{timed(load_chunks):>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=10000)
+    main(parser.parse_args().steps)
@@ -0,0 +1,86 @@
+"""
+Compare many processes writing a single run through the run log server to writing the run log store directly.
+
+Every process adds its own step logs to the run, as the branches of a map do. The remote stores connect to a
+run log server, started in this process, serving a chunked-fs store over a Unix socket or HTTP, with and
+without write_behind batching the writes of a process into a single request.
+
+    python scripts/benchmarks/run_log_server.py [--processes 16] [--steps 50]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict
+
+from magnus.extensions.run_log_store.chunked_file_system.implementation import ChunkedFileSystemRunLogStore
+from magnus.extensions.run_log_store.remote.implementation import RemoteRunLogStore
+from magnus.extensions.run_log_store.remote.server import RunLogServer
+
+RUN_ID = "benchmark"
+
+STORES: Dict[str, Any] = {
+    "chunked-fs": ChunkedFileSystemRunLogStore,
+    "remote": RemoteRunLogStore,
+}
+
+
+def hammer(service_name: str, config: dict, worker: int, steps: int):
+    run_log_store = STORES[service_name](**config)
+
+    for i in range(steps):
+        name = f"worker_{worker}_{i}"
+        run_log_store.add_step_log(run_log_store.create_step_log(name, name), run_id=RUN_ID)
+    run_log_store.flush()
+
+
+def run(label: str, service_name: str, config: dict, processes: int, steps: int, check: Any):
+    workers = [multiprocessing.Process(target=hammer, args=(service_name, config, i, steps)) for i in range(processes)]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    found = len(check.get_run_log_by_id(run_id=RUN_ID, full=True).steps)
+    print(f"{label:<32}{elapsed:>10.2f}{processes * steps / elapsed:>10.0f}{processes * steps - found:>10}")
+
+
+def main(processes: int, steps: int):
+    print(f"{'store':<32}" + "".join(f"{column:>10}" for column in ["seconds", "writes/s", "lost"]))
+
+    with tempfile.TemporaryDirectory() as log_folder:
+        config = {"log_folder": log_folder, "run_index": False}
+        store = ChunkedFileSystemRunLogStore(**config)
+        store.create_run_log(run_id=RUN_ID)
+        run("chunked-fs direct", "chunked-fs", config, processes, steps, store)
+
+    for transport in ["unix", "http"]:
+        for write_behind in [False, True]:
+            with tempfile.TemporaryDirectory() as log_folder:
+                store = ChunkedFileSystemRunLogStore(log_folder=log_folder, run_index=False)
+                socket_path = os.path.join(log_folder, "runlog.sock") if transport == "unix" else ""
+                server = RunLogServer(store, socket_path=socket_path)
+                thread = threading.Thread(target=server.serve_forever, daemon=True)
+                thread.start()
+
+                store.create_run_log(run_id=RUN_ID)
+                config = {"url": server.url, "write_behind": write_behind}
+                label = f"remote {transport}" + (" write-behind" if write_behind else "")
+                run(label, "remote", config, processes, steps, store)
+
+                server.shutdown()
+                thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=50)
+    arguments = parser.parse_args()
+    main(arguments.processes, arguments.steps)
@@ -1,4 +1,23 @@
-from magnus.extensions.catalog import is_catalog_out_of_sync
+import errno
+import os
+import stat
+import time
+from pathlib import Path
+
+import pytest
+
+from magnus import extensions, utils
+from magnus.datastore import DataCatalog
+from magnus.extensions.catalog import (
+    ParentFolders,
+    copy_and_hash,
+    is_catalog_out_of_sync,
+    is_cataloged,
+    link_and_hash,
+    link_file,
+    transfer_files,
+    validate_link_mode,
+)
 
 
 def test_is_catalog_out_of_sync_returns_true_for_empty_synced_catalogs():
@@ -50,3 +69,154 @@ def test_is_catalog_out_of_sync_returns_true_for_different_paths():
 
     synced_catalog = [catalog_item1]
     assert is_catalog_out_of_sync(catalog_item2, synced_catalog) is True
+
+
+def test_transfer_files_returns_the_results_in_the_order_of_the_files():
+    def _transfer(delay):
+        time.sleep(delay)
+        return delay
+
+    assert transfer_files(_transfer, [0.03, 0.0, 0.01], max_workers=3) == [0.03, 0.0, 0.01]
+
+
+def test_transfer_files_attempts_every_file_and_raises_the_failures_together():
+    attempted = []
+
+    def _transfer(file):
+        attempted.append(file)
+        if file in ["b", "d"]:
+            raise ValueError(f"bad {file}")
+        return file
+
+    for max_workers in [1, 4]:
+        attempted.clear()
+        with pytest.raises(Exception, match="Could not transfer 2 of 4 files:\nb: bad b\nd: bad d"):
+            transfer_files(_transfer, ["a", "b", "c", "d"], max_workers=max_workers)
+        assert sorted(attempted) == ["a", "b", "c", "d"]
+
+
+def test_parent_folders_makes_every_folder_once(tmp_path, mocker):
+    mock_mkdir = mocker.patch.object(Path, "mkdir", autospec=True)
+    parent_folders = ParentFolders()
+
+    parent_folders.make(tmp_path / "a" / "b" / "file1")
+    parent_folders.make(tmp_path / "a" / "b" / "file2")
+    parent_folders.make(tmp_path / "a" / "file3")
+
+    assert [call.args[0] for call in mock_mkdir.call_args_list] == [tmp_path / "a" / "b", tmp_path / "a"]
+
+
+def _is_writable(path: Path) -> bool:
+    return bool(path.stat().st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+@pytest.fixture
+def source(tmp_path):
+    source = tmp_path / "source.csv"
+    source.write_text("1,2")
+    return source
+
+
+def test_validate_link_mode_raises_for_unknown_modes():
+    assert validate_link_mode("hardlink") == "hardlink"
+    with pytest.raises(ValueError, match="Unsupported link mode"):
+        validate_link_mode("move")
+
+
+def test_link_file_copies_into_a_writable_file(source, tmp_path):
+    source.chmod(0o444)
+
+    assert link_file(source, tmp_path / "copy.csv", link_mode="copy") == "copy"
+
+    assert (tmp_path / "copy.csv").read_text() == "1,2"
+    assert not os.path.samefile(source, tmp_path / "copy.csv")
+    assert _is_writable(tmp_path / "copy.csv")
+
+
+def test_link_file_hardlinks_and_protects_the_file(source, tmp_path):
+    assert link_file(source, tmp_path / "link.csv", link_mode="hardlink") == "hardlink"
+
+    assert os.path.samefile(source, tmp_path / "link.csv")
+    assert not _is_writable(source)
+
+
+def test_link_file_falls_back_to_a_copy_across_devices(source, tmp_path, monkeypatch):
+    def _cross_device(*args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(extensions.catalog.os, "link", _cross_device)
+
+    assert link_file(source, tmp_path / "link.csv", link_mode="hardlink") == "copy"
+
+    assert (tmp_path / "link.csv").read_text() == "1,2"
+    assert _is_writable(source)
+
+
+def test_link_file_symlinks_to_the_protected_source(source, tmp_path):
+    assert link_file(source, tmp_path / "link.csv", link_mode="symlink") == "symlink"
+
+    assert os.readlink(tmp_path / "link.csv") == str(source)
+    assert not _is_writable(source)
+
+
+def test_link_file_falls_back_to_a_copy_if_reflink_is_not_supported(source, tmp_path, monkeypatch):
+    def _not_supported(*args):
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(extensions.catalog, "_reflink", _not_supported)
+
+    assert link_file(source, tmp_path / "reflink.csv", link_mode="reflink") == "copy"
+    assert (tmp_path / "reflink.csv").read_text() == "1,2"
+
+
+def test_link_file_reflinks_or_copies_the_contents(source, tmp_path):
+    # The file system of the tests may or may not support copy on write
+    assert link_file(source, tmp_path / "reflink.csv", link_mode="reflink") in ["reflink", "copy"]
+
+    assert (tmp_path / "reflink.csv").read_text() == "1,2"
+    assert not os.path.samefile(source, tmp_path / "reflink.csv")
+
+
+def test_link_file_replaces_the_destination(source, tmp_path):
+    (tmp_path / "link.csv").symlink_to(tmp_path / "missing")
+
+    link_file(source, tmp_path / "link.csv", link_mode="hardlink")
+
+    assert (tmp_path / "link.csv").read_text() == "1,2"
+
+
+def test_is_cataloged_matches_the_catalog_relative_path_only():
+    catalog = DataCatalog(name="data", catalog_relative_path="run/data", data_hash="changed")
+    synced_catalogs = [DataCatalog(name="data", catalog_relative_path="run/data", data_hash="hash")]
+
+    assert is_cataloged(catalog, synced_catalogs)
+    assert not is_cataloged(catalog, [DataCatalog(name="other", catalog_relative_path="run/other")])
+    assert not is_cataloged(catalog, None)
+
+
+@pytest.mark.parametrize("contents", [b"", b"1,2", bytes(range(256)) * 100])
+def test_copy_and_hash_copies_and_hashes_in_one_pass(tmp_path, contents):
+    (tmp_path / "source.bin").write_bytes(contents)
+
+    data_hash = copy_and_hash(tmp_path / "source.bin", tmp_path / "copy.bin", buffer_size=1000)
+
+    assert (tmp_path / "copy.bin").read_bytes() == contents
+    assert data_hash == utils.get_data_hash(str(tmp_path / "source.bin"))
+
+
+def test_link_and_hash_hashes_while_copying(source, tmp_path, mocker):
+    spy_get_data_hash = mocker.spy(extensions.catalog.utils, "get_data_hash")
+
+    mode, data_hash = link_and_hash(source, tmp_path / "copy.csv", link_mode="copy")
+
+    assert mode == "copy"
+    assert data_hash == utils.get_data_hash(str(source))
+    assert spy_get_data_hash.call_count == 1  # Only by the assertion
+    assert _is_writable(tmp_path / "copy.csv")
+
+
+def test_link_and_hash_hashes_the_linked_file(source, tmp_path):
+    mode, data_hash = link_and_hash(source, tmp_path / "link.csv", link_mode="hardlink")
+
+    assert mode == "hardlink"
+    assert data_hash == utils.get_data_hash(str(source))
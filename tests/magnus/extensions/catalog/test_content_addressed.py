@@ -0,0 +1,209 @@
+import os
+
+import pytest
+
+from magnus import utils
+from magnus.extensions.catalog import hash_cache
+from magnus.extensions.catalog.content_addressed import implementation
+from magnus.extensions.catalog.content_addressed.implementation import ContentAddressedCatalog
+
+
+@pytest.fixture(autouse=True)
+def mock_context(mocker):
+    mock_context = mocker.MagicMock()
+    mocker.patch(
+        "magnus.catalog.BaseCatalog._context",
+        new_callable=mocker.PropertyMock,
+        return_value=mock_context,
+    )
+    return mock_context
+
+
+@pytest.fixture
+def catalog_handler(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    return ContentAddressedCatalog(catalog_location=str(tmp_path / "catalog"))
+
+
+def _blobs(tmp_path):
+    return sorted(path.name for path in (tmp_path / "catalog" / implementation.BLOBS_FOLDER).glob("*/*"))
+
+
+def test_content_addressed_catalog_put_stores_the_contents_once(catalog_handler, tmp_path):
+    (tmp_path / "data" / "a.csv").write_text("same")
+    (tmp_path / "data" / "b.csv").write_text("same")
+
+    data_catalogs = catalog_handler.put(name="data/*", run_id="run")
+
+    data_hash = utils.get_data_hash(str(tmp_path / "data" / "a.csv"))
+    assert _blobs(tmp_path) == [data_hash]
+    assert [data_catalog.data_hash for data_catalog in data_catalogs] == [data_hash, data_hash]
+    assert (tmp_path / "catalog" / "run" / "data" / "a.csv").read_text() == data_hash
+    assert (tmp_path / "catalog" / "run" / "data" / "b.csv").read_text() == data_hash
+
+
+def test_content_addressed_catalog_put_does_not_copy_stored_contents(catalog_handler, tmp_path, mocker, monkeypatch):
+    monkeypatch.setattr(hash_cache, "RACY_SECONDS", 0)
+    (tmp_path / "data" / "a.csv").write_text("same")
+    catalog_handler.put(name="data/*", run_id="run")
+
+    spy_link_file = mocker.spy(implementation, "link_file")
+    spy_link_and_hash = mocker.spy(ContentAddressedCatalog, "link_and_hash")
+    catalog_handler.put(name="data/*", run_id="other")
+
+    assert spy_link_file.call_count == 0
+    assert spy_link_and_hash.call_count == 0
+    assert (tmp_path / "catalog" / "other" / "data" / "a.csv").exists()
+
+
+def test_content_addressed_catalog_put_hashes_new_files_while_copying(catalog_handler, tmp_path, mocker):
+    (tmp_path / "data" / "a.csv").write_text("same")
+    (tmp_path / "data" / "b.csv").write_text("same")
+    spy_get_data_hash = mocker.spy(implementation.utils, "get_data_hash")
+    spy_hash_cache = mocker.spy(hash_cache.HashCache, "get_data_hash")
+
+    data_catalogs = catalog_handler.put(name="data/*", run_id="run")
+
+    assert spy_get_data_hash.call_count == 0
+    assert spy_hash_cache.call_count == 0
+    data_hash = utils.get_data_hash(str(tmp_path / "data" / "a.csv"))
+    assert [data_catalog.data_hash for data_catalog in data_catalogs] == [data_hash, data_hash]
+    assert _blobs(tmp_path) == [data_hash]
+    assert [path.name for path in (tmp_path / "catalog" / implementation.BLOBS_FOLDER).iterdir()] == [data_hash[:2]]
+
+
+def test_content_addressed_catalog_put_never_links_the_blob_to_the_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "a.csv").write_text("contents")
+    catalog_handler = ContentAddressedCatalog(catalog_location=str(tmp_path / "catalog"), link_mode="hardlink")
+
+    data_catalogs = catalog_handler.put(name="data/*", run_id="run")
+    (tmp_path / "data" / "a.csv").write_text("changed")
+
+    blob = catalog_handler.get_blob_path(data_catalogs[0].data_hash)
+    assert blob.read_text() == "contents"
+
+
+def test_content_addressed_catalog_put_skips_unchanged_synced_catalogs(catalog_handler, tmp_path):
+    (tmp_path / "data" / "a.csv").write_text("same")
+    synced_catalogs = catalog_handler.put(name="data/*", run_id="run")
+    (tmp_path / "catalog" / "run" / "data" / "a.csv").unlink()
+
+    catalog_handler.put(name="data/*", run_id="run", synced_catalogs=synced_catalogs)
+
+    assert not (tmp_path / "catalog" / "run" / "data" / "a.csv").exists()
+
+
+def test_content_addressed_catalog_put_raises_exception_if_nothing_matches(catalog_handler):
+    with pytest.raises(Exception, match="Did not find any files matching"):
+        catalog_handler.put(name="data/*", run_id="run")
+
+
+def test_content_addressed_catalog_get_materializes_the_files_from_the_blobs(catalog_handler, tmp_path):
+    (tmp_path / "data" / "nested").mkdir()
+    (tmp_path / "data" / "nested" / "a.csv").write_text("contents")
+    catalog_handler.put(name="data/**/*", run_id="run")
+    (tmp_path / "data" / "nested" / "a.csv").unlink()
+
+    data_catalogs = catalog_handler.get(name="data/**/*", run_id="run")
+
+    assert (tmp_path / "data" / "nested" / "a.csv").read_text() == "contents"
+    assert [data_catalog.catalog_relative_path for data_catalog in data_catalogs] == [
+        os.path.join("data", "nested", "a.csv")
+    ]
+    assert data_catalogs[0].stage == "get"
+
+
+def test_content_addressed_catalog_get_raises_exception_if_blob_is_missing(catalog_handler, tmp_path):
+    (tmp_path / "data" / "a.csv").write_text("contents")
+    catalog_handler.put(name="data/*", run_id="run")
+    for blob in (tmp_path / "catalog" / implementation.BLOBS_FOLDER).glob("*/*"):
+        blob.unlink()
+
+    with pytest.raises(Exception, match="are not in"):
+        catalog_handler.get(name="data/*", run_id="run")
+
+
+def test_content_addressed_catalog_get_raises_exception_if_catalog_does_not_exist(catalog_handler):
+    with pytest.raises(Exception, match="Expected Catalog to be present at"):
+        catalog_handler.get(name="*", run_id="run")
+
+
+def test_content_addressed_catalog_sync_between_runs_copies_only_the_manifest(catalog_handler, tmp_path):
+    (tmp_path / "data" / "a.csv").write_text("contents")
+    catalog_handler.put(name="data/*", run_id="run")
+
+    catalog_handler.sync_between_runs(previous_run_id="run", run_id="re-run")
+    (tmp_path / "data" / "a.csv").unlink()
+    catalog_handler.get(name="data/*", run_id="re-run")
+
+    assert (tmp_path / "data" / "a.csv").read_text() == "contents"
+    assert len(_blobs(tmp_path)) == 1
+
+
+def test_content_addressed_catalog_delete_run_keeps_the_blobs_of_other_runs(catalog_handler, tmp_path, monkeypatch):
+    # The modification time of a blob can be ahead of time.time(), within the resolution of the file system
+    monkeypatch.setattr(implementation, "BLOB_GRACE_SECONDS", -1)
+    (tmp_path / "data" / "shared.csv").write_text("shared")
+    catalog_handler.put(name="data/*", run_id="other")
+    (tmp_path / "data" / "own.csv").write_text("own")
+    catalog_handler.put(name="data/*", run_id="run")
+    manifest_size = sum(path.stat().st_size for path in (tmp_path / "catalog" / "run").rglob("*") if path.is_file())
+
+    assert catalog_handler.delete_run(run_id="run", dry_run=True) == manifest_size + len("own")
+    assert len(_blobs(tmp_path)) == 2
+
+    assert catalog_handler.delete_run(run_id="run") == manifest_size + len("own")
+    assert _blobs(tmp_path) == [utils.get_data_hash(str(tmp_path / "data" / "shared.csv"))]
+    assert [path.name for path in (tmp_path / "catalog").iterdir() if not path.name.startswith(".")] == ["other"]
+
+
+def _age_blobs(tmp_path, seconds=3600):
+    for blob in (tmp_path / "catalog" / implementation.BLOBS_FOLDER).glob("*/*"):
+        past = blob.stat().st_mtime - seconds
+        os.utime(blob, (past, past))
+
+
+def test_content_addressed_catalog_delete_run_counts_the_references_once_for_many_runs(
+    catalog_handler, tmp_path, mocker
+):
+    (tmp_path / "data" / "shared.csv").write_text("shared")
+    for run_id in ["a", "b", "c"]:
+        catalog_handler.put(name="data/*", run_id=run_id)
+    (tmp_path / "data" / "own.csv").write_text("own")
+    catalog_handler.put(name="data/own.csv", run_id="c")
+    _age_blobs(tmp_path)
+
+    spy_count_references = mocker.spy(ContentAddressedCatalog, "_count_references")
+    for run_id in ["a", "b"]:
+        catalog_handler.delete_run(run_id=run_id)
+
+    # The manifest of every deleted run and one count of all the references
+    assert spy_count_references.call_count == 3
+    assert len(_blobs(tmp_path)) == 2
+
+    assert catalog_handler.delete_run(run_id="c") == 2 * 64 + len("shared") + len("own")
+    assert _blobs(tmp_path) == []
+
+
+def test_content_addressed_catalog_sync_between_runs_touches_the_blobs(catalog_handler, tmp_path):
+    (tmp_path / "data" / "a.csv").write_text("contents")
+    catalog_handler.put(name="data/*", run_id="run")
+    _age_blobs(tmp_path)
+    catalog_handler._all_references()  # A gc counted the references before the sync
+
+    catalog_handler.sync_between_runs(previous_run_id="run", run_id="re-run")
+    catalog_handler.delete_run(run_id="run")
+
+    assert len(_blobs(tmp_path)) == 1
+
+
+def test_content_addressed_catalog_delete_run_keeps_recently_used_blobs(catalog_handler, tmp_path):
+    (tmp_path / "data" / "own.csv").write_text("own")
+    catalog_handler.put(name="data/*", run_id="run")
+
+    catalog_handler.delete_run(run_id="run")
+
+    assert len(_blobs(tmp_path)) == 1
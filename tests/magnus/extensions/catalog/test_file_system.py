@@ -1,8 +1,10 @@
 import pytest
 import tempfile
 import os
+import shutil
 
 from magnus import defaults
+from magnus.datastore import DataCatalog
 from magnus.extensions.catalog.file_system.implementation import FileSystemCatalog
 import magnus.extensions.catalog.file_system.implementation as implementation
 
@@ -160,6 +162,7 @@ def test_file_system_catalog_put_copies_files_from_compute_folder_to_catalog_if_
 
 
 def test_file_system_catalog_put_copies_files_from_compute_folder_to_catalog_if_synced_true(mocker, monkeypatch):
+    monkeypatch.setattr(implementation, "is_cataloged", mocker.MagicMock(return_value=True))
     monkeypatch.setattr(implementation, "is_catalog_out_of_sync", mocker.MagicMock(return_value=False))
     mock_run_store = mocker.MagicMock()
     mock_context = mocker.MagicMock()
@@ -256,3 +259,186 @@ def test_file_system_sync_between_runs_raises_exception_if_previous_catalog_does
     catalog_handler = FileSystemCatalog(catalog_location="this_location")
     with pytest.raises(Exception):
         catalog_handler.sync_between_runs("previous", "current")
+
+
+def test_file_system_catalog_delete_run_removes_the_catalog_of_the_run(tmp_path):
+    (tmp_path / "run" / "data").mkdir(parents=True)
+    (tmp_path / "run" / "data" / "data.csv").write_bytes(b"1,2")
+    (tmp_path / "other").mkdir()
+    catalog_handler = FileSystemCatalog(catalog_location=str(tmp_path))
+
+    assert catalog_handler.delete_run(run_id="run", dry_run=True) == 3
+    assert (tmp_path / "run" / "data" / "data.csv").exists()
+
+    assert catalog_handler.delete_run(run_id="run") == 3
+    assert os.listdir(tmp_path) == ["other"]
+
+
+def test_file_system_catalog_get_does_not_copy_files_already_in_the_compute_folder(tmp_path, monkeypatch, mocker):
+    mocker.patch("magnus.catalog.BaseCatalog._context", new_callable=mocker.PropertyMock)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "catalog" / "run" / "data").mkdir(parents=True)
+    (tmp_path / "catalog" / "run" / "data" / "data.csv").write_text("1,2")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "data.csv").write_text("1,2")
+    spy_link_file = mocker.spy(implementation, "link_file")
+
+    catalog_handler = FileSystemCatalog(catalog_location=str(tmp_path / "catalog"))
+    catalog_handler.get(name="data/*", run_id="run")
+
+    assert spy_link_file.call_count == 0
+
+    (tmp_path / "data" / "data.csv").write_text("3,4")
+    catalog_handler.get(name="data/*", run_id="run")
+
+    assert spy_link_file.call_count == 1
+    assert (tmp_path / "data" / "data.csv").read_text() == "1,2"
+
+
+def test_file_system_catalog_get_data_hash_uses_the_hash_cache_of_the_catalog_location(tmp_path):
+    (tmp_path / "data.csv").write_text("1,2")
+
+    catalog_handler = FileSystemCatalog(catalog_location=str(tmp_path / "catalog"))
+    data_hash = catalog_handler.get_data_hash(str(tmp_path / "data.csv"))
+
+    assert data_hash == implementation.utils.get_data_hash(str(tmp_path / "data.csv"))
+    assert (tmp_path / "catalog" / implementation.HASH_CACHE_FILE).exists()
+    assert catalog_handler.cache_stats()["bytes_hashed"] == 3
+
+
+def test_file_system_catalog_get_data_hash_without_the_hash_cache(tmp_path):
+    (tmp_path / "data.csv").write_text("1,2")
+
+    catalog_handler = FileSystemCatalog(catalog_location=str(tmp_path / "catalog"), hash_cache=False)
+    catalog_handler.get_data_hash(str(tmp_path / "data.csv"))
+
+    assert not (tmp_path / "catalog").exists()
+    assert catalog_handler.cache_stats() == {}
+
+
+def test_file_system_catalog_put_and_get_many_files_concurrently(tmp_path, monkeypatch, mocker):
+    mock_context = mocker.patch("magnus.catalog.BaseCatalog._context", new_callable=mocker.PropertyMock)
+    mock_context.return_value.run_log_store.create_data_catalog.side_effect = lambda name: DataCatalog(name=name)
+    monkeypatch.chdir(tmp_path)
+    for i in range(20):
+        (tmp_path / "data" / f"shard{i % 3}").mkdir(parents=True, exist_ok=True)
+        (tmp_path / "data" / f"shard{i % 3}" / f"{i}.csv").write_text(str(i))
+
+    catalog_handler = FileSystemCatalog(catalog_location=str(tmp_path / "catalog"), max_workers=4)
+    put = catalog_handler.put(name="data/**/*.csv", run_id="run")
+
+    assert [data_catalog.name for data_catalog in put] == [
+        str(file.relative_to(tmp_path)) for file in (tmp_path / "data").glob("**/*.csv")
+    ]
+
+    shutil.rmtree(tmp_path / "data")
+    got = catalog_handler.get(name="data/**/*.csv", run_id="run")
+
+    assert sorted(data_catalog.data_hash for data_catalog in got) == sorted(
+        data_catalog.data_hash for data_catalog in put
+    )
+    assert (tmp_path / "data" / "shard1" / "7.csv").read_text() == "7"
+
+
+def test_file_system_catalog_sync_between_runs_copies_nested_files(tmp_path):
+    (tmp_path / "previous" / "data" / "nested").mkdir(parents=True)
+    (tmp_path / "previous" / "data" / "nested" / "data.csv").write_text("1,2")
+    (tmp_path / "previous" / "step.execution.log").write_text("log")
+
+    catalog_handler = FileSystemCatalog(catalog_location=str(tmp_path))
+    catalog_handler.sync_between_runs(previous_run_id="previous", run_id="current")
+
+    assert (tmp_path / "current" / "data" / "nested" / "data.csv").read_text() == "1,2"
+    assert not (tmp_path / "current" / "step.execution.log").exists()
+
+
+def test_file_system_catalog_raises_for_unknown_link_mode():
+    with pytest.raises(ValueError, match="Unsupported link mode"):
+        FileSystemCatalog(link_mode="move")
+
+
+@pytest.mark.parametrize("link_mode", ["hardlink", "symlink"])
+def test_file_system_catalog_does_not_link_the_files_put(tmp_path, monkeypatch, mocker, link_mode):
+    mocker.patch("magnus.catalog.BaseCatalog._context", new_callable=mocker.PropertyMock)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "data.csv").write_text("1,2")
+    mode = (tmp_path / "data" / "data.csv").stat().st_mode
+
+    catalog_handler = FileSystemCatalog(catalog_location=str(tmp_path / "catalog"), link_mode=link_mode)
+    catalog_handler.put(name="data/*", run_id="run")
+    catalog_handler.sync_between_runs(previous_run_id="run", run_id="re-run")
+
+    cataloged = tmp_path / "catalog" / "run" / "data" / "data.csv"
+    synced = tmp_path / "catalog" / "re-run" / "data" / "data.csv"
+    assert not cataloged.is_symlink() and not synced.is_symlink()
+    assert not os.path.samefile(tmp_path / "data" / "data.csv", cataloged)
+    assert not os.path.samefile(cataloged, synced)
+    assert (tmp_path / "data" / "data.csv").stat().st_mode == mode
+
+
+def test_file_system_catalog_symlinks_on_get_but_copies_on_put(tmp_path, monkeypatch, mocker):
+    mocker.patch("magnus.catalog.BaseCatalog._context", new_callable=mocker.PropertyMock)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "data.csv").write_text("1,2")
+
+    catalog_handler = FileSystemCatalog(catalog_location=str(tmp_path / "catalog"), link_mode="symlink")
+    catalog_handler.put(name="data/*", run_id="run")
+
+    assert not (tmp_path / "catalog" / "run" / "data" / "data.csv").is_symlink()
+
+    (tmp_path / "data" / "data.csv").unlink()
+    catalog_handler.get(name="data/*", run_id="run")
+
+    assert (tmp_path / "data" / "data.csv").is_symlink()
+    assert (tmp_path / "data" / "data.csv").read_text() == "1,2"
+
+
+@pytest.fixture
+def single_pass_catalog(tmp_path, monkeypatch, mocker):
+    mock_context = mocker.MagicMock()
+    mock_context.run_log_store.create_data_catalog.side_effect = lambda name: DataCatalog(name=name)
+    mocker.patch("magnus.catalog.BaseCatalog._context", new_callable=mocker.PropertyMock, return_value=mock_context)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "data.csv").write_text("1,2")
+
+    return FileSystemCatalog(catalog_location=str(tmp_path / "catalog"), link_mode="copy")
+
+
+def test_file_system_catalog_put_hashes_new_files_while_copying(single_pass_catalog, tmp_path, mocker):
+    spy_get_data_hash = mocker.spy(implementation.utils, "get_data_hash")
+    spy_hash_cache = mocker.spy(implementation.HashCache, "get_data_hash")
+
+    data_catalogs = single_pass_catalog.put(name="data/*", run_id="run")
+
+    assert spy_get_data_hash.call_count == 0
+    assert spy_hash_cache.call_count == 0
+    assert data_catalogs[0].data_hash == implementation.utils.get_data_hash(str(tmp_path / "data" / "data.csv"))
+    assert (tmp_path / "catalog" / "run" / "data" / "data.csv").read_text() == "1,2"
+
+
+def test_file_system_catalog_put_hashes_synced_files_before_copying(single_pass_catalog, tmp_path, mocker):
+    synced_catalogs = single_pass_catalog.put(name="data/*", run_id="run")
+    (tmp_path / "catalog" / "run" / "data" / "data.csv").unlink()
+
+    spy_link_and_hash = mocker.spy(implementation, "link_and_hash")
+    spy_link_file = mocker.spy(implementation, "link_file")
+    single_pass_catalog.put(name="data/*", run_id="run", synced_catalogs=synced_catalogs)
+
+    assert spy_link_and_hash.call_count == 0
+    assert spy_link_file.call_count == 0
+    assert not (tmp_path / "catalog" / "run" / "data" / "data.csv").exists()
+
+
+def test_file_system_catalog_get_hashes_missing_files_while_copying(single_pass_catalog, tmp_path, mocker):
+    single_pass_catalog.put(name="data/*", run_id="run")
+    (tmp_path / "data" / "data.csv").unlink()
+
+    spy_get_data_hash = mocker.spy(implementation.utils, "get_data_hash")
+    data_catalogs = single_pass_catalog.get(name="data/*", run_id="run")
+
+    assert spy_get_data_hash.call_count == 0
+    assert data_catalogs[0].data_hash == implementation.utils.get_data_hash(str(tmp_path / "data" / "data.csv"))
+    assert (tmp_path / "data" / "data.csv").read_text() == "1,2"
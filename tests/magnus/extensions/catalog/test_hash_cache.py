@@ -0,0 +1,99 @@
+import os
+import time
+
+import pytest
+
+from magnus import utils
+from magnus.extensions.catalog import hash_cache
+from magnus.extensions.catalog.hash_cache import HashCache
+from magnus.extensions.run_log_store.cache import file_token
+
+
+def _old_file(path, contents: str):
+    path.write_text(contents)
+    an_hour_ago = time.time() - 3600
+    os.utime(path, (an_hour_ago, an_hour_ago))
+    return str(path)
+
+
+def test_hash_cache_serves_unchanged_files_from_the_cache(tmp_path, mocker):
+    file_name = _old_file(tmp_path / "data.csv", "1,2")
+    spy_get_data_hash = mocker.spy(hash_cache.utils, "get_data_hash")
+
+    cache = HashCache(str(tmp_path / "hashes.db"))
+    first = cache.get_data_hash(file_name)
+    second = HashCache(str(tmp_path / "hashes.db")).get_data_hash(file_name)
+
+    assert first == second == utils.get_data_hash(file_name)
+    assert spy_get_data_hash.call_count == 2  # Once by the cache and once by the assertion
+    assert cache.stats() == {"hits": 0, "misses": 1, "bytes_hashed": 3, "bytes_cached": 0}
+
+
+def test_hash_cache_counts_the_bytes_served_from_the_cache(tmp_path):
+    file_name = _old_file(tmp_path / "data.csv", "1,2")
+
+    cache = HashCache(str(tmp_path / "hashes.db"))
+    cache.get_data_hash(file_name)
+    cache.get_data_hash(file_name)
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "bytes_hashed": 3, "bytes_cached": 3}
+
+
+def test_hash_cache_hashes_modified_files_again(tmp_path):
+    file_name = _old_file(tmp_path / "data.csv", "1,2")
+    cache = HashCache(str(tmp_path / "hashes.db"))
+    cache.get_data_hash(file_name)
+
+    _old_file(tmp_path / "data.csv", "3,4,5")
+
+    assert cache.get_data_hash(file_name) == utils.get_data_hash(file_name)
+    assert cache.misses == 2
+
+
+def test_hash_cache_does_not_cache_recently_modified_files(tmp_path):
+    (tmp_path / "data.csv").write_text("1,2")
+    cache = HashCache(str(tmp_path / "hashes.db"))
+
+    cache.get_data_hash(str(tmp_path / "data.csv"))
+    cache.get_data_hash(str(tmp_path / "data.csv"))
+
+    assert cache.misses == 2
+
+
+def test_hash_cache_hashes_without_the_cache_if_the_database_cannot_be_used(tmp_path):
+    file_name = _old_file(tmp_path / "data.csv", "1,2")
+    (tmp_path / "hashes.db").mkdir()
+
+    cache = HashCache(str(tmp_path / "hashes.db"))
+
+    assert cache.get_data_hash(file_name) == utils.get_data_hash(file_name)
+
+
+def test_hash_cache_raises_if_file_does_not_exist(tmp_path):
+    cache = HashCache(str(tmp_path / "hashes.db"))
+
+    with pytest.raises(FileNotFoundError):
+        cache.get_data_hash(str(tmp_path / "missing"))
+
+
+def test_hash_cache_serves_recorded_hashes(tmp_path):
+    file_name = _old_file(tmp_path / "data.csv", "1,2")
+    cache = HashCache(str(tmp_path / "hashes.db"))
+
+    assert cache.lookup(file_name) is None
+
+    cache.record(file_name, "recorded", file_token(file_name))
+
+    assert cache.lookup(file_name) == "recorded"
+    assert cache.stats() == {"hits": 1, "misses": 1, "bytes_hashed": 3, "bytes_cached": 3}
+
+
+def test_hash_cache_does_not_record_hashes_of_files_changed_since(tmp_path):
+    file_name = _old_file(tmp_path / "data.csv", "1,2")
+    cache = HashCache(str(tmp_path / "hashes.db"))
+    token = file_token(file_name)
+
+    _old_file(tmp_path / "data.csv", "3,4,5")
+    cache.record(file_name, "stale", token)
+
+    assert cache.lookup(file_name) is None
@@ -1,7 +1,10 @@
-import pytest
+import json
 import logging
 
+import pytest
+
 from magnus import defaults, exceptions
+from magnus.datastore import BranchLog, LazyRunLog, LogStatus, RunLog, RunLogTreeSource, StepLog
 from magnus.extensions.executor import GenericExecutor
 from magnus.extensions import executor
 import magnus.extensions.executor as executor
@@ -13,6 +16,11 @@ def instantiable_base_class(monkeypatch, mocker):
     yield
 
 
+@pytest.fixture(autouse=True)
+def forget_original_run_indexes(monkeypatch):
+    monkeypatch.setattr(executor, "_original_run_indexes", {})
+
+
 @pytest.fixture
 def mock_run_context(mocker, monkeypatch):
     mock_run_context = mocker.Mock()
@@ -75,11 +83,8 @@ def test_set_up_for_re_run_syncs_catalog_and_parameters(mocker, monkeypatch, moc
     mock_run_context.run_id = "run_id"
     mock_run_context.original_run_id = "original_run_id"
 
-    mock_attempt_run_log = mocker.MagicMock()
-    mock_attempt_run_log.parameters = {"ghost": "from past"}
-
     mock_run_log_store = mocker.MagicMock()
-    mock_run_log_store.get_run_log_by_id.return_value = mock_attempt_run_log
+    mock_run_log_store.get_parameters.return_value = {"ghost": "from past"}
     mock_run_context.run_log_store = mock_run_log_store
 
     parameters = {}
@@ -87,6 +92,7 @@ def test_set_up_for_re_run_syncs_catalog_and_parameters(mocker, monkeypatch, moc
 
     mock_catalog_handler_sync_between_runs.assert_called_once_with(previous_run_id="original_run_id", run_id="run_id")
     assert parameters == {"ghost": "from past"}
+    mock_run_log_store.get_parameters.assert_called_once_with(run_id="original_run_id")
 
 
 def test_set_up_for_re_run_syncs_catalog_and_updates_parameters(mocker, monkeypatch, mock_run_context):
@@ -98,11 +104,8 @@ def test_set_up_for_re_run_syncs_catalog_and_updates_parameters(mocker, monkeypa
     mock_run_context.run_id = "run_id"
     mock_run_context.original_run_id = "original_run_id"
 
-    mock_attempt_run_log = mocker.MagicMock()
-    mock_attempt_run_log.parameters = {"ghost": "from past"}
-
     mock_run_log_store = mocker.MagicMock()
-    mock_run_log_store.get_run_log_by_id.return_value = mock_attempt_run_log
+    mock_run_log_store.get_parameters.return_value = {"ghost": "from past"}
     mock_run_context.run_log_store = mock_run_log_store
 
     parameters = {"present": "now"}
@@ -488,11 +491,10 @@ def test_base_executor__is_step_eligible_for_rerun_returns_true_if_step_log_not_
     mock_node = mocker.MagicMock()
     mock_node._get_step_log_name.return_value = "IdontExist"
 
-    mock_run_context.run_log_store.get_step_log.side_effect = exceptions.StepLogNotFoundError(
-        run_id="test", name="test"
-    )
+    mock_run_context.run_log_store.get_status_index.return_value = {}
 
     test_executor = GenericExecutor()
+    test_executor._local = True
 
     assert test_executor._is_step_eligible_for_rerun(node=mock_node)
 
@@ -503,9 +505,10 @@ def test_base_executor__is_step_eligible_for_rerun_returns_true_if_step_failed(m
     mock_node = mocker.MagicMock()
     mock_node._get_step_log_name.return_value = "IExist"
 
-    mock_run_context.run_log_store.get_step_log.return_value.status = defaults.FAIL
+    mock_run_context.run_log_store.get_status_index.return_value = {"IExist": LogStatus(status=defaults.FAIL)}
 
     test_executor = GenericExecutor()
+    test_executor._local = True
 
     assert test_executor._is_step_eligible_for_rerun(node=mock_node) is True
 
@@ -516,13 +519,109 @@ def test_base_executor__is_step_eligible_for_rerun_returns_false_if_step_succeed
     mock_node = mocker.MagicMock()
     mock_node._get_step_log_name.return_value = "IExist"
 
-    mock_run_context.run_log_store.get_step_log.return_value.status = defaults.SUCCESS
+    mock_run_context.run_log_store.get_status_index.return_value = {"IExist": LogStatus(status=defaults.SUCCESS)}
 
     test_executor = GenericExecutor()
+    test_executor._local = True
 
     assert test_executor._is_step_eligible_for_rerun(node=mock_node) is False
 
 
+def test_base_executor__is_step_eligible_for_rerun_retrieves_the_original_run_once(mocker, mock_run_context):
+    mock_run_context.use_cached = True
+    mock_run_context.original_run_id = "original_run_id"
+    mock_run_context.run_log_store.get_status_index.return_value = {"step": LogStatus(status=defaults.SUCCESS)}
+
+    mock_node = mocker.MagicMock()
+    test_executor = GenericExecutor()
+    test_executor._local = True
+    for step_log_name in ["step", "map.1.step", "map.2.step"]:
+        mock_node._get_step_log_name.return_value = step_log_name
+        test_executor._is_step_eligible_for_rerun(node=mock_node)
+
+    mock_run_context.run_log_store.get_status_index.assert_called_once_with(run_id="original_run_id")
+    mock_run_context.run_log_store.get_step_log.assert_not_called()
+
+
+def test_base_executor__is_branch_eligible_for_rerun_returns_true_if_not_use_cached(mock_run_context):
+    mock_run_context.use_cached = False
+
+    assert GenericExecutor()._is_branch_eligible_for_rerun("map.1") is True
+    mock_run_context.run_log_store.get_status_index.assert_not_called()
+
+
+def test_base_executor__is_branch_eligible_for_rerun_returns_false_only_if_branch_succeeded(mock_run_context):
+    mock_run_context.use_cached = True
+    mock_run_context.run_log_store.get_status_index.return_value = {
+        "map.1": LogStatus(status=defaults.SUCCESS),
+        "map.2": LogStatus(status=defaults.FAIL),
+    }
+
+    test_executor = GenericExecutor()
+    test_executor._local = True
+
+    assert test_executor._is_branch_eligible_for_rerun("map.1") is False
+    assert test_executor._is_branch_eligible_for_rerun("map.2") is True
+    assert test_executor._is_branch_eligible_for_rerun("map.3") is True
+
+
+def test_base_executor__get_original_branch_parameters_returns_parameters_of_original_branch(mock_run_context):
+    mock_run_context.use_cached = True
+    mock_run_context.run_log_store.get_status_index.return_value = {
+        "map.1": LogStatus(status=defaults.SUCCESS, parameters={"x": 1}),
+    }
+
+    test_executor = GenericExecutor()
+    test_executor._local = True
+
+    assert test_executor._get_original_branch_parameters("map.1") == {"x": 1}
+    assert test_executor._get_original_branch_parameters("map.2") == {}
+
+
+def test_base_executor__is_step_eligible_for_rerun_retrieves_the_step_log_if_not_local(mocker, mock_run_context):
+    mock_run_context.use_cached = True
+    mock_run_context.original_run_id = "original_run_id"
+    mock_run_context.run_log_store.get_step_log.return_value = StepLog(
+        name="step", internal_name="step", status=defaults.SUCCESS
+    )
+
+    mock_node = mocker.MagicMock()
+    mock_node._get_step_log_name.return_value = "step"
+
+    assert GenericExecutor()._is_step_eligible_for_rerun(node=mock_node) is False
+    mock_run_context.run_log_store.get_step_log.assert_called_once_with(internal_name="step", run_id="original_run_id")
+    mock_run_context.run_log_store.get_status_index.assert_not_called()
+
+
+def test_base_executor__is_step_eligible_for_rerun_returns_true_if_step_log_not_found_if_not_local(
+    mocker, mock_run_context
+):
+    mock_run_context.use_cached = True
+    mock_run_context.run_log_store.get_step_log.side_effect = exceptions.StepLogNotFoundError("run", "step")
+
+    mock_node = mocker.MagicMock()
+    mock_node._get_step_log_name.return_value = "step"
+
+    assert GenericExecutor()._is_step_eligible_for_rerun(node=mock_node) is True
+
+
+def test_base_executor__is_branch_eligible_for_rerun_retrieves_the_branch_log_if_not_local(mock_run_context):
+    mock_run_context.use_cached = True
+    mock_run_context.original_run_id = "original_run_id"
+    mock_run_context.run_log_store.get_branch_log.return_value = BranchLog(
+        internal_name="map.1", status=defaults.SUCCESS, parameters={"x": 1}
+    )
+
+    test_executor = GenericExecutor()
+
+    assert test_executor._is_branch_eligible_for_rerun("map.1") is False
+    assert test_executor._get_original_branch_parameters("map.1") == {"x": 1}
+    mock_run_context.run_log_store.get_branch_log.assert_called_with(
+        internal_branch_name="map.1", run_id="original_run_id"
+    )
+    mock_run_context.run_log_store.get_status_index.assert_not_called()
+
+
 def test_base_executor_resolve_executor_config_gives_global_config_if_node_does_not_override(mocker, mock_run_context):
     mock_node = mocker.MagicMock()
     mock_node._get_executor_config.return_value = {}
@@ -669,3 +768,34 @@ def test_send_return_code_does_not_raise_exception_if_pipeline_execution_succeed
 
     test_executor = GenericExecutor()
     test_executor.send_return_code()
+
+
+def _lazy_run_log(steps: int) -> LazyRunLog:
+    run_log = RunLog(run_id="run", status=defaults.SUCCESS)
+    for i in range(steps):
+        run_log.steps[f"step{i}"] = StepLog(name=f"step{i}", internal_name=f"step{i}", status=defaults.SUCCESS)
+    return LazyRunLog(run_log=RunLog(run_id="run", status=defaults.SUCCESS), source=RunLogTreeSource(run_log))
+
+
+def test_print_run_log_prints_the_run_log_if_within_max_printed_steps(mock_run_context, capsys):
+    mock_run_context.run_id = "run"
+    mock_run_context.run_log_store.get_lazy_run_log.return_value = _lazy_run_log(steps=2)
+
+    test_executor = GenericExecutor(max_printed_steps=2)
+    test_executor._print_run_log()
+
+    printed = json.loads(capsys.readouterr().out)
+    assert list(printed["steps"]) == ["step0", "step1"]
+
+
+def test_print_run_log_prints_a_summary_if_above_max_printed_steps(mock_run_context, capsys):
+    mock_run_context.run_id = "run"
+    mock_run_context.run_log_store.get_lazy_run_log.return_value = _lazy_run_log(steps=3)
+
+    test_executor = GenericExecutor(max_printed_steps=2)
+    test_executor._print_run_log()
+
+    printed = capsys.readouterr().out
+    summary = json.loads(printed[: printed.rindex("}") + 1])
+    assert summary["steps"] == {defaults.SUCCESS: 3}
+    assert "magnus runs show run" in printed
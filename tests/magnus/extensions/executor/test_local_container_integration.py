@@ -33,3 +33,19 @@ def test_configure_for_execution_assigns_catalog_location_within_container(mocke
     test_integration.configure_for_execution()
 
     assert mock_fs_catalog.catalog_location == "this_location"
+
+
+def test_content_addressed_catalog_is_mounted_and_relocated_within_container(mocker):
+    mock_executor = mocker.MagicMock()
+    mock_executor._volumes = {}
+    mock_executor._container_catalog_location = "this_location"
+
+    mock_catalog = mocker.MagicMock()
+    mock_catalog.catalog_location = "catalog_location"
+
+    test_integration = implementation.LocalContainerComputeContentAddressedCatalog(mock_executor, mock_catalog)
+    test_integration.configure_for_traversal()
+    test_integration.configure_for_execution()
+
+    assert mock_executor._volumes == {str(Path("catalog_location").resolve()): {"bind": "this_location", "mode": "rw"}}
+    assert mock_catalog.catalog_location == "this_location"
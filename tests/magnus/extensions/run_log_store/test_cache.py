@@ -0,0 +1,52 @@
+from magnus.datastore import StepLog
+from magnus.extensions.run_log_store.cache import RunLogCache, fd_token, file_token
+
+
+def test_file_token_is_none_if_file_does_not_exist(tmp_path):
+    assert file_token(tmp_path / "not_there") is None
+
+
+def test_file_token_changes_when_file_is_written(tmp_path):
+    path = tmp_path / "chunk.json"
+    path.write_text("{}")
+    before = file_token(path)
+
+    with open(path, "w") as fw:
+        fw.write('{"a": 1}')
+        fw.flush()
+        written = fd_token(fw.fileno())
+
+    assert written != before
+    assert file_token(path) == written
+
+
+def test_run_log_cache_get_counts_hits_and_misses():
+    cache = RunLogCache()
+
+    assert cache.get("key", token=1) is None
+    cache.put("key", token=1, contents={"a": 1})
+
+    assert cache.get("key", token=1).model() == {"a": 1}  # type: ignore
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_run_log_cache_get_discards_stale_entry():
+    cache = RunLogCache()
+    cache.put("key", token=1, contents={"a": 1})
+
+    assert cache.get("key", token=2) is None
+    assert cache.stats() == {"hits": 0, "misses": 1, "entries": 0}
+
+
+def test_cache_entry_model_returns_independent_copies():
+    cache = RunLogCache()
+    entry = cache.put("key", token=1, contents=StepLog(name="step", internal_name="step").model_dump())
+
+    first = entry.model(StepLog)
+    first.status = "MODIFIED"
+    first.branches["a"] = None  # type: ignore
+
+    second = entry.model(StepLog)
+    assert isinstance(second, StepLog)
+    assert second.status != "MODIFIED"
+    assert second.branches == {}
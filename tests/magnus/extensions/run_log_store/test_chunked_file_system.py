@@ -0,0 +1,692 @@
+import multiprocessing
+import os
+
+import pytest
+
+from magnus import defaults, exceptions
+from magnus.datastore import BranchLog, StepLog
+from magnus.extensions.run_log_store.chunked_file_system import implementation
+from magnus.extensions.run_log_store.chunked_file_system.implementation import (
+    ChunkedFileSystemRunLogStore,
+    RunManifest,
+)
+from magnus.extensions.run_log_store.file_system.implementation import FileSystemRunLogstore
+from magnus.extensions.run_log_store.generic_chunked import EntityNotFoundError
+
+
+def test_run_manifest_logical_name_drops_creation_time_of_step_logs():
+    assert RunManifest.logical_name("StepLog-step-1234.json") == "StepLog-step-"
+
+
+def test_run_manifest_logical_name_drops_creation_time_of_branch_logs():
+    assert RunManifest.logical_name("BranchLog-map.a-b-1234.json") == "BranchLog-map.a-b-"
+
+
+def test_run_manifest_logical_name_keeps_run_log_and_parameters():
+    assert RunManifest.logical_name("RunLog.json") == "RunLog"
+    assert RunManifest.logical_name("Parameter-x.json") == "Parameter-x"
+
+
+def test_run_manifest_add_ignores_duplicates(tmp_path):
+    manifest = RunManifest(tmp_path)
+
+    manifest.add("StepLog-step-1234.json")
+    manifest.add("StepLog-step-1234.json")
+
+    assert manifest.entries == {"StepLog-step-": ["StepLog-step-1234.json"]}
+
+
+def test_run_manifest_refresh_reads_only_complete_lines(tmp_path):
+    manifest = RunManifest(tmp_path)
+    (tmp_path / implementation.MANIFEST_FILE_NAME).write_text("RunLog.json\nStepLog-st")
+
+    manifest.refresh()
+
+    assert manifest.entries == {"RunLog": ["RunLog.json"]}
+    assert manifest.offset == len("RunLog.json\n")
+
+    with open(tmp_path / implementation.MANIFEST_FILE_NAME, "a") as fw:
+        fw.write("ep-1234.json\n")
+
+    manifest.refresh()
+
+    assert manifest.entries["StepLog-step-"] == ["StepLog-step-1234.json"]
+
+
+def test_run_manifest_refresh_rebuilds_from_folder_if_missing(tmp_path):
+    (tmp_path / "RunLog.json").write_text("{}")
+    (tmp_path / "StepLog-step-1234.json").write_text("{}")
+
+    manifest = RunManifest(tmp_path)
+
+    assert manifest.lookup("StepLog-step-") == [tmp_path / "StepLog-step-1234.json"]
+    assert (tmp_path / implementation.MANIFEST_FILE_NAME).read_text() == "RunLog.json\nStepLog-step-1234.json\n"
+
+
+def test_run_manifest_refresh_does_nothing_if_run_folder_does_not_exist(tmp_path):
+    manifest = RunManifest(tmp_path / "not_there")
+
+    assert manifest.lookup("RunLog") == []
+    assert not (tmp_path / "not_there").exists()
+
+
+def test_run_manifest_lookup_exact_does_not_match_names_sharing_a_prefix(tmp_path):
+    manifest = RunManifest(tmp_path)
+    manifest.append(["StepLog-a-1.json", "StepLog-a-b-2.json"])
+
+    assert manifest.lookup("StepLog-a-") == [tmp_path / "StepLog-a-1.json"]
+
+
+def test_run_manifest_lookup_prefix_matches_all(tmp_path):
+    manifest = RunManifest(tmp_path)
+    manifest.append(["Parameter-x.json", "Parameter-y.json", "RunLog.json"])
+
+    assert manifest.lookup("Parameter-", prefix=True) == [tmp_path / "Parameter-x.json", tmp_path / "Parameter-y.json"]
+
+
+def test_chunked_file_system_store_writes_are_recorded_in_the_manifest(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.set_parameters(run_id="run", parameters={"x": 1})
+    run_log_store.set_parameters(run_id="run", parameters={"x": 2})
+
+    manifest = (tmp_path / "run" / implementation.MANIFEST_FILE_NAME).read_text().splitlines()
+
+    assert manifest == ["RunLog.json", "Parameter-x.json", "Parameter-x.json"]
+    assert run_log_store.get_parameters(run_id="run") == {"x": 2}
+
+
+def test_chunked_file_system_store_get_matches_raises_for_multiple_matches_if_not_allowed(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    (tmp_path / "run").mkdir()
+    run_log_store.get_manifest("run").append(["StepLog-step-1.json", "StepLog-step-2.json"])
+
+    with pytest.raises(Exception, match="Multiple matches found"):
+        run_log_store.get_matches(run_id="run", name="StepLog-step-${creation_time}")
+
+
+def test_chunked_file_system_store_sees_writes_of_other_instances(tmp_path):
+    reader = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    writer = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    writer.create_run_log(run_id="run")
+    assert reader.get_run_log_by_id(run_id="run").run_id == "run"
+
+    step_log = writer.create_step_log("step", "step")
+    writer.add_step_log(step_log, run_id="run")
+
+    assert reader.get_step_log("step", run_id="run").name == "step"
+
+
+def _add_step_logs(log_folder: str, prefix: str):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=log_folder)
+    for i in range(20):
+        step_log = run_log_store.create_step_log(f"{prefix}{i}", f"{prefix}{i}")
+        run_log_store.add_step_log(step_log, run_id="run")
+
+
+def test_chunked_file_system_store_manifest_is_consistent_under_concurrent_writers(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+
+    processes = [multiprocessing.Process(target=_add_step_logs, args=(str(tmp_path), f"branch{i}_")) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    run_log = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    assert len(run_log.steps) == 80
+    chunks = [name for name in os.listdir(tmp_path / "run") if name.endswith(".json")]
+    assert len(chunks) == 81
+
+
+def test_chunked_file_system_store_add_branch_logs_appends_manifest_once(mocker, tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+    branch_logs = [run_log_store.create_branch_log(f"map.{i}") for i in range(3)]
+
+    spy_append = mocker.spy(RunManifest, "append")
+    run_log_store.add_branch_logs(branch_logs, run_id="run")
+
+    assert spy_append.call_count == 1
+    assert run_log_store.get_branch_statuses(["map.0", "map.2"], run_id="run") == {
+        "map.0": "CREATED",
+        "map.2": "CREATED",
+    }
+
+
+def test_chunked_file_system_store_get_branch_statuses_raises_if_branch_not_found(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+
+    with pytest.raises(exceptions.BranchLogNotFoundError):
+        run_log_store.get_branch_statuses(["map.0"], run_id="run")
+
+
+def test_chunked_file_system_store_get_branch_logs_returns_the_branch_logs(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+    branch_logs = [run_log_store.create_branch_log(f"map.{i}") for i in range(3)]
+    branch_logs[1].parameters = {"x": 1}
+    run_log_store.add_branch_logs(branch_logs, run_id="run")
+
+    got = run_log_store.get_branch_logs(["map.1", "map.0"], run_id="run")
+
+    assert list(got) == ["map.1", "map.0"]
+    assert got["map.1"].parameters == {"x": 1}
+
+
+def test_chunked_file_system_store_get_branch_logs_raises_if_branch_not_found(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+
+    with pytest.raises(exceptions.BranchLogNotFoundError):
+        run_log_store.get_branch_logs(["map.0"], run_id="run")
+
+
+def test_chunked_file_system_store_cache_is_invalidated_by_writes_of_other_instances(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), cache=True)
+    other = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.add_step_log(run_log_store.create_step_log("step", "step"), run_id="run")
+
+    step_log = run_log_store.get_step_log("step", run_id="run")
+    step_log.status = "MODIFIED"
+    assert run_log_store.get_step_log("step", run_id="run").status == "CREATED"
+
+    step_log = other.get_step_log("step", run_id="run")
+    step_log.status = "SUCCESS"
+    step_log.message = "written by another process"
+    other.add_step_log(step_log, run_id="run")
+
+    assert run_log_store.get_step_log("step", run_id="run").status == "SUCCESS"
+    assert run_log_store.cache_stats() == {"hits": 2, "misses": 1, "entries": 2}
+
+
+def test_chunked_file_system_store_cache_is_disabled_by_default(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.get_run_log_by_id(run_id="run")
+
+    assert run_log_store.cache_stats() == {}
+
+
+def test_chunked_file_system_store_write_behind_defers_step_logs_till_flush(mocker, tmp_path):
+    mocker.patch.object(ChunkedFileSystemRunLogStore, "_flush_at_exit")
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), write_behind=True)
+    other = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run")
+    step_log = run_log_store.create_step_log("step", "step")
+    run_log_store.add_step_log(step_log, run_id="run")
+    step_log.status = "SUCCESS"
+    run_log_store.add_step_log(step_log, run_id="run")
+
+    assert run_log_store.get_step_log("step", run_id="run").status == "SUCCESS"
+    assert run_log_store.get_run_log_by_id(run_id="run", full=True).steps["step"].status == "SUCCESS"
+    with pytest.raises(EntityNotFoundError):
+        other.get_step_log("step", run_id="run")
+
+    spy_store_many = mocker.spy(ChunkedFileSystemRunLogStore, "store_many")
+    run_log_store.flush()
+    run_log_store.flush()
+
+    assert spy_store_many.call_count == 1
+    assert other.get_step_log("step", run_id="run").status == "SUCCESS"
+
+
+def test_chunked_file_system_store_write_behind_registers_exit_flush_once(mocker, tmp_path):
+    mock_register = mocker.patch("magnus.extensions.run_log_store.generic_chunked.atexit.register")
+    mocker.patch("magnus.extensions.run_log_store.generic_chunked.signal.signal")
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), write_behind=True)
+
+    for name in ["a", "b"]:
+        run_log_store.add_step_log(run_log_store.create_step_log(name, name), run_id="run")
+
+    assert mock_register.call_count == 1
+
+    mock_register.call_args.args[0]()
+
+    assert len(run_log_store.get_matches(run_id="run", name="StepLog", multiple_allowed=True)) == 2  # type: ignore
+
+
+def test_chunked_file_system_store_reads_chunks_of_any_serializer(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(
+        log_folder=str(tmp_path), serializer="compact-json", compression="gzip"
+    )
+    default = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run")
+    default.set_parameters(run_id="run", parameters={"x": 1})
+    run_log_store.set_parameters(run_id="run", parameters={"y": 2})
+
+    assert default.get_parameters(run_id="run") == {"x": 1, "y": 2}
+    assert (tmp_path / "run" / "RunLog.json").read_bytes()[:2] == b"\x1f\x8b"
+
+
+def test_chunked_file_system_store_rejects_unknown_serializer(tmp_path):
+    with pytest.raises(ValueError):
+        ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), serializer="pickle")
+
+
+def _add_nested_run(run_log_store: ChunkedFileSystemRunLogStore, run_id: str = "run"):
+    run_log_store.create_run_log(run_id=run_id)
+    run_log_store.set_parameters(run_id=run_id, parameters={"x": 1})
+    run_log_store.add_step_log(run_log_store.create_step_log("first", "first"), run_id=run_id)
+    run_log_store.add_step_log(run_log_store.create_step_log("map", "map"), run_id=run_id)
+    run_log_store.add_branch_logs([run_log_store.create_branch_log(f"map.{i}") for i in range(3)], run_id=run_id)
+    for i in range(2):
+        step_log = run_log_store.create_step_log("task", f"map.{i}.task")
+        run_log_store.add_step_log(step_log, run_id=run_id)
+        step_log.status = "SUCCESS"
+        run_log_store.add_step_log(step_log, run_id=run_id)
+
+
+def test_chunked_file_system_store_materialized_run_log_is_the_prepared_run_log(mocker, tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    _add_nested_run(run_log_store)
+
+    materialized = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    mocker.patch.object(ChunkedFileSystemRunLogStore, "_changes", return_value=None)
+    prepared = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path)).get_run_log_by_id(run_id="run", full=True)
+
+    assert materialized.model_dump() == prepared.model_dump()
+    assert list(materialized.steps["map"].branches) == ["map.0", "map.1"]
+    assert materialized.steps["map"].branches["map.1"].steps["map.1.task"].status == "SUCCESS"
+
+
+def test_chunked_file_system_store_materialized_run_log_reads_only_the_changes(mocker, tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    _add_nested_run(run_log_store)
+    run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    other = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    step_log = other.create_step_log("task", "map.2.task")
+    other.add_step_log(step_log, run_id="run")
+    other.set_parameters(run_id="run", parameters={"y": 2})
+
+    spy_retrieve = mocker.spy(ChunkedFileSystemRunLogStore, "_retrieve")
+    run_log = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    assert spy_retrieve.call_count == 2
+    assert run_log.parameters == {"x": 1, "y": 2}
+    assert "map.2.task" in run_log.steps["map"].branches["map.2"].steps
+
+
+def test_chunked_file_system_store_materialized_run_log_returns_a_copy(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    _add_nested_run(run_log_store)
+
+    run_log = run_log_store.get_run_log_by_id(run_id="run", full=True)
+    run_log.steps["first"].status = "MODIFIED"
+
+    assert run_log_store.get_run_log_by_id(run_id="run", full=True).steps["first"].status == "CREATED"
+
+
+def test_chunked_file_system_store_materialized_run_log_starts_from_the_snapshot(mocker, tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), snapshot_interval=5)
+    _add_nested_run(run_log_store)
+    expected = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    assert (tmp_path / "run" / implementation.SNAPSHOT_FILE_NAME).exists()
+
+    run_log_store.add_step_log(run_log_store.create_step_log("last", "last"), run_id="run")
+    expected.steps["last"] = run_log_store.get_step_log("last", run_id="run")
+
+    spy_retrieve = mocker.spy(ChunkedFileSystemRunLogStore, "_retrieve")
+    run_log = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path)).get_run_log_by_id(run_id="run", full=True)
+
+    assert spy_retrieve.call_count == 1
+    assert run_log.model_dump() == expected.model_dump()
+
+
+def test_chunked_file_system_store_materialized_run_log_is_rebuilt_if_manifest_is_recreated(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    _add_nested_run(run_log_store)
+    expected = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    os.remove(tmp_path / "run" / implementation.MANIFEST_FILE_NAME)
+    run_log_store._manifests.clear()
+
+    assert run_log_store.get_run_log_by_id(run_id="run", full=True).model_dump() == expected.model_dump()
+
+
+def test_chunked_file_system_store_materialized_run_log_raises_if_run_log_not_found(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+
+def test_run_manifest_rebuild_orders_chunks_by_creation_time(tmp_path):
+    for name in ["StepLog-b-2.json", "StepLog-a-10.json", "Parameter-x.json", "RunLog.json"]:
+        (tmp_path / name).write_text("{}")
+    manifest = RunManifest(tmp_path)
+
+    manifest.rebuild()
+
+    assert manifest.read(0, os.stat(manifest.manifest_path).st_size)[0] == [
+        "Parameter-x.json",
+        "RunLog.json",
+        "StepLog-b-2.json",
+        "StepLog-a-10.json",
+    ]
+
+
+def test_chunked_file_system_store_lazy_run_log_retrieves_only_the_chunks_accessed(mocker, tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    _add_nested_run(run_log_store)
+    expected = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    spy_retrieve = mocker.spy(ChunkedFileSystemRunLogStore, "_retrieve")
+    lazy_run_log = run_log_store.get_lazy_run_log(run_id="run")
+    step_log, _ = lazy_run_log.search_step_by_internal_name("map.1.task")
+
+    assert step_log.status == "SUCCESS"
+    assert lazy_run_log.parameters == {"x": 1}
+    # The run log, the parameter, map, the branch map.1 and its task
+    assert spy_retrieve.call_count == 5
+    assert list(lazy_run_log.steps["map"].branches) == ["map.0", "map.1", "map.2"]
+    assert [step_log.internal_name for step_log in lazy_run_log.iter_steps()] == list(expected.steps) + [
+        "map.0.task",
+        "map.1.task",
+    ]
+
+
+def test_chunked_file_system_store_indexes_runs_as_they_change(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run", tag="nightly", status="PROCESSING")
+    run_log_store.update_run_log_status(run_id="run", status="SUCCESS")
+
+    (run,) = run_log_store.list_runs(tag="nightly")
+    assert run["run_id"] == "run"
+    assert run["status"] == "SUCCESS"
+
+
+def test_chunked_file_system_store_reindex_reads_only_the_run_logs(mocker, tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), run_index=False)
+    _add_nested_run(run_log_store, run_id="first")
+    _add_nested_run(run_log_store, run_id="second")
+    run_log_store.update_run_log_status(run_id="second", status="SUCCESS")
+
+    indexed = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    spy_retrieve = mocker.spy(ChunkedFileSystemRunLogStore, "_retrieve")
+    indexed.reindex()
+
+    assert spy_retrieve.call_count == 2
+    assert [run["run_id"] for run in indexed.list_runs()] == ["second", "first"]
+    assert [run["end_time"] is None for run in indexed.list_runs()] == [False, True]
+
+
+def test_chunked_file_system_store_does_not_list_the_runs_of_a_file_system_store(tmp_path):
+    file_system = FileSystemRunLogstore(log_folder=str(tmp_path))
+    file_system.create_run_log(run_id="json")
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="chunked")
+
+    run_log_store.reindex()
+    file_system.reindex()
+
+    assert [run["run_id"] for run in run_log_store.list_runs()] == ["chunked"]
+    assert [run["run_id"] for run in file_system.list_runs()] == ["json"]
+
+
+def test_chunked_file_system_store_list_runs_raises_if_run_index_disabled(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), run_index=False)
+
+    with pytest.raises(Exception, match="run index is disabled"):
+        run_log_store.list_runs()
+
+
+def test_chunked_file_system_store_sharded_layout_spreads_step_and_branch_logs(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), layout="sharded")
+    _add_nested_run(run_log_store)
+
+    run_folder = tmp_path / "run"
+    assert sorted(path.name for path in run_folder.glob("*.json")) == ["Parameter-x.json", "RunLog.json"]
+    nested = [path.relative_to(run_folder).parts for path in run_folder.rglob("StepLog-*.json")]
+    assert len(nested) == 4
+    assert all(len(parts) == 3 and len(parts[0]) == len(parts[1]) == 2 for parts in nested)
+
+    reader = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    assert reader.get_step_log("map.1.task", run_id="run").status == "SUCCESS"
+    assert list(reader.get_run_log_by_id(run_id="run", full=True).steps) == ["first", "map"]
+
+
+def test_chunked_file_system_store_layouts_coexist_in_log_folder(tmp_path):
+    flat = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    flat.create_run_log(run_id="flat")
+    sharded = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), layout="sharded", shard_levels=1)
+    sharded.create_run_log(run_id="sharded")
+
+    for run_log_store in [flat, sharded]:
+        for run_id in ["flat", "sharded"]:
+            step_log = run_log_store.create_step_log(f"step_{run_log_store.layout}", f"step_{run_log_store.layout}")
+            run_log_store.add_step_log(step_log, run_id=run_id)
+
+    assert [path.name for path in (tmp_path / "flat").iterdir() if path.is_dir()] == []
+    assert len(list((tmp_path / "sharded").glob("*/StepLog-*.json"))) == 2
+    for run_id in ["flat", "sharded"]:
+        run_log = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path)).get_run_log_by_id(run_id=run_id, full=True)
+        assert list(run_log.steps) == ["step_flat", "step_sharded"]
+
+
+def test_run_manifest_rebuild_finds_chunks_of_sharded_layout(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), layout="sharded")
+    _add_nested_run(run_log_store)
+    os.remove(tmp_path / "run" / implementation.MANIFEST_FILE_NAME)
+
+    run_log = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path)).get_run_log_by_id(run_id="run", full=True)
+
+    assert run_log.steps["map"].branches["map.1"].steps["map.1.task"].status == "SUCCESS"
+    assert run_log.parameters == {"x": 1}
+
+
+def test_chunked_file_system_store_rejects_unknown_layout(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported layout"):
+        ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), layout="tree")
+
+
+def test_chunked_file_system_store_sharded_run_folder_created_by_another_process_wins(tmp_path):
+    (tmp_path / "run").mkdir()
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), layout="sharded")
+    (tmp_path / "run" / "RunLog.json").write_text("{}")
+
+    assert run_log_store.shard_levels_of(run_id="run") == 0
+    assert [path.name for path in tmp_path.iterdir()] == ["run"]
+
+
+def _add_same_step_log(log_folder: str, barrier):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=log_folder, run_index=False)
+    step_log = run_log_store.create_step_log("fan_in", "fan_in")
+    barrier.wait()
+    run_log_store.add_step_log(step_log, run_id="run")
+
+
+def test_chunked_file_system_store_concurrent_inserts_of_a_step_log_give_one_chunk(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), run_index=False)
+    run_log_store.create_run_log(run_id="run")
+
+    barrier = multiprocessing.Barrier(4)
+    processes = [multiprocessing.Process(target=_add_same_step_log, args=(str(tmp_path), barrier)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert len(list((tmp_path / "run").glob("StepLog-fan_in-*.json"))) == 1
+    assert run_log_store.get_step_log("fan_in", run_id="run").name == "fan_in"
+
+
+def test_chunked_file_system_store_locks_the_run_while_storing(mocker, tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), run_index=False)
+    run_log_store.create_run_log(run_id="run")
+    spy_acquire = mocker.spy(implementation.RunLocks, "__call__")
+
+    run_log_store.set_parameters(run_id="run", parameters={"x": 1})
+
+    assert spy_acquire.call_count == 1
+    assert (tmp_path / ".locks" / "run.lock").exists()
+
+
+def test_chunked_file_system_store_removes_the_lock_file_once_the_run_is_over(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), run_index=False)
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.set_parameters(run_id="run", parameters={"x": 1})
+
+    run_log_store.update_run_log_status(run_id="run", status=defaults.FAIL)
+
+    assert not (tmp_path / ".locks" / "run.lock").exists()
+    assert run_log_store.get_run_log_by_id(run_id="run").status == defaults.FAIL
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_chunked_file_system_store_removes_the_lock_file_once_the_pipeline_ends(tmp_path, write_behind):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), run_index=False, write_behind=write_behind)
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.add_step_log(StepLog(name="map", internal_name="map", status=defaults.PROCESSING), run_id="run")
+    run_log_store.add_branch_log(BranchLog(internal_name="map.a"), run_id="run")
+    run_log_store.add_step_log(
+        StepLog(name="fail", internal_name="map.a.fail", step_type="fail", status=defaults.SUCCESS), run_id="run"
+    )
+    run_log_store.flush()
+
+    assert (tmp_path / ".locks" / "run.lock").exists()
+
+    run_log_store.add_step_log(
+        StepLog(name="fail", internal_name="fail", step_type="fail", status=defaults.SUCCESS), run_id="run"
+    )
+    run_log_store.flush()
+
+    assert not (tmp_path / ".locks" / "run.lock").exists()
+
+
+def test_chunked_file_system_store_does_not_lock_if_locking_disabled(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), run_index=False, locking=False)
+    run_log_store.create_run_log(run_id="run")
+
+    assert not (tmp_path / ".locks").exists()
+
+
+def test_chunked_file_system_store_delete_run_removes_the_run_of_either_layout(tmp_path):
+    for layout in ["flat", "sharded"]:
+        run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), layout=layout)
+        _add_nested_run(run_log_store, run_id=layout)
+        run_log_store.get_run_log_by_id(run_id=layout, full=True)
+
+        reclaimable = run_log_store.delete_run(run_id=layout, dry_run=True)
+        assert reclaimable > 0
+        assert (tmp_path / layout).exists()
+
+        assert run_log_store.delete_run(run_id=layout, max_workers=2) == reclaimable
+        assert not any(path.name.endswith(layout) for path in tmp_path.iterdir())
+        with pytest.raises(exceptions.RunLogNotFoundError):
+            run_log_store.get_run_log_by_id(run_id=layout, full=True)
+
+    assert run_log_store.list_runs() == []
+
+
+@pytest.mark.parametrize("layout", ["flat", "sharded"])
+def test_chunked_file_system_store_run_created_again_after_delete_run(tmp_path, layout):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), layout=layout)
+    _add_nested_run(run_log_store, run_id="run")
+    run_log_store.delete_run(run_id="run")
+
+    _add_nested_run(run_log_store, run_id="run")
+
+    assert run_log_store.get_run_log_by_id(run_id="run", full=True) == ChunkedFileSystemRunLogStore(
+        log_folder=str(tmp_path)
+    ).get_run_log_by_id(run_id="run", full=True)
+
+
+def test_chunked_file_system_store_delete_run_refuses_runs_it_does_not_hold(tmp_path):
+    FileSystemRunLogstore(log_folder=str(tmp_path)).create_run_log(run_id="json")
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.delete_run(run_id="json")
+
+    assert (tmp_path / "json.json").exists()
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_chunked_file_system_store_stores_parameters_of_attempts_once(mocker, tmp_path, write_behind):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path), write_behind=write_behind)
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.add_step_log(run_log_store.create_step_log("map", "map"), run_id="run")
+    run_log_store.add_branch_logs([run_log_store.create_branch_log(f"map.{i}") for i in range(3)], run_id="run")
+    for i in range(3):
+        step_log = run_log_store.create_step_log("task", f"map.{i}.task")
+        attempt_log = run_log_store.create_attempt_log()
+        attempt_log.parameters = {"config": {"x": 1}}
+        step_log.attempts.append(attempt_log)
+        run_log_store.add_step_log(step_log, run_id="run")
+    run_log_store.flush()
+
+    run_folder = tmp_path / "run"
+    assert len(list(run_folder.glob("ParameterSnapshot-*.json"))) == 1
+    assert run_folder.joinpath(implementation.MANIFEST_FILE_NAME).read_text().count("ParameterSnapshot-") == 1
+
+    reader = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    assert reader.get_step_log("map.1.task", run_id="run").attempts[0].parameters == {"config": {"x": 1}}
+    lazy_run_log = reader.get_lazy_run_log(run_id="run")
+    assert lazy_run_log.search_step_by_internal_name("map.2.task")[0].attempts[0].parameters == {"config": {"x": 1}}
+
+    materialized = reader.get_run_log_by_id(run_id="run", full=True)
+    mocker.patch.object(ChunkedFileSystemRunLogStore, "_changes", return_value=None)
+    prepared = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path)).get_run_log_by_id(run_id="run", full=True)
+    for run_log in [materialized, prepared]:
+        branches = run_log.steps["map"].branches
+        assert [branches[f"map.{i}"].steps[f"map.{i}.task"].attempts[0].parameters for i in range(3)] == [
+            {"config": {"x": 1}}
+        ] * 3
+
+
+def test_chunked_file_system_store_status_index_has_branches_without_steps(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    _add_nested_run(run_log_store)
+
+    index = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path)).get_status_index(run_id="run")
+
+    assert sorted(index) == ["first", "map", "map.0", "map.0.task", "map.1", "map.1.task", "map.2"]
+    assert index["map.1.task"].status == "SUCCESS"
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.get_status_index(run_id="missing")
+
+
+def test_chunked_file_system_store_keeps_parameters_of_branches_in_branch_logs(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.set_parameters(run_id="run", parameters={"x": 0, "y": 0})
+    run_log_store.add_step_log(run_log_store.create_step_log("map", "map"), run_id="run")
+    run_log_store.add_branch_logs([run_log_store.create_branch_log(f"map.{i}") for i in range(2)], run_id="run")
+
+    run_log_store.set_parameters(run_id="run", parameters={"y": 1}, internal_branch_name="map.1")
+    run_log_store.add_step_log(run_log_store.create_step_log("task", "map.1.task"), run_id="run")
+
+    reader = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+    assert reader.get_parameters(run_id="run", internal_branch_name="map.1") == {"x": 0, "y": 1}
+    assert reader.get_parameters(run_id="run", internal_branch_name="map.0") == {"x": 0, "y": 0}
+    assert reader.get_parameters(run_id="run") == {"x": 0, "y": 0}
+    assert not list((tmp_path / "run").glob("Parameter-y*-*"))
+    assert reader.get_run_log_by_id(run_id="run", full=True).steps["map"].branches["map.1"].parameters == {"y": 1}
+    assert reader.get_status_index(run_id="run")["map.1"].parameters == {"y": 1}
+
+
+def test_chunked_file_system_store_parameters_round_trip_non_finite_floats_and_large_integers(tmp_path):
+    run_log_store = ChunkedFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.set_parameters(run_id="run", parameters={"x": float("nan"), "y": 2**70 + 1})
+
+    parameters = run_log_store.get_parameters(run_id="run")
+
+    assert parameters["x"] != parameters["x"]
+    assert parameters["y"] == 2**70 + 1
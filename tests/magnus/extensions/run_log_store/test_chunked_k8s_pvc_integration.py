@@ -15,3 +15,13 @@ def test_k8s_pvc_errors_for_local_container():
 
     with pytest.raises(Exception, match="We can't use the local-container compute"):
         test_integration.validate()
+
+
+def test_chunked_k8s_pvc_store_writes_to_the_mount_path(tmp_path):
+    from magnus.extensions.run_log_store.chunked_k8s_pvc.implementation import ChunkedK8PersistentVolumeRunLogstore
+
+    run_log_store = ChunkedK8PersistentVolumeRunLogstore(
+        persistent_volume_name="volume", mount_path=str(tmp_path), log_folder="logs", run_index=False
+    )
+
+    assert run_log_store.log_folder_with_run_id(run_id="run") == tmp_path / "logs" / "run"
@@ -0,0 +1,196 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from magnus import defaults, exceptions
+from magnus.extensions.run_log_store.db.implementation import DBRunLogStore
+
+
+@pytest.fixture
+def connection_string(tmp_path):
+    return f"sqlite:///{tmp_path / 'logs' / 'run_logs.db'}"
+
+
+def test_db_store_attribute_splits_naming_pattern(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+
+    assert run_log_store._attribute("RunLog") == ("RunLog", "")
+    assert run_log_store._attribute("Parameter-x") == ("Parameter", "x")
+    assert run_log_store._attribute("StepLog-map.a-b-${creation_time}") == ("StepLog", "map.a-b")
+    assert run_log_store._attribute("StepLog") == ("StepLog", "")
+
+
+def test_db_store_creates_sqlite_database_in_wal_mode(tmp_path, connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+
+    run_log_store.create_run_log(run_id="run")
+
+    connection = sqlite3.connect(tmp_path / "logs" / "run_logs.db")
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_db_store_resolves_secrets_in_connection_string(mocker, tmp_path):
+    mock_context = mocker.MagicMock()
+    mock_context.secrets_handler.get.return_value = str(tmp_path)
+    mocker.patch("magnus.context.run_context", mock_context)
+
+    run_log_store = DBRunLogStore(connection_string="sqlite:///${folder}/run_logs.db")
+
+    assert run_log_store._resolve_connection_string() == f"sqlite:///{tmp_path}/run_logs.db"
+    mock_context.secrets_handler.get.assert_called_once_with(name="folder")
+
+
+def test_db_store_raises_run_log_not_found(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.get_run_log_by_id(run_id="run")
+
+
+def test_db_store_merges_with_existing_contents(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.set_parameters(run_id="run", parameters={"x": 1, "y": 1})
+    run_log_store.set_parameters(run_id="run", parameters={"x": 2})
+
+    assert run_log_store.get_parameters(run_id="run") == {"x": 2, "y": 1}
+
+
+def test_db_store_set_parameters_is_a_single_transaction(mocker, connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+    mock_upsert = mocker.patch.object(DBRunLogStore, "_upsert")
+
+    run_log_store.set_parameters(run_id="run", parameters={"x": 1, "y": 2})
+
+    mock_upsert.assert_called_once_with(run_id="run", attribute_type="Parameter", items={"x": {"x": 1}, "y": {"y": 2}})
+
+
+def test_db_store_get_matches_exact_does_not_match_names_sharing_a_prefix(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+    run_log_store.store_many(
+        run_id="run",
+        log_type=run_log_store.LogTypes.STEP_LOG,
+        items={"a": {"internal_name": "a"}, "a-b": {"internal_name": "a-b"}},
+    )
+
+    match = run_log_store.get_matches(run_id="run", name="StepLog-a-${creation_time}")
+    matches = run_log_store.get_matches(run_id="run", name="StepLog", multiple_allowed=True)
+
+    assert run_log_store._retrieve(match) == {"internal_name": "a"}  # type: ignore
+    assert len(matches) == 2  # type: ignore
+
+
+def test_db_store_orderly_retrieve_keeps_the_order_of_creation(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+
+    for name in ["c", "a", "b"]:
+        run_log_store.add_step_log(run_log_store.create_step_log(name, name), run_id="run")
+
+    ordered = run_log_store.orderly_retrieve(run_id="run", log_type=run_log_store.LogTypes.STEP_LOG)
+
+    assert list(ordered) == ["c", "a", "b"]
+
+
+def test_db_store_full_run_log_stitches_branches(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+    run_log_store.create_run_log(run_id="run")
+
+    run_log_store.add_step_log(run_log_store.create_step_log("map", "map"), run_id="run")
+    run_log_store.add_branch_log(run_log_store.create_branch_log("map.a"), run_id="run")
+    step_log = run_log_store.create_step_log("task", "map.a.task")
+    run_log_store.add_step_log(step_log, run_id="run")
+
+    step_log.status = defaults.SUCCESS
+    run_log_store.add_step_log(step_log, run_id="run")
+
+    run_log = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    assert run_log.steps["map"].branches["map.a"].steps["map.a.task"].status == defaults.SUCCESS
+
+
+def _add_step_logs(connection_string: str, prefix: str):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+    for i in range(20):
+        step_log = run_log_store.create_step_log(f"{prefix}{i}", f"{prefix}{i}")
+        run_log_store.add_step_log(step_log, run_id="run")
+        run_log_store.set_parameters(run_id="run", parameters={"shared": i})
+
+
+def test_db_store_is_consistent_under_concurrent_writers(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+    run_log_store.create_run_log(run_id="run")
+
+    processes = [
+        multiprocessing.Process(target=_add_step_logs, args=(connection_string, f"branch{i}_")) for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+
+    run_log = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    assert len(run_log.steps) == 80
+    assert run_log.parameters == {"shared": 19}
+
+
+def test_db_store_add_branch_logs_and_get_branch_statuses(mocker, connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+    run_log_store.create_run_log(run_id="run")
+    branch_logs = [run_log_store.create_branch_log(f"map.{i}") for i in range(3)]
+    branch_logs[2].status = defaults.FAIL
+
+    spy_upsert = mocker.spy(DBRunLogStore, "_upsert")
+    run_log_store.add_branch_logs(branch_logs, run_id="run")
+
+    assert spy_upsert.call_count == 1
+    assert run_log_store.get_branch_statuses(["map.2", "map.0"], run_id="run") == {
+        "map.2": defaults.FAIL,
+        "map.0": defaults.CREATED,
+    }
+
+
+def test_db_store_get_branch_statuses_raises_if_branch_not_found(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+
+    with pytest.raises(exceptions.BranchLogNotFoundError):
+        run_log_store.get_branch_statuses(["map.0"], run_id="run")
+
+
+def test_db_store_get_branch_logs_returns_the_branch_logs(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+    run_log_store.create_run_log(run_id="run")
+    branch_logs = [run_log_store.create_branch_log(f"map.{i}") for i in range(3)]
+    branch_logs[2].parameters = {"x": 1}
+    run_log_store.add_branch_logs(branch_logs, run_id="run")
+
+    got = run_log_store.get_branch_logs(["map.2", "map.0"], run_id="run")
+
+    assert list(got) == ["map.2", "map.0"]
+    assert got["map.2"].parameters == {"x": 1}
+
+
+def test_db_store_get_branch_logs_raises_if_branch_not_found(connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+
+    with pytest.raises(exceptions.BranchLogNotFoundError):
+        run_log_store.get_branch_logs(["map.0"], run_id="run")
+
+
+def test_db_store_lazy_run_log_indexes_without_retrieving(mocker, connection_string):
+    run_log_store = DBRunLogStore(connection_string=connection_string)
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.add_step_log(run_log_store.create_step_log("map", "map"), run_id="run")
+    run_log_store.add_branch_log(run_log_store.create_branch_log("map.a"), run_id="run")
+    run_log_store.add_step_log(run_log_store.create_step_log("task", "map.a.task"), run_id="run")
+
+    spy_retrieve = mocker.spy(DBRunLogStore, "_retrieve")
+    lazy_run_log = run_log_store.get_lazy_run_log(run_id="run")
+
+    assert spy_retrieve.call_count == 0
+    assert lazy_run_log.search_step_by_internal_name("map.a.task")[0].name == "task"
+    assert lazy_run_log.to_run_log().model_dump() == run_log_store.get_run_log_by_id("run", full=True).model_dump()
@@ -1,9 +1,14 @@
+import json
+import multiprocessing
+import os
+
 import pytest
 
 from magnus.extensions.run_log_store.file_system.implementation import FileSystemRunLogstore
 import magnus.extensions.run_log_store.file_system.implementation as implementation
 from magnus import defaults
 from magnus import exceptions
+from magnus import datastore
 
 
 def test_file_system_run_log_store_log_folder_name_defaults_if_not_provided():
@@ -22,31 +27,27 @@ def test_file_system_run_log_store_write_to_folder_makes_dir_if_not_present(mock
     mock_safe_make_dir = mocker.MagicMock()
     monkeypatch.setattr(implementation.utils, "safe_make_dir", mock_safe_make_dir)
 
-    mock_json = mocker.MagicMock()
+    mock_serializers = mocker.MagicMock()
     mock_path = mocker.MagicMock()
-    monkeypatch.setattr(implementation, "json", mock_json)
+    monkeypatch.setattr(implementation, "serializers", mock_serializers)
     monkeypatch.setattr(implementation, "Path", mock_path)
+    mock_atomic_write = mocker.MagicMock()
+    monkeypatch.setattr(implementation, "atomic_write", mock_atomic_write)
 
     mock_run_log = mocker.MagicMock()
     mock_dict = mocker.MagicMock()
     mock_run_log.model_dump = mock_dict
 
-    run_log_store = FileSystemRunLogstore()
+    run_log_store = FileSystemRunLogstore(run_index=False)
     run_log_store.write_to_folder(run_log=mock_run_log)
 
     mock_safe_make_dir.assert_called_once_with(run_log_store.log_folder_name)
     assert mock_dict.call_count == 1
+    assert mock_atomic_write.call_count == 1
 
 
-def test_file_system_run_log_store_get_from_folder_raises_exception_if_folder_not_present(mocker, monkeypatch):
-    mock_path = mocker.MagicMock()
-    monkeypatch.setattr(implementation, "Path", mocker.MagicMock(return_value=mock_path))
-
-    mock_path.__truediv__.return_value = mock_path
-
-    mock_path.exists.return_value = False
-
-    run_log_store = implementation.FileSystemRunLogstore()
+def test_file_system_run_log_store_get_from_folder_raises_exception_if_folder_not_present(tmp_path):
+    run_log_store = implementation.FileSystemRunLogstore(log_folder=str(tmp_path / "not_there"))
 
     with pytest.raises(FileNotFoundError):
         run_log_store.get_from_folder(run_id="test")
@@ -59,9 +60,9 @@ def test_file_system_run_log_store_get_from_folder_returns_run_log_from_file_con
     mock_path.__truediv__.return_value = mock_path
     mock_path.exists.return_value = True
 
-    mock_json = mocker.MagicMock()
-    monkeypatch.setattr(implementation, "json", mock_json)
-    mock_json.load.return_value = {"run_id": "test"}
+    mock_serializers = mocker.MagicMock()
+    monkeypatch.setattr(implementation, "serializers", mock_serializers)
+    mock_serializers.loads.return_value = {"run_id": "test"}
 
     run_log_store = implementation.FileSystemRunLogstore()
     run_log = run_log_store.get_from_folder(run_id="does not matter")
@@ -69,12 +70,12 @@ def test_file_system_run_log_store_get_from_folder_returns_run_log_from_file_con
     assert run_log.run_id == "test"
 
 
-def test_file_system_run_log_store_create_run_log_writes_to_folder(mocker, monkeypatch):
+def test_file_system_run_log_store_create_run_log_writes_to_folder(mocker, monkeypatch, tmp_path):
     mock_write_to_folder = mocker.MagicMock()
 
     monkeypatch.setattr(implementation.FileSystemRunLogstore, "write_to_folder", mock_write_to_folder)
 
-    run_log_store = implementation.FileSystemRunLogstore()
+    run_log_store = implementation.FileSystemRunLogstore(log_folder=str(tmp_path))
     run_log = run_log_store.create_run_log(run_id="test random")
 
     mock_write_to_folder.assert_called_once_with(run_log)
@@ -82,14 +83,14 @@ def test_file_system_run_log_store_create_run_log_writes_to_folder(mocker, monke
     assert run_log.run_id == "test random"
 
 
-def test_file_system_run_log_store_create_run_log_raises_exception_if_present(mocker, monkeypatch):
+def test_file_system_run_log_store_create_run_log_raises_exception_if_present(mocker, monkeypatch, tmp_path):
     mock_write_to_folder = mocker.MagicMock()
     mock_get_run_log_by_id = mocker.MagicMock(return_value="existing")
 
     monkeypatch.setattr(implementation.FileSystemRunLogstore, "write_to_folder", mock_write_to_folder)
     monkeypatch.setattr(implementation.FileSystemRunLogstore, "get_run_log_by_id", mock_get_run_log_by_id)
 
-    run_log_store = implementation.FileSystemRunLogstore()
+    run_log_store = implementation.FileSystemRunLogstore(log_folder=str(tmp_path))
     with pytest.raises(exceptions.RunLogExistsError):
         run_log_store.create_run_log(run_id="test random")
 
@@ -128,3 +129,150 @@ def test_file_system_run_log_store_put_run_log_writes_to_folder(mocker, monkeypa
     run_log_store.put_run_log(run_log=mock_run_log)
 
     mock_write_to_folder.assert_called_once_with(mock_run_log)
+
+
+def test_file_system_run_log_store_cache_serves_copies_until_file_changes(tmp_path):
+    run_log_store = implementation.FileSystemRunLogstore(log_folder=str(tmp_path), cache=True)
+    other = implementation.FileSystemRunLogstore(log_folder=str(tmp_path))
+
+    run_log = run_log_store.create_run_log(run_id="test")
+
+    first = run_log_store.get_run_log_by_id(run_id="test")
+    first.status = "MODIFIED"
+    assert run_log_store.get_run_log_by_id(run_id="test") == run_log
+    assert run_log_store.cache_stats() == {"hits": 2, "misses": 0, "entries": 1}
+
+    run_log.tag = "changed by another process"
+    other.put_run_log(run_log)
+
+    assert run_log_store.get_run_log_by_id(run_id="test").tag == "changed by another process"
+
+
+def test_file_system_run_log_store_reads_run_log_of_any_serializer(tmp_path):
+    run_log_store = implementation.FileSystemRunLogstore(log_folder=str(tmp_path), serializer="compact-json")
+    default = implementation.FileSystemRunLogstore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run", tag="compact")
+
+    assert default.get_run_log_by_id(run_id="run").tag == "compact"
+    assert b"\n" not in (tmp_path / "run.json").read_bytes()
+
+
+def test_file_system_run_log_store_indexes_runs_and_reindexes(tmp_path):
+    run_log_store = implementation.FileSystemRunLogstore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run", dag_hash="abc")
+    run_log_store.update_run_log_status(run_id="run", status="SUCCESS")
+
+    assert [run["status"] for run in run_log_store.list_runs(dag_hash="abc")] == ["SUCCESS"]
+
+    (tmp_path / "run_index.file-system.db").unlink()
+    indexed = implementation.FileSystemRunLogstore(log_folder=str(tmp_path))
+    indexed.reindex()
+
+    assert [run["run_id"] for run in indexed.list_runs(status="SUCCESS")] == ["run"]
+
+
+def _add_step_logs(log_folder: str, prefix: str):
+    run_log_store = FileSystemRunLogstore(log_folder=log_folder, run_index=False)
+    for i in range(10):
+        step_log = run_log_store.create_step_log(f"{prefix}{i}", f"{prefix}{i}")
+        run_log_store.add_step_log(step_log, run_id="run")
+
+
+def test_file_system_run_log_store_does_not_lose_updates_of_concurrent_writers(tmp_path):
+    run_log_store = FileSystemRunLogstore(log_folder=str(tmp_path), run_index=False)
+    run_log_store.create_run_log(run_id="run")
+
+    processes = [multiprocessing.Process(target=_add_step_logs, args=(str(tmp_path), f"branch{i}_")) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert len(run_log_store.get_run_log_by_id(run_id="run").steps) == 40
+    assert sorted(os.listdir(tmp_path)) == [".locks", "run.json"]
+
+
+def test_file_system_run_log_store_removes_the_lock_file_once_the_run_is_over(tmp_path):
+    run_log_store = FileSystemRunLogstore(log_folder=str(tmp_path), run_index=False)
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.update_run_log_status(run_id="run", status=defaults.PROCESSING)
+
+    assert (tmp_path / ".locks" / "run.lock").exists()
+
+    run_log_store.update_run_log_status(run_id="run", status=defaults.SUCCESS)
+
+    assert not (tmp_path / ".locks" / "run.lock").exists()
+    assert run_log_store.get_run_log_by_id(run_id="run").status == defaults.SUCCESS
+
+
+def test_file_system_run_log_store_removes_the_lock_file_once_the_pipeline_ends(tmp_path):
+    run_log_store = FileSystemRunLogstore(log_folder=str(tmp_path), run_index=False)
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.add_step_log(
+        datastore.StepLog(name="success", internal_name="success", step_type="success", status=defaults.PROCESSING),
+        run_id="run",
+    )
+
+    assert (tmp_path / ".locks" / "run.lock").exists()
+
+    run_log_store.add_step_log(
+        datastore.StepLog(name="success", internal_name="success", step_type="success", status=defaults.SUCCESS),
+        run_id="run",
+    )
+
+    assert not (tmp_path / ".locks" / "run.lock").exists()
+
+
+def test_file_system_run_log_store_delete_run_removes_the_run_log_and_its_index(tmp_path):
+    run_log_store = FileSystemRunLogstore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+    size = os.stat(tmp_path / "run.json").st_size
+
+    assert run_log_store.delete_run(run_id="run", dry_run=True) == size
+    assert [run["run_id"] for run in run_log_store.list_runs()] == ["run"]
+
+    assert run_log_store.delete_run(run_id="run") == size
+    assert run_log_store.list_runs() == []
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.get_run_log_by_id(run_id="run")
+
+
+def test_file_system_run_log_store_delete_run_refuses_runs_it_does_not_hold(tmp_path):
+    run_log_store = FileSystemRunLogstore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.index.record(datastore.RunLog(run_id="other"))
+
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.delete_run(run_id="other")
+
+    assert [run["run_id"] for run in run_log_store.list_runs()] == ["other", "run"]
+
+
+def test_file_system_run_log_store_writes_parameters_of_attempts_once(tmp_path):
+    run_log_store = FileSystemRunLogstore(log_folder=str(tmp_path), cache=True)
+    run_log_store.create_run_log(run_id="run")
+    for name in ["a", "b"]:
+        step_log = run_log_store.create_step_log(name, name)
+        attempt_log = run_log_store.create_attempt_log()
+        attempt_log.parameters = {"config": {"x": 1}}
+        step_log.attempts.append(attempt_log)
+        run_log_store.add_step_log(step_log, run_id="run")
+
+    contents = json.loads((tmp_path / "run.json").read_text())
+    assert list(contents["parameter_snapshots"].values()) == [{"config": {"x": 1}}]
+    assert contents["steps"]["a"]["attempts"][0]["parameters"] == {}
+
+    reader = FileSystemRunLogstore(log_folder=str(tmp_path))
+    for store in [run_log_store, reader]:
+        run_log = store.get_run_log_by_id(run_id="run")
+        assert [step_log.attempts[0].parameters for step_log in run_log.steps.values()] == [{"config": {"x": 1}}] * 2
+
+
+def test_file_system_run_log_store_parameters_round_trip_non_finite_floats_and_large_integers(tmp_path):
+    run_log_store = implementation.FileSystemRunLogstore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.set_parameters(run_id="run", parameters={"x": float("inf"), "y": 2**70 + 1})
+
+    assert run_log_store.get_parameters(run_id="run") == {"x": float("inf"), "y": 2**70 + 1}
@@ -0,0 +1,156 @@
+import fcntl
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from magnus.extensions.run_log_store import locking
+
+
+def test_atomic_write_replaces_contents_and_leaves_no_temporary_file(tmp_path):
+    path = tmp_path / "run.json"
+    path.write_bytes(b"before")
+
+    token = locking.atomic_write(path, b"after")
+
+    assert path.read_bytes() == b"after"
+    assert os.listdir(tmp_path) == ["run.json"]
+    assert token == (os.stat(path).st_dev, os.stat(path).st_ino, 5, os.stat(path).st_mtime_ns)
+
+
+def test_atomic_write_keeps_earlier_contents_if_write_fails(mocker, tmp_path):
+    path = tmp_path / "run.json"
+    path.write_bytes(b"before")
+    mocker.patch.object(locking.os, "replace", side_effect=OSError("disk full"))
+
+    with pytest.raises(OSError):
+        locking.atomic_write(path, b"after")
+
+    assert path.read_bytes() == b"before"
+    assert os.listdir(tmp_path) == ["run.json"]
+
+
+def test_file_lock_is_reentrant_within_a_thread(tmp_path):
+    lock = locking.FileLock(tmp_path / "run.lock")
+
+    with lock:
+        with lock:
+            assert lock._depth == 2
+        assert lock._fd >= 0
+
+    assert lock._depth == 0
+    assert lock._fd == -1
+
+
+def _increment(path: str, times: int):
+    lock = locking.FileLock(path + ".lock")
+    for _ in range(times):
+        with lock:
+            with open(path) as fr:
+                value = int(fr.read())
+            with open(path, "w") as fw:
+                fw.write(str(value + 1))
+
+
+def test_file_lock_excludes_other_processes(tmp_path):
+    counter = tmp_path / "counter"
+    counter.write_text("0")
+
+    processes = [multiprocessing.Process(target=_increment, args=(str(counter), 50)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert counter.read_text() == "200"
+
+
+def test_run_locks_gives_a_lock_per_run(tmp_path):
+    run_locks = locking.RunLocks(tmp_path)
+
+    assert run_locks("run") is run_locks("run")
+    assert run_locks("run") is not run_locks("other")
+    assert run_locks("run").path == tmp_path / locking.LOCKS_FOLDER_NAME / "run.lock"
+
+
+def _hold_and_report(path: str, queue, release):
+    with locking.FileLock(path):
+        queue.put(os.stat(path).st_ino)
+        release.wait(10)
+
+
+def test_file_lock_waiter_retries_if_lock_file_is_removed(tmp_path):
+    path = tmp_path / "run.lock"
+    holder = locking.FileLock(path)
+    queue = multiprocessing.Queue()
+    release = multiprocessing.Event()
+
+    holder.acquire()
+    removed = os.fstat(holder._fd).st_ino
+    waiter = multiprocessing.Process(target=_hold_and_report, args=(str(path), queue, release))
+    waiter.start()
+    time.sleep(0.5)  # The waiter is blocked on the lock of the file being removed.
+    os.remove(path)
+    holder.release()
+
+    inode = queue.get(timeout=10)
+    fd = os.open(path, os.O_RDWR)
+    try:
+        assert inode == os.fstat(fd).st_ino
+        with pytest.raises(BlockingIOError):
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    finally:
+        os.close(fd)
+        release.set()
+        waiter.join()
+
+    assert inode != removed
+
+
+def _increment_run(folder: str, counter: str, times: int):
+    run_locks = locking.RunLocks(folder)
+    for _ in range(times):
+        with run_locks("run"):
+            with open(counter) as fr:
+                value = int(fr.read())
+            with open(counter, "w") as fw:
+                fw.write(str(value + 1))
+
+
+def _remove_run_lock(folder: str, stop):
+    run_locks = locking.RunLocks(folder)
+    while not stop.is_set():
+        run_locks.remove("run")
+
+
+def test_run_locks_remove_does_not_let_waiting_lockers_in_together(tmp_path):
+    counter = tmp_path / "counter"
+    counter.write_text("0")
+    stop = multiprocessing.Event()
+
+    remover = multiprocessing.Process(target=_remove_run_lock, args=(str(tmp_path), stop))
+    remover.start()
+    processes = [
+        multiprocessing.Process(target=_increment_run, args=(str(tmp_path), str(counter), 50)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    stop.set()
+    remover.join()
+
+    assert counter.read_text() == "200"
+
+
+def test_run_locks_remove_keeps_the_lock_file_if_held_by_the_caller(tmp_path):
+    run_locks = locking.RunLocks(tmp_path)
+
+    with run_locks("run"):
+        run_locks.remove("run")
+        assert run_locks("run").path.exists()
+
+    run_locks.remove("run")
+
+    assert not (tmp_path / locking.LOCKS_FOLDER_NAME / "run.lock").exists()
@@ -0,0 +1,233 @@
+import json
+import threading
+import urllib.request
+
+import pytest
+
+from magnus import defaults, exceptions
+from magnus.datastore import BranchLog, StepLog
+from magnus.extensions.run_log_store.chunked_file_system.implementation import ChunkedFileSystemRunLogStore
+from magnus.extensions.run_log_store.remote import protocol
+from magnus.extensions.run_log_store.remote.implementation import RemoteRunLogStore
+from magnus.extensions.run_log_store.remote.server import RunLogServer
+
+
+@pytest.fixture
+def backing_store(tmp_path):
+    return ChunkedFileSystemRunLogStore(log_folder=str(tmp_path / "logs"))
+
+
+def _serve(server: RunLogServer):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def server(backing_store):
+    server = RunLogServer(backing_store, port=0)
+    thread = _serve(server)
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+@pytest.fixture
+def unix_server(backing_store, tmp_path):
+    server = RunLogServer(backing_store, socket_path=str(tmp_path / "runlog.sock"))
+    thread = _serve(server)
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+def test_protocol_encodes_and_decodes_models():
+    step_log = StepLog(name="step", internal_name="step", status=defaults.SUCCESS)
+
+    decoded = protocol.decode(json.loads(json.dumps(protocol.encode({"logs": [step_log], "run_id": "run"}))))
+
+    assert decoded == {"logs": [step_log], "run_id": "run"}
+
+
+def test_protocol_decode_error_raises_magnus_exceptions_as_is():
+    error = protocol.encode_error(exceptions.RunLogNotFoundError("run"))
+
+    decoded = protocol.decode_error(error)
+
+    assert isinstance(decoded, exceptions.RunLogNotFoundError)
+    assert "run" in decoded.message
+
+
+def test_protocol_decode_error_raises_other_exceptions_as_exception():
+    decoded = protocol.decode_error(protocol.encode_error(KeyError("missing")))
+
+    assert type(decoded) is Exception
+    assert "KeyError" in str(decoded)
+
+
+def test_remote_store_rejects_unsupported_urls():
+    with pytest.raises(ValueError):
+        RemoteRunLogStore(url="ftp://127.0.0.1:8765")
+
+
+def test_run_log_server_rejects_a_remote_store():
+    with pytest.raises(Exception, match="remote"):
+        RunLogServer(RemoteRunLogStore())
+
+
+def test_run_log_server_health(server):
+    with urllib.request.urlopen(server.url + protocol.HEALTH_PATH) as response:
+        contents = json.loads(response.read())
+
+    assert contents == {"status": "ok", "run_log_store": "chunked-fs"}
+
+
+def test_run_log_server_rejects_unknown_methods(server):
+    results = server.dispatch([{"method": "delete_everything", "kwargs": {}}])
+
+    assert "does not support delete_everything" in results[0]["error"]["message"]
+
+
+def test_run_log_server_continues_past_failed_calls(server):
+    results = server.dispatch(
+        [
+            {"method": "get_run_log_by_id", "kwargs": {"run_id": "missing"}},
+            {"method": "create_run_log", "kwargs": {"run_id": "run"}},
+        ]
+    )
+
+    assert results[0]["error"]["type"] == "RunLogNotFoundError"
+    assert results[1]["result"]["__model__"] == "RunLog"
+
+
+@pytest.mark.parametrize("fixture", ["server", "unix_server"])
+def test_remote_store_round_trips_the_run_log(fixture, request, backing_store):
+    server = request.getfixturevalue(fixture)
+    store = RemoteRunLogStore(url=server.url)
+
+    store.create_run_log(run_id="run", tag="tag")
+    store.set_parameters(run_id="run", parameters={"x": 1})
+    store.add_step_log(StepLog(name="step", internal_name="step", status=defaults.SUCCESS), run_id="run")
+    store.update_run_log_status(run_id="run", status=defaults.SUCCESS)
+
+    run_log = store.get_run_log_by_id(run_id="run", full=True)
+
+    assert run_log.tag == "tag"
+    assert run_log.status == defaults.SUCCESS
+    assert run_log.parameters == {"x": 1}
+    assert run_log.steps["step"].status == defaults.SUCCESS
+    assert store.get_step_log(internal_name="step", run_id="run").status == defaults.SUCCESS
+    assert store.get_status_index(run_id="run")["step"].status == defaults.SUCCESS
+    assert backing_store.get_run_log_by_id(run_id="run", full=True) == run_log
+
+
+def test_remote_store_raises_magnus_exceptions(server):
+    store = RemoteRunLogStore(url=server.url)
+
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        store.get_run_log_by_id(run_id="missing")
+
+
+def test_remote_store_reuses_connections(server, mocker):
+    store = RemoteRunLogStore(url=server.url)
+    connect = mocker.spy(store.pool, "_connect")
+
+    store.create_run_log(run_id="run")
+    for _ in range(5):
+        store.get_run_log_by_id(run_id="run")
+
+    assert connect.call_count == 1
+
+
+def test_remote_store_reconnects_if_idle_connection_was_closed(server):
+    store = RemoteRunLogStore(url=server.url)
+    store.create_run_log(run_id="run")
+
+    store.pool._idle.queue[0].sock.close()
+
+    assert store.get_run_log_by_id(run_id="run").run_id == "run"
+
+
+def test_remote_store_raises_if_server_is_unreachable(tmp_path):
+    store = RemoteRunLogStore(url=f"unix://{tmp_path / 'missing.sock'}")
+
+    with pytest.raises(Exception, match="Unable to reach the run log server"):
+        store.get_parameters(run_id="run")
+
+
+def test_remote_store_write_behind_sends_writes_in_one_request(server, mocker):
+    store = RemoteRunLogStore(url=server.url, write_behind=True)
+    store.create_run_log(run_id="run")
+    post = mocker.spy(store.pool, "post")
+
+    for i in range(10):
+        store.add_step_log(StepLog(name=f"step{i}", internal_name=f"step{i}"), run_id="run")
+    assert post.call_count == 0
+
+    store.flush()
+
+    assert post.call_count == 1
+    assert len(server.run_log_store.get_run_log_by_id(run_id="run", full=True).steps) == 10
+
+
+def test_remote_store_write_behind_flushes_before_reads(server):
+    store = RemoteRunLogStore(url=server.url, write_behind=True)
+    store.create_run_log(run_id="run")
+
+    store.set_parameters(run_id="run", parameters={"x": 1})
+
+    assert store.get_parameters(run_id="run") == {"x": 1}
+
+
+def test_remote_store_forwards_parameters_of_branches(server):
+    store = RemoteRunLogStore(url=server.url)
+    store.create_run_log(run_id="run")
+    store.set_parameters(run_id="run", parameters={"x": 1, "y": 1})
+    store.add_step_log(StepLog(name="map", internal_name="map"), run_id="run")
+    store.add_branch_log(BranchLog(internal_name="map.a"), run_id="run")
+
+    store.set_parameters(run_id="run", parameters={"y": 2}, internal_branch_name="map.a")
+
+    assert store.get_parameters(run_id="run", internal_branch_name="map.a") == {"x": 1, "y": 2}
+    assert store.get_parameters(run_id="run") == {"x": 1, "y": 1}
+
+
+def test_remote_store_reads_branch_logs_in_one_request(server):
+    store = RemoteRunLogStore(url=server.url)
+    store.create_run_log(run_id="run")
+    store.add_step_log(StepLog(name="map", internal_name="map"), run_id="run")
+    store.add_branch_logs(
+        [BranchLog(internal_name="map.a", parameters={"x": 1}), BranchLog(internal_name="map.b")], run_id="run"
+    )
+
+    branch_logs = store.get_branch_logs(["map.a", "map.b"], run_id="run")
+
+    assert branch_logs["map.a"].parameters == {"x": 1}
+    assert branch_logs["map.b"].internal_name == "map.b"
+
+
+def test_remote_store_does_not_lose_concurrent_writes(server):
+    store = RemoteRunLogStore(url=server.url)
+    store.create_run_log(run_id="run")
+
+    def _write(worker: int):
+        for i in range(10):
+            step_log = StepLog(name=f"step{worker}-{i}", internal_name=f"step{worker}-{i}")
+            store.add_step_log(step_log, run_id="run")
+
+    threads = [threading.Thread(target=_write, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.get_run_log_by_id(run_id="run", full=True).steps) == 80
+
+
+def test_remote_store_lists_and_deletes_runs(server):
+    store = RemoteRunLogStore(url=server.url)
+    store.create_run_log(run_id="run", tag="tag")
+
+    assert [run["run_id"] for run in store.list_runs(tag="tag")] == ["run"]
+    assert store.delete_run(run_id="run") > 0
+    assert store.list_runs() == []
@@ -0,0 +1,121 @@
+import multiprocessing
+
+import pytest
+
+from magnus import datastore, defaults
+from magnus.extensions.run_log_store import run_index
+from magnus.extensions.run_log_store.chunked_k8s_pvc.implementation import ChunkedK8PersistentVolumeRunLogstore
+from magnus.extensions.run_log_store.k8s_pvc.implementation import K8PersistentVolumeRunLogstore
+from magnus.extensions.run_log_store.run_index import RunIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    return RunIndex(str(tmp_path), layout="file-system")
+
+
+def test_run_index_record_inserts_and_updates(index):
+    run_log = datastore.RunLog(run_id="run", tag="nightly", dag_hash="abc", status=defaults.PROCESSING)
+
+    index.record(run_log)
+    run_log.status = defaults.SUCCESS
+    index.record(run_log)
+
+    (run,) = index.query()
+    assert run["run_id"] == "run"
+    assert run["tag"] == "nightly"
+    assert run["status"] == defaults.SUCCESS
+    assert run["end_time"] >= run["start_time"]
+
+
+def test_run_index_record_skips_unchanged_attributes(mocker, index):
+    run_log = datastore.RunLog(run_id="run", status=defaults.PROCESSING)
+    index.record(run_log)
+
+    mock_connection = mocker.patch.object(RunIndex, "connection", new_callable=mocker.PropertyMock)
+    index.record(run_log)
+
+    assert mock_connection.call_count == 0
+
+
+def test_run_index_query_filters_and_paginates_latest_first(mocker, index):
+    mock_time = mocker.patch.object(run_index.time, "time")
+    for i in range(5):
+        mock_time.return_value = float(i)
+        status = defaults.SUCCESS if i % 2 else defaults.FAIL
+        index.record(datastore.RunLog(run_id=f"run{i}", tag="x" if i < 4 else "y", status=status))
+
+    assert [run["run_id"] for run in index.query(tag="x")] == ["run3", "run2", "run1", "run0"]
+    assert [run["run_id"] for run in index.query(tag="x", status=defaults.SUCCESS)] == ["run3", "run1"]
+    assert [run["run_id"] for run in index.query(limit=2, offset=1)] == ["run3", "run2"]
+    assert index.query(dag_hash="unknown") == []
+
+
+def test_run_index_rebuild_replaces_the_index(index):
+    index.record(datastore.RunLog(run_id="stale", status=defaults.SUCCESS))
+
+    index.rebuild([(datastore.RunLog(run_id="run", status=defaults.FAIL), 1.0, 2.0)])
+
+    assert index.query() == [
+        {
+            "run_id": "run",
+            "tag": "",
+            "status": defaults.FAIL,
+            "dag_hash": "",
+            "original_run_id": "",
+            "start_time": 1.0,
+            "end_time": 2.0,
+        }
+    ]
+
+
+def test_run_index_started_at_is_the_earliest_attempt():
+    run_log = datastore.RunLog(run_id="run")
+    step_log = datastore.StepLog(name="map", internal_name="map")
+    step_log.attempts.append(datastore.StepAttempt(start_time="2024-01-02 00:00:00.000000"))
+    branch_log = datastore.BranchLog(internal_name="map.a")
+    branch_step_log = datastore.StepLog(name="task", internal_name="map.a.task")
+    branch_step_log.attempts.append(datastore.StepAttempt(start_time="2024-01-01 00:00:00.000000"))
+    branch_log.steps["map.a.task"] = branch_step_log
+    step_log.branches["map.a"] = branch_log
+    run_log.steps["map"] = step_log
+
+    assert run_index.started_at(run_log) == pytest.approx(
+        run_index.datetime.fromisoformat("2024-01-01 00:00:00").timestamp()
+    )
+    assert run_index.started_at(datastore.RunLog(run_id="run")) is None
+
+
+def _record_runs(folder: str, prefix: str):
+    index = RunIndex(folder, layout="file-system")
+    for i in range(20):
+        index.record(datastore.RunLog(run_id=f"{prefix}{i}", status=defaults.SUCCESS))
+
+
+def test_run_index_is_consistent_under_concurrent_writers(tmp_path):
+    processes = [multiprocessing.Process(target=_record_runs, args=(str(tmp_path), f"p{i}_")) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    assert len(RunIndex(str(tmp_path), layout="file-system").query(limit=100)) == 80
+
+
+def test_run_index_uses_the_rollback_journal_without_wal(tmp_path):
+    index = RunIndex(str(tmp_path), layout="file-system", wal=False)
+    index.record(datastore.RunLog(run_id="run", status=defaults.SUCCESS))
+
+    assert index.connection.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+    assert [run["run_id"] for run in index.query()] == ["run"]
+    assert not (tmp_path / "run_index.file-system.db-wal").exists()
+
+
+@pytest.mark.parametrize("store", [K8PersistentVolumeRunLogstore, ChunkedK8PersistentVolumeRunLogstore])
+def test_run_index_of_the_persistent_volume_stores_does_not_use_wal(tmp_path, store):
+    run_log_store = store(persistent_volume_name="volume", mount_path=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+
+    assert run_log_store.index.wal is False
+    assert [run["run_id"] for run in run_log_store.list_runs()] == ["run"]
@@ -0,0 +1,202 @@
+import json
+import os
+
+import pytest
+
+from magnus import defaults, exceptions
+from magnus.extensions.run_log_store.segment_file_system import implementation
+from magnus.extensions.run_log_store.segment_file_system.implementation import (
+    SegmentFileSystemRunLogStore,
+    SegmentFold,
+)
+
+
+def _record(name, contents, time, writer="w", seq=0):
+    return {"name": name, "time": time, "writer": writer, "seq": seq, "contents": contents}
+
+
+def test_segment_fold_merges_fields_by_stamp_irrespective_of_order(tmp_path):
+    fold = SegmentFold(tmp_path)
+
+    fold.apply(_record("Parameter-x", {"a": 2, "b": 2}, time=2))
+    fold.apply(_record("Parameter-x", {"a": 1, "c": 1}, time=1))
+
+    assert fold.contents("Parameter-x") == {"a": 2, "b": 2, "c": 1}
+
+
+def test_segment_fold_chunk_name_uses_the_first_write(tmp_path):
+    fold = SegmentFold(tmp_path)
+
+    fold.apply(_record("StepLog-step-${creation_time}", {"status": "SUCCESS"}, time=20))
+    fold.apply(_record("StepLog-step-${creation_time}", {"status": "PROCESSING"}, time=10))
+
+    assert fold.lookup("StepLog-step-") == ["StepLog-step-10"]
+    assert fold.chunk_names == {"StepLog-step-10": "StepLog-step-"}
+    assert fold.contents("StepLog-step-") == {"status": "SUCCESS"}
+
+
+def test_segment_fold_lookup_exact_does_not_match_names_sharing_a_prefix(tmp_path):
+    fold = SegmentFold(tmp_path)
+
+    fold.apply(_record("StepLog-a-${creation_time}", {}, time=1))
+    fold.apply(_record("StepLog-a-b-${creation_time}", {}, time=2))
+
+    assert fold.lookup("StepLog-a-") == ["StepLog-a-1"]
+    assert fold.lookup("StepLog", prefix=True) == ["StepLog-a-1", "StepLog-a-b-2"]
+
+
+def test_segment_fold_refresh_does_nothing_without_a_registry(tmp_path):
+    fold = SegmentFold(tmp_path / "not_there")
+
+    assert fold.lookup("RunLog") == []
+
+
+def test_segment_store_writes_only_append(tmp_path):
+    run_log_store = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.set_parameters(run_id="run", parameters={"x": 1})
+    run_log_store.set_parameters(run_id="run", parameters={"x": 2})
+
+    files = os.listdir(tmp_path / "run")
+    assert sorted(files) == sorted([implementation.REGISTRY_FILE_NAME, run_log_store.writer + ".segment"])
+
+    segment = (tmp_path / "run" / (run_log_store.writer + ".segment")).read_text().splitlines()
+    assert len(segment) == 3
+    assert run_log_store.get_parameters(run_id="run") == {"x": 2}
+
+
+def test_segment_store_raises_run_log_not_found(tmp_path):
+    run_log_store = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.get_run_log_by_id(run_id="run")
+
+
+def test_segment_store_folds_writes_of_other_writers(tmp_path):
+    reader = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+    writer = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    writer.create_run_log(run_id="run")
+    assert reader.get_run_log_by_id(run_id="run").run_id == "run"
+
+    step_log = reader.create_step_log("step", "step")
+    step_log.status = defaults.PROCESSING
+    reader.add_step_log(step_log, run_id="run")
+
+    step_log = writer.get_step_log("step", run_id="run")
+    step_log.status = defaults.SUCCESS
+    writer.add_step_log(step_log, run_id="run")
+
+    assert reader.get_step_log("step", run_id="run").status == defaults.SUCCESS
+    assert len(os.listdir(tmp_path / "run")) == 3
+
+
+def test_segment_store_full_run_log_stitches_branches(tmp_path):
+    run_log_store = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+
+    run_log_store.add_step_log(run_log_store.create_step_log("map", "map"), run_id="run")
+    run_log_store.add_branch_log(run_log_store.create_branch_log("map.a"), run_id="run")
+    run_log_store.add_step_log(run_log_store.create_step_log("task", "map.a.task"), run_id="run")
+
+    run_log = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    assert list(run_log.steps["map"].branches["map.a"].steps) == ["map.a.task"]
+
+
+def test_segment_store_compact_collapses_segments(tmp_path):
+    writer = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+    other = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    writer.create_run_log(run_id="run")
+    writer.add_step_log(writer.create_step_log("first", "first"), run_id="run")
+    other.add_step_log(other.create_step_log("second", "second"), run_id="run")
+    other.set_parameters(run_id="run", parameters={"x": 1})
+    before = writer.get_run_log_by_id(run_id="run", full=True)
+
+    writer.compact(run_id="run")
+
+    segments = [name for name in os.listdir(tmp_path / "run") if name.endswith(".segment")]
+    assert len(segments) == 1
+    assert SegmentFileSystemRunLogStore(log_folder=str(tmp_path)).get_run_log_by_id(run_id="run", full=True) == before
+    assert other.get_run_log_by_id(run_id="run", full=True) == before
+
+
+def test_segment_fold_refresh_starts_afresh_if_registry_replaced_by_one_as_long(tmp_path):
+    (tmp_path / "a.segment").write_text(json.dumps(_record("RunLog", {"status": "old"}, 1)) + "\n")
+    (tmp_path / implementation.REGISTRY_FILE_NAME).write_text("a.segment\n")
+    fold = SegmentFold(tmp_path)
+    fold.refresh()
+
+    (tmp_path / "b.segment").write_text(json.dumps(_record("RunLog", {"run_id": "run"}, 2)) + "\n")
+    (tmp_path / "registry").write_text("b.segment\n")
+    os.replace(tmp_path / "registry", tmp_path / implementation.REGISTRY_FILE_NAME)
+    (tmp_path / "a.segment").unlink()
+    fold.refresh()
+
+    assert fold.contents("RunLog") == {"run_id": "run"}
+    assert fold.segments == {"b.segment": len((tmp_path / "b.segment").read_bytes())}
+
+
+def test_segment_store_reader_open_across_compact_sees_the_compacted_writes(tmp_path):
+    writer = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+    reader = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    writer.create_run_log(run_id="run")
+    writer.add_step_log(writer.create_step_log("first", "first"), run_id="run")
+    assert list(reader.get_run_log_by_id(run_id="run", full=True).steps) == ["first"]
+
+    writer.add_step_log(writer.create_step_log("second", "second"), run_id="run")
+    writer.compact(run_id="run")
+    later = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+    later.add_step_log(later.create_step_log("third", "third"), run_id="run")
+
+    assert list(reader.get_run_log_by_id(run_id="run", full=True).steps) == ["first", "second", "third"]
+
+
+def test_segment_store_compact_raises_if_no_segments(tmp_path):
+    run_log_store = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+
+    with pytest.raises(Exception, match="No segments found"):
+        run_log_store.compact(run_id="run")
+
+
+def test_segment_store_add_branch_logs_is_a_single_append(tmp_path):
+    run_log_store = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+    branch_logs = [run_log_store.create_branch_log(f"map.{i}") for i in range(3)]
+    branch_logs[1].status = defaults.SUCCESS
+
+    run_log_store.add_branch_logs(branch_logs, run_id="run")
+
+    segment = (tmp_path / "run" / (run_log_store.writer + ".segment")).read_text().splitlines()
+    assert len(segment) == 4
+
+    statuses = SegmentFileSystemRunLogStore(log_folder=str(tmp_path)).get_branch_statuses(
+        ["map.0", "map.1"], run_id="run"
+    )
+    assert statuses == {"map.0": defaults.CREATED, "map.1": defaults.SUCCESS}
+
+
+def test_segment_store_get_branch_statuses_raises_if_branch_not_found(tmp_path):
+    run_log_store = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+
+    with pytest.raises(exceptions.BranchLogNotFoundError):
+        run_log_store.get_branch_statuses(["map.0"], run_id="run")
+
+
+def test_segment_store_get_branch_logs_returns_the_branch_logs(tmp_path):
+    run_log_store = SegmentFileSystemRunLogStore(log_folder=str(tmp_path))
+    run_log_store.create_run_log(run_id="run")
+    branch_logs = [run_log_store.create_branch_log(f"map.{i}") for i in range(2)]
+    branch_logs[1].parameters = {"x": 1}
+    run_log_store.add_branch_logs(branch_logs, run_id="run")
+
+    got = SegmentFileSystemRunLogStore(log_folder=str(tmp_path)).get_branch_logs(["map.1", "map.0"], run_id="run")
+
+    assert list(got) == ["map.1", "map.0"]
+    assert got["map.1"].parameters == {"x": 1}
+    with pytest.raises(exceptions.BranchLogNotFoundError):
+        run_log_store.get_branch_logs(["map.2"], run_id="run")
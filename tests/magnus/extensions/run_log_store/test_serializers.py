@@ -0,0 +1,119 @@
+import gzip
+import json
+import math
+
+import pytest
+
+from magnus.extensions.run_log_store import serializers
+
+CONTENTS = {"run_id": "run", "steps": {"step": {"status": "SUCCESS", "attempts": [1, 2.5, None, True]}}}
+
+
+@pytest.mark.parametrize("serializer", ["json", "compact-json"])
+@pytest.mark.parametrize("compression", ["", "gzip"])
+def test_serializers_loads_detects_the_format_written_by_dumps(serializer, compression):
+    payload = serializers.dumps(CONTENTS, serializer=serializer, compression=compression)
+
+    assert serializers.loads(payload) == CONTENTS
+
+
+def test_serializers_json_is_the_indented_format_of_earlier_versions():
+    assert serializers.dumps(CONTENTS) == json.dumps(CONTENTS, ensure_ascii=True, indent=4).encode()
+
+
+def test_serializers_compact_json_is_smaller_than_json():
+    assert len(serializers.dumps(CONTENTS, serializer="compact-json")) < len(serializers.dumps(CONTENTS))
+
+
+def test_serializers_compact_json_falls_back_to_json_without_orjson(monkeypatch):
+    monkeypatch.setattr(serializers, "_orjson", lambda: None)
+
+    payload = serializers.dumps(CONTENTS, serializer="compact-json")
+
+    assert payload == json.dumps(CONTENTS, separators=(",", ":")).encode()
+    assert serializers.loads(payload) == CONTENTS
+
+
+@pytest.mark.parametrize("serializer", ["json", "compact-json"])
+def test_serializers_large_integers_round_trip(serializer):
+    contents = {"x": 2**70 + 1, "y": [-(2**64)]}
+
+    decoded = serializers.loads(serializers.dumps(contents, serializer=serializer))
+
+    assert decoded == contents
+    assert isinstance(decoded["x"], int)
+
+
+def test_serializers_json_round_trips_non_finite_floats():
+    contents = {"nan": float("nan"), "inf": float("inf"), "ninf": float("-inf")}
+
+    decoded = serializers.loads(serializers.dumps(contents))
+
+    assert math.isnan(decoded["nan"])
+    assert decoded["inf"] == float("inf")
+    assert decoded["ninf"] == float("-inf")
+
+
+def test_serializers_loads_falls_back_to_json_if_orjson_cannot_decode():
+    payload = json.dumps({"x": float("nan"), "y": 1}, indent=4).encode()
+
+    decoded = serializers.loads(payload)
+
+    assert math.isnan(decoded["x"])
+    assert decoded["y"] == 1
+
+
+@pytest.mark.parametrize("orjson", [True, False])
+def test_serializers_compact_json_rejects_non_finite_floats(monkeypatch, orjson):
+    if not orjson:
+        monkeypatch.setattr(serializers, "_orjson", lambda: None)
+
+    with pytest.raises(ValueError):
+        serializers.dumps({"x": [None, float("nan")]}, serializer="compact-json")
+
+
+def test_serializers_compact_json_keeps_null():
+    contents = {"x": None, "y": [None, 1.5]}
+
+    assert serializers.loads(serializers.dumps(contents, serializer="compact-json")) == contents
+
+
+def test_serializers_gzip_is_deterministic():
+    payload = serializers.dumps(CONTENTS, compression="gzip")
+
+    assert payload[:2] == serializers.GZIP_MAGIC
+    assert payload == serializers.dumps(CONTENTS, compression="gzip")
+    assert json.loads(gzip.decompress(payload)) == CONTENTS
+
+
+def test_serializers_msgpack_round_trips():
+    pytest.importorskip("msgpack")
+
+    payload = serializers.dumps(CONTENTS, serializer="msgpack")
+
+    assert serializers.loads(payload) == CONTENTS
+    assert serializers.loads(serializers.dumps(CONTENTS, serializer="msgpack", compression="gzip")) == CONTENTS
+
+
+def test_serializers_zstd_round_trips():
+    pytest.importorskip("zstandard")
+
+    payload = serializers.dumps(CONTENTS, serializer="compact-json", compression="zstd")
+
+    assert payload[:4] == serializers.ZSTD_MAGIC
+    assert serializers.loads(payload) == CONTENTS
+
+
+def test_serializers_raise_if_optional_dependency_not_installed(monkeypatch):
+    monkeypatch.setitem(__import__("sys").modules, "msgpack", None)
+
+    with pytest.raises(Exception, match="msgpack is required"):
+        serializers.dumps(CONTENTS, serializer="msgpack")
+
+
+def test_serializers_validate_rejects_unknown_formats():
+    with pytest.raises(ValueError):
+        serializers.validate_serializer("pickle")
+
+    with pytest.raises(ValueError):
+        serializers.validate_compression("lz4")
@@ -0,0 +1,132 @@
+import multiprocessing
+
+import pytest
+
+from magnus import defaults, exceptions
+from magnus.datastore import StepLog
+from magnus.extensions.run_log_store.shared_memory import implementation
+from magnus.extensions.run_log_store.shared_memory.implementation import RunLogChunks, SharedMemoryRunLogStore
+
+
+@pytest.fixture
+def run_log_store(monkeypatch):
+    monkeypatch.delenv(implementation.ADDRESS_ENV, raising=False)
+    run_log_store = SharedMemoryRunLogStore()
+    yield run_log_store
+    if run_log_store._manager is not None:
+        run_log_store._manager.shutdown()
+
+
+def test_run_log_chunks_upsert_merges_with_existing_contents():
+    chunks = RunLogChunks()
+
+    chunks.upsert("run", "StepLog", {"step": {"status": "PROCESSING", "name": "step"}})
+    chunks.upsert("run", "StepLog", {"step": {"status": "SUCCESS"}})
+
+    assert chunks.get("run", "StepLog", "step") == {"status": "SUCCESS", "name": "step"}
+
+
+def test_run_log_chunks_keeps_the_order_of_creation():
+    chunks = RunLogChunks()
+
+    chunks.upsert("run", "StepLog", {"b": {}, "a": {}})
+    chunks.upsert("run", "StepLog", {"b": {"status": "SUCCESS"}, "c": {}})
+
+    assert chunks.keys("run", "StepLog") == ["b", "a", "c"]
+    assert chunks.keys("run", "StepLog", "a") == ["a"]
+    assert chunks.keys("other", "StepLog") == []
+
+
+def test_run_log_chunks_statuses_skips_missing_keys():
+    chunks = RunLogChunks()
+
+    chunks.upsert("run", "BranchLog", {"branch": {"status": "SUCCESS"}})
+
+    assert chunks.statuses("run", "BranchLog", ["branch", "missing"]) == {"branch": "SUCCESS"}
+
+
+def test_shared_memory_store_starts_a_manager_and_publishes_its_address(run_log_store):
+    run_log_store.create_run_log(run_id="run")
+
+    assert run_log_store._manager is not None
+    assert implementation.os.environ[implementation.ADDRESS_ENV] == run_log_store._manager.address
+
+
+def test_shared_memory_store_connects_to_the_published_manager(run_log_store):
+    run_log_store.create_run_log(run_id="run", tag="tag")
+
+    other = SharedMemoryRunLogStore()
+
+    assert other.get_run_log_by_id(run_id="run").tag == "tag"
+    assert other._manager is None
+
+
+def test_shared_memory_store_starts_a_manager_if_published_one_is_gone(run_log_store, monkeypatch, tmp_path):
+    monkeypatch.setenv(implementation.ADDRESS_ENV, str(tmp_path / "gone"))
+
+    run_log_store.create_run_log(run_id="run")
+
+    assert run_log_store._manager is not None
+    assert implementation.os.environ[implementation.ADDRESS_ENV] != str(tmp_path / "gone")
+
+
+def test_shared_memory_store_round_trips_the_run_log(run_log_store):
+    run_log_store.create_run_log(run_id="run")
+    run_log_store.set_parameters(run_id="run", parameters={"x": 1})
+    run_log_store.add_step_log(StepLog(name="step", internal_name="step", status=defaults.SUCCESS), run_id="run")
+
+    branch_log = run_log_store.create_branch_log("map.a")
+    branch_log.status = defaults.SUCCESS
+    run_log_store.add_branch_log(branch_log, run_id="run")
+
+    run_log = run_log_store.get_run_log_by_id(run_id="run", full=True)
+
+    assert run_log.parameters == {"x": 1}
+    assert run_log.steps["step"].status == defaults.SUCCESS
+    assert run_log_store.get_branch_statuses(["map.a"], run_id="run") == {"map.a": defaults.SUCCESS}
+
+
+def test_shared_memory_store_raises_if_run_log_does_not_exist(run_log_store):
+    with pytest.raises(exceptions.RunLogNotFoundError):
+        run_log_store.get_run_log_by_id(run_id="missing")
+
+
+def test_shared_memory_store_raises_if_branch_does_not_exist(run_log_store):
+    run_log_store.create_run_log(run_id="run")
+
+    with pytest.raises(exceptions.BranchLogNotFoundError):
+        run_log_store.get_branch_statuses(["missing"], run_id="run")
+
+
+def test_shared_memory_store_get_branch_logs_returns_the_branch_logs(run_log_store):
+    run_log_store.create_run_log(run_id="run")
+    branch_log = run_log_store.create_branch_log("map.a")
+    branch_log.parameters = {"x": 1}
+    run_log_store.add_branch_logs([branch_log, run_log_store.create_branch_log("map.b")], run_id="run")
+
+    got = run_log_store.get_branch_logs(["map.a", "map.b"], run_id="run")
+
+    assert got["map.a"].parameters == {"x": 1}
+    with pytest.raises(exceptions.BranchLogNotFoundError):
+        run_log_store.get_branch_logs(["missing"], run_id="run")
+
+
+def _add_step_logs(worker: int):
+    # As the branches of a parallel node do, the store is created afresh in the process.
+    run_log_store = SharedMemoryRunLogStore()
+    for i in range(10):
+        name = f"step{worker}-{i}"
+        run_log_store.add_step_log(StepLog(name=name, internal_name=name), run_id="run")
+
+
+def test_shared_memory_store_is_shared_by_child_processes(run_log_store):
+    run_log_store.create_run_log(run_id="run")
+
+    processes = [multiprocessing.Process(target=_add_step_logs, args=(worker,)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    assert len(run_log_store.get_run_log_by_id(run_id="run", full=True).steps) == 40
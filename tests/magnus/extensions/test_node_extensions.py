@@ -1,6 +1,7 @@
 import pytest
 
 from magnus import defaults
+from magnus.datastore import BranchLog
 from magnus.extensions import nodes as nodes
 
 from magnus.tasks import BaseTaskType
@@ -181,6 +182,163 @@ def test_parallel_node_parse_from_config_raises_exception_if_no_branches(mocker,
         _ = nodes.ParallelNode.parse_from_config(config=config)
 
 
+def test_parallel_node_fan_out_adds_branch_logs_in_one_call(mocker, monkeypatch):
+    mock_context = mocker.MagicMock()
+    monkeypatch.setattr(nodes.ParallelNode, "_context", mock_context)
+    mock_context.run_log_store.create_branch_log.side_effect = lambda name: mocker.MagicMock(internal_name=name)
+
+    node = nodes.ParallelNode(
+        name="test",
+        internal_name="test",
+        next_node="next_node",
+        branches={"test.a": nodes.Graph(start_at="first"), "test.b": nodes.Graph(start_at="first")},
+    )
+
+    node.fan_out()
+
+    branch_logs = mock_context.run_log_store.add_branch_logs.call_args[0][0]
+    assert [branch_log.internal_name for branch_log in branch_logs] == ["test.a", "test.b"]
+    assert all(branch_log.status == defaults.PROCESSING for branch_log in branch_logs)
+    mock_context.run_log_store.add_branch_log.assert_not_called()
+
+
+def test_parallel_node_fan_in_fails_step_if_any_branch_is_not_success(mocker, monkeypatch):
+    mock_context = mocker.MagicMock()
+    mock_step_log = mocker.MagicMock()
+    monkeypatch.setattr(nodes.ParallelNode, "_context", mock_context)
+    mock_context.run_log_store.get_branch_logs.return_value = {
+        "test.a": BranchLog(internal_name="test.a", status=defaults.SUCCESS),
+        "test.b": BranchLog(internal_name="test.b", status=defaults.FAIL),
+    }
+    mock_context.run_log_store.get_step_log.return_value = mock_step_log
+
+    node = nodes.ParallelNode(
+        name="test",
+        internal_name="test",
+        next_node="next_node",
+        branches={"test.a": nodes.Graph(start_at="first"), "test.b": nodes.Graph(start_at="first")},
+    )
+
+    node.fan_in()
+
+    mock_context.run_log_store.get_branch_logs.assert_called_once_with(["test.a", "test.b"], mock_context.run_id)
+    assert mock_step_log.status == defaults.FAIL
+
+
+def test_map_node_fan_out_and_fan_in_use_bulk_apis(mocker, monkeypatch):
+    mock_context = mocker.MagicMock()
+    mock_step_log = mocker.MagicMock()
+    monkeypatch.setattr(nodes.MapNode, "_context", mock_context)
+    mock_context.run_log_store.get_parameters.return_value = {"chunks": [1, 2, 3]}
+    mock_context.run_log_store.create_branch_log.side_effect = lambda name: mocker.MagicMock(internal_name=name)
+    mock_context.run_log_store.get_branch_logs.side_effect = lambda names, run_id: {
+        name: BranchLog(internal_name=name, status=defaults.SUCCESS) for name in names
+    }
+    mock_context.run_log_store.get_step_log.return_value = mock_step_log
+
+    node = nodes.MapNode(
+        name="test",
+        internal_name="test",
+        next_node="next_node",
+        iterate_on="chunks",
+        iterate_as="chunk",
+        branch=nodes.Graph(start_at="first"),
+    )
+
+    node.fan_out()
+    node.fan_in()
+
+    branch_logs = mock_context.run_log_store.add_branch_logs.call_args[0][0]
+    assert [branch_log.internal_name for branch_log in branch_logs] == ["test.1", "test.2", "test.3"]
+    mock_context.run_log_store.get_branch_logs.assert_called_once_with(
+        ["test.1", "test.2", "test.3"], mock_context.run_id
+    )
+    mock_context.run_log_store.get_branch_log.assert_not_called()
+    assert mock_step_log.status == defaults.SUCCESS
+
+
+def test_map_node_execute_as_graph_skips_iterations_that_succeeded_in_original_run(mocker, monkeypatch):
+    mock_context = mocker.MagicMock()
+    monkeypatch.setattr(nodes.MapNode, "_context", mock_context)
+    mock_context.run_log_store.get_parameters.return_value = {"chunks": [1, 2, 3]}
+    mock_context.run_log_store.create_branch_log.side_effect = lambda name: mocker.MagicMock(internal_name=name)
+    mock_context.run_log_store.get_branch_logs.side_effect = lambda names, run_id: {
+        name: BranchLog(internal_name=name, status=defaults.SUCCESS) for name in names
+    }
+    mock_context.executor._is_parallel_execution.return_value = False
+    mock_context.executor._is_branch_eligible_for_rerun.side_effect = lambda name: name == "test.2"
+
+    node = nodes.MapNode(
+        name="test",
+        internal_name="test",
+        next_node="next_node",
+        iterate_on="chunks",
+        iterate_as="chunk",
+        branch=nodes.Graph(start_at="first"),
+    )
+
+    node.execute_as_graph()
+
+    branch_logs = mock_context.run_log_store.add_branch_logs.call_args[0][0]
+    assert [branch_log.status for branch_log in branch_logs] == [
+        defaults.SUCCESS,
+        defaults.PROCESSING,
+        defaults.SUCCESS,
+    ]
+    mock_context.executor.execute_graph.assert_called_once_with(node.branch, map_variable={"chunk": 2})
+    assert branch_logs[0].parameters == mock_context.executor._get_original_branch_parameters.return_value
+    mock_context.executor._get_original_branch_parameters.assert_any_call("test.1")
+
+
+def test_map_node_iterates_on_parameters_of_the_containing_branch(mocker, monkeypatch):
+    mock_context = mocker.MagicMock()
+    monkeypatch.setattr(nodes.MapNode, "_context", mock_context)
+    mock_context.run_log_store.get_parameters.return_value = {"chunks": [1, 2]}
+    mock_context.run_log_store.create_branch_log.side_effect = lambda name: mocker.MagicMock(internal_name=name)
+
+    node = nodes.MapNode(
+        name="inner",
+        internal_name=f"outer.{defaults.MAP_PLACEHOLDER}.inner",
+        internal_branch_name=f"outer.{defaults.MAP_PLACEHOLDER}",
+        next_node="next_node",
+        iterate_on="chunks",
+        iterate_as="chunk",
+        branch=nodes.Graph(start_at="first"),
+    )
+
+    node.fan_out(map_variable={"x": "a"})
+
+    mock_context.run_log_store.get_parameters.assert_called_once_with(
+        mock_context.run_id, internal_branch_name="outer.a"
+    )
+    branch_logs = mock_context.run_log_store.add_branch_logs.call_args[0][0]
+    assert [branch_log.internal_name for branch_log in branch_logs] == ["outer.a.inner.1", "outer.a.inner.2"]
+
+
+def test_parallel_node_fan_in_merges_parameters_of_branches_by_reducer(mocker, monkeypatch):
+    mock_context = mocker.MagicMock()
+    monkeypatch.setattr(nodes.ParallelNode, "_context", mock_context)
+    mock_merge = mocker.MagicMock()
+    monkeypatch.setattr(nodes.ParallelNode, "_merge_branch_parameters", mock_merge)
+    branch_logs = {
+        "test.a": BranchLog(internal_name="test.a", status=defaults.SUCCESS),
+        "test.b": BranchLog(internal_name="test.b", status=defaults.SUCCESS),
+    }
+    mock_context.run_log_store.get_branch_logs.return_value = branch_logs
+
+    node = nodes.ParallelNode(
+        name="test",
+        internal_name="test",
+        next_node="next_node",
+        branches={"test.a": nodes.Graph(start_at="first"), "test.b": nodes.Graph(start_at="first")},
+        reducer=defaults.COLLECT_REDUCER,
+    )
+
+    node.fan_in()
+
+    mock_merge.assert_called_once_with(list(branch_logs.values()), reducer=defaults.COLLECT_REDUCER, map_variable=None)
+
+
 def test_map_node_parse_from_config_raises_exception_if_no_branch(mocker, monkeypatch):
     config = {}
     with pytest.raises(Exception, match="A map node should have a branch"):
@@ -55,3 +55,12 @@ def test_do_nothing_catalog_put_returns_empty_list(monkeypatch, mocker):
 def test_do_nothing_catalog_sync_between_runs_does_nothing(monkeypatch, mocker):
     catalog_handler = catalog.DoNothingCatalog()
     catalog_handler.sync_between_runs(previous_run_id="1", run_id="2")
+
+
+def test_base_catalog_delete_run_not_supported(instantiable_base_class):
+    with pytest.raises(Exception, match="does not support deleting runs"):
+        catalog.BaseCatalog().delete_run(run_id="run")
+
+
+def test_do_nothing_catalog_delete_run_reclaims_nothing():
+    assert catalog.DoNothingCatalog().delete_run(run_id="run") == 0
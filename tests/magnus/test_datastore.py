@@ -1,3 +1,6 @@
+import io
+import json
+
 import pytest
 
 from magnus import datastore, defaults, exceptions
@@ -148,6 +151,69 @@ def test_run_log_get_data_catalogs_by_stage_gets_catalogs_from_steps(mocker, mon
     assert data_catalogs == ["data catalog"]
 
 
+def test_copy_log_is_independent_of_the_log():
+    step_log = datastore.StepLog(name="step", internal_name="step")
+    step_log.attempts.append(datastore.StepAttempt(parameters={"x": [1, 2]}))
+    step_log.data_catalog.append(datastore.DataCatalog(name="data", extra_field="kept"))
+
+    copied = datastore.copy_log(step_log)
+    copied.attempts[0].parameters["x"].append(3)
+
+    assert copied.data_catalog[0].extra_field == "kept"
+    assert step_log.attempts[0].parameters == {"x": [1, 2]}
+    assert copied.model_dump(exclude={"attempts"}) == step_log.model_dump(exclude={"attempts"})
+
+
+def test_copy_log_replaces_the_updated_fields():
+    branch_log = datastore.BranchLog(internal_name="map.a", status=defaults.SUCCESS)
+    branch_log.steps["map.a.step"] = datastore.StepLog(name="step", internal_name="map.a.step")
+
+    copied = datastore.copy_log(branch_log, steps={})
+
+    assert copied.steps == {}
+    assert copied.status == defaults.SUCCESS
+    assert list(branch_log.steps) == ["map.a.step"]
+
+
+def test_get_parameters_hash_does_not_depend_on_the_order_of_keys():
+    assert datastore.get_parameters_hash({"x": 1, "y": [1, 2]}) == datastore.get_parameters_hash({"y": [1, 2], "x": 1})
+    assert datastore.get_parameters_hash({"x": 1}) != datastore.get_parameters_hash({"x": 2})
+
+
+def test_detach_parameters_collects_one_snapshot_per_distinct_parameters():
+    run_log = datastore.RunLog(run_id="run")
+    for name in ["a", "b"]:
+        step_log = datastore.StepLog(name=name, internal_name=name)
+        step_log.attempts.append(datastore.StepAttempt(parameters={"x": 1}))
+        run_log.steps[name] = step_log
+    branch_log = datastore.BranchLog(internal_name="a.branch")
+    branch_log.steps["a.branch.c"] = datastore.StepLog(name="c", internal_name="a.branch.c")
+    branch_log.steps["a.branch.c"].attempts.append(datastore.StepAttempt(parameters={"x": 2}))
+    branch_log.steps["a.branch.c"].attempts.append(datastore.StepAttempt())
+    run_log.steps["a"].branches["a.branch"] = branch_log
+
+    snapshots = {}
+    contents = datastore.detach_parameters(run_log.model_dump(), snapshots)
+
+    assert sorted(snapshots.values(), key=lambda snapshot: snapshot["x"]) == [{"x": 1}, {"x": 2}]
+    attempts = contents["steps"]["a"]["branches"]["a.branch"]["steps"]["a.branch.c"]["attempts"]
+    assert attempts[0]["parameters"] == {}
+    assert snapshots[attempts[0]["parameters_hash"]] == {"x": 2}
+    assert attempts[1]["parameters_hash"] == ""
+
+    restored = datastore.RunLog(**datastore.attach_parameters(contents, snapshots))
+    assert restored.steps["b"].attempts[0].parameters == {"x": 1}
+    assert restored.steps["a"].branches["a.branch"].steps["a.branch.c"].attempts[0].parameters == {"x": 2}
+
+
+def test_attach_parameters_leaves_the_parameters_empty_if_snapshot_is_missing():
+    contents = {"attempts": [{"parameters": {}, "parameters_hash": "missing"}]}
+
+    datastore.attach_parameters(contents, {})
+
+    assert contents["attempts"][0]["parameters"] == {}
+
+
 def test_base_run_log_store_create_run_log_not_implemented():
     run_log_store = datastore.BaseRunLogStore()
     with pytest.raises(NotImplementedError):
@@ -237,6 +303,55 @@ def test_base_run_log_store_get_parameters_gets_from_run_log(mocker, monkeypatch
     assert run_log_store.get_parameters(run_id="testing") == {"b": 2}
 
 
+def _run_log_with_nested_branches() -> datastore.RunLog:
+    run_log = datastore.RunLog(run_id="testing", parameters={"x": 0, "y": 0, "z": 0})
+    map_log = datastore.StepLog(name="map", internal_name="map")
+    map_log.branches["map.1"] = datastore.BranchLog(internal_name="map.1", parameters={"y": 1, "z": 1})
+    parallel_log = datastore.StepLog(name="parallel", internal_name="map.1.parallel")
+    parallel_log.branches["map.1.parallel.a"] = datastore.BranchLog(
+        internal_name="map.1.parallel.a", parameters={"z": 2}
+    )
+    map_log.branches["map.1"].steps["map.1.parallel"] = parallel_log
+    run_log.steps["map"] = map_log
+    return run_log
+
+
+def test_get_branch_scopes_returns_enclosing_branches_from_the_outermost():
+    assert datastore.get_branch_scopes("") == []
+    assert datastore.get_branch_scopes("map.1") == ["map.1"]
+    assert datastore.get_branch_scopes("map.1.parallel.a") == ["map.1", "map.1.parallel.a"]
+
+
+def test_base_run_log_store_get_parameters_of_branch_overlays_enclosing_branches(mocker, monkeypatch):
+    run_log = _run_log_with_nested_branches()
+    monkeypatch.setattr(datastore.BaseRunLogStore, "get_run_log_by_id", mocker.MagicMock(return_value=run_log))
+
+    run_log_store = datastore.BaseRunLogStore()
+
+    assert run_log_store.get_parameters(run_id="testing", internal_branch_name="map.1.parallel.a") == {
+        "x": 0,
+        "y": 1,
+        "z": 2,
+    }
+    assert run_log_store.get_parameters(run_id="testing", internal_branch_name="map.1") == {"x": 0, "y": 1, "z": 1}
+    assert run_log.parameters == {"x": 0, "y": 0, "z": 0}
+
+
+def test_base_run_log_store_set_parameters_of_branch_updates_branch_log(mocker, monkeypatch):
+    run_log = _run_log_with_nested_branches()
+    mock_put_run_log = mocker.MagicMock()
+    monkeypatch.setattr(datastore.BaseRunLogStore, "get_run_log_by_id", mocker.MagicMock(return_value=run_log))
+    monkeypatch.setattr(datastore.BaseRunLogStore, "put_run_log", mock_put_run_log)
+
+    run_log_store = datastore.BaseRunLogStore()
+    run_log_store.set_parameters(run_id="testing", parameters={"x": 3}, internal_branch_name="map.1.parallel.a")
+
+    branch_log, _ = run_log.search_branch_by_internal_name("map.1.parallel.a")
+    assert branch_log.parameters == {"z": 2, "x": 3}
+    assert run_log.parameters == {"x": 0, "y": 0, "z": 0}
+    mock_put_run_log.assert_called_once_with(run_log=run_log)
+
+
 def test_base_run_log_store_get_run_config_returns_config_from_run_log(mocker, monkeypatch):
     run_log = datastore.RunLog(run_id="testing")
     run_config = {"executor": "for testing"}
@@ -432,6 +547,90 @@ def test_base_run_log_add_branch_log_adds_branch_to_the_right_step(mocker, monke
     assert mock_step.branches["test.branch.step"] == branch_log
 
 
+def test_base_run_log_add_branch_logs_puts_run_log_once(mocker, monkeypatch):
+    branch_logs = [datastore.BranchLog(internal_name="map.a"), datastore.BranchLog(internal_name="map.b")]
+
+    mock_run_log = mocker.MagicMock()
+    mock_step = mocker.MagicMock()
+    mock_step.branches = {}
+    mock_run_log.search_step_by_internal_name.return_value = mock_step, None
+
+    mock_put_run_log = mocker.MagicMock()
+    mock_get_run_log_by_id = mocker.MagicMock(return_value=mock_run_log)
+    monkeypatch.setattr(datastore.BaseRunLogStore, "put_run_log", mock_put_run_log)
+    monkeypatch.setattr(datastore.BaseRunLogStore, "get_run_log_by_id", mock_get_run_log_by_id)
+
+    run_log_store = datastore.BaseRunLogStore()
+
+    run_log_store.add_branch_logs(branch_logs=branch_logs, run_id="test")
+
+    assert mock_step.branches == {"map.a": branch_logs[0], "map.b": branch_logs[1]}
+    mock_get_run_log_by_id.assert_called_once_with(run_id="test")
+    mock_put_run_log.assert_called_once_with(mock_run_log)
+
+
+def test_base_run_log_get_branch_statuses_reads_run_log_once(mocker, monkeypatch):
+    run_log = datastore.RunLog(run_id="test")
+    step_log = datastore.StepLog(name="map", internal_name="map")
+    step_log.branches["map.a"] = datastore.BranchLog(internal_name="map.a", status=defaults.SUCCESS)
+    step_log.branches["map.b"] = datastore.BranchLog(internal_name="map.b", status=defaults.FAIL)
+    run_log.steps["map"] = step_log
+
+    mock_get_run_log_by_id = mocker.MagicMock(return_value=run_log)
+    monkeypatch.setattr(datastore.BaseRunLogStore, "get_run_log_by_id", mock_get_run_log_by_id)
+
+    run_log_store = datastore.BaseRunLogStore()
+
+    statuses = run_log_store.get_branch_statuses(internal_branch_names=["map.a", "map.b"], run_id="test")
+
+    assert statuses == {"map.a": defaults.SUCCESS, "map.b": defaults.FAIL}
+    mock_get_run_log_by_id.assert_called_once_with(run_id="test")
+
+
+def test_base_run_log_get_branch_logs_reads_run_log_once(mocker, monkeypatch):
+    run_log = datastore.RunLog(run_id="test")
+    step_log = datastore.StepLog(name="map", internal_name="map")
+    step_log.branches["map.a"] = datastore.BranchLog(internal_name="map.a", parameters={"x": 1})
+    step_log.branches["map.b"] = datastore.BranchLog(internal_name="map.b", parameters={"x": 2})
+    run_log.steps["map"] = step_log
+
+    mock_get_run_log_by_id = mocker.MagicMock(return_value=run_log)
+    monkeypatch.setattr(datastore.BaseRunLogStore, "get_run_log_by_id", mock_get_run_log_by_id)
+
+    run_log_store = datastore.BaseRunLogStore()
+
+    branch_logs = run_log_store.get_branch_logs(internal_branch_names=["map.b", "map.a"], run_id="test")
+
+    assert list(branch_logs) == ["map.b", "map.a"]
+    assert branch_logs["map.a"].parameters == {"x": 1}
+    mock_get_run_log_by_id.assert_called_once_with(run_id="test")
+
+
+def test_base_run_log_get_status_index_indexes_steps_and_branches(mocker, monkeypatch):
+    run_log = datastore.RunLog(run_id="test")
+    step_log = datastore.StepLog(name="map", internal_name="map", status=defaults.FAIL)
+    step_log.branches["map.a"] = datastore.BranchLog(
+        internal_name="map.a", status=defaults.SUCCESS, parameters={"x": 1}
+    )
+    task_log = datastore.StepLog(name="task", internal_name="map.a.task", status=defaults.SUCCESS)
+    task_log.data_catalog.append(datastore.DataCatalog(name="data.csv", data_hash="hash", stage="put"))
+    task_log.data_catalog.append(datastore.DataCatalog(name="input.csv", data_hash="other", stage="get"))
+    step_log.branches["map.a"].steps["map.a.task"] = task_log
+    run_log.steps["map"] = step_log
+
+    mock_get_run_log_by_id = mocker.MagicMock(return_value=run_log)
+    monkeypatch.setattr(datastore.BaseRunLogStore, "get_run_log_by_id", mock_get_run_log_by_id)
+
+    index = datastore.BaseRunLogStore().get_status_index(run_id="test")
+
+    assert index == {
+        "map": datastore.LogStatus(status=defaults.FAIL),
+        "map.a": datastore.LogStatus(status=defaults.SUCCESS, parameters={"x": 1}),
+        "map.a.task": datastore.LogStatus(status=defaults.SUCCESS, data_hashes={"data.csv": "hash"}),
+    }
+    mock_get_run_log_by_id.assert_called_once_with(run_id="test", full=True)
+
+
 def test_buffered_run_log_store_inits_run_log_as_none():
     run_log_store = datastore.BufferRunLogstore()
 
@@ -475,3 +674,182 @@ def test_buffered_get_run_log_by_id_raises_exception_if_not_found():
 
     with pytest.raises(exceptions.RunLogNotFoundError):
         run_log_store.get_run_log_by_id("test")
+
+
+def _nested_run_log() -> datastore.RunLog:
+    run_log = datastore.RunLog(run_id="run", status=defaults.SUCCESS, parameters={"x": 1})
+    run_log.steps["first"] = datastore.StepLog(name="first", internal_name="first")
+    run_log.steps["map"] = datastore.StepLog(name="map", internal_name="map")
+    for i in range(2):
+        branch_log = datastore.BranchLog(internal_name=f"map.{i}")
+        step_log = datastore.StepLog(name="task", internal_name=f"map.{i}.task")
+        step_log.data_catalog.append(datastore.DataCatalog(name=f"data{i}", stage="put"))
+        branch_log.steps[step_log.internal_name] = step_log
+        run_log.steps["map"].branches[branch_log.internal_name] = branch_log
+    return run_log
+
+
+def test_lazy_run_log_loads_only_the_steps_accessed(mocker):
+    source = datastore.RunLogTreeSource(_nested_run_log())
+    spy_load_step = mocker.spy(source, "load_step")
+    lazy_run_log = datastore.LazyRunLog(run_log=datastore.RunLog(run_id="run", status=defaults.SUCCESS), source=source)
+
+    step_log, branch_log = lazy_run_log.search_step_by_internal_name("map.1.task")
+
+    assert step_log.internal_name == "map.1.task"
+    assert branch_log.internal_name == "map.1"
+    assert [call.args[0] for call in spy_load_step.call_args_list] == ["map", "map.1.task"]
+    assert list(lazy_run_log.steps) == ["first", "map"]
+    assert lazy_run_log.status == defaults.SUCCESS
+
+
+def test_lazy_run_log_search_branch_by_internal_name():
+    lazy_run_log = datastore.LazyRunLog(
+        run_log=datastore.RunLog(run_id="run"), source=datastore.RunLogTreeSource(_nested_run_log())
+    )
+
+    branch_log, step_log = lazy_run_log.search_branch_by_internal_name("map.0")
+
+    assert branch_log.internal_name == "map.0"
+    assert step_log.internal_name == "map"
+    assert lazy_run_log.search_branch_by_internal_name("") == (lazy_run_log, None)
+
+
+def test_lazy_run_log_raises_key_error_for_unknown_or_nested_steps():
+    lazy_run_log = datastore.LazyRunLog(
+        run_log=datastore.RunLog(run_id="run"), source=datastore.RunLogTreeSource(_nested_run_log())
+    )
+
+    with pytest.raises(KeyError):
+        lazy_run_log.steps["map.0.task"]
+
+    assert "map.0.task" not in lazy_run_log.steps
+
+
+def test_lazy_run_log_iter_steps_walks_depth_first():
+    lazy_run_log = datastore.LazyRunLog(
+        run_log=datastore.RunLog(run_id="run"), source=datastore.RunLogTreeSource(_nested_run_log())
+    )
+
+    assert [step_log.internal_name for step_log in lazy_run_log.iter_steps()] == [
+        "first",
+        "map",
+        "map.0.task",
+        "map.1.task",
+    ]
+    assert {dc.name for dc in lazy_run_log.get_data_catalogs_by_stage(stage="put")} == {"data0", "data1"}
+
+
+def test_lazy_run_log_to_run_log_is_the_full_run_log():
+    run_log = _nested_run_log()
+    header = run_log.model_copy(update={"steps": {}})
+
+    lazy_run_log = datastore.LazyRunLog(run_log=header, source=datastore.RunLogTreeSource(run_log))
+
+    assert lazy_run_log.to_run_log().model_dump() == run_log.model_dump()
+
+
+def test_lazy_run_log_iter_logs_follows_every_step_by_its_branches():
+    lazy_run_log = datastore.LazyRunLog(
+        run_log=datastore.RunLog(run_id="run"), source=datastore.RunLogTreeSource(_nested_run_log())
+    )
+
+    logs = list(lazy_run_log.iter_logs())
+
+    assert [(type(log).__name__, log.internal_name) for log in logs] == [
+        ("StepLog", "first"),
+        ("StepLog", "map"),
+        ("BranchLog", "map.0"),
+        ("StepLog", "map.0.task"),
+        ("BranchLog", "map.1"),
+        ("StepLog", "map.1.task"),
+    ]
+    assert logs[1].branches == {}
+    assert logs[2].steps == {}
+
+
+def test_lazy_run_log_count_steps_does_not_load_the_steps(mocker):
+    source = datastore.RunLogTreeSource(_nested_run_log())
+    spy_load_step = mocker.spy(source, "load_step")
+    lazy_run_log = datastore.LazyRunLog(run_log=datastore.RunLog(run_id="run"), source=source)
+
+    assert lazy_run_log.count_steps() == 4
+    assert lazy_run_log.count_steps("map.0") == 1
+    assert spy_load_step.call_count == 0
+
+
+def test_run_log_summary_counts_the_logs_by_status():
+    run_log = _nested_run_log()
+    run_log.steps["first"].status = defaults.SUCCESS
+    run_log.steps["map"].status = defaults.SUCCESS
+    run_log.steps["map"].branches["map.0"].status = defaults.SUCCESS
+    run_log.steps["map"].branches["map.0"].steps["map.0.task"].status = defaults.SUCCESS
+    run_log.steps["map"].branches["map.1"].status = defaults.FAIL
+    lazy_run_log = datastore.LazyRunLog(
+        run_log=datastore.RunLog(run_id="run", tag="tag", status=defaults.FAIL),
+        source=datastore.RunLogTreeSource(run_log),
+    )
+
+    summary = datastore.RunLogSummary.from_run_log(lazy_run_log)
+
+    assert summary.run_id == "run"
+    assert summary.tag == "tag"
+    assert summary.status == defaults.FAIL
+    assert summary.steps == {defaults.SUCCESS: 3, defaults.FAIL: 1}
+    assert summary.branches == {defaults.SUCCESS: 1, defaults.FAIL: 1}
+    assert summary.failed_steps == ["map.1.task"]
+
+
+def test_run_log_summary_bounds_the_failed_steps():
+    run_log = datastore.RunLog(run_id="run")
+    for i in range(5):
+        run_log.steps[f"step{i}"] = datastore.StepLog(name=f"step{i}", internal_name=f"step{i}", status=defaults.FAIL)
+    lazy_run_log = datastore.LazyRunLog(
+        run_log=datastore.RunLog(run_id="run"), source=datastore.RunLogTreeSource(run_log)
+    )
+
+    summary = datastore.RunLogSummary.from_run_log(lazy_run_log, max_failed_steps=2)
+
+    assert summary.steps == {defaults.FAIL: 5}
+    assert summary.failed_steps == ["step0", "step1"]
+
+
+def test_export_run_log_writes_a_line_for_every_log():
+    run_log = _nested_run_log()
+    header = run_log.model_copy(update={"steps": {}})
+    lazy_run_log = datastore.LazyRunLog(run_log=header, source=datastore.RunLogTreeSource(run_log))
+    stream = io.StringIO()
+
+    lines = datastore.export_run_log(lazy_run_log, stream)
+
+    logs = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines == len(logs) == 7
+    assert logs[0]["log_type"] == "RunLog"
+    assert logs[0]["parameters"] == {"x": 1}
+    assert "steps" not in logs[0]
+    assert [log["log_type"] for log in logs[1:]] == [
+        "StepLog",
+        "StepLog",
+        "BranchLog",
+        "StepLog",
+        "BranchLog",
+        "StepLog",
+    ]
+    assert "branches" not in logs[2]
+    assert "steps" not in logs[3]
+    assert logs[4]["data_catalog"][0]["name"] == "data0"
+
+
+def test_base_run_log_store_get_lazy_run_log_wraps_the_full_run_log(mocker):
+    run_log_store = datastore.BufferRunLogstore()
+    run_log_store.run_log = _nested_run_log()
+
+    lazy_run_log = run_log_store.get_lazy_run_log(run_id="run")
+
+    assert lazy_run_log.parameters == {"x": 1}
+    assert lazy_run_log.steps["map"].branches["map.1"].steps["map.1.task"].name == "task"
+
+
+def test_base_run_log_store_delete_run_not_supported():
+    with pytest.raises(Exception, match="does not support deleting runs"):
+        datastore.BaseRunLogStore().delete_run(run_id="run")
@@ -133,3 +133,25 @@ def test_buffered_run_log_store_accepts_local(mocker, caplog):
         extension.validate()
 
     assert "Run log generated by buffered run log store are not persisted." in caplog.text
+
+
+def test_shared_memory_run_log_store_raises_exception_for_anything_else_than_local(mocker):
+    mock_executor = mocker.MagicMock()
+
+    mock_executor.service_name = "not_local"
+
+    extension = integration.SharedMemoryRunLogStore(mock_executor, "service")
+    with pytest.raises(Exception, match="Shared memory run log store is only supported for local executor"):
+        extension.validate()
+
+
+def test_shared_memory_run_log_store_accepts_local(mocker, caplog):
+    mock_executor = mocker.MagicMock()
+
+    mock_executor.service_name = "local"
+
+    extension = integration.SharedMemoryRunLogStore(mock_executor, "service")
+    with caplog.at_level(logging.WARNING, logger="magnus"):
+        extension.validate()
+
+    assert "Run log generated by shared memory run log store are not persisted." in caplog.text
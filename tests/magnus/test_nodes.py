@@ -1,6 +1,7 @@
 import pytest
 
 from magnus import defaults, nodes, exceptions  # pylint: disable=import-error  # pylint: disable=import-error
+from magnus.datastore import BranchLog
 
 
 @pytest.fixture(autouse=True)
@@ -285,6 +286,81 @@ def test_composite_node_execute_raises_exception(instantiable_composite_node):
         traversal_class.execute()
 
 
+@pytest.fixture()
+def branch_parameters(mocker, monkeypatch):
+    mock_run_context = mocker.MagicMock()
+    monkeypatch.setattr(nodes.context, "run_context", mock_run_context)
+
+    parameters = {}
+
+    def branch_logs(names):
+        return [BranchLog(internal_name=name, parameters=parameters[name]) for name in names]
+
+    yield parameters, mock_run_context.run_log_store, branch_logs
+
+
+def test_composite_node_merge_branch_parameters_by_last_writer(instantiable_composite_node, branch_parameters):
+    parameters, run_log_store, branch_logs = branch_parameters
+    parameters.update({"test.a": {"x": 1, "y": "a"}, "test.b": {"x": 2}})
+
+    node = nodes.CompositeNode(name="test", internal_name="test", node_type="test", next_node="next")
+    node._merge_branch_parameters(branch_logs(["test.a", "test.b"]))
+
+    _, merged = run_log_store.set_parameters.call_args[0]
+    assert merged == {"x": 2, "y": "a"}
+    assert run_log_store.set_parameters.call_args[1] == {"internal_branch_name": ""}
+
+
+def test_composite_node_merge_branch_parameters_collects_into_the_containing_branch(
+    instantiable_composite_node, branch_parameters
+):
+    parameters, run_log_store, branch_logs = branch_parameters
+    parameters.update({"map.1.test.a": {"x": 1}, "map.1.test.b": {"x": 2, "y": "b"}})
+
+    node = nodes.CompositeNode(
+        name="test", internal_name=f"map.{defaults.MAP_PLACEHOLDER}.test", node_type="test", next_node="next"
+    )
+    node._merge_branch_parameters(
+        branch_logs(["map.1.test.a", "map.1.test.b"]), reducer=defaults.COLLECT_REDUCER, map_variable={"chunk": 1}
+    )
+
+    _, merged = run_log_store.set_parameters.call_args[0]
+    assert merged == {"x": [1, 2], "y": ["b"]}
+    assert run_log_store.set_parameters.call_args[1] == {"internal_branch_name": "map.1"}
+
+
+def test_composite_node_merge_branch_parameters_by_function(instantiable_composite_node, branch_parameters):
+    parameters, run_log_store, branch_logs = branch_parameters
+    parameters.update({"test.a": {"x": 1}, "test.b": {"x": 3}})
+
+    node = nodes.CompositeNode(name="test", internal_name="test", node_type="test", next_node="next")
+    node._merge_branch_parameters(branch_logs(["test.a", "test.b"]), reducer="builtins.sum")
+
+    assert run_log_store.set_parameters.call_args[0][1] == {"x": 4}
+
+
+def test_composite_node_merge_branch_parameters_raises_if_reducer_fails(instantiable_composite_node, branch_parameters):
+    parameters, _, branch_logs = branch_parameters
+    parameters.update({"test.a": {"x": "a"}, "test.b": {"x": 3}})
+
+    node = nodes.CompositeNode(name="test", internal_name="test", node_type="test", next_node="next")
+
+    with pytest.raises(Exception, match="The reducer builtins.sum of test could not merge"):
+        node._merge_branch_parameters(branch_logs(["test.a", "test.b"]), reducer="builtins.sum")
+
+
+def test_composite_node_merge_branch_parameters_does_nothing_if_none_set(
+    instantiable_composite_node, branch_parameters
+):
+    parameters, run_log_store, branch_logs = branch_parameters
+    parameters.update({"test.a": {}, "test.b": {}})
+
+    node = nodes.CompositeNode(name="test", internal_name="test", node_type="test", next_node="next")
+    node._merge_branch_parameters(branch_logs(["test.a", "test.b"]))
+
+    run_log_store.set_parameters.assert_not_called()
+
+
 def test_terminal_node_get_on_failure_node_raises_exception(instantiable_terminal_node):
     node = nodes.TerminalNode(name="test", internal_name="test", node_type="dummy")
 
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from magnus import retention
+
+DAY = 24 * 60 * 60
+
+
+def _run(run_id: str, start_time: float, tag: str = "", status: str = "SUCCESS", original_run_id: str = "") -> dict:
+    return {
+        "run_id": run_id,
+        "tag": tag,
+        "status": status,
+        "dag_hash": "",
+        "original_run_id": original_run_id,
+        "start_time": start_time,
+        "end_time": start_time + 1,
+    }
+
+
+def _expired(runs, **policy):
+    return [run["run_id"] for run in retention.expired_runs(runs, retention.RetentionPolicy(**policy), now=100 * DAY)]
+
+
+def test_retention_policy_needs_a_rule():
+    with pytest.raises(ValueError, match="at least one of keep_last or max_age_days"):
+        retention.RetentionPolicy()
+
+
+def test_expired_runs_keeps_the_latest_runs_of_every_tag():
+    runs = [_run("a1", 1, tag="a"), _run("a2", 2, tag="a"), _run("a3", 3, tag="a"), _run("b1", 1, tag="b")]
+
+    assert _expired(runs, keep_last=2) == ["a1"]
+
+
+def test_expired_runs_expires_runs_older_than_max_age():
+    runs = [_run("old", 10 * DAY), _run("new", 95 * DAY), _run("old_failed", 10 * DAY, status="FAIL")]
+
+    assert _expired(runs, max_age_days=30) == ["old", "old_failed"]
+
+
+def test_expired_runs_keeps_runs_in_progress_older_than_max_age():
+    runs = [_run("old", 10 * DAY), _run("old_running", 10 * DAY, status="PROCESSING")]
+
+    assert _expired(runs, max_age_days=30) == ["old"]
+
+
+def test_expired_runs_does_not_count_runs_in_progress_against_keep_last():
+    runs = [_run("done", 1), _run("running", 2, status="PROCESSING")]
+
+    assert _expired(runs, keep_last=0) == ["done"]
+
+
+def test_expired_runs_keeps_runs_referenced_by_retained_runs():
+    runs = [
+        _run("first", 1 * DAY),
+        _run("rerun", 2 * DAY, original_run_id="first"),
+        _run("rerun_of_rerun", 99 * DAY, original_run_id="rerun"),
+        _run("unrelated", 3 * DAY),
+    ]
+
+    assert _expired(runs, max_age_days=30) == ["unrelated"]
+    assert _expired(runs, max_age_days=30, keep_referenced=False) == ["first", "rerun", "unrelated"]
+
+
+def test_throttle_spaces_the_operations(mocker):
+    mock_sleep = mocker.patch.object(retention.time, "sleep")
+    mocker.patch.object(retention.time, "monotonic", return_value=10.0)
+    throttle = retention.Throttle(rate=4)
+
+    for _ in range(3):
+        throttle.wait()
+
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.25, 0.5]
+
+
+def test_throttle_does_not_limit_without_rate(mocker):
+    mock_sleep = mocker.patch.object(retention.time, "sleep")
+
+    retention.Throttle().wait()
+
+    assert mock_sleep.call_count == 0
+
+
+def _make_tree(root):
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "top.json").write_bytes(b"12345")
+    (root / "a" / "b" / "deep.json").write_bytes(b"123")
+    return root
+
+
+def test_remove_tree_dry_run_reports_the_bytes_only(tmp_path):
+    root = _make_tree(tmp_path / "run")
+
+    assert retention.remove_tree(root, dry_run=True) == 8
+    assert (root / "a" / "b" / "deep.json").exists()
+
+
+def test_remove_tree_removes_nested_folders(tmp_path):
+    root = _make_tree(tmp_path / "run")
+
+    assert retention.remove_tree(root, max_workers=2, throttle=retention.Throttle(rate=1000)) == 8
+    assert os.listdir(tmp_path) == []
+
+
+def test_remove_tree_removes_a_file_and_ignores_missing(tmp_path):
+    (tmp_path / "run.json").write_bytes(b"12")
+
+    assert retention.remove_tree(tmp_path / "run.json") == 2
+    assert retention.remove_tree(tmp_path / "run.json") == 0
+
+
+def test_set_aside_renames_to_a_hidden_name(tmp_path):
+    (tmp_path / "run").mkdir()
+
+    aside = retention.set_aside(tmp_path / "run")
+
+    assert aside.name.startswith(".deleting.run.")
+    assert os.listdir(tmp_path) == [aside.name]
+    assert retention.set_aside(tmp_path / "missing") == tmp_path / "missing"
@@ -436,3 +436,10 @@ def test_get_node_execution_command_overwrites_run_id_if_asked(mocker, monkeypat
 def test_get_service_base_class_throws_exception_for_unknown_service():
     with pytest.raises(Exception):
         utils.get_service_base_class("Does not exist")
+
+
+def test_diff_dict_returns_new_and_modified_items_only():
+    d1 = {"same": 1, "modified": [1, 2], "removed": "x"}
+    d2 = {"same": 1, "modified": [1, 2, 3], "new": {"a": 1}}
+
+    assert utils.diff_dict(d1, d2) == {"modified": [1, 2, 3], "new": {"a": 1}}